@@ -0,0 +1,99 @@
+"""
+Transpile time of a large synthetic module.
+
+Generates a module with many structs and many services, each with a refine
+method using them, then times transpiling every service in it: once from
+cold, then again unchanged and after editing one service, as watch-mode
+rebuilds or the IDE would. Refine is the method transpile_service generates,
+so each service is one cached method body:
+
+    python -m aj_lang.transpiler.bench --structs 300 --services 300
+"""
+import argparse
+import importlib.util
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+
+def synthetic_module(structs: int, services: int, edited: int = -1) -> str:
+    """Source of `structs` structs and `services` services; service `edited` adds 2 instead of 1"""
+    lines = [
+        "from aj_lang.decorators import service, refine, structure",
+        "from aj_lang.types import U64, Mapping",
+        "",
+    ]
+    for i in range(structs):
+        lines += [
+            "@structure",
+            f"class Record{i}:",
+            "    owner: U64",
+            "    amount: U64",
+            "    flags: U64",
+            "",
+        ]
+    for n in range(services):
+        used = [(n + k) % max(structs, 1) for k in range(min(structs, 4))]
+        lines += ["@service", f"class Service{n}:", "    total: U64"]
+        lines += [f"    records{i}: Mapping[U64, Record{i}]" for i in used]
+        lines += [
+            "",
+            "    @refine",
+            "    def refine(self, payload: bytes) -> bytes:",
+            "        cmd = payload[0]",
+            "        who = U64.from_bytes(payload[1:9], 'little')",
+        ]
+        for i in used:
+            lines += [
+                f"        if cmd == {i % 256}:",
+                f"            r = self.records{i}[who]",
+                f"            r.amount += {2 if n == edited else 1}",
+                f"            self.records{i}[who] = r",
+                "            return r.amount",
+            ]
+        lines += ["        return b''", ""]
+    return "\n".join(lines)
+
+
+def _load(path: Path, name: str) -> List[type]:
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return [cls for cls in vars(module).values() if hasattr(cls, "_jam_meta")]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from aj_lang.transpiler import transpile
+
+    parser = argparse.ArgumentParser(
+        prog="python -m aj_lang.transpiler.bench",
+        description="Time transpiling a large synthetic module",
+    )
+    parser.add_argument("--structs", type=int, default=300)
+    parser.add_argument("--services", type=int, default=300)
+    opts = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "big_module.py"
+        rows = []
+        for run, edited in [("cold", -1), ("unchanged", -1), ("one edited", 0)]:
+            path.write_text(synthetic_module(opts.structs, opts.services, edited))
+            services = _load(path, f"big_module_{len(rows)}")
+            cached = set(transpile._method_cache)
+            started = time.perf_counter()
+            size = sum(len(transpile.transpile_service(cls)) for cls in services)
+            elapsed = time.perf_counter() - started
+            generated = len(set(transpile._method_cache) - cached)
+            rows.append((run, elapsed, generated, size))
+
+    print(f"{opts.structs} structs, {opts.services} services")
+    for run, elapsed, generated, size in rows:
+        print(f"{run:<12} {elapsed * 1000:>9.1f} ms  {generated:>5} methods generated  {size} bytes of C")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,6 +27,7 @@ class CCodeGenerator(ast.NodeVisitor):
         self.type_annotations = type_annotations or {}
         self.state_vars = state_vars or {}
         self.structs = structs or {}
+        self.declared_types: dict[str, str] = {}  # name -> C type, fixed by the optimiser
         
     def indent(self) -> str:
         return "    " * self.indent_level
@@ -58,6 +59,8 @@ class CCodeGenerator(ast.NodeVisitor):
         # Collect and declare local variables
         collector = VariableCollector(self)
         collector.visit(node)
+        for name in collector.vars.keys() & self.declared_types.keys():
+            collector.vars[name] = self.declared_types[name]
         
         for name, c_type in collector.vars.items():
             if name == 'payload': continue # Already declared in wrapper
@@ -257,6 +260,46 @@ class CCodeGenerator(ast.NodeVisitor):
             self.indent_level -= 1
         self.emit("}")
 
+    def visit_While(self, node: ast.While) -> None:
+        cond = self.visit_expr(node.test)
+        self.emit(f"while ({cond}) {{")
+        self.indent_level += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.indent_level -= 1
+        self.emit("}")
+
+    def visit_For(self, node: ast.For) -> None:
+        # Counting loops only: for i in range([start,] stop[, step]), step > 0
+        it = node.iter
+        if not (isinstance(node.target, ast.Name) and isinstance(it, ast.Call) and isinstance(it.func, ast.Name)
+                and it.func.id == 'range' and 1 <= len(it.args) <= 3):
+            raise TranspileError("Only 'for <name> in range(...)' loops supported", node)
+        args = [self.visit_expr(a) for a in it.args]
+        start, stop, step = ["0", args[0], "1"] if len(args) == 1 else (args + ["1"])[:3]
+        var = node.target.id
+        # A hidden counter, with range()'s arguments evaluated once and in
+        # order: as in Python, writes to the variable in the body don't change
+        # the iteration, and after the loop it holds the last value (or is
+        # untouched by an empty range)
+        counter, bound, stride = self.new_temp(), self.new_temp(), self.new_temp()
+        self.emit(f"uint64_t {counter} = {start};")
+        self.emit(f"const uint64_t {bound} = {stop};")
+        self.emit(f"const uint64_t {stride} = {step};")
+        self.emit(f"for (; {counter} < {bound}; {counter} += {stride}) {{")
+        self.indent_level += 1
+        self.emit(f"{var} = {counter};")
+        for stmt in node.body:
+            self.visit(stmt)
+        self.indent_level -= 1
+        self.emit("}")
+
+    def visit_Break(self, node: ast.Break) -> None:
+        self.emit("break;")
+
+    def visit_Continue(self, node: ast.Continue) -> None:
+        self.emit("continue;")
+
     def visit_Expr(self, node: ast.Expr) -> None:
         if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
             return # Skip docstrings
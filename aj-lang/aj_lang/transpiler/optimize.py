@@ -0,0 +1,647 @@
+"""
+Optimisation passes over a method's AST, run before C generation.
+
+State maps compile to storage accessors (balances[k] -> balances_get(k)) that
+the C compiler cannot see through, so every map read in the source stays a
+storage lookup in the service. These passes drop the redundant ones, and
+tidy up after themselves:
+
+- fold_constants: constant arithmetic and comparisons, and branches on them
+- hoist_map_reads: map reads no loop iteration can change, out of the loop
+- eliminate_map_reads: repeated reads of the same map entry
+- eliminate_dead_stores: local assignments that are never read
+
+Scalar state variables are C globals, loaded once per entry point already,
+so only map reads are worth caching. Reading a map has no side effects,
+which is what lets reads move: a hoisted read may run for a loop that
+never iterates.
+"""
+
+import ast
+import copy
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .var_collector import VariableCollector
+
+# (map name, key) of a map read; the key is a constant or a variable name
+Entry = Tuple[str, str]
+
+# Calls that cannot write storage; any other call may write any map
+_STORAGE_SAFE_CALLS = {
+    'from_bytes', 'len', 'range', 'bytearray', 'gas', 'get_storage',
+    'print', 'log', 'LOG_INFO', 'LOG_DEBUG', 'LOG_WARN', 'LOG_ERROR',
+}
+
+# Calls without side effects at all, so safe to drop
+_PURE_CALLS = {'from_bytes', 'len'}
+
+
+def optimize_function(node: ast.FunctionDef, gen: Any) -> ast.FunctionDef:
+    """
+    Run every pass over a method of `gen`'s service, in place.
+
+    Local types are taken before the passes run and fixed on `gen`: folding
+    `x = 2 + 3` to `x = 5` must not change the type x is declared with.
+    """
+    collector = VariableCollector(gen)
+    collector.visit(node)
+
+    temps = _Temps(gen)
+    fold_constants(node)
+    hoist_map_reads(node, gen.state_vars, temps)
+    eliminate_map_reads(node, gen.state_vars, temps)
+    eliminate_dead_stores(node, gen.state_vars)
+
+    gen.declared_types = {**collector.vars, **temps.types}
+    _fill_empty_blocks(node)
+    ast.fix_missing_locations(node)
+    return node
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+class _Temps:
+    """New locals holding map reads, and their C types"""
+
+    def __init__(self, gen: Any):
+        self.gen = gen
+        self.types: Dict[str, str] = {}
+        self.inlinable: Set[str] = set()
+
+    def new(self, prefix: str, read: ast.Subscript) -> str:
+        name = f"_{prefix}{len(self.types) + 1}"
+        self.types[name] = self.gen.infer_type(read)
+        return name
+
+
+def map_name(node: ast.AST, state_vars: Dict[str, Any]) -> Optional[str]:
+    """The state map `node` indexes, for m[k] and self.m[k]"""
+    if not isinstance(node, ast.Subscript):
+        return None
+    value = node.value
+    if isinstance(value, ast.Name):
+        name = value.id
+    elif isinstance(value, ast.Attribute) and isinstance(value.value, ast.Name) and value.value.id == 'self':
+        name = value.attr
+    else:
+        return None
+    info = state_vars.get(name)
+    return name if info and info['is_map'] else None
+
+
+def _key(node: ast.AST) -> Optional[str]:
+    """A map key we can track: an integer constant, a variable or self.<scalar>"""
+    if isinstance(node, ast.Constant) and type(node.value) is int:
+        return repr(node.value)
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == 'self':
+        return node.attr
+    return None
+
+
+def _entry(node: ast.AST, state_vars: Dict[str, Any]) -> Optional[Entry]:
+    m = map_name(node, state_vars)
+    if m is None:
+        return None
+    key = _key(node.slice)
+    return (m, key) if key is not None else None
+
+
+def _call_name(node: ast.Call) -> str:
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    return ''
+
+
+def _target_root(node: ast.AST) -> Optional[str]:
+    """Variable an assignment target changes: x for x, x.f and x[i]; v for self.v"""
+    while isinstance(node, (ast.Attribute, ast.Subscript)):
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == 'self':
+            return node.attr
+        node = node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+
+class _Effects(ast.NodeVisitor):
+    """Variables and maps a piece of code may change"""
+
+    def __init__(self, state_vars: Dict[str, Any]):
+        self.state_vars = state_vars
+        self.names: Set[str] = set()
+        self.maps: Set[str] = set()
+        self.calls = False  # calls something that may write storage
+
+    def store(self, target: ast.AST) -> None:
+        if isinstance(target, (ast.Tuple, ast.List)):
+            for elt in target.elts:
+                self.store(elt)
+            return
+        m = map_name(target, self.state_vars)
+        if m:
+            self.maps.add(m)
+        root = _target_root(target)
+        if root:
+            self.names.add(root)
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        for target in node.targets:
+            self.store(target)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        self.store(node.target)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self.store(node.target)
+        self.generic_visit(node)
+
+    def visit_For(self, node: ast.For) -> None:
+        self.store(node.target)
+        self.generic_visit(node)
+
+    def visit_NamedExpr(self, node: ast.NamedExpr) -> None:
+        self.store(node.target)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if _call_name(node) not in _STORAGE_SAFE_CALLS:
+            self.calls = True
+        self.generic_visit(node)
+
+
+def _effects(nodes: List[ast.AST], state_vars: Dict[str, Any]) -> _Effects:
+    effects = _Effects(state_vars)
+    for node in nodes:
+        effects.visit(node)
+    return effects
+
+
+def _reads(node: ast.AST) -> Set[str]:
+    """Variables `node` reads, including the targets of augmented assignments"""
+    names = set()
+    for sub in ast.walk(node):
+        if isinstance(sub, ast.Name) and isinstance(sub.ctx, ast.Load):
+            names.add(sub.id)
+        elif isinstance(sub, ast.AugAssign):
+            root = _target_root(sub.target)
+            if root:
+                names.add(root)
+    return names
+
+
+def _is_pure(node: ast.AST) -> bool:
+    """True if evaluating `node` has no side effects (map reads have none)"""
+    for sub in ast.walk(node):
+        if isinstance(sub, ast.Call) and _call_name(sub) not in _PURE_CALLS:
+            return False
+        if isinstance(sub, (ast.NamedExpr, ast.Await, ast.Yield, ast.YieldFrom)):
+            return False
+    return True
+
+
+def _falls_through(stmts: List[ast.stmt]) -> bool:
+    return not (stmts and isinstance(stmts[-1], (ast.Return, ast.Break, ast.Continue)))
+
+
+def _fill_empty_blocks(node: ast.AST) -> None:
+    """Passes may empty a block; keep the tree valid Python"""
+    for sub in ast.walk(node):
+        if isinstance(sub, (ast.FunctionDef, ast.If, ast.While, ast.For)) and not sub.body:
+            sub.body = [ast.Pass()]
+
+
+# =============================================================================
+# Constant folding
+# =============================================================================
+
+# Integer division, as the generated C does it
+_FOLD_BINOPS = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a // b if b else None,
+    ast.Mod: lambda a, b: a % b if b else None,
+    ast.BitAnd: lambda a, b: a & b,
+    ast.BitOr: lambda a, b: a | b,
+    ast.BitXor: lambda a, b: a ^ b,
+    ast.LShift: lambda a, b: a << b if b < 64 else None,
+    ast.RShift: lambda a, b: a >> b,
+}
+
+_FOLD_COMPARES = {
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+    ast.Lt: lambda a, b: a < b,
+    ast.LtE: lambda a, b: a <= b,
+    ast.Gt: lambda a, b: a > b,
+    ast.GtE: lambda a, b: a >= b,
+}
+
+
+def _int_value(node: ast.AST) -> Optional[int]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, int):
+        return int(node.value)
+    return None
+
+
+class ConstantFolder(ast.NodeTransformer):
+    """
+    Folds integer arithmetic and comparisons on constants, and drops the
+    branches of `if` and `while` that a constant test rules out.
+
+    Only results in [0, 2**63) are folded, where Python's integers and the
+    generated C's agree.
+    """
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.expr:
+        self.generic_visit(node)
+        a, b = _int_value(node.left), _int_value(node.right)
+        fold = _FOLD_BINOPS.get(type(node.op))
+        if a is None or b is None or fold is None:
+            return node
+        value = fold(a, b)
+        if value is None or not 0 <= value < 2**63:
+            return node
+        return ast.copy_location(ast.Constant(value), node)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.expr:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not) and _int_value(node.operand) is not None:
+            return ast.copy_location(ast.Constant(not node.operand.value), node)
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.expr:
+        self.generic_visit(node)
+        if len(node.ops) != 1:
+            return node
+        a, b = _int_value(node.left), _int_value(node.comparators[0])
+        fold = _FOLD_COMPARES.get(type(node.ops[0]))
+        if a is None or b is None or fold is None:
+            return node
+        return ast.copy_location(ast.Constant(fold(a, b)), node)
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.expr:
+        self.generic_visit(node)
+        values = [_int_value(v) for v in node.values]
+        # Python's `1 and 3` is 3 where C's is 1; they agree on booleans
+        if any(v not in (0, 1) for v in values):
+            return node
+        value = all(values) if isinstance(node.op, ast.And) else any(values)
+        return ast.copy_location(ast.Constant(value), node)
+
+    def visit_If(self, node: ast.If) -> Any:
+        self.generic_visit(node)
+        test = _int_value(node.test)
+        if test is None:
+            return node
+        return node.body if test else node.orelse
+
+    def visit_While(self, node: ast.While) -> Any:
+        self.generic_visit(node)
+        if _int_value(node.test) == 0:
+            return node.orelse
+        return node
+
+
+def fold_constants(node: ast.AST) -> ast.AST:
+    return ConstantFolder().visit(node)
+
+
+# =============================================================================
+# Loop-invariant map reads
+# =============================================================================
+
+class _ReplaceReads(ast.NodeTransformer):
+    """Replaces reads of the given map entries with their holders"""
+
+    def __init__(self, state_vars: Dict[str, Any], holders: Dict[Entry, ast.expr]):
+        self.state_vars = state_vars
+        self.holders = holders
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.expr:
+        self.generic_visit(node)
+        entry = _entry(node, self.state_vars)
+        if entry in self.holders and isinstance(node.ctx, ast.Load):
+            return ast.copy_location(copy.deepcopy(self.holders[entry]), node)
+        return node
+
+
+class LoopHoister(ast.NodeTransformer):
+    """
+    Reads a map entry once before a loop, rather than every iteration, when
+    the loop writes neither that map nor the variables in its key.
+
+    Inner loops go first, so a read leaves a loop nest one loop at a time.
+    """
+
+    def __init__(self, state_vars: Dict[str, Any], temps: _Temps):
+        self.state_vars = state_vars
+        self.temps = temps
+
+    def visit_While(self, node: ast.While) -> Any:
+        self.generic_visit(node)
+        return self.hoist(node, [node.test] + node.body)
+
+    def visit_For(self, node: ast.For) -> Any:
+        self.generic_visit(node)
+        # The iterable is evaluated once already; the target changes every iteration
+        return self.hoist(node, node.body, stores=[node.target])
+
+    def hoist(self, loop: ast.stmt, parts: List[ast.AST], stores: List[ast.AST] = ()) -> Any:
+        effects = _effects(parts, self.state_vars)
+        for target in stores:
+            effects.store(target)
+        if effects.calls:
+            return loop
+
+        holders: Dict[Entry, ast.expr] = {}
+        hoisted = []
+        for part in parts:
+            for sub in ast.walk(part):
+                entry = _entry(sub, self.state_vars)
+                if entry is None or entry in holders or not isinstance(sub.ctx, ast.Load):
+                    continue
+                if entry[0] in effects.maps or entry[1] in effects.names:
+                    continue
+                name = self.temps.new('hoist', sub)
+                holders[entry] = ast.Name(name, ast.Load())
+                hoisted.append(ast.copy_location(
+                    ast.Assign(targets=[ast.Name(name, ast.Store())], value=copy.deepcopy(sub)), loop
+                ))
+
+        if not hoisted:
+            return loop
+        _ReplaceReads(self.state_vars, holders).visit(loop)
+        return hoisted + [loop]
+
+
+def hoist_map_reads(node: ast.AST, state_vars: Dict[str, Any], temps: _Temps) -> ast.AST:
+    return LoopHoister(state_vars, temps).visit(node)
+
+
+# =============================================================================
+# Redundant map reads
+# =============================================================================
+
+class _ReadRewriter(ast.NodeTransformer):
+    """
+    Rewrites an expression's map reads: an entry already held in a variable
+    becomes that variable; any other entry is read into a new temp first, if
+    `prelude` is given to put the read in.
+    """
+
+    def __init__(self, cse: 'MapReadEliminator', avail: Dict[Entry, ast.expr], prelude: Optional[List[ast.stmt]]):
+        self.cse = cse
+        self.avail = avail
+        self.prelude = prelude
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.expr:
+        self.generic_visit(node)
+        entry = _entry(node, self.cse.state_vars)
+        if entry is None or not isinstance(node.ctx, ast.Load):
+            return node
+        if entry in self.avail:
+            return ast.copy_location(copy.deepcopy(self.avail[entry]), node)
+        if self.prelude is None:
+            return node
+        name = self.cse.temps.new('cse', node)
+        self.cse.temps.inlinable.add(name)
+        self.prelude.append(ast.copy_location(ast.Assign(targets=[ast.Name(name, ast.Store())], value=node), node))
+        self.avail[entry] = ast.Name(name, ast.Load())
+        return ast.copy_location(ast.Name(name, ast.Load()), node)
+
+    def conditional(self, node: ast.expr) -> ast.expr:
+        """Rewrite code that may not run: reads must not move out of it"""
+        prelude, self.prelude = self.prelude, None
+        node = self.visit(node)
+        self.prelude = prelude
+        return node
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.expr:
+        node.values = [self.visit(node.values[0])] + [self.conditional(v) for v in node.values[1:]]
+        return node
+
+    def visit_IfExp(self, node: ast.IfExp) -> ast.expr:
+        node.test = self.visit(node.test)
+        node.body = self.conditional(node.body)
+        node.orelse = self.conditional(node.orelse)
+        return node
+
+
+class MapReadEliminator:
+    """
+    Reuses a map entry already read, or just written, in the same function.
+
+    Walks each block in order, tracking which entries a variable currently
+    holds. Writing a variable forgets the entries it holds or keys; writing
+    a map forgets all of that map's entries, since two keys may be equal; a
+    call that may write storage forgets everything. After an `if`, only
+    what both branches still hold is kept.
+    """
+
+    def __init__(self, state_vars: Dict[str, Any], temps: _Temps):
+        self.state_vars = state_vars
+        self.temps = temps
+
+    def block(self, stmts: List[ast.stmt], avail: Dict[Entry, ast.expr]) -> List[ast.stmt]:
+        out = []
+        for stmt in stmts:
+            out.extend(self.statement(stmt, avail))
+        return out
+
+    def expr(self, node: ast.expr, avail: Dict[Entry, ast.expr], prelude: Optional[List[ast.stmt]]) -> ast.expr:
+        return _ReadRewriter(self, avail, prelude).visit(node)
+
+    def forget(self, avail: Dict[Entry, ast.expr], effects: _Effects) -> None:
+        for entry, holder in list(avail.items()):
+            held = holder.id if isinstance(holder, ast.Name) else None
+            if entry[0] in effects.maps or entry[1] in effects.names or held in effects.names:
+                del avail[entry]
+
+    def statement(self, stmt: ast.stmt, avail: Dict[Entry, ast.expr]) -> List[ast.stmt]:
+        effects = _effects([stmt], self.state_vars)
+        if effects.calls:
+            avail.clear()
+            return [stmt]
+
+        prelude: List[ast.stmt] = []
+        if isinstance(stmt, ast.If):
+            stmt.test = self.expr(stmt.test, avail, prelude)
+            body, orelse = dict(avail), dict(avail)
+            stmt.body = self.block(stmt.body, body)
+            stmt.orelse = self.block(stmt.orelse, orelse)
+            branches = [b for b, stmts in ((body, stmt.body), (orelse, stmt.orelse)) if _falls_through(stmts)]
+            avail.clear()
+            if branches:
+                for entry, holder in branches[0].items():
+                    if all(entry in b and ast.dump(b[entry]) == ast.dump(holder) for b in branches[1:]):
+                        avail[entry] = holder
+
+        elif isinstance(stmt, (ast.While, ast.For)):
+            if isinstance(stmt, ast.For):
+                stmt.iter = self.expr(stmt.iter, avail, prelude)
+            # Only what no iteration changes holds throughout the loop
+            self.forget(avail, effects)
+            if isinstance(stmt, ast.While):
+                stmt.test = self.expr(stmt.test, avail, None)
+            stmt.body = self.block(stmt.body, dict(avail))
+
+        elif isinstance(stmt, ast.AugAssign) and _entry(stmt.target, self.state_vars):
+            # m[k] += v is m[k] = m[k] + v, whose read may already be held
+            read = copy.deepcopy(stmt.target)
+            read.ctx = ast.Load()
+            value = ast.BinOp(read, stmt.op, stmt.value)
+            return self.statement(ast.copy_location(ast.Assign(targets=[stmt.target], value=value), stmt), avail)
+
+        elif isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+            target = stmt.targets[0]
+            entry = _entry(stmt.value, self.state_vars)
+            # x = m[k] needs no temp: x holds the entry from here on
+            holds = isinstance(target, ast.Name) and entry is not None and entry not in avail and entry[1] != target.id
+            if not holds:
+                stmt.value = self.expr(stmt.value, avail, prelude)
+            written = _entry(target, self.state_vars)
+            if written and not isinstance(stmt.value, (ast.Name, ast.Constant)) and _is_pure(stmt.value):
+                # Hold the value written, for later reads of the entry
+                name = self.temps.new('cse', target)
+                self.temps.inlinable.add(name)
+                prelude.append(ast.copy_location(ast.Assign(targets=[ast.Name(name, ast.Store())], value=stmt.value), stmt))
+                stmt.value = ast.Name(name, ast.Load())
+            self.forget(avail, effects)
+            if holds:
+                avail[entry] = ast.Name(target.id, ast.Load())
+            elif written:
+                avail[written] = copy.deepcopy(stmt.value)
+
+        elif isinstance(stmt, (ast.Return, ast.Expr)) and stmt.value is not None:
+            stmt.value = self.expr(stmt.value, avail, prelude)
+
+        else:
+            self.forget(avail, effects)
+
+        return prelude + [stmt]
+
+
+class _InlineTemps(ast.NodeTransformer):
+    """Puts reads whose temp turned out to be used once back where they were"""
+
+    def __init__(self, values: Dict[str, ast.expr]):
+        self.values = values
+
+    def visit_Assign(self, node: ast.Assign) -> Any:
+        target = node.targets[0]
+        if isinstance(target, ast.Name) and target.id in self.values:
+            return None
+        return self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name) -> ast.expr:
+        if node.id in self.values and isinstance(node.ctx, ast.Load):
+            # The value may use another temp being inlined
+            return ast.copy_location(self.visit(self.values[node.id]), node)
+        return node
+
+
+def eliminate_map_reads(node: ast.FunctionDef, state_vars: Dict[str, Any], temps: _Temps) -> ast.FunctionDef:
+    node.body = MapReadEliminator(state_vars, temps).block(node.body, {})
+
+    # A temp is used once when nothing read its entry again
+    uses = Counter(
+        sub.id for sub in ast.walk(node)
+        if isinstance(sub, ast.Name) and isinstance(sub.ctx, ast.Load) and sub.id in temps.inlinable
+    )
+    values = {}
+    for sub in ast.walk(node):
+        if isinstance(sub, ast.Assign) and isinstance(sub.targets[0], ast.Name):
+            name = sub.targets[0].id
+            if name in temps.inlinable and uses[name] <= 1:
+                values[name] = sub.value
+    if values:
+        _InlineTemps(values).visit(node)
+        for name in values:
+            del temps.types[name]
+    return node
+
+
+# =============================================================================
+# Dead stores
+# =============================================================================
+
+def _leaves_block(stmt: ast.AST) -> bool:
+    """True if `stmt` may break, continue or return out of the block holding it"""
+    if isinstance(stmt, (ast.Break, ast.Continue, ast.Return)):
+        return True
+    if isinstance(stmt, (ast.For, ast.While)):
+        # Its own break and continue stay inside it
+        return any(isinstance(n, ast.Return) for n in ast.walk(stmt))
+    return any(_leaves_block(child) for child in ast.iter_child_nodes(stmt))
+
+
+def _dead_store(stmts: List[ast.stmt], i: int, name: str, top: bool) -> bool:
+    """True if the value stmts[i] assigns to `name` is never read"""
+    for stmt in stmts[i + 1:]:
+        if name in _reads(stmt):
+            return False
+        if isinstance(stmt, ast.Assign) and any(isinstance(t, ast.Name) and t.id == name for t in stmt.targets):
+            return True
+        if isinstance(stmt, ast.Return):
+            return True
+        if _leaves_block(stmt):
+            # The value may reach the loop's next test or the code after it
+            return False
+    # Past the end of a nested block, the value may still be read
+    return top
+
+
+class DeadStoreEliminator:
+    """
+    Removes assignments to locals whose value is never read: overwritten
+    first, or with no read after them in the function. Only values without
+    side effects are dropped, map reads among them.
+    """
+
+    def __init__(self, node: ast.FunctionDef, state_vars: Dict[str, Any]):
+        self.node = node
+        self.state_vars = state_vars
+        self.changed = False
+
+    def candidate(self, stmt: ast.stmt) -> Optional[str]:
+        if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name)):
+            return None
+        name = stmt.targets[0].id
+        if name in self.state_vars or name in ('self', 'payload') or not _is_pure(stmt.value):
+            return None
+        return name
+
+    def block(self, stmts: List[ast.stmt], top: bool, read: Set[str]) -> List[ast.stmt]:
+        out = []
+        for i, stmt in enumerate(stmts):
+            name = self.candidate(stmt)
+            if name and (name not in read or _dead_store(stmts, i, name, top)):
+                self.changed = True
+                continue
+            if isinstance(stmt, ast.If):
+                stmt.body = self.block(stmt.body, False, read)
+                stmt.orelse = self.block(stmt.orelse, False, read)
+            elif isinstance(stmt, (ast.While, ast.For)):
+                stmt.body = self.block(stmt.body, False, read)
+            out.append(stmt)
+        return out
+
+    def run(self) -> None:
+        # Dropping one store can leave the stores it read dead
+        self.changed = True
+        while self.changed:
+            self.changed = False
+            self.node.body = self.block(self.node.body, True, _reads(self.node))
+
+
+def eliminate_dead_stores(node: ast.FunctionDef, state_vars: Dict[str, Any]) -> ast.FunctionDef:
+    DeadStoreEliminator(node, state_vars).run()
+    return node
@@ -0,0 +1,92 @@
+"""
+Parsed module sources, shared by everything transpiled from a module.
+
+inspect.getsource() reparses the whole module for every class it is asked
+about, so a service with N structs had its module parsed N times per
+build. Here a module is parsed once per version of its text, and classes
+and functions are looked up in it by qualified name.
+
+Modules are kept by file name and reparsed only when their text changes,
+so watch mode and the IDE reparse just the files that were edited.
+"""
+
+import ast
+import hashlib
+import inspect
+import linecache
+from typing import Dict, List, Optional, Tuple
+
+
+class ModuleSource:
+    """A module's text and AST, with its classes and functions by qualified name"""
+
+    def __init__(self, filename: str, text: str, digest: bytes, source_lines: List[str]):
+        self.filename = filename
+        self.digest = digest
+        # linecache's list for the text; the same list means the same text
+        self.source_lines = source_lines
+        self.lines = text.splitlines(keepends=True)
+        self.tree = ast.parse(text, filename)
+        self.defs: Dict[str, ast.AST] = {}
+        self._index(self.tree.body, "")
+
+    def _index(self, body, prefix: str) -> None:
+        for node in body:
+            if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                # Later definitions win, as they do when the module runs
+                self.defs[prefix + node.name] = node
+                if isinstance(node, ast.ClassDef):
+                    self._index(node.body, f"{prefix}{node.name}.")
+
+    def text(self, node: ast.AST) -> str:
+        """Source of a definition, decorators excluded"""
+        return "".join(self.lines[node.lineno - 1:node.end_lineno])
+
+
+_modules: Dict[str, ModuleSource] = {}
+
+
+def module_source(obj) -> Optional[ModuleSource]:
+    """The parsed source of the module defining `obj`, or None without one"""
+    try:
+        filename = inspect.getsourcefile(obj)
+    except TypeError:
+        return None
+    if not filename:
+        return None
+
+    # As inspect does: pick up edits made since the file was last read
+    linecache.checkcache(filename)
+    module = inspect.getmodule(obj)
+    lines = linecache.getlines(filename, module.__dict__ if module else None)
+    cached = _modules.get(filename)
+    if cached is not None and cached.source_lines is lines:
+        # linecache hasn't reread the file, so skip hashing it again
+        return cached
+
+    text = "".join(lines)
+    if not text:
+        return None
+    digest = hashlib.sha256(text.encode()).digest()
+    if cached is None or cached.digest != digest:
+        cached = _modules[filename] = ModuleSource(filename, text, digest, lines)
+    cached.source_lines = lines
+    return cached
+
+
+def invalidate(filename: str) -> None:
+    """Forget a file's parsed source, as when the file is deleted"""
+    _modules.pop(filename, None)
+
+
+def definition(obj) -> Tuple[ast.AST, str]:
+    """The AST and source text of a class or function's definition"""
+    obj = inspect.unwrap(obj) if inspect.isfunction(obj) else obj
+    source = module_source(obj)
+    node = source.defs.get(obj.__qualname__) if source else None
+    if node is not None:
+        return node, source.text(node)
+
+    # Defined in a function, or somewhere we can't index
+    text = inspect.getsource(obj)
+    return ast.parse(inspect.cleandoc(text)).body[0], text
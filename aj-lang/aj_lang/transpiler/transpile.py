@@ -1,5 +1,8 @@
 import ast
+import copy
+import hashlib
 import inspect
+from collections import OrderedDict
 from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 
@@ -9,10 +12,39 @@ from aj_lang.semantics import (
 )
 from aj_lang.intrinsics import get_intrinsic, infer_intrinsic_return_type
 from .code_gen import CCodeGenerator
+from .optimize import optimize_function
+from .source_cache import definition
 
+# Generated C of each method body, keyed by a hash of the method's source and
+# of everything else its C depends on. A rebuild in watch mode or the IDE
+# regenerates only the methods that changed.
+_METHOD_CACHE_SIZE = 1024
+_method_cache: "OrderedDict[str, List[str]]" = OrderedDict()
 
-def transpile_service(service_class: type) -> str:
-    """Transpile a Python service class to C code."""
+
+def _method_body(gen: CCodeGenerator, method, layouts: List[str], optimize: bool) -> List[str]:
+    """C statements of a method's body, from the cache if its source and the struct layouts are unchanged"""
+    node, source = definition(method)
+    key = hashlib.sha256(repr((
+        source, gen.service_name, gen.state_vars, layouts, optimize,
+    )).encode()).hexdigest()
+    if key in _method_cache:
+        _method_cache.move_to_end(key)
+        return list(_method_cache[key])
+
+    # The passes rewrite the tree, which belongs to the shared module AST
+    func = copy.deepcopy(node)
+    if optimize:
+        func = optimize_function(func, gen)
+    gen.visit(func) # Visit FunctionDef
+    _method_cache[key] = list(gen.output)
+    if len(_method_cache) > _METHOD_CACHE_SIZE:
+        _method_cache.popitem(last=False)
+    return list(gen.output)
+
+
+def transpile_service(service_class: type, optimize: bool = True) -> str:
+    """Transpile a Python service class to C code. `optimize` runs the passes in optimize.py."""
     
     if not hasattr(service_class, '_jam_meta'):
         raise ValueError(f"{service_class.__name__} is not a JAM service")
@@ -31,9 +63,7 @@ def transpile_service(service_class: type) -> str:
     # 2. Collect State Variables
     state_vars = {}
     # Parse class body for type annotations
-    source = inspect.getsource(service_class)
-    tree = ast.parse(inspect.cleandoc(source))
-    class_def = tree.body[0]
+    class_def, _ = definition(service_class)
     
     for stmt in class_def.body:
         if isinstance(stmt, ast.AnnAssign) and isinstance(stmt.target, ast.Name):
@@ -92,13 +122,14 @@ def transpile_service(service_class: type) -> str:
     c_code.append('')
     
     # Struct Definitions
+    layouts = []
     for name, cls in structs.items():
         c_code.append(f'typedef struct {{')
         # Get fields from dataclass/annotations
         # We need to parse the struct class source too to get order and types
-        struct_source = inspect.getsource(cls)
-        struct_tree = ast.parse(inspect.cleandoc(struct_source))
-        struct_def = struct_tree.body[0]
+        struct_def, struct_source = definition(cls)
+        # A changed field changes the struct's source, and so the method keys
+        layouts.append(struct_source)
         
         gen = CCodeGenerator("", structs=structs)
         for stmt in struct_def.body:
@@ -150,11 +181,7 @@ def transpile_service(service_class: type) -> str:
         c_code.append('    const uint8_t* work_package_hash')
         c_code.append(') {')
         
-        method = meta.methods[meta.refine_method]
-        source = inspect.getsource(method)
-        tree = ast.parse(inspect.cleandoc(source))
-        gen.visit(tree.body[0]) # Visit FunctionDef
-        c_code.extend(gen.output)
+        c_code.extend(_method_body(gen, meta.methods[meta.refine_method], layouts, optimize))
         c_code.append('}')
         c_code.append('')
 
@@ -36,6 +36,12 @@ class VariableCollector(ast.NodeVisitor):
                 self.vars[var_name] = var_type
         self.generic_visit(node)
 
+    def visit_For(self, node: ast.For):
+        # Loop counters: for i in range(...)
+        if isinstance(node.target, ast.Name) and node.target.id not in self.vars:
+            self.vars[node.target.id] = 'uint64_t'
+        self.generic_visit(node)
+
     def visit_FunctionDef(self, node: ast.FunctionDef):
         # Don't recurse into nested functions
         for stmt in node.body:
@@ -0,0 +1,114 @@
+"""Tests for the benchmark corpus and runner."""
+
+import json
+from dataclasses import replace
+
+import pytest
+
+from tsrkit_pvm import available_engines, get_engine
+from tsrkit_pvm.bench import COLD, WARM, StorageHost, corpus, run_threaded, run_workload
+from tsrkit_pvm.bench.__main__ import main
+from tsrkit_pvm.bench.corpus import BATCH_OP, HOST_NONE, HOST_WHAT
+from tsrkit_pvm.bench.runner import percentile
+
+ENGINES = [name for name in ("python", "cython") if available_engines()[name] is None]
+
+
+def small(gas=2_000):
+    return [replace(w, gas=gas) for w in corpus()]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("workload", small(), ids=lambda w: w.name)
+def test_workloads_run_out_of_gas(engine, workload):
+    result = run_workload(workload, get_engine(engine, strict=True), WARM, runs=2, warmup=0)
+    assert (result.status, result.gas) == ("out_of_gas", workload.gas)
+    assert result.p99_us >= result.p50_us >= result.min_us > 0
+    assert result.decode_us == 0
+    if workload.host:
+        assert result.host_calls > 0
+
+
+def test_storage_host():
+    host = StorageHost()
+    engine = get_engine("python")
+    workload = next(w for w in small(5_000) if w.name == "storage")
+    assert run_workload(replace(workload, host=lambda: host), engine, runs=1, warmup=0).host_calls
+    # 64 keys, each holding the last counter written under it
+    assert len(host.storage) == 64
+    assert all(int.from_bytes(v, "little") % 64 == int.from_bytes(k, "little") for k, v in host.storage.items())
+
+
+class FlatMemory:
+    def __init__(self, size=4096):
+        self.data = bytearray(size)
+
+    def read(self, address, length):
+        return self.data[address : address + length]
+
+    def write(self, address, value):
+        self.data[address : address + len(value)] = value
+
+
+def test_storage_host_batch():
+    memory = FlatMemory()
+    memory.write(0, b"k1k2v1v2")
+    memory.write(100, BATCH_OP.pack(0, 2, 4, 2, 0) + BATCH_OP.pack(2, 2, 6, 2, 0))
+
+    registers = [0] * 13
+    registers[7:9] = [100, 2]
+    assert StorageHost()(201, 100, registers, memory)[1] == 90
+    assert registers[7] == HOST_WHAT
+
+    host = StorageHost(batch=True)
+    host.storage[b"k1"] = b"old"
+    registers[7:9] = [100, 2]
+    # One call, plus one per item
+    assert host(201, 100, registers, memory)[1] == 70
+    assert registers[7] == 2 and host.storage == {b"k1": b"v1", b"k2": b"v2"}
+    assert [BATCH_OP.unpack_from(memory.data, 100 + i * BATCH_OP.size)[4] for i in range(2)] == [3, HOST_NONE]
+
+    memory.write(4, bytes(4))
+    registers[8:10] = [100, 2]
+    host(200, 100, registers, memory)
+    assert memory.read(4, 4) == b"v1v2"
+
+
+def test_cold_runs_include_decoding():
+    workload = small()[0]
+    result = run_workload(workload, get_engine("python"), COLD, runs=3, warmup=0)
+    assert 0 < result.decode_us < result.p50_us
+    assert result.to_dict()["gas_per_us"] == round(result.gas / result.p50_us, 3)
+
+
+def test_threaded_runs(capsys):
+    workload = small()[0]
+    gas, elapsed = run_threaded(workload, get_engine("python"), 3)
+    assert gas == 3 * workload.gas and elapsed > 0
+    assert main(["--engines", "python", "--workloads", workload.name, "--runs", "1", "--threads", "3"]) == 0
+    assert [line.split()[2] for line in capsys.readouterr().out.splitlines()[-3:]] == ["1", "2", "3"]
+
+
+def test_percentile():
+    samples = list(range(1, 101))
+    assert (percentile(samples, 50), percentile(samples, 99), percentile([7], 99)) == (50, 99, 7)
+
+
+def test_cli_and_baseline(tmp_path, capsys):
+    out = tmp_path / "bench.json"
+    argv = ["--engines", "python", "--workloads", "add_jump,sbrk", "--runs", "2", "--gas", "1000"]
+    assert main(argv + ["--mode", "both", "--json", str(out)]) == 0
+    assert "add_jump" in capsys.readouterr().out
+
+    report = json.loads(out.read_text())
+    assert report["meta"]["runs"] == 2
+    assert [(r["workload"], r["mode"]) for r in report["results"]] == [
+        ("add_jump", WARM), ("add_jump", COLD), ("sbrk", WARM), ("sbrk", COLD)
+    ]
+
+    # Pretend the baseline was ten times faster
+    for r in report["results"]:
+        r["p50_us"] /= 10
+    out.write_text(json.dumps(report))
+    assert main(argv + ["--baseline", str(out)]) == 1
+    assert "regression: add_jump on python (warm)" in capsys.readouterr().out
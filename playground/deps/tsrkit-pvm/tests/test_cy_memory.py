@@ -0,0 +1,42 @@
+"""Tests for the page-table backed Cython memory."""
+
+import pytest
+
+from tsrkit_pvm.common.types import Accessibility
+
+cy_memory = pytest.importorskip("tsrkit_pvm.cpvm.cy_memory")
+CyMemory = cy_memory.CyMemory
+
+
+def test_read_write_across_pages():
+    mem = CyMemory({}, [], [15, 16, 17])
+    mem.write(0x10FFE, b"\x01\x02\x03\x04")
+    assert mem.read(0x10FFC, 8) == b"\x00\x00\x01\x02\x03\x04\x00\x00"
+    assert mem.read(0x11800, 4) == bytes(4)
+    assert mem.page_count == 2
+
+    with pytest.raises(Exception) as e:
+        mem.read(0x11FFE, 4)
+    assert e.value.register == 0x11FFE
+
+
+def test_from_pc_zones():
+    mem = CyMemory.from_pc(b"ro" * 3000, b"rw", b"args", 1, 4096)
+    assert mem.read(0x10000, 4) == b"roro"
+    assert mem.is_accessible(0x10000, 6000, Accessibility.READ)
+    assert not mem.is_accessible(0x10000, 1, Accessibility.WRITE)
+
+    write_start = 0x30000
+    assert mem.read(write_start, 2) == b"rw"
+    # write zone plus one page of z
+    assert mem.heap_break == write_start + 2 * 4096
+    assert mem.read(2**32 - 2**16 - 2**24, 4) == b"args"
+
+
+def test_equality_ignores_layout():
+    a = CyMemory({}, [1], [2])
+    b = CyMemory({}, [1], [2])
+    b.write(0x2000, bytes(16))
+    assert a == b
+    b.write(0x2000, b"\x01")
+    assert a != b
@@ -0,0 +1,85 @@
+"""Tests for the differential engine runner."""
+
+from dataclasses import dataclass
+
+import pytest
+
+from tsrkit_pvm import engine as registry
+from tsrkit_pvm import available_engines, get_engine
+from tsrkit_pvm.diff import main, run_diff
+
+LOOP = bytes([
+    0, 0, 26, 51, 0, 51, 1, 64, 66, 15, 40, 2, 149, 0, 1, 171, 16, 253,
+    20, 3, 239, 190, 173, 222, 0, 0, 0, 0, 0, 133, 146, 0, 2,
+])
+
+# load_imm r3, 64; sbrk r2, r3; jump 0
+SBRK = bytes([0, 0, 13, 51, 3, 64, 0, 0, 0, 101, 0x32, 40, 248, 255, 255, 255, 65, 1])
+
+NATIVE = [
+    name for name, error in available_engines().items()
+    if error is None and name != "recompiler"
+]
+
+
+@dataclass(frozen=True)
+class _OffByOne(registry.Engine):
+    """Python engine whose counter register drifts once it passes 10"""
+
+    def execute(self, program, pc, gas, registers, memory):
+        status, pc, gas, regs, memory = super().execute(program, pc, gas, registers, memory)
+        if regs[0] == 10:
+            regs[0] += 1
+        return status, pc, gas, regs, memory
+
+
+@pytest.fixture
+def buggy_engine():
+    def load():
+        python = get_engine("python")
+        return _OffByOne("buggy", python.pvm, python.program, python.memory)
+
+    registry.register_engine("buggy", load)
+    yield "buggy"
+    for table in (registry._loaders, registry._fallbacks, registry._engines):
+        table.pop("buggy", None)
+
+
+@pytest.mark.skipif(len(NATIVE) < 2, reason="needs the Cython engine")
+def test_engines_agree_on_loop():
+    result = run_diff(LOOP, gas=1_001, engines=NATIVE, raw=True)
+    assert result.ok, str(result.divergence)
+    assert result.status == "out_of_gas"
+    assert result.gas_used == 1_001
+    assert result.steps == 501
+
+
+@pytest.mark.skipif(len(NATIVE) < 2, reason="needs the Cython engine")
+@pytest.mark.xfail(
+    strict=True,
+    reason="sbrk leaves the new heap break in rd in the Python interpreter, the old one in Cython",
+)
+def test_engines_agree_on_sbrk():
+    result = run_diff(SBRK, gas=100, engines=NATIVE, raw=True)
+    assert result.ok, str(result.divergence)
+
+
+def test_reports_first_divergence(buggy_engine):
+    result = run_diff(LOOP, gas=1_000, engines=["python", buggy_engine], raw=True)
+    assert not result.ok
+    divergence = result.divergence
+    assert divergence.field == "registers"
+    assert divergence.results["python"][0] == 10
+    assert divergence.results["buggy"][0] == 11
+    assert any(line.startswith("=>") and "add_imm_64" in line for line in divergence.window)
+
+
+def test_cli(tmp_path, buggy_engine, capsys):
+    path = tmp_path / "loop.bin"
+    path.write_bytes(LOOP)
+    engines = f"python,{buggy_engine}"
+    assert main([str(path), "--raw", "--engines", engines, "--max-steps", "5"]) == 0
+    assert "agree: 5 blocks" in capsys.readouterr().out
+    assert main([str(path), "--raw", "--engines", engines, "--json"]) == 1
+    assert '"field": "registers"' in capsys.readouterr().out
+
@@ -0,0 +1,71 @@
+"""Tests for the PVM engine registry."""
+
+import pytest
+
+from tsrkit_pvm import engine as registry
+from tsrkit_pvm import (
+    Engine,
+    EngineUnavailable,
+    INT_Memory,
+    available_engines,
+    engine_of,
+    get_engine,
+    select_engine,
+)
+
+LOOP = bytes([
+    0, 0, 26, 51, 0, 51, 1, 64, 66, 15, 40, 2, 149, 0, 1, 171, 16, 253,
+    20, 3, 239, 190, 173, 222, 0, 0, 0, 0, 0, 133, 146, 0, 2,
+])
+
+
+@pytest.fixture
+def broken_engine():
+    def load():
+        raise ImportError("not built")
+
+    registry.register_engine("broken", load, fallback="python")
+    yield
+    for table in (registry._loaders, registry._fallbacks, registry._errors):
+        table.pop("broken", None)
+
+
+def test_legacy_modes(monkeypatch):
+    monkeypatch.setenv("PVM_MODE", "mypyc")
+    assert get_engine().name == "python"
+    monkeypatch.setenv("PVM_MODE", "interpreter")
+    assert get_engine().name in ("cython", "python")
+    with pytest.raises(ValueError):
+        get_engine("jit")
+
+
+def test_fallback_and_strict(broken_engine):
+    assert get_engine("broken").name == "python"
+    with pytest.raises(EngineUnavailable, match="not built"):
+        get_engine("broken", strict=True)
+    assert available_engines()["broken"] == "not built"
+    assert available_engines()["python"] is None
+
+
+def test_tiered_routes_by_gas(monkeypatch):
+    engines = {
+        name: Engine(name, None, None, INT_Memory) for name in ("cython", "recompiler")
+    }
+    monkeypatch.setattr(registry, "get_engine", lambda name: engines[name])
+    assert select_engine("tiered", 1_000).name == "cython"
+    assert select_engine("tiered", registry.TIER_GAS_THRESHOLD).name == "recompiler"
+
+
+def test_engines_run_the_same_program():
+    results = {}
+    for name, error in available_engines().items():
+        if error is not None or name == "recompiler":
+            continue
+        engine = get_engine(name, strict=True)
+        memory = engine.new_memory(None)
+        assert engine_of(memory) is engine
+        status, _, gas, regs, _ = engine.execute(
+            engine.decode(LOOP), 0, 100_000, [0] * 13, memory
+        )
+        results[name] = (status.name, int(gas), [int(r) for r in regs])
+    assert len(set(map(str, results.values()))) == 1
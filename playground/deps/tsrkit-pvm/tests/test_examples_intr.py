@@ -451,3 +451,112 @@ def test_add_jump_loop_1_000_000():
     print(
         f"PVM - ADD LOOP 1,000,000: {1000 * gas_consumed/(end_time - start_time)} gas/us | Total time {(end_time - start_time) / (10**6)} ms"
     )
+
+
+def test_threaded_add_jump_loop_cython():
+    """
+    The Cython interpreter on several threads at once
+
+    Each thread runs its own copy of the add and jump loop, whose compiled
+    blocks run without the GIL, and must end exactly where a run on its own
+    does. Throughput across threads is measured by
+    `python -m tsrkit_pvm.bench --engines cython --threads N`.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from tsrkit_pvm.cpvm.cy_memory import CyMemory
+    from tsrkit_pvm.cpvm.cy_program import CyProgram
+    from tsrkit_pvm.cpvm.cy_pvm import CyInterpreter
+
+    bytecode = bytes(
+        [0, 0, 26, 51, 0, 51, 1, 64, 66, 15, 40, 2, 149, 0, 1, 171, 16, 253, 20, 3, 239, 190, 173, 222]
+        + [0, 0, 0, 0, 0, 133, 146, 0, 2]
+    )
+    gas = 1_000_000
+
+    def run(_):
+        program = CyProgram.decode_from(bytecode)[0]
+        status, pc, gas_left, regs, _ = CyInterpreter.execute(program, 0, gas, [0] * 13, CyMemory({}, [], []))
+        return status, pc, gas_left, list(regs)
+
+    expected = run(None)
+    assert expected[0] == ExecutionStatus.OUT_OF_GAS
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(run, range(8))) == [expected] * 8
+
+
+def host_call_loop(index: int) -> bytes:
+    """ecalli `index`, then jump back to it"""
+    return bytes([0, 0, 10, 10, index, 0, 0, 0, 40, 251, 255, 255, 255, 33, 0])
+
+
+def test_threaded_host_calls_cython():
+    """
+    Host calls on several threads at once
+
+    The HOST status is shared, so each thread must still read the host call
+    its own run stopped at, after the other threads have stopped at theirs.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Barrier
+
+    from tsrkit_pvm.cpvm.cy_memory import CyMemory
+    from tsrkit_pvm.cpvm.cy_program import CyProgram
+    from tsrkit_pvm.cpvm.cy_pvm import CyInterpreter
+
+    threads = 8
+    stopped = Barrier(threads, timeout=10)
+
+    def run(index):
+        program = CyProgram.decode_from(host_call_loop(index))[0]
+        memory = CyMemory({}, [], [])
+        pc, gas, regs, calls = 0, 1_000_000, [0] * 13, []
+        for _ in range(20):
+            status, pc, gas, regs, memory = CyInterpreter.execute(program, pc, gas, regs, memory)
+            stopped.wait()
+            assert status == ExecutionStatus.HOST
+            calls.append(status.value.register)
+        return calls
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        assert list(pool.map(run, range(1, threads + 1))) == [[i] * 20 for i in range(1, threads + 1)]
+
+
+def test_precompiled_cgoi_cython():
+    """
+    Benchmarking Conway's Game of Life on a precompiled Cython program
+
+    Precompiled and lazily compiled programs must end in the same state.
+
+    --------------------------------
+
+    """
+    import json
+    from pathlib import Path
+
+    from tsrkit_pvm.cpvm.cy_memory import CyMemory
+    from tsrkit_pvm.cpvm.cy_program import CyProgram
+    from tsrkit_pvm.cpvm.cy_pvm import CyInterpreter
+
+    bytecode = bytes(json.load(open(Path(__file__).parent / "programs" / "cgio.json")))
+    pages = list(range(256))
+    gas = 1_000_000
+
+    results = []
+    for precompile in (False, True):
+        program = CyProgram.decode_from(bytecode)[0]
+        if precompile:
+            program.precompile()
+            assert program.precompiled
+        start_time = time.time_ns()
+        status, pc, remaining_gas, registers, memory = CyInterpreter.execute(
+            program, 0, gas, [0] * 13, CyMemory({}, pages, pages)
+        )
+        end_time = time.time_ns()
+        assert status == ExecutionStatus.OUT_OF_GAS
+        results.append((pc, remaining_gas, registers, bytes(memory.read(0x20000, 4096))))
+        print(
+            f"\nPVM - CGOI precompiled={precompile}: {1000 * (gas - remaining_gas) / (end_time - start_time)} gas/us"
+        )
+
+    assert results[0] == results[1]
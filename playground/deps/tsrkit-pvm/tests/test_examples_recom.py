@@ -138,3 +138,65 @@ def test_add_jump_loop_1_000_000():
     print(
         f"PVM - ADD LOOP 1,000,000: {1000 * gas_consumed/(end_time - start_time)} gas/us | Total time {(end_time - start_time) / (10**6)} ms"
     )
+
+
+def test_threaded_cgoi_recompiler():
+    """
+    Recompiled runs on several threads at once
+
+    Each thread runs its own copy of Conway's Game of Life and must end
+    exactly where a run on its own does. Throughput across threads is
+    measured by `python -m tsrkit_pvm.bench --engines recompiler --threads N`.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    bytecode = bytes(json.load(open(Path(__file__).parent / "programs" / "cgio.json")))
+    gas = 100_000
+
+    def run(_):
+        program = REC_Program.decode_from(bytecode)[0]
+        program.assemble()
+        status, pc, gas_left, regs, _ = Recompiler.execute(
+            program,
+            0,
+            gas,
+            [0] * 13,
+            REC_Memory(VMContext.calculate_size(len(program.jump_table))),
+        )
+        return status, pc, gas_left, list(regs)
+
+    expected = run(None)
+    assert expected[0] == ExecutionStatus.OUT_OF_GAS
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(run, range(8))) == [expected] * 8
+
+
+def test_threaded_host_calls_recompiler():
+    """
+    Host calls from recompiled code on several threads at once
+
+    The HOST status is shared, so each thread must still read the host call
+    its own run stopped at, after the other threads have stopped at theirs.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Barrier
+
+    threads = 8
+    stopped = Barrier(threads, timeout=10)
+
+    def run(index):
+        # ecalli `index`, then jump back to it
+        bytecode = bytes([0, 0, 10, 10, index, 0, 0, 0, 40, 251, 255, 255, 255, 33, 0])
+        program = REC_Program.decode_from(bytecode)[0]
+        program.assemble()
+        memory = REC_Memory(VMContext.calculate_size(len(program.jump_table)))
+        pc, gas, regs, calls = 0, 1_000_000, [0] * 13, []
+        for _ in range(20):
+            status, pc, gas, regs, memory = Recompiler.execute(program, pc, gas, regs, memory)
+            stopped.wait()
+            assert status == ExecutionStatus.HOST
+            calls.append(status.value.register)
+        return calls
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        assert list(pool.map(run, range(1, threads + 1))) == [[i] * 20 for i in range(1, threads + 1)]
@@ -0,0 +1,73 @@
+"""Tests for copy-on-write snapshots and forks of the memory models."""
+
+import pytest
+
+from tsrkit_pvm.common.types import Accessibility
+from tsrkit_pvm.interpreter.memory import INT_Memory
+
+MEMORIES = [INT_Memory]
+try:
+    from tsrkit_pvm.cpvm.cy_memory import CyMemory
+    MEMORIES.append(CyMemory)
+except ImportError:
+    pass
+
+
+@pytest.fixture(params=MEMORIES, ids=lambda cls: cls.__name__)
+def memory(request):
+    mem = request.param({}, [1], [2, 3])
+    mem.write(0x2000, b"abc")
+    return mem
+
+
+def test_restore_is_repeatable(memory):
+    snap = memory.snapshot()
+    memory.write(0x2001, b"ZZ")
+    memory.write(0x3000, b"q")
+    memory.alter_accessibility(0x4000, 1, Accessibility.WRITE)
+    memory.write(0x4000, b"x")
+    memory.heap_break = 99
+
+    memory.restore(snap)
+    assert memory.read(0x2000, 3) == b"abc"
+    assert memory.read(0x3000, 1) == b"\x00"
+    assert not memory.is_accessible(0x4000, 1, Accessibility.WRITE)
+    assert memory.heap_break == 0
+
+    memory.write(0x2000, b"again")
+    memory.restore(snap)
+    assert memory.read(0x2000, 5) == b"abc\x00\x00"
+
+
+def test_fork_shares_until_written(memory):
+    snap = memory.snapshot()
+    memory.write(0x2000, b"P")
+    child = memory.fork()
+    child.write(0x2001, b"C")
+    memory.write(0x2002, b"p")
+
+    assert child.read(0x2000, 3) == b"PCc"
+    assert memory.read(0x2000, 3) == b"Pbp"
+    memory.restore(snap)
+    assert memory.read(0x2000, 3) == b"abc"
+    assert child.read(0x2000, 3) == b"PCc"
+    assert child == child.fork()
+
+
+def test_stale_snapshot(memory):
+    old = memory.snapshot()
+    memory.snapshot()
+    with pytest.raises(ValueError):
+        memory.restore(old)
+    with pytest.raises(ValueError):
+        memory.fork().restore(old)
+
+
+def test_dirty_pages(memory):
+    with pytest.raises(ValueError):
+        memory.dirty_pages()
+    memory.snapshot()
+    memory.write(0x3004, b"x")
+    memory.write(0x2000, b"y")
+    memory.write(0x2010, b"z")
+    assert memory.dirty_pages() == [2, 3]
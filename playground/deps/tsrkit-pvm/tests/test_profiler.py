@@ -0,0 +1,119 @@
+"""Tests for the block and host-call profiler."""
+
+import json
+
+import pytest
+
+from tsrkit_pvm import available_engines, get_engine
+from tsrkit_pvm.profiler import COUNTED, UNPROFILED, Profiler, active_profiler, load_symbols, main
+
+LOOP = bytes([
+    0, 0, 26, 51, 0, 51, 1, 64, 66, 15, 40, 2, 149, 0, 1, 171, 16, 253,
+    20, 3, 239, 190, 173, 222, 0, 0, 0, 0, 0, 133, 146, 0, 2,
+])
+
+needs_cython = pytest.mark.skipif(
+    available_engines()["cython"] is not None, reason="needs the Cython engine"
+)
+
+
+def run(engine, program, gas=100_000):
+    return engine.execute(program, 0, gas, [0] * 13, engine.new_memory(program))
+
+
+@needs_cython
+def test_block_counts_are_exact():
+    engine = get_engine("cython", strict=True)
+    program = engine.decode(LOOP)
+    run(engine, program)  # not attached yet, so not counted
+
+    with Profiler({0: "main", 9: "loop"}) as profiler:
+        assert active_profiler() is profiler
+        profiler.attach(program, "loop")
+        run(engine, program, gas=2_001)
+        run(engine, program, gas=2_001)
+    assert active_profiler() is None
+
+    profile = profiler.collect().programs[0]
+    assert profile.mode == COUNTED
+    # The iteration that runs out of gas is entered, so counted too
+    loop = profile.blocks[9]
+    assert (loop.symbol, loop.instructions, loop.entries) == ("loop", 2, 2 * 1000)
+    assert profile.blocks[0].entries == 2
+    assert profile.opcodes["add_imm_64"] == 2 * 1000
+    assert profile.gas == 2 * (3 + 2 * 1000)
+    assert profiler.collect().folded() == ["loop;main;block@0x0 6", "loop;loop;block@0x9 4000"]
+
+    program.reset_profile()
+    assert program.block_hits() == {}
+
+    # Turned back on, counting starts over
+    run(engine, program, gas=2_001)
+    program.disable_profile()
+    assert program.block_hits() == {}
+    program.enable_profile()
+    assert program.block_hits() == {}
+    run(engine, program, gas=2_001)
+    assert program.block_hits()[9] == 1000
+    program.disable_profile()
+
+
+@needs_cython
+def test_profilers_count_only_their_own_runs():
+    engine = get_engine("cython", strict=True)
+    program = engine.decode(LOOP)
+    with Profiler() as first:
+        first.attach(program)
+        run(engine, program, gas=2_001)
+    # Profiling is off again once no profiler holds the program
+    assert program.block_hits() == {}
+    run(engine, program, gas=2_001)
+
+    with Profiler() as outer:
+        outer.attach(program)
+        run(engine, program, gas=2_001)
+        with Profiler() as inner:
+            inner.attach(program)
+            run(engine, program, gas=1_001)
+        # Still counting for the outer profiler
+        assert program.block_hits()
+        run(engine, program, gas=2_001)
+
+    assert first.collect().programs[0].gas == 3 + 2 * 1000
+    assert inner.collect().programs[0].gas == 3 + 2 * 500
+    assert outer.collect().programs[0].gas == 2 * (3 + 2 * 1000) + 3 + 2 * 500
+    assert program.block_hits() == {}
+
+
+def test_host_calls_and_python_programs():
+    engine = get_engine("python")
+    profiler = Profiler()
+    profiler.attach(engine.decode(LOOP))
+    for elapsed in (300, 100):
+        profiler.record_host_call(2, elapsed)
+    with profiler.host_call(3):
+        pass
+
+    profile = profiler.collect()
+    assert profile.programs[0].mode == UNPROFILED
+    assert profile.programs[0].blocks == {}
+    stats = profile.host_calls[2]
+    assert (stats.count, stats.total_ns, stats.max_ns, stats.mean_us) == (2, 400, 300, 0.2)
+    assert profile.to_dict()["host_calls"]["3"]["count"] == 1
+
+
+@needs_cython
+def test_cli(tmp_path, capsys):
+    code = tmp_path / "loop.bin"
+    code.write_bytes(LOOP)
+    symbols = tmp_path / "loop.sym"
+    symbols.write_text("# pc name\n0x9 loop\n")
+    assert load_symbols(str(symbols)) == {9: "loop"}
+
+    out = tmp_path / "profile.json"
+    folded = tmp_path / "profile.folded"
+    argv = [str(code), "--raw", "--gas", "1001", "--symbols", str(symbols)]
+    assert main(argv + ["--json", str(out), "--folded", str(folded)]) == 0
+    assert "0x9 loop" in capsys.readouterr().out
+    assert json.loads(out.read_text())["programs"][0]["blocks"][0]["pc"] == 9
+    assert "program;loop;block@0x9 1000" in folded.read_text()
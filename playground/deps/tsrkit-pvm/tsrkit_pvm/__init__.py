@@ -8,10 +8,19 @@ __version__ = "0.1.0"
 __author__ = "Chainscore Labs"
 
 # Import common constants and utilities
-from .core.memory import Memory
+from .core.memory import Memory, MemorySnapshot
 from .core.program_base import Program
 from .core.ipvm import PVM
 from .core.code import Code, y_function
+from .engine import (
+    Engine,
+    EngineUnavailable,
+    available_engines,
+    engine_of,
+    get_engine,
+    register_engine,
+    select_engine,
+)
 from .common.types import Accessibility
 from .common.status import (
     CONTINUE,
@@ -62,10 +71,19 @@ except ImportError:
 __all__ = [
     # Core
     "Memory",
+    "MemorySnapshot",
     "PVM",
     "Program",
     "Code",
     "y_function",
+    # Engines
+    "Engine",
+    "EngineUnavailable",
+    "available_engines",
+    "engine_of",
+    "get_engine",
+    "register_engine",
+    "select_engine",
     # PVM
     "INT_Memory",
     "INT_Program",
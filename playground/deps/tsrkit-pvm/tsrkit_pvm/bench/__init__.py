@@ -0,0 +1,26 @@
+"""
+Benchmarks for the PVM engines.
+
+    python -m tsrkit_pvm.bench --engines python,cython --mode both --json bench.json
+    python -m tsrkit_pvm.bench --baseline bench.json      # compare against a previous run
+    python -m tsrkit_pvm.bench --engines recompiler --threads 4   # scaling across threads
+
+See `corpus` for the workloads and `runner` for what is timed.
+"""
+
+from .corpus import StorageHost, Workload, corpus
+from .runner import COLD, WARM, Result, compare, run_suite, run_threaded, run_workload, write_json
+
+__all__ = [
+    "COLD",
+    "WARM",
+    "Result",
+    "StorageHost",
+    "Workload",
+    "compare",
+    "corpus",
+    "run_suite",
+    "run_threaded",
+    "run_workload",
+    "write_json",
+]
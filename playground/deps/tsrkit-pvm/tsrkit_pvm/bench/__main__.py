@@ -0,0 +1,82 @@
+import argparse
+import json
+import sys
+from dataclasses import replace
+from typing import List, Optional
+
+from ..engine import available_engines, get_engine
+from .corpus import corpus
+from .runner import COLD, WARM, compare, run_suite, run_threaded, write_json
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tsrkit_pvm.bench",
+        description="Time the benchmark corpus on PVM engines",
+    )
+    parser.add_argument("--engines", help="comma-separated; default: every available engine")
+    parser.add_argument("--workloads", help="comma-separated; default: all")
+    parser.add_argument("--mode", choices=[WARM, COLD, "both"], default=WARM)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--gas", type=int, help="override every workload's gas per invocation")
+    parser.add_argument("--token", help="built token service (examples/c/token.c), or $PVM_BENCH_TOKEN")
+    parser.add_argument(
+        "--batch-storage", action="store_true", help="serve the token service the batched storage calls"
+    )
+    parser.add_argument(
+        "--threads", type=int, help="also run each workload on this many threads at once and report scaling"
+    )
+    parser.add_argument("--json", help="write results here")
+    parser.add_argument("--baseline", help="previous --json output to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="p50 slowdown counted as a regression")
+    opts = parser.parse_args(argv)
+
+    if opts.engines:
+        engines = opts.engines.split(",")
+    else:
+        engines = [name for name, reason in available_engines().items() if reason is None]
+    workloads = corpus(opts.token, opts.batch_storage)
+    if opts.workloads:
+        wanted = opts.workloads.split(",")
+        unknown = set(wanted) - {w.name for w in workloads}
+        if unknown:
+            parser.error(f"unknown workloads: {', '.join(sorted(unknown))}")
+        workloads = [w for w in workloads if w.name in wanted]
+    if opts.gas:
+        workloads = [replace(w, gas=opts.gas) for w in workloads]
+    modes = [WARM, COLD] if opts.mode == "both" else [opts.mode]
+
+    results = run_suite(workloads, engines, modes, opts.runs, opts.warmup)
+    print(f"{'workload':<10} {'engine':<11} {'mode':<5} {'status':<11} {'gas':>10} "
+          f"{'p50 us':>11} {'p99 us':>11} {'gas/us':>9}")
+    for r in results:
+        print(f"{r.workload:<10} {r.engine:<11} {r.mode:<5} {r.status:<11} {r.gas:>10} "
+              f"{r.p50_us:>11.1f} {r.p99_us:>11.1f} {r.gas_per_us:>9.1f}")
+    if opts.threads:
+        print(f"\n{'workload':<10} {'engine':<11} {'threads':>7} {'gas/us':>9} {'scaling':>8}")
+        for name in engines:
+            engine = get_engine(name, strict=True)
+            for w in workloads:
+                gas, elapsed = run_threaded(w, engine, 1)
+                single = gas / elapsed
+                for threads in sorted({1, 2, opts.threads}):
+                    if threads > 1:
+                        gas, elapsed = run_threaded(w, engine, threads)
+                    print(f"{w.name:<10} {name:<11} {threads:>7} {gas / elapsed:>9.1f} "
+                          f"{gas / elapsed / single:>7.2f}x")
+    if opts.json:
+        write_json(opts.json, results, {"runs": opts.runs, "warmup": opts.warmup})
+
+    if opts.baseline:
+        with open(opts.baseline) as f:
+            rows = compare(results, json.load(f), opts.threshold)
+        regressed = [(r, ratio) for r, ratio, slower in rows if slower]
+        for r, ratio in regressed:
+            print(f"regression: {r.workload} on {r.engine} ({r.mode}) is {ratio:.2f}x the baseline p50")
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
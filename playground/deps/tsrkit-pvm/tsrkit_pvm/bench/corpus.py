@@ -0,0 +1,379 @@
+"""
+Benchmark workloads.
+
+Workloads are standard program blobs, laid out like y_function does (read-only
+data, read-write data from 0x20000, stack, heap), except for test-vector
+programs that address low memory directly. The synthetic kernels loop forever and
+are bounded by their gas budget; the token service runs a fixed sequence of
+refine calls against `StorageHost`.
+"""
+
+import os
+import struct
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from tsrkit_types.bytes import Bytes
+from tsrkit_types.integers import Uint
+
+from ..common.constants import PVM_INIT_ZONE_SIZE
+from ..common.status import CONTINUE, ExecutionStatus
+from ..core.code import Code
+
+# Start of read-write data when a program has no read-only data
+RW_BASE = 2 * PVM_INIT_ZONE_SIZE
+
+HOST_NONE = 2**64 - 1
+HOST_WHAT = 2**64 - 2
+HOST_CALL_GAS = 10
+# The experimental batched storage calls, as the playground implements them
+READ_MANY = 200
+WRITE_MANY = 201
+BATCH_OP = struct.Struct("<5Q")
+
+
+class StorageHost:
+    """
+    The host calls the SDK links against, over an in-memory key-value store:
+    gas (0), read (3), write (4) and log (100). With `batch`, also the
+    batched read (200) and write (201), charged per item. Anything else
+    returns WHAT.
+    """
+
+    def __init__(self, batch: bool = False):
+        self.storage: Dict[bytes, bytes] = {}
+        self.calls = 0
+        self.batch = batch
+
+    def __call__(self, index: int, gas: int, registers: List[int], memory) -> Tuple[ExecutionStatus, int]:
+        self.calls += 1
+        gas -= HOST_CALL_GAS
+        r = registers
+        if index == 0:
+            r[7] = max(gas, 0)
+        elif index == 3:
+            key = bytes(memory.read(r[8], r[9]))
+            value = self.storage.get(key)
+            if value is None:
+                r[7] = HOST_NONE
+            else:
+                start = min(r[11], len(value))
+                memory.write(r[10], value[start : start + min(r[12], len(value) - start)])
+                r[7] = len(value)
+        elif index == 4:
+            key = bytes(memory.read(r[7], r[8]))
+            previous = self.storage.get(key)
+            if r[10] == 0:
+                self.storage.pop(key, None)
+            else:
+                self.storage[key] = bytes(memory.read(r[9], r[10]))
+            r[7] = HOST_NONE if previous is None else len(previous)
+        elif self.batch and index in (READ_MANY, WRITE_MANY):
+            ops, count = (r[8], r[9]) if index == READ_MANY else (r[7], r[8])
+            gas -= HOST_CALL_GAS * count
+            data = bytearray(memory.read(ops, BATCH_OP.size * count))
+            for i in range(count):
+                key_ptr, key_len, value_ptr, value_len, _ = BATCH_OP.unpack_from(data, i * BATCH_OP.size)
+                key = bytes(memory.read(key_ptr, key_len))
+                previous = self.storage.get(key)
+                if index == WRITE_MANY:
+                    if value_len == 0:
+                        self.storage.pop(key, None)
+                    else:
+                        self.storage[key] = bytes(memory.read(value_ptr, value_len))
+                elif previous is not None:
+                    memory.write(value_ptr, previous[:value_len])
+                result = HOST_NONE if previous is None else len(previous)
+                struct.pack_into("<Q", data, i * BATCH_OP.size + 32, result)
+            memory.write(ops, bytes(data))
+            r[7] = count
+        elif index != 100:
+            r[7] = HOST_WHAT
+        return CONTINUE, gas
+
+
+@dataclass(frozen=True)
+class Workload:
+    """
+    A program and the invocations one run of it makes.
+
+    Args:
+        blob: Standard program blob, or bare code when `pages` is set
+        calls: (pc, arguments) of each invocation in a run
+        gas: Gas per invocation
+        host: Builds fresh host state for each run; None for programs
+            without host calls
+        pages: Run bare code on this many read-write pages from address 0,
+            with zeroed registers, as the test-vector programs expect
+    """
+
+    name: str
+    description: str
+    blob: bytes
+    gas: int
+    calls: Sequence[Tuple[int, bytes]] = ((0, b""),)
+    host: Optional[Callable[[], StorageHost]] = None
+    pages: int = 0
+    tags: Sequence[str] = field(default_factory=tuple)
+
+
+class _Asm:
+    """Just enough of a PVM assembler for the synthetic kernels"""
+
+    def __init__(self):
+        self._items: List[Tuple[int, int, bytes, Optional[str]]] = []
+        self._labels: Dict[str, int] = {}
+        self._size = 0
+
+    def label(self, name: str) -> None:
+        # Branch targets must start a basic block, so end the one before
+        if self._size:
+            self._emit(1)  # fallthrough
+        self._labels[name] = self._size
+
+    def _emit(self, opcode: int, args: bytes = b"", target: Optional[str] = None) -> None:
+        self._items.append((self._size, opcode, args, target))
+        self._size += 1 + len(args) + (4 if target else 0)
+
+    # Immediates and offsets are always four bytes, sign-extended by the PVM
+    @staticmethod
+    def _imm(value: int) -> bytes:
+        return (value & 0xFFFFFFFF).to_bytes(4, "little")
+
+    def load_imm(self, rd: int, value: int) -> None:
+        self._emit(51, bytes([rd]) + self._imm(value))
+
+    def load_imm_64(self, rd: int, value: int) -> None:
+        self._emit(20, bytes([rd]) + value.to_bytes(8, "little"))
+
+    def add_imm(self, rd: int, ra: int, value: int) -> None:
+        self._emit(149, bytes([rd | ra << 4]) + self._imm(value))
+
+    def and_imm(self, rd: int, ra: int, value: int) -> None:
+        self._emit(132, bytes([rd | ra << 4]) + self._imm(value))
+
+    def _reg3(self, opcode: int, rd: int, ra: int, rb: int) -> None:
+        self._emit(opcode, bytes([ra | rb << 4, rd]))
+
+    def add(self, rd: int, ra: int, rb: int) -> None:
+        self._reg3(200, rd, ra, rb)
+
+    def mul(self, rd: int, ra: int, rb: int) -> None:
+        self._reg3(202, rd, ra, rb)
+
+    def xor(self, rd: int, ra: int, rb: int) -> None:
+        self._reg3(211, rd, ra, rb)
+
+    def load_u8(self, rd: int, base: int, offset: int = 0) -> None:
+        self._emit(124, bytes([rd | base << 4]) + self._imm(offset))
+
+    def load_u64(self, rd: int, base: int, offset: int = 0) -> None:
+        self._emit(130, bytes([rd | base << 4]) + self._imm(offset))
+
+    def store_u64(self, rs: int, base: int, offset: int = 0) -> None:
+        self._emit(123, bytes([rs | base << 4]) + self._imm(offset))
+
+    def sbrk(self, rd: int, ra: int) -> None:
+        self._emit(101, bytes([rd | ra << 4]))
+
+    def ecalli(self, index: int) -> None:
+        self._emit(10, self._imm(index))
+
+    def branch_lt_u(self, ra: int, rb: int, target: str) -> None:
+        self._emit(172, bytes([ra | rb << 4]), target)
+
+    def jump(self, target: str) -> None:
+        self._emit(40, target=target)
+
+    def code(self) -> bytes:
+        """Encoded program: jump table, code and opcode bitmask"""
+        code, mask = bytearray(), []
+        for pc, opcode, args, target in self._items:
+            instruction = bytes([opcode]) + args
+            if target is not None:
+                instruction += self._imm(self._labels[target] - pc)
+            code += instruction
+            mask += [1] + [0] * (len(instruction) - 1)
+        bitmask = bytes(
+            sum(bit << i for i, bit in enumerate(mask[j : j + 8])) for j in range(0, len(mask), 8)
+        )
+        return Uint(0).encode() + bytes([0]) + Uint(len(code)).encode() + bytes(code) + bitmask
+
+
+def _blob(code: bytes, rw_pages: int = 1, stack: int = 1 << 16) -> bytes:
+    """Standard program blob with `rw_pages` zeroed pages of read-write data"""
+    return Code(read=b"", r_write=b"", code=code, z=rw_pages, s=stack).encode()
+
+
+# Infinite add/jump loop from benchmark.md
+ADD_JUMP = bytes([0, 0, 14, 40, 2, 200, 50, 1, 40, 2, 200, 67, 2, 51, 1, 40, 246, 165, 20])
+
+# Conway's Game of Life from tests/programs/cgio.json; its board lives at
+# fixed low addresses, so it runs as bare code
+CGOL = bytes.fromhex(
+    "000081171e0103ff001e010bff001e0113ff001e0112ff001e0109ff0028e9003301ff01"
+    "951101511108df003302ff01952201511208f1961308c82303282f953380007c34844401"
+    "5214010e5315021956150315280851150306280b9533804603ff0028cd953380460328c6"
+    "330564343308409544ffcd8407957780007c76846601c86505954402cd8407957780007c"
+    "76846601c865059544f7cd8407957780007c76846601c86505954410cd8407957780007c"
+    "76846601c86505954401cd8407957780007c76846601c865059544fecd8407957780007c"
+    "76846601c865059544f0cd8407957780007c76846601c86505954402cd8407957780007c"
+    "76846601c86505283cff3301019513800080127a329511045111400cff28f02184109209"
+    "99488a121145895295244a922849a2248992244a922849a2248992342a21"
+)
+CGOL_PAGES = 256
+
+
+def _memcopy(size: int = 1 << 15) -> bytes:
+    """Copy `size` bytes a word at a time between two halves of the heap data"""
+    a = _Asm()
+    a.load_imm(2, RW_BASE)
+    a.load_imm(3, RW_BASE + size)
+    a.load_imm(5, size)
+    a.label("outer")
+    a.load_imm(4, 0)
+    a.label("inner")
+    a.add(7, 2, 4)
+    a.load_u64(6, 7)
+    a.add(8, 3, 4)
+    a.store_u64(6, 8)
+    a.add_imm(4, 4, 8)
+    a.branch_lt_u(4, 5, "inner")
+    a.jump("outer")
+    return a.code()
+
+
+def _fnv1a(size: int = 4096) -> bytes:
+    """FNV-1a over a buffer, byte by byte, forever"""
+    a = _Asm()
+    a.load_imm(2, RW_BASE)
+    a.load_imm(5, size)
+    a.load_imm_64(9, 0xCBF29CE484222325)
+    a.load_imm_64(10, 0x100000001B3)
+    a.label("outer")
+    a.load_imm(4, 0)
+    a.label("inner")
+    a.add(7, 2, 4)
+    a.load_u8(6, 7)
+    a.xor(9, 9, 6)
+    a.mul(9, 9, 10)
+    a.store_u64(9, 2, size)
+    a.add_imm(4, 4, 1)
+    a.branch_lt_u(4, 5, "inner")
+    a.jump("outer")
+    return a.code()
+
+
+def _storage_loop(keys: int = 64) -> bytes:
+    """Write a counter under one of `keys` keys, then read it back"""
+    a = _Asm()
+    a.load_imm(2, RW_BASE)  # key
+    a.load_imm(3, RW_BASE + 8)  # value
+    a.load_imm(5, 0)  # counter
+    a.label("loop")
+    a.and_imm(6, 5, keys - 1)
+    a.store_u64(6, 2)
+    a.store_u64(5, 3)
+    # write(key, 8, value, 8)
+    a.add_imm(7, 2, 0)
+    a.load_imm(8, 8)
+    a.add_imm(9, 3, 0)
+    a.load_imm(10, 8)
+    a.ecalli(4)
+    # read(self, key, 8, value, 0, 8)
+    a.load_imm(7, -1)
+    a.add_imm(8, 2, 0)
+    a.load_imm(9, 8)
+    a.add_imm(10, 3, 0)
+    a.load_imm(11, 0)
+    a.load_imm(12, 8)
+    a.ecalli(3)
+    a.add_imm(5, 5, 1)
+    a.jump("loop")
+    return a.code()
+
+
+def _allocator(chunk: int = 64) -> bytes:
+    """Grow the heap a chunk at a time and touch each chunk"""
+    a = _Asm()
+    a.load_imm(3, chunk)
+    a.load_imm(5, 0)
+    a.label("loop")
+    a.sbrk(2, 3)
+    # The interpreters disagree on whether sbrk returns the old or the new
+    # break (test_engines_agree_on_sbrk in tests/test_diff.py, an expected
+    # failure); the word below it is allocated either way
+    a.store_u64(5, 2, -8)
+    a.add_imm(5, 5, 1)
+    a.jump("loop")
+    return a.code()
+
+
+def _token_calls() -> Sequence[Tuple[int, bytes]]:
+    """Refine calls of the token example: init, mint, transfer, balance queries"""
+
+    def refine(payload: bytes) -> Tuple[int, bytes]:
+        return 0, Uint(0).encode() + Uint(0).encode() + Bytes(payload).encode() + bytes(32)
+
+    def u64(value: int) -> bytes:
+        return value.to_bytes(8, "little")
+
+    return (
+        refine(bytes([0x06])),
+        refine(bytes([0x01]) + u64(1) + u64(1000)),
+        refine(bytes([0x01]) + u64(100) + u64(500)),
+        refine(bytes([0x02]) + u64(2) + u64(200)),
+        refine(bytes([0x03]) + u64(1)),
+        refine(bytes([0x03]) + u64(2)),
+        refine(bytes([0x04]) + u64(2)),
+    )
+
+
+def token_workload(path: str, batch: bool = False) -> Workload:
+    """
+    The examples/c/token.c service, built with
+    `ajanta build examples/c/token.c -o build/token.pvm` (add
+    `--batch-storage` for a build that flushes state in one call, and run it
+    with `batch`).
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    # Built services start with their length-prefixed metadata
+    _, offset = Bytes.decode_from(data)
+    return Workload(
+        "token",
+        "examples/c/token.c refine calls",
+        data[offset:],
+        gas=10_000_000,
+        calls=_token_calls(),
+        host=partial(StorageHost, batch=batch),
+        tags=("service",),
+    )
+
+
+def corpus(token: Optional[str] = None, batch: bool = False) -> List[Workload]:
+    """
+    Every workload. The token service is included when its build is found at
+    `token` or $PVM_BENCH_TOKEN, served by a host with the batched storage
+    calls if `batch`.
+    """
+    workloads = [
+        Workload("add_jump", "add and jump forever", _blob(ADD_JUMP, rw_pages=1), gas=1_000_000),
+        Workload("cgol", "Conway's Game of Life", CGOL, gas=1_000_000, pages=CGOL_PAGES),
+        Workload("memcopy", "64-bit copy of 32 KiB", _blob(_memcopy(), rw_pages=16), gas=1_000_000),
+        Workload("fnv1a", "FNV-1a over 4 KiB", _blob(_fnv1a(), rw_pages=2), gas=1_000_000),
+        Workload(
+            "storage",
+            "storage write and read per iteration",
+            _blob(_storage_loop(), rw_pages=1),
+            gas=100_000,
+            host=StorageHost,
+            tags=("host",),
+        ),
+        Workload("sbrk", "64-byte sbrk allocations", _blob(_allocator(), rw_pages=1), gas=100_000),
+    ]
+    token = token or os.environ.get("PVM_BENCH_TOKEN")
+    if token:
+        workloads.append(token_workload(token, batch))
+    return workloads
@@ -0,0 +1,219 @@
+"""
+Timing workloads on engines.
+
+Warm runs decode (and, for the recompiler, assemble) a program once and time
+execution only, each run on fresh memory. Cold runs time everything a first
+invocation pays: decoding the blob, building memory and executing.
+"""
+
+import json
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..common.constants import PVM_MEMORY_PAGE_SIZE
+from ..common.status import CONTINUE, ExecutionStatus, PvmError
+from ..core.code import Code, regs_from_pc
+from ..engine import Engine, get_engine
+from .corpus import Workload
+
+WARM = "warm"
+COLD = "cold"
+
+
+@dataclass
+class Result:
+    workload: str
+    engine: str
+    mode: str
+    runs: int
+    status: str
+    gas: int
+    host_calls: int
+    p50_us: float
+    p99_us: float
+    mean_us: float
+    min_us: float
+    # Decoding and assembly share of a cold run (p50); 0 for warm runs
+    decode_us: float = 0.0
+
+    @property
+    def gas_per_us(self) -> float:
+        return self.gas / self.p50_us if self.p50_us else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "gas_per_us": round(self.gas_per_us, 3)}
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]"""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def _invoke(engine: Engine, program: Any, pc: int, gas: int, registers: list, memory: Any, host: Any):
+    """Run to a terminal status, servicing host calls like PsiH"""
+    calls = 0
+    while True:
+        status, pc, gas, registers, memory = engine.execute(program, pc, gas, registers, memory)
+        if status != ExecutionStatus.HOST or host is None:
+            return status, gas, calls
+        calls += 1
+        try:
+            status, gas = host(int(status.value.register), gas, registers, memory)
+        except PvmError as e:
+            return e.code, gas, calls
+        if gas < 0:
+            return ExecutionStatus.OUT_OF_GAS, gas, calls
+        if status != CONTINUE:
+            return status, gas, calls
+
+
+def _code(workload: Workload) -> Code:
+    if workload.pages:
+        return Code(read=b"", r_write=b"", code=workload.blob, z=0, s=0)
+    return Code.decode_from(workload.blob)
+
+
+def _memory(engine: Engine, program: Any, workload: Workload, code: Code, args: bytes) -> Any:
+    if not workload.pages:
+        return engine.memory_from_pc(program, code.read, code.r_write, args, code.z, code.s)
+    if engine.name == "recompiler":
+        mapped = [{"address": 0, "length": workload.pages * PVM_MEMORY_PAGE_SIZE}]
+        return engine.memory.from_initial(mapped, [], *engine.memory_args(program))
+    pages = list(range(workload.pages))
+    return engine.memory({}, pages, pages, *engine.memory_args(program))
+
+
+def _run(engine: Engine, workload: Workload, code: Code, program: Any) -> Tuple[str, int, int, int]:
+    """
+    One run of every invocation in a workload, each on fresh memory.
+    Returns (last status, gas used, host calls, ns spent executing).
+    """
+    host = workload.host() if workload.host else None
+    status, used, calls, elapsed = None, 0, 0, 0
+    for pc, args in workload.calls:
+        memory = _memory(engine, program, workload, code, args)
+        registers = [0] * 13 if workload.pages else regs_from_pc(args)
+        started = time.perf_counter_ns()
+        status, remaining, n = _invoke(engine, program, pc, workload.gas, registers, memory, host)
+        elapsed += time.perf_counter_ns() - started
+        used += workload.gas - max(int(remaining), 0)
+        calls += n
+    return status.name.lower(), used, calls, elapsed
+
+
+def run_workload(
+    workload: Workload, engine: Engine, mode: str = WARM, runs: int = 10, warmup: int = 1
+) -> Result:
+    """Time `runs` runs of `workload` on `engine` after `warmup` untimed ones"""
+    if mode not in (WARM, COLD):
+        raise ValueError(f"Unknown mode {mode!r}")
+    code = _code(workload)
+    program = engine.decode(code.code)
+    timings: List[float] = []
+    decodes: List[float] = []
+    for i in range(warmup + runs):
+        started = time.perf_counter_ns()
+        if mode == COLD:
+            program = engine.decode(code.code)
+        decoded = time.perf_counter_ns()
+        status, gas, calls, executing = _run(engine, workload, code, program)
+        finished = time.perf_counter_ns()
+        if i < warmup:
+            continue
+        if mode == COLD:
+            timings.append((finished - started) / 1000)
+            decodes.append((decoded - started) / 1000)
+        else:
+            timings.append(executing / 1000)
+    return Result(
+        workload=workload.name,
+        engine=engine.name,
+        mode=mode,
+        runs=runs,
+        status=status,
+        gas=gas,
+        host_calls=calls,
+        p50_us=round(percentile(timings, 50), 3),
+        p99_us=round(percentile(timings, 99), 3),
+        mean_us=round(statistics.fmean(timings), 3),
+        min_us=round(min(timings), 3),
+        decode_us=round(percentile(decodes, 50), 3) if decodes else 0.0,
+    )
+
+
+def run_threaded(workload: Workload, engine: Engine, threads: int) -> Tuple[int, float]:
+    """
+    One run of `workload` on each of `threads` threads at once, each with its
+    own decoded program. Returns (gas used by all threads, wall-clock us);
+    engines that release the GIL (the recompiler) should scale with cores.
+    """
+    code = _code(workload)
+    programs = [engine.decode(code.code) for _ in range(threads)]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        started = time.perf_counter_ns()
+        runs = list(pool.map(lambda program: _run(engine, workload, code, program), programs))
+        elapsed = time.perf_counter_ns() - started
+    return sum(gas for _, gas, _, _ in runs), elapsed / 1000
+
+
+def run_suite(
+    workloads: Sequence[Workload],
+    engines: Sequence[str],
+    modes: Sequence[str] = (WARM,),
+    runs: int = 10,
+    warmup: int = 1,
+) -> List[Result]:
+    """Every workload on every engine, strictly (unavailable engines raise)"""
+    results = []
+    for name in engines:
+        engine = get_engine(name, strict=True)
+        for workload in workloads:
+            for mode in modes:
+                results.append(run_workload(workload, engine, mode, runs, warmup))
+    return results
+
+
+def report(results: Sequence[Result], meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """JSON-ready results with the environment they were measured in"""
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            **(meta or {}),
+        },
+        "results": [r.to_dict() for r in results],
+    }
+
+
+def write_json(path: str, results: Sequence[Result], meta: Optional[Dict[str, Any]] = None) -> None:
+    with open(path, "w") as f:
+        json.dump(report(results, meta), f, indent=2)
+
+
+def compare(
+    results: Sequence[Result], baseline: Dict[str, Any], threshold: float = 0.1
+) -> List[Tuple[Result, float, bool]]:
+    """
+    Match results to a previous report by (workload, engine, mode). Returns
+    (result, p50 ratio to the baseline, regressed by more than `threshold`).
+    """
+    previous = {
+        (r["workload"], r["engine"], r["mode"]): r for r in baseline.get("results", [])
+    }
+    rows = []
+    for result in results:
+        before = previous.get((result.workload, result.engine, result.mode))
+        if before and before["p50_us"]:
+            ratio = result.p50_us / before["p50_us"]
+            rows.append((result, ratio, ratio > 1 + threshold))
+    return rows
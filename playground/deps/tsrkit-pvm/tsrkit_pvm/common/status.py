@@ -1,13 +1,38 @@
-from dataclasses import dataclass
+import threading
 from enum import Enum
 from typing import Any, Optional
 
 
-@dataclass
 class ExecValue:
-    name: str
-    code: int
-    register: Optional[int]
+    """
+    Value of an ExecutionStatus. HOST and PAGE_FAULT carry the register of
+    the run that ended with them; it is kept per thread, as the statuses are
+    shared and engines run on several threads at once.
+    """
+
+    def __init__(self, name: str, code: int, register: Optional[int]) -> None:
+        self.name = name
+        self.code = code
+        self._default = register
+        self._local = threading.local()
+
+    @property
+    def register(self) -> Optional[int]:
+        return getattr(self._local, "register", self._default)
+
+    @register.setter
+    def register(self, value: Optional[int]) -> None:
+        self._local.register = value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ExecValue):
+            return NotImplemented
+        return (self.name, self.code, self.register) == (other.name, other.code, other.register)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ExecValue(name={self.name!r}, code={self.code!r}, register={self.register!r})"
 
 
 class ExecutionStatus(Enum):
@@ -1,21 +1,11 @@
 from dataclasses import dataclass
-import os
 from typing import Tuple, Union, Any
 
 from tsrkit_types.integers import Uint
 from tsrkit_types.itf.codable import Codable
-from tsrkit_pvm.recompiler.vm_context import VMContext
 
 from ..common.constants import PVM_INIT_DATA_SIZE, PVM_INIT_ZONE_SIZE
-
-from ..recompiler.program import REC_Program
-from ..recompiler.memory import REC_Memory
-from tsrkit_pvm.interpreter.program import INT_Program
-from tsrkit_pvm.interpreter.memory import INT_Memory
-from ..cpvm.cy_memory import CyMemory
-from ..cpvm.cy_program import CyProgram
-
-_PVM_MODE = os.environ.get("PVM_MODE", "interpreter")
+from ..engine import get_engine
 
 @dataclass
 class Code(Codable):
@@ -92,10 +82,13 @@ def regs_from_pc(args: bytes) -> list:
 
 
 def y_function(
-    bytecode: bytes, args: bytes
+    bytecode: bytes, args: bytes, engine: Any = None
 ) -> Union[Tuple[Any, list, Any], None]:
     """Extract program components from bytecode.
 
+    Args:
+        engine: Engine or engine name to build for, defaults to PVM_MODE
+
     Returns:
         Tuple of (program, registers, memory_data)
     """
@@ -103,25 +96,11 @@ def y_function(
     if not code:
         return None
 
-    
-    if _PVM_MODE == "recompiler":
-        program_ = REC_Program.decode_from(code.code)[0]
-        memory = REC_Memory.from_pc(
-            code.read,
-            code.r_write,
-            args,
-            code.z,
-            code.s,
-            VMContext.calculate_size(len(program_.jump_table)),
-        )
-    elif _PVM_MODE == "mypyc":
-        program_ = INT_Program.decode_from(code.code)[0]
-        memory = INT_Memory.from_pc(code.read, code.r_write, args, code.z, code.s)
-    elif _PVM_MODE == "interpreter":
-        program_ = CyProgram.decode_from(code.code)[0]
-        memory = CyMemory.from_pc(code.read, code.r_write, args, code.z, code.s)
-    else:
-        raise ValueError(f"PVM_MODE {_PVM_MODE} not supported")
+    engine = get_engine(engine)
+    program_ = engine.decode(code.code)
+    memory = engine.memory_from_pc(
+        program_, code.read, code.r_write, args, code.z, code.s
+    )
 
     return (
         program_,
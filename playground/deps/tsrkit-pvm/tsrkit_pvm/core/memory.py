@@ -1,7 +1,35 @@
 """Abstract base class for Memory implementations."""
 
 from abc import ABC, abstractmethod
-from typing import List, Sequence, Union
+from typing import Any, List, Sequence, Union
+
+
+class MemorySnapshot:
+    """
+    Checkpoint handle returned by `Memory.snapshot()`.
+
+    A memory keeps one live checkpoint: restoring it rolls back every page
+    written since, and can be repeated. Taking a new snapshot invalidates the
+    previous one.
+    """
+
+    __slots__ = ("memory", "epoch", "heap", "state")
+
+    def __init__(self, memory: Any, epoch: int, heap: int, state: Any = None):
+        self.memory = memory
+        self.epoch = epoch
+        self.heap = heap
+        self.state = state
+
+    def check(self, memory: Any, epoch: int) -> None:
+        """Raise ValueError unless this is the live checkpoint of memory"""
+        if self.memory is not memory:
+            raise ValueError("snapshot belongs to another memory")
+        if self.epoch != epoch:
+            raise ValueError("snapshot was superseded by a newer one")
+
+    def __repr__(self) -> str:
+        return f"MemorySnapshot(epoch={self.epoch}, heap={self.heap})"
 
 
 class Memory(ABC):
@@ -21,3 +49,23 @@ class Memory(ABC):
     ) -> None:
         """Alter memory accessibility."""
         pass
+
+    @abstractmethod
+    def snapshot(self) -> MemorySnapshot:
+        """Checkpoint contents, permissions and heap; pages are copied on write."""
+        pass
+
+    @abstractmethod
+    def restore(self, snapshot: MemorySnapshot) -> None:
+        """Roll back to the live checkpoint, touching only pages written since."""
+        pass
+
+    @abstractmethod
+    def fork(self) -> "Memory":
+        """Independent copy; pages are shared until either side writes them."""
+        pass
+
+    @abstractmethod
+    def dirty_pages(self) -> List[int]:
+        """Pages written since the live snapshot, ascending."""
+        pass
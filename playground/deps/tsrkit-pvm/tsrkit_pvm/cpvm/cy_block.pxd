@@ -6,10 +6,62 @@ Cython declaration file for cy_block.pyx
 This file exposes the CyCompiledInstruction and CyBlockInfo classes 
 for efficient block compilation and execution.
 """
-from libc.stdint cimport int32_t, uint32_t, uint64_t, uint8_t
+from libc.stdint cimport int32_t, int64_t, uint32_t, uint64_t, uint8_t
 from .cy_program cimport CyProgram
+from .cy_code cimport CyCode
 from .cy_memory cimport CyMemory
-from .instructions.cy_table cimport CyTableEntry, instr_fn_t
+from .cy_pages cimport CyMem
+from .instructions.cy_table cimport CyTableEntry, instr_fn_t, instr_nogil_fn_t, instr_mem_fn_t
+
+
+cdef extern from *:
+    """
+    /* Blocks are published to other threads through the program's block table */
+    static inline void pvm_publish_block(void **slot, void *block) {
+        __atomic_store_n(slot, block, __ATOMIC_RELEASE);
+    }
+    static inline void *pvm_load_block(void **slot) {
+        return __atomic_load_n(slot, __ATOMIC_ACQUIRE);
+    }
+    """
+    void pvm_publish_block(void **slot, void *block) nogil
+    void *pvm_load_block(void **slot) nogil
+
+
+# Compiled instruction, laid out for the nogil loop
+cdef struct CyInstr:
+    instr_fn_t       fn
+    instr_nogil_fn_t nogil_fn
+    instr_mem_fn_t   mem_fn
+    uint64_t         vx
+    uint64_t         vy
+    uint32_t         next_pc
+    uint8_t          ra
+    uint8_t          rb
+    uint8_t          rd
+    bint             is_terminating
+
+
+cdef struct CyBlock:
+    CyInstr*  instrs
+    uint32_t  count
+    uint32_t  total_gas
+    bint      nogil           # every instruction has a nogil or memory handler
+    # Successors of the terminating instruction. The pcs are known when the
+    # block is compiled, the block pointers only once the whole program is
+    # precompiled; until then they are NULL and the block table is used.
+    uint32_t  next_pc         # fall-through pc
+    uint32_t  target_pc       # static jump target, PVM_NEXT_PC if none
+    CyBlock*  next
+    CyBlock*  target
+
+
+cdef enum RunExit:
+    RUN_YIELD = 0             # next block is not compiled yet, or needs the other loop
+    RUN_PANIC = 1
+    RUN_HALT = 2
+    RUN_OUT_OF_GAS = 3
+    RUN_PAGE_FAULT = 4        # address in CyMem.fault_addr
 
 
 cdef class CyCompiledInstruction:
@@ -32,6 +84,12 @@ cdef class CyBlockInfo:
     # Public attributes
     cdef public uint32_t      total_gas
     cdef public list          instructions
+    cdef CyBlock              block
     
     # Methods
-    cdef tuple execute(self, CyProgram program, uint32_t start_pc, uint64_t *reg_arr, CyMemory memory)
\ No newline at end of file
+    cdef tuple execute(self, CyProgram program, uint32_t start_pc, uint64_t *reg_arr, CyMemory memory)
+
+
+cdef CyBlock* lookup_block(CyProgram program, int32_t pc) noexcept nogil
+cdef int run_blocks(CyProgram program, int32_t *pc, int64_t *gas, uint64_t *registers, CyMem *mem) noexcept nogil
+cdef int run_blocks_gil(CyProgram program, int32_t *pc, int64_t *gas, uint64_t *registers, CyMemory memory) except -1
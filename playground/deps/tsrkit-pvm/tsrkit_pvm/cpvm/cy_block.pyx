@@ -12,11 +12,14 @@
 
 from typing import List, Any
 from libc.stdint cimport int64_t, int32_t, uint8_t, uint32_t, uint64_t
+from libc.stdlib cimport malloc, free
 from libc.time cimport time_t, clock, CLOCKS_PER_SEC
 import time
-from .cy_status cimport CONTINUE, PVM_CONTINUE, CyStatus, PvmExit
+from .cy_status cimport CONTINUE, PVM_CONTINUE, PVM_PANIC, PVM_HALT, PVM_PAGE_FAULT, CyStatus, PvmExit
 from .cy_memory cimport CyMemory 
 from .cy_program cimport CyProgram
+from .cy_code cimport CyCode, PVM_NEXT_PC, PVM_EXIT_PANIC, PVM_EXIT_HALT
+from .cy_pages cimport CyMem, PVM_EXIT_PAGE_FAULT
 from .instructions.cy_table cimport CyTableEntry
 
 cdef class CyCompiledInstruction:
@@ -33,51 +36,104 @@ cdef class CyCompiledInstruction:
 
 cdef class CyBlockInfo:
     """Compiled basic block with pre-decoded instructions."""
+    def __cinit__(self):
+        self.block.instrs = NULL
+        self.block.count = 0
+
     def __init__(self, total_gas: uint32_t, instructions: List):
         self.total_gas = total_gas
         self.instructions = instructions
+
+        # Copy operands and handlers into a C array for the execution loops
+        cdef uint32_t count = len(instructions)
+        cdef CyCompiledInstruction compiled_inst
+        cdef CyInstr* ins
+        cdef uint32_t i
+        self.block.instrs = <CyInstr*>malloc(max(count, 1) * sizeof(CyInstr))
+        if self.block.instrs == NULL:
+            raise MemoryError("failed to allocate block")
+        self.block.count = count
+        self.block.total_gas = total_gas
+        self.block.nogil = True
+        for i in range(count):
+            compiled_inst = instructions[i]
+            ins = &self.block.instrs[i]
+            ins.fn = compiled_inst.handler.fn
+            ins.nogil_fn = compiled_inst.handler.nogil_fn
+            ins.mem_fn = compiled_inst.handler.mem_fn
+            ins.vx = compiled_inst.vx
+            ins.vy = compiled_inst.vy
+            ins.ra = compiled_inst.ra
+            ins.rb = compiled_inst.rb
+            ins.rd = compiled_inst.rd
+            ins.next_pc = compiled_inst.next_pc
+            ins.is_terminating = compiled_inst.handler.is_terminating
+            if ins.nogil_fn == NULL and ins.mem_fn == NULL:
+                self.block.nogil = False
+
+        self.block.next_pc = PVM_NEXT_PC
+        self.block.target_pc = PVM_NEXT_PC
+        self.block.next = NULL
+        self.block.target = NULL
+        if count > 0:
+            compiled_inst = instructions[count - 1]
+            self.block.next_pc = compiled_inst.next_pc
+            if compiled_inst.handler.target_arg == 1:
+                self.block.target_pc = <uint32_t>compiled_inst.vx
+            elif compiled_inst.handler.target_arg == 2:
+                self.block.target_pc = <uint32_t>compiled_inst.vy
+
+    def __dealloc__(self):
+        if self.block.instrs != NULL:
+            free(self.block.instrs)
+
+    @property
+    def is_nogil(self):
+        """True if the block runs without the GIL."""
+        return self.block.nogil
     
     cdef tuple execute(self, CyProgram program, uint32_t start_pc, uint64_t *reg_arr, CyMemory memory):
-        """Execute block with optimized loop - minimal Python object creation."""
+        """Execute block with the GIL held, for blocks that touch memory or call the host."""
         cdef uint32_t current_pc = start_pc
         cdef uint32_t i
         cdef uint32_t next_pc
-        cdef CyCompiledInstruction compiled_inst
-        cdef CyTableEntry handler
-        cdef tuple result
-        
-        # Pre-cache the list and size to avoid repeated attribute lookups
-        cdef list instructions = self.instructions
-        cdef uint32_t instructions_size = len(instructions)
-        cdef uint32_t total_gas = self.total_gas
+        cdef CyInstr* ins
+        cdef uint32_t instructions_size = self.block.count
+        cdef uint32_t total_gas = self.block.total_gas
         
         # Execute instructions with minimal overhead
         for i in range(instructions_size):
-            compiled_inst = instructions[i]
-            handler = compiled_inst.handler
-            
-            # print(i, "🚨" if handler.is_terminating else "✅", "opcode:", compiled_inst.opcode, "at PC:", current_pc)
+            ins = &self.block.instrs[i]
 
             # Call the instruction function directly
-            try:
-                next_pc = handler.fn(
-                    program, reg_arr, memory, current_pc, 
-                    compiled_inst.vx, compiled_inst.vy, 
-                    compiled_inst.ra, compiled_inst.rb, compiled_inst.rd
-                )
-            except PvmExit as e:
-                e.next_pc = compiled_inst.next_pc
-                e.gas_cost = i + 1
-                raise e
-
-            if next_pc == 0xFFFF_FFFF:
-                next_pc = compiled_inst.next_pc
-
-            # print("-> Next PC:", next_pc)
+            if ins.nogil_fn != NULL:
+                next_pc = ins.nogil_fn(&program.code, reg_arr, current_pc, ins.vx, ins.vy, ins.ra, ins.rb, ins.rd)
+                if next_pc == PVM_EXIT_PANIC:
+                    raise PvmExit(PVM_PANIC, 0, ins.next_pc, i + 1)
+                if next_pc == PVM_EXIT_HALT:
+                    raise PvmExit(PVM_HALT, 0, ins.next_pc, i + 1)
+            elif ins.mem_fn != NULL:
+                next_pc = ins.mem_fn(memory.mem, reg_arr, ins.vx, ins.vy, ins.ra, ins.rb, ins.rd)
+                if next_pc == PVM_EXIT_PAGE_FAULT:
+                    raise PvmExit(PVM_PAGE_FAULT, memory.mem.fault_addr, ins.next_pc, i + 1)
+                if next_pc == PVM_EXIT_PANIC:
+                    raise PvmExit(PVM_PANIC, 0, ins.next_pc, i + 1)
+            else:
+                try:
+                    next_pc = ins.fn(
+                        program, reg_arr, memory, current_pc, 
+                        ins.vx, ins.vy, ins.ra, ins.rb, ins.rd
+                    )
+                except PvmExit as e:
+                    e.next_pc = ins.next_pc
+                    e.gas_cost = i + 1
+                    raise e
+
+            if next_pc == PVM_NEXT_PC:
+                next_pc = ins.next_pc
 
             # Use pre-cached termination flag
-            if handler.is_terminating:
-                # print("🏁 Block terminated at PC:", current_pc, "with opcode:", compiled_inst.opcode)
+            if ins.is_terminating:
                 return next_pc, total_gas
 
             # For non-terminating instructions, advance PC normally
@@ -86,3 +142,121 @@ cdef class CyBlockInfo:
         # Block completed normally (shouldn't happen as blocks end with terminating instructions)
         print("⚠️ Block ended without termination instruction")
         return current_pc, total_gas
+
+
+cdef CyBlock* lookup_block(CyProgram program, int32_t pc) noexcept nogil:
+    """Compiled block starting at pc, or NULL."""
+    if pc < 0 or pc >= program._block_table_len:
+        return NULL
+    return <CyBlock*>pvm_load_block(&program._block_table[pc])
+
+
+cdef inline CyBlock* _successor(CyProgram program, CyBlock* block, uint32_t pc) noexcept nogil:
+    # Precompiled blocks link to their static successors
+    if pc == block.next_pc and block.next != NULL:
+        return block.next
+    if pc == block.target_pc and block.target != NULL:
+        return block.target
+    return lookup_block(program, <int32_t>pc)
+
+
+cdef inline int _run_exit(uint32_t sentinel) noexcept nogil:
+    if sentinel == PVM_EXIT_PAGE_FAULT:
+        return RUN_PAGE_FAULT
+    return RUN_PANIC if sentinel == PVM_EXIT_PANIC else RUN_HALT
+
+
+cdef int run_blocks(CyProgram program, int32_t *pc, int64_t *gas, uint64_t *registers, CyMem *mem) noexcept nogil:
+    """
+    Run compiled blocks from pc without the GIL.
+
+    Follows block successors until the next block is missing or needs the GIL,
+    updating pc and gas in place with the same accounting as CyBlockInfo.execute.
+    """
+    cdef const CyCode* code = &program.code
+    cdef CyBlock* block = lookup_block(program, pc[0])
+    cdef CyInstr* ins
+    cdef uint32_t i, counter, next_pc
+    cdef uint64_t* hits = program._block_hits if program._profiling else NULL
+
+    while block != NULL and block.nogil:
+        counter = <uint32_t>pc[0]
+        next_pc = counter
+        if hits != NULL:
+            hits[counter] += 1
+        for i in range(block.count):
+            ins = &block.instrs[i]
+            if ins.nogil_fn != NULL:
+                next_pc = ins.nogil_fn(code, registers, counter, ins.vx, ins.vy, ins.ra, ins.rb, ins.rd)
+            else:
+                next_pc = ins.mem_fn(mem, registers, ins.vx, ins.vy, ins.ra, ins.rb, ins.rd)
+            if next_pc == PVM_NEXT_PC:
+                next_pc = ins.next_pc
+            elif next_pc >= PVM_EXIT_PAGE_FAULT:
+                gas[0] -= i + 1
+                pc[0] = <int32_t>ins.next_pc
+                return _run_exit(next_pc)
+            if ins.is_terminating:
+                break
+            counter = next_pc
+
+        pc[0] = <int32_t>next_pc
+        gas[0] -= block.total_gas
+        if gas[0] < 0:
+            return RUN_OUT_OF_GAS
+        block = _successor(program, block, next_pc)
+    return RUN_YIELD
+
+
+cdef int run_blocks_gil(CyProgram program, int32_t *pc, int64_t *gas, uint64_t *registers, CyMemory memory) except -1:
+    """
+    Run compiled blocks that need the GIL, the counterpart of run_blocks.
+
+    Returns once the next block is missing or can run without the GIL.
+    Instructions that exit the PVM raise PvmExit with next_pc and gas_cost
+    relative to the current block, whose start pc and gas are left in place.
+    """
+    cdef const CyCode* code = &program.code
+    cdef CyBlock* block = lookup_block(program, pc[0])
+    cdef CyInstr* ins
+    cdef uint32_t i, counter, next_pc
+    cdef uint64_t* hits = program._block_hits if program._profiling else NULL
+
+    while block != NULL and not block.nogil:
+        counter = <uint32_t>pc[0]
+        next_pc = counter
+        if hits != NULL:
+            hits[counter] += 1
+        for i in range(block.count):
+            ins = &block.instrs[i]
+            if ins.nogil_fn != NULL or ins.mem_fn != NULL:
+                if ins.nogil_fn != NULL:
+                    next_pc = ins.nogil_fn(code, registers, counter, ins.vx, ins.vy, ins.ra, ins.rb, ins.rd)
+                else:
+                    next_pc = ins.mem_fn(memory.mem, registers, ins.vx, ins.vy, ins.ra, ins.rb, ins.rd)
+                if next_pc != PVM_NEXT_PC and next_pc >= PVM_EXIT_PAGE_FAULT:
+                    gas[0] -= i + 1
+                    pc[0] = <int32_t>ins.next_pc
+                    return _run_exit(next_pc)
+            else:
+                try:
+                    next_pc = ins.fn(
+                        program, registers, memory, counter,
+                        ins.vx, ins.vy, ins.ra, ins.rb, ins.rd
+                    )
+                except PvmExit as e:
+                    e.next_pc = ins.next_pc
+                    e.gas_cost = i + 1
+                    raise e
+            if next_pc == PVM_NEXT_PC:
+                next_pc = ins.next_pc
+            if ins.is_terminating:
+                break
+            counter = next_pc
+
+        pc[0] = <int32_t>next_pc
+        gas[0] -= block.total_gas
+        if gas[0] < 0:
+            return RUN_OUT_OF_GAS
+        block = _successor(program, block, next_pc)
+    return RUN_YIELD
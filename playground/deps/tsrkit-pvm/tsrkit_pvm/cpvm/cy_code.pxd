@@ -0,0 +1,55 @@
+# cython: language_level=3
+
+"""
+Control-flow tables of a program and the branch checks that use them.
+
+Kept free of Python objects so instruction handlers can branch without the GIL.
+"""
+
+from libc.stdint cimport int32_t, int64_t, uint32_t, uint8_t
+
+
+cdef extern from *:
+    """
+    #define PVM_NEXT_PC    0xFFFFFFFFu
+    #define PVM_EXIT_PANIC 0xFFFFFFFEu
+    #define PVM_EXIT_HALT  0xFFFFFFFDu
+    """
+    # Returned by instruction handlers instead of a target pc
+    const uint32_t PVM_NEXT_PC       # continue with the next instruction
+    const uint32_t PVM_EXIT_PANIC
+    const uint32_t PVM_EXIT_HALT
+
+
+# Control-flow tables of a program, readable without the GIL
+cdef struct CyCode:
+    const uint8_t*  block_map       # 1 where a basic block starts
+    int32_t         block_map_len
+    const int64_t*  jump_table
+    int32_t         jump_table_len
+
+
+cdef inline uint32_t code_branch(const CyCode* code, int32_t target, bint cond) noexcept nogil:
+    """Branch to target if cond holds; targets must start a basic block."""
+    if not cond:
+        return PVM_NEXT_PC
+    if target < 0 or target >= code.block_map_len or not code.block_map[target]:
+        return PVM_EXIT_PANIC
+    return <uint32_t>target
+
+
+cdef inline uint32_t code_djump(const CyCode* code, uint32_t a) noexcept nogil:
+    """Dynamic jump through the jump table."""
+    # halt sentinel
+    if a == <uint32_t>0xFFFF0000:
+        return PVM_EXIT_HALT
+    # address sanity, PVM_ADDR_ALIGNMENT == 2
+    if a == 0 or a % 2:
+        return PVM_EXIT_PANIC
+    cdef int64_t idx = <int64_t>(a // 2) - 1
+    if idx >= code.jump_table_len:
+        return PVM_EXIT_PANIC
+    cdef int64_t target = code.jump_table[idx]
+    if target < 0 or target >= code.block_map_len or not code.block_map[target]:
+        return PVM_EXIT_PANIC
+    return <uint32_t>target
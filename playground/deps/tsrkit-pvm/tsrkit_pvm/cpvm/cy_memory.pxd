@@ -1,6 +1,7 @@
 # cython: language_level=3
 from ..common.types import Accessibility as CommonAccessibility
 from libc.stdint cimport uint32_t, uint8_t, uint64_t
+from .cy_pages cimport CyMem
 
 cdef enum Accessibility:
     ACC_READ
@@ -15,22 +16,21 @@ NONE = ACC_NONE
 DEF MAX_PAGES = 1048576  # 1M pages
 
 cdef class CyMemory:
-    cdef public dict _pages                    # page_idx -> Py_ssize_t (raw pointer) 
-    cdef public set _r_pages                   # readable pages (keeping for compatibility)
-    cdef public set _w_pages                   # writable pages (keeping for compatibility)
-    cdef uint64_t _r_bitset[16384]            # C-level read permission bitset (1M bits / 64 = 16384)
-    cdef uint64_t _w_bitset[16384]            # C-level write permission bitset
+    cdef CyMem* mem                            # page table and permission bitsets, see cy_pages
     cdef public int heap_break
+    cdef uint64_t _epoch                       # bumped by every snapshot
 
     # Low-level page management
-    cdef unsigned char* _get_cpage(self, uint32_t page_idx, bint create=*)
+    cdef unsigned char* _get_cpage(self, uint32_t page_idx, bint create=*) except? NULL
     cdef void _clear_bitsets(self) noexcept
-    cpdef void _sync_bitsets_from_sets(self)
-    
+    cdef void _load_c(self, uint32_t address, const unsigned char[:] data)
+    cdef uint32_t _set_zone_access(self, uint32_t start, uint32_t length, int mode)
+    cdef void _share_pages(self) except *
+
     # C-level byte operations
-    cdef void _set_byte_c(self, uint32_t addr, uint8_t value) noexcept
+    cdef void _set_byte_c(self, uint32_t addr, uint8_t value)
     cdef uint8_t _get_byte_c(self, uint32_t addr) noexcept
-    
+
     # C-level access control
     cdef bint _has_access_c(self, uint32_t page_idx, int mode) noexcept nogil
     cdef void _set_access_c(self, uint32_t page_idx, int mode, bint value) noexcept nogil
@@ -39,7 +39,7 @@ cdef class CyMemory:
     cdef void _alter_accessibility_c(self, uint32_t start_addr, uint32_t length, uint8_t access)
 
     # C-level memory operations
-    cdef void _zero_memory_range_c(self, uint32_t start_page, uint32_t num_pages) noexcept
+    cdef void _zero_memory_range_c(self, uint32_t start_page, uint32_t num_pages)
     cdef bint _is_accessible_c(self, uint32_t address, uint32_t length, int access) noexcept
 
     # Python-accessible wrappers
@@ -49,6 +49,6 @@ cdef class CyMemory:
     cpdef void write(self, uint32_t address, data)
 
 cdef uint32_t _norm(uint32_t addr) noexcept
-cdef uint32_t _get_start_page(uint32_t addr) noexcept  
+cdef uint32_t _get_start_page(uint32_t addr) noexcept
 cdef uint32_t _get_page_offset(uint32_t addr) noexcept
-cdef void _get_page_range(uint32_t start_addr, uint32_t length, uint32_t *start_page, uint32_t *num_pages) noexcept
\ No newline at end of file
+cdef void _get_page_range(uint32_t start_addr, uint32_t length, uint32_t *start_page, uint32_t *num_pages) noexcept
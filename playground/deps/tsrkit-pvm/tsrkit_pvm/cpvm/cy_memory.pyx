@@ -7,20 +7,26 @@
 """
 Hardcore C-level memory model for the CPVM.
 
-• Uses raw C buffers for pages with PyMem_Malloc/Free
+• Two-level C page table, pages carved from arena chunks (see cy_pages)
 • C-level bitsets for ultra-fast page permission checks
 • All hot paths run in pure C with nogil
+• Copy-on-write snapshots and forks, costing O(pages written)
 • Maximum performance optimized for block processing
 """
 
 from libc.stdint cimport uint32_t, uint8_t, uint64_t, uintptr_t
-from libc.string cimport memset, memcpy
-from libc.stdlib cimport malloc, free
-from cpython.mem cimport PyMem_Malloc, PyMem_Free
+from libc.string cimport memset, memcpy, memcmp
+from libc.stdlib cimport calloc, malloc, free
 from .cy_memory cimport Accessibility, ACC_READ, ACC_WRITE, ACC_NONE
+from .cy_pages cimport (
+    CyMem, PtPool, PtUndo, PtPermUndo, pt_page, pt_page_alloc, pt_reserve,
+    pt_can_read, pt_can_write, pt_bit, pt_track, pt_recycle, pt_lock, pt_unlock,
+    PT_DIR_SIZE, PT_LEAF_SIZE, PT_LEAF_SHIFT, PT_BITSET_WORDS, PT_PERM_LOG_WORDS,
+)
 from .cy_status cimport PAGE_FAULT, PvmExit, PVM_PAGE_FAULT
-from .cy_utils cimport get_pages, total_page_size, total_zone_size
+from .cy_utils cimport total_page_size, total_zone_size
 from ..common.types import Accessibility as CommonAccessibility
+from ..core.memory import MemorySnapshot
 
 DEF PVM_ADDR_ALIGNMENT = 2
 DEF PVM_INIT_DATA_SIZE = 2**24
@@ -54,32 +60,55 @@ cdef class CyMemory:
     """
     Ultra-high performance page-oriented memory:
     
-    • Raw C buffers per page (PyMem_Malloc'd 4KB chunks)
+    • Two-level C page table, O(1) page lookup without the GIL
+    • Pages allocated from contiguous arena chunks, not one by one
     • C-level bitsets for lightning-fast access control  
-    • All hot paths run in pure C with nogil
     • Zero Python object overhead in memory operations
+    • snapshot() / restore() / fork() share pages until written
     """
 
+    def __cinit__(self, *args, **kwargs):
+        self.mem = <CyMem*>calloc(1, sizeof(CyMem))
+        if self.mem == NULL:
+            raise MemoryError("failed to allocate page table")
+        self.mem.pool = <PtPool*>calloc(1, sizeof(PtPool))
+        if self.mem.pool == NULL:
+            raise MemoryError("failed to allocate page pool")
+        self.mem.pool.refs = 1
+
     # ───────────────────────── low-level page helpers ──────────────────────
-    cdef unsigned char* _get_cpage(self, uint32_t page_idx, bint create=False):
+    cdef unsigned char* _get_cpage(self, uint32_t page_idx, bint create=False) except? NULL:
         """
         Return raw C pointer for page `page_idx`.
         If `create` is true, allocate the page (filled with 0) when absent.
         """
-        cdef Py_ssize_t ptr_val
-        cdef unsigned char* buf
+        if not create:
+            return pt_page(self.mem, page_idx)
+        cdef unsigned char* buf = pt_page_alloc(self.mem, page_idx)
+        if buf == NULL:
+            raise MemoryError()
+        return buf
 
-        ptr_val = self._pages.get(page_idx, 0)
-        if ptr_val == 0:
-            if not create:
-                return <unsigned char*>0
-            buf = <unsigned char*>PyMem_Malloc(PAGE_SIZE)
-            if buf == NULL:
-                raise MemoryError()
-            memset(buf, 0, PAGE_SIZE)
-            self._pages[page_idx] = <Py_ssize_t>buf
-            return buf
-        return <unsigned char*>ptr_val
+    cdef void _load_c(self, uint32_t address, const unsigned char[:] data):
+        """Copy data into memory page by page, ignoring permissions."""
+        cdef uint32_t length = data.shape[0]
+        if length == 0:
+            return
+        cdef uint32_t start_page, num_pages
+        _get_page_range(address, length, &start_page, &num_pages)
+        if not pt_reserve(self.mem, num_pages):
+            raise MemoryError()
+
+        cdef uint32_t cur = address
+        cdef uint32_t copied = 0
+        cdef uint32_t chunk
+        while copied < length:
+            chunk = PAGE_SIZE - _get_page_offset(cur)
+            if chunk > length - copied:
+                chunk = length - copied
+            memcpy(self._get_cpage(_get_start_page(cur), True) + _get_page_offset(cur), &data[copied], chunk)
+            copied += chunk
+            cur += chunk
 
     # ---------------------------------------------------------------- init --
     def __init__(self,
@@ -87,63 +116,54 @@ cdef class CyMemory:
                  list[int] allowed_read_pages  = None,
                  list[int] allowed_write_pages = None,
                  int  heap                = 0):
-        # NOTE: _pages now maps page-idx → Py_ssize_t (raw pointer)
-        self._pages     = {}
-        self._r_pages   = set(allowed_read_pages or [])
-        self._w_pages   = set(allowed_write_pages or [])
         self.heap_break = heap
 
-        # Initialize C-level bitsets to zero
-        self._clear_bitsets()
-
         # Set initial permissions in bitsets
-        self._sync_bitsets_from_sets()
+        cdef int pg
+        for pg in allowed_read_pages or []:
+            self._set_access_c(pg, ACC_READ, True)
+        for pg in allowed_write_pages or []:
+            self._set_access_c(pg, ACC_WRITE, True)
 
         if data:
             for addr, val in data.items():
                 self._set_byte_c(addr, val)
 
     def __dealloc__(self):
-        """Free every allocated raw page."""
-        cdef Py_ssize_t ptr_val
-        for ptr_val in self._pages.values():
-            PyMem_Free(<void*>ptr_val)
+        """Free the arena chunks and page-table leaves with the last fork."""
+        cdef uint32_t i
+        cdef PtPool* pool
+        cdef bint last
+        if self.mem == NULL:
+            return
+        pool = self.mem.pool
+        if pool != NULL:
+            pt_lock(&pool.lock)
+            pool.refs -= 1
+            last = pool.refs == 0
+            pt_unlock(&pool.lock)
+            if last:
+                for i in range(pool.chunk_count):
+                    free(pool.chunks[i])
+                free(pool.chunks)
+                free(pool)
+        free(self.mem.undo)
+        free(self.mem.perm_undo)
+        free(self.mem.cow)
+        free(self.mem)
 
     cdef void _clear_bitsets(self) noexcept:
         """Clear all C-level bitsets."""
-        cdef int i
-        for i in range(16384):  # MAX_PAGES / 64
-            self._r_bitset[i] = 0
-            self._w_bitset[i] = 0
-
-    cpdef void _sync_bitsets_from_sets(self):
-        """Synchronize C-level bitsets from Python sets."""
-        # Clear all bitsets first
-        self._clear_bitsets()
-        
-        # Set read permissions
-        cdef int pg
-        for pg in self._r_pages:
-            self._set_access_c(pg, ACC_READ, True)
-        
-        # Set write permissions
-        for pg in self._w_pages:
-            self._set_access_c(pg, ACC_WRITE, True)
+        memset(self.mem.r_bitset, 0, sizeof(self.mem.r_bitset))
+        memset(self.mem.w_bitset, 0, sizeof(self.mem.w_bitset))
 
     # ───────────────────── C-level bitset access control ───────────────────
     cdef bint _has_access_c(self, uint32_t page_idx, int mode) noexcept nogil:
         """Check if page has access permission using C-level bitsets."""
-        if page_idx >= MAX_PAGES:
-            return False
-        
-        cdef uint32_t word_idx = page_idx >> 6  # divide by 64
-        cdef uint32_t bit_idx = page_idx & 63   # modulo 64
-        cdef uint64_t mask = <uint64_t>1 << bit_idx
-        
         if mode == ACC_WRITE:
-            return (self._w_bitset[word_idx] & mask) != 0
+            return pt_can_write(self.mem, page_idx)
         else:  # ACC_READ
-            return ((self._r_bitset[word_idx] | self._w_bitset[word_idx]) & mask) != 0
+            return pt_can_read(self.mem, page_idx)
 
     cdef void _set_access_c(self, uint32_t page_idx, int mode, bint value) noexcept nogil:
         """Set page access permission using C-level bitsets."""
@@ -153,17 +173,28 @@ cdef class CyMemory:
         cdef uint32_t word_idx = page_idx >> 6  # divide by 64
         cdef uint32_t bit_idx = page_idx & 63   # modulo 64
         cdef uint64_t mask = <uint64_t>1 << bit_idx
+        cdef CyMem* m = self.mem
+        cdef PtPermUndo* entry
+
+        # Keep the word as it was at the snapshot, once
+        if m.tracking and not pt_bit(m.perm_logged, word_idx):
+            entry = &m.perm_undo[m.perm_undo_count]
+            entry.word = word_idx
+            entry.r = m.r_bitset[word_idx]
+            entry.w = m.w_bitset[word_idx]
+            m.perm_undo_count += 1
+            m.perm_logged[word_idx >> 6] |= <uint64_t>1 << (word_idx & 63)
         
         if mode == ACC_WRITE:
             if value:
-                self._w_bitset[word_idx] |= mask
+                self.mem.w_bitset[word_idx] |= mask
             else:
-                self._w_bitset[word_idx] &= ~mask
+                self.mem.w_bitset[word_idx] &= ~mask
         elif mode == ACC_READ:
             if value:
-                self._r_bitset[word_idx] |= mask
+                self.mem.r_bitset[word_idx] |= mask
             else:
-                self._r_bitset[word_idx] &= ~mask
+                self.mem.r_bitset[word_idx] &= ~mask
 
     cdef void _set_access_range_c(self, uint32_t start_page, uint32_t num_pages, int mode, bint value) noexcept nogil:
         """Set access permission for a range of pages using C-level bitsets."""
@@ -195,7 +226,7 @@ cdef class CyMemory:
             self._set_access_range_c(start_page, num_pages, ACC_WRITE, False)
 
     # ───────────────────── single-byte helpers (C-level) ───────────────────
-    cdef void _set_byte_c(self, uint32_t addr, uint8_t value) noexcept:
+    cdef void _set_byte_c(self, uint32_t addr, uint8_t value):
         cdef uint32_t pg = _get_start_page(addr)
         cdef uint32_t off = _get_page_offset(addr)
         (<unsigned char*>self._get_cpage(pg, True))[off] = value
@@ -208,7 +239,7 @@ cdef class CyMemory:
             return 0
         return buf[off]
 
-    cdef void _zero_memory_range_c(self, uint32_t start_page, uint32_t num_pages) noexcept:
+    cdef void _zero_memory_range_c(self, uint32_t start_page, uint32_t num_pages):
         """Zero a range of pages using C-level operations."""
         if num_pages <= 0:
             return
@@ -325,60 +356,193 @@ cdef class CyMemory:
         self._zero_memory_range_c(start_page, num_pages)
 
     # ----------------------------------------------------------- from_pc --
+    cdef uint32_t _set_zone_access(self, uint32_t start, uint32_t length, int mode):
+        """Grant mode on the pages of a zone, returning the page after it."""
+        cdef uint32_t start_page, num_pages
+        # An empty zone still covers the page at its start, as in get_pages
+        _get_page_range(start, length if length > 0 else 1, &start_page, &num_pages)
+        self._set_access_range_c(start_page, num_pages, mode, True)
+        return start_page + num_pages
+
     @classmethod
     def from_pc(cls, bytes read, bytes write, bytes args,
                 int z, int s, uint32_t heap=0):
         """
         Build memory from program counters.  Parameters mirror the interpreter
         version; implementation matches logic but uses the new internals.
+
+        Zone contents are copied in bulk into one contiguous run of pages.
         """
-        cdef uint32_t last_page
-        mem = cls(data={}, allowed_read_pages=[], allowed_write_pages=[], heap=heap)
-        
+        cdef CyMemory mem = cls(data={}, allowed_read_pages=[], allowed_write_pages=[], heap=heap)
+        cdef uint32_t read_start = PVM_INIT_ZONE_SIZE
+        cdef uint32_t write_start = 2 * PVM_INIT_ZONE_SIZE + total_zone_size(len(read))
+        cdef uint32_t stack_start = 2**32 - 2 * PVM_INIT_ZONE_SIZE - PVM_INIT_DATA_SIZE - total_page_size(s)
+        cdef uint32_t arg_start = 2**32 - PVM_INIT_ZONE_SIZE - PVM_INIT_DATA_SIZE
+        cdef uint32_t heap_page
+
+        if not pt_reserve(mem.mem, (total_page_size(len(read)) + total_page_size(len(write))
+                                    + total_page_size(len(args))) // PAGE_SIZE):
+            raise MemoryError()
+
         # read zone
-        read_start = PVM_INIT_ZONE_SIZE
-        for i, b in enumerate(read):
-            mem._set_byte(read_start + i, b)
-        mem._r_pages.update(get_pages(read_start, total_page_size(len(read))))
-
-        # write zone
-        write_start = 2 * PVM_INIT_ZONE_SIZE + total_zone_size(len(read))
-        for i, b in enumerate(write):
-            mem._set_byte(write_start + i, b)
-        w_pages = get_pages(
-            write_start,
-            total_page_size(len(write)) + (z * PAGE_SIZE),
-        )
-        mem._w_pages.update(w_pages)
+        mem._load_c(read_start, read)
+        mem._set_zone_access(read_start, total_page_size(len(read)), ACC_READ)
 
-        # heap
-        if len(w_pages) > 0:
-            mem.heap_break = (w_pages[len(w_pages) - 1] + 1) * PAGE_SIZE
+        # write zone, heap starts after it
+        mem._load_c(write_start, write)
+        heap_page = mem._set_zone_access(
+            write_start, total_page_size(len(write)) + (z * PAGE_SIZE), ACC_WRITE
+        )
+        mem.heap_break = heap_page * PAGE_SIZE
 
         # stack
-        stack_start = 2**32 - 2 * PVM_INIT_ZONE_SIZE - PVM_INIT_DATA_SIZE - total_page_size(s)
-        mem._w_pages.update(get_pages(stack_start, total_page_size(s)))
+        mem._set_zone_access(stack_start, total_page_size(s), ACC_WRITE)
 
         # args zone
-        arg_start = 2**32 - PVM_INIT_ZONE_SIZE - PVM_INIT_DATA_SIZE
-        for i, b in enumerate(args):
-            mem._set_byte(arg_start + i, b)
-        mem._r_pages.update(get_pages(arg_start, total_page_size(len(args))))
+        mem._load_c(arg_start, args)
+        mem._set_zone_access(arg_start, total_page_size(len(args)), ACC_READ)
 
-        # IMPORTANT: Sync C-level bitsets after updating Python sets
-        mem._sync_bitsets_from_sets()
-        
         return mem
 
+    # --------------------------------------------------------- snapshots --
+    cdef void _share_pages(self) except *:
+        """Mark every page as shared, so the next write to it copies."""
+        if self.mem.cow == NULL:
+            self.mem.cow = <uint64_t*>malloc(PT_BITSET_WORDS * sizeof(uint64_t))
+            if self.mem.cow == NULL:
+                raise MemoryError()
+        memset(self.mem.cow, 0xFF, PT_BITSET_WORDS * sizeof(uint64_t))
+
+    def snapshot(self):
+        """Checkpoint memory; costs nothing until pages are written."""
+        cdef CyMem* m = self.mem
+        cdef uint32_t k
+        if m.perm_undo == NULL:
+            m.perm_undo = <PtPermUndo*>malloc(PT_BITSET_WORDS * sizeof(PtPermUndo))
+            if m.perm_undo == NULL:
+                raise MemoryError()
+        self._share_pages()
+
+        # Without forks, nothing else can hold the buffers the old log kept
+        if m.pool.refs == 1:
+            for k in range(m.undo_count):
+                if m.undo[k].buf != NULL:
+                    pt_recycle(m, m.undo[k].buf)
+        m.undo_count = 0
+        m.perm_undo_count = 0
+        memset(m.perm_logged, 0, sizeof(m.perm_logged))
+        m.tracking = True
+
+        self._epoch += 1
+        return MemorySnapshot(self, self._epoch, self.heap_break)
+
+    def restore(self, snapshot):
+        """Roll back to the live snapshot, which stays valid afterwards."""
+        snapshot.check(self, self._epoch)
+        cdef CyMem* m = self.mem
+        cdef bint exclusive = m.pool.refs == 1
+        cdef PtUndo* entry
+        cdef PtPermUndo* perm
+        cdef uint8_t** leaf
+        cdef uint8_t* cur
+        cdef uint32_t k, slot
+
+        # Newest first: a page copied again after a fork is logged twice
+        for k in reversed(range(m.undo_count)):
+            entry = &m.undo[k]
+            leaf = m.dir[(entry.page >> PT_LEAF_SHIFT) & (PT_DIR_SIZE - 1)]
+            slot = entry.page & (PT_LEAF_SIZE - 1)
+            cur = leaf[slot]
+            if cur != entry.buf:
+                # A copy made since the last fork is ours alone
+                if cur != NULL and (exclusive or not pt_bit(m.cow, entry.page)):
+                    pt_recycle(m, cur)
+                if entry.buf == NULL:
+                    m.page_count -= 1
+                leaf[slot] = entry.buf
+            m.cow[entry.page >> 6] |= <uint64_t>1 << (entry.page & 63)
+
+        for k in reversed(range(m.perm_undo_count)):
+            perm = &m.perm_undo[k]
+            m.r_bitset[perm.word] = perm.r
+            m.w_bitset[perm.word] = perm.w
+
+        m.undo_count = 0
+        m.perm_undo_count = 0
+        memset(m.perm_logged, 0, sizeof(m.perm_logged))
+        self.heap_break = snapshot.heap
+
+    def dirty_pages(self):
+        """Pages written since the live snapshot, ascending."""
+        cdef CyMem* m = self.mem
+        cdef uint32_t k
+        if not m.tracking:
+            raise ValueError("no live snapshot")
+        return sorted({m.undo[k].page for k in range(m.undo_count)})
+
+    def fork(self):
+        """Independent memory sharing every page with this one until written."""
+        cdef CyMemory child = type(self).__new__(type(self))
+        cdef CyMem* m = self.mem
+        cdef CyMem* c = child.mem
+        cdef uint8_t** leaf
+        cdef uint32_t d
+
+        free(c.pool)
+        c.pool = m.pool
+        pt_lock(&m.pool.lock)
+        m.pool.refs += 1
+        pt_unlock(&m.pool.lock)
+
+        memcpy(c.r_bitset, m.r_bitset, sizeof(m.r_bitset))
+        memcpy(c.w_bitset, m.w_bitset, sizeof(m.w_bitset))
+        for d in range(PT_DIR_SIZE):
+            if m.dir[d] == NULL:
+                continue
+            leaf = <uint8_t**>calloc(PT_LEAF_SIZE, sizeof(uint8_t*))
+            if leaf == NULL or not pt_track(c, leaf):
+                free(leaf)
+                raise MemoryError()
+            memcpy(leaf, m.dir[d], PT_LEAF_SIZE * sizeof(uint8_t*))
+            c.dir[d] = leaf
+        c.page_count = m.page_count
+        child.heap_break = self.heap_break
+
+        child._share_pages()
+        self._share_pages()
+        return child
+
     # --------------------------------------------------------- dunder --
+    @property
+    def page_count(self):
+        """Number of pages holding data."""
+        return self.mem.page_count
+
     def __repr__(self):
-        return f"CyMemory(pages={len(self._pages)}, heap={self.heap_break})"
+        return f"CyMemory(pages={self.mem.page_count}, heap={self.heap_break})"
 
     def __eq__(self, other):
         if not isinstance(other, CyMemory):
             return NotImplemented
-        return (
-            self._pages == other._pages and
-            self._r_pages == other._r_pages and
-            self._w_pages == other._w_pages
-        )
+        cdef CyMemory that = other
+        if (memcmp(self.mem.r_bitset, that.mem.r_bitset, sizeof(self.mem.r_bitset)) != 0 or
+                memcmp(self.mem.w_bitset, that.mem.w_bitset, sizeof(self.mem.w_bitset)) != 0):
+            return False
+
+        # Pages never written read as zeros
+        cdef uint8_t zero[PAGE_SIZE]
+        memset(zero, 0, PAGE_SIZE)
+        cdef uint32_t d, i
+        cdef uint8_t* a
+        cdef uint8_t* b
+        for d in range(PT_DIR_SIZE):
+            if self.mem.dir[d] == NULL and that.mem.dir[d] == NULL:
+                continue
+            for i in range(PT_LEAF_SIZE):
+                a = pt_page(self.mem, (d << PT_LEAF_SHIFT) | i)
+                b = pt_page(that.mem, (d << PT_LEAF_SHIFT) | i)
+                if a == b:
+                    continue
+                if memcmp(a if a != NULL else zero, b if b != NULL else zero, PAGE_SIZE) != 0:
+                    return False
+        return True
@@ -0,0 +1,277 @@
+# cython: language_level=3
+
+"""
+Two-level page table backing CyMemory.
+
+A directory of 1024 leaves, each mapping 1024 pages to raw 4 KiB buffers,
+covers the 32-bit address space. Pages are carved out of large arena chunks
+instead of being allocated one by one. Everything here is free of Python
+objects, so memory instructions run without the GIL.
+
+Snapshots and forks share page buffers. While `cow` is set, a page marked in
+it is copied before its first write; with a live snapshot the buffer it
+replaced goes to the undo log, so restoring costs O(pages written). Chunks
+belong to a pool shared by a memory and its forks and are freed with the last
+of them.
+"""
+
+from libc.stdint cimport uint8_t, uint32_t, uint64_t
+from libc.stdlib cimport calloc, realloc
+from libc.string cimport memcpy, memset
+from .cy_code cimport PVM_NEXT_PC, PVM_EXIT_PANIC
+
+
+cdef extern from *:
+    """
+    #define PVM_EXIT_PAGE_FAULT 0xFFFFFFFCu
+    static inline void pt_lock(char *lock) {
+        while (__atomic_test_and_set(lock, __ATOMIC_ACQUIRE)) {}
+    }
+    static inline void pt_unlock(char *lock) {
+        __atomic_clear(lock, __ATOMIC_RELEASE);
+    }
+    """
+    # Returned by memory handlers on an inaccessible address, see CyMem.fault_addr
+    const uint32_t PVM_EXIT_PAGE_FAULT
+    # Spinlock guarding a pool; held only while registering a chunk
+    void pt_lock(char* lock) nogil
+    void pt_unlock(char* lock) nogil
+
+
+cdef enum:
+    PT_PAGE_SHIFT = 12
+    PT_PAGE_SIZE = 4096
+    PT_LEAF_SHIFT = 10
+    PT_LEAF_SIZE = 1024                 # pages per leaf
+    PT_DIR_SIZE = 1024                  # leaves per directory
+    PT_MAX_PAGES = 1048576
+    PT_BITSET_WORDS = 16384             # PT_MAX_PAGES / 64
+    PT_ARENA_PAGES = 64                 # pages per arena chunk unless reserved
+    PT_PERM_LOG_WORDS = 256             # PT_BITSET_WORDS / 64
+
+
+cdef struct PtPool:
+    void**      chunks                  # every chunk and leaf, for freeing
+    uint32_t    chunk_count
+    uint32_t    chunk_cap
+    uint32_t    refs                    # memories sharing these pages
+    char        lock
+
+
+cdef struct PtUndo:
+    uint32_t    page
+    uint8_t*    buf                     # buffer replaced by the first write, NULL if none
+
+
+cdef struct PtPermUndo:
+    uint32_t    word                    # bitset word index
+    uint64_t    r
+    uint64_t    w
+
+
+cdef struct CyMem:
+    uint8_t**   dir[PT_DIR_SIZE]        # page >> 10 -> leaf of page buffers, NULL if empty
+    uint64_t    r_bitset[PT_BITSET_WORDS]
+    uint64_t    w_bitset[PT_BITSET_WORDS]
+    uint32_t    page_count              # pages with a buffer
+    uint8_t*    arena                   # unused tail of the current chunk
+    uint32_t    arena_left              # pages left in it
+    PtPool*     pool
+    uint8_t*    free_pages              # recycled buffers, linked through their first word
+    uint64_t*   cow                     # pages shared with a snapshot or fork, NULL if none
+    bint        tracking                # a snapshot is live, log what writes replace
+    PtUndo*     undo
+    uint32_t    undo_count
+    uint32_t    undo_cap
+    PtPermUndo* perm_undo               # room for every bitset word once
+    uint32_t    perm_undo_count
+    uint64_t    perm_logged[PT_PERM_LOG_WORDS]
+    uint32_t    fault_addr              # address of the last page fault
+
+
+cdef inline uint8_t* pt_page(const CyMem* m, uint32_t page) noexcept nogil:
+    """Buffer of page, or NULL if it was never written."""
+    cdef uint8_t** leaf = m.dir[(page >> PT_LEAF_SHIFT) & (PT_DIR_SIZE - 1)]
+    if leaf == NULL:
+        return NULL
+    return leaf[page & (PT_LEAF_SIZE - 1)]
+
+
+cdef inline bint pt_bit(const uint64_t* bits, uint32_t i) noexcept nogil:
+    return (bits[i >> 6] >> (i & 63)) & 1
+
+
+cdef inline bint pt_track(CyMem* m, void* chunk) noexcept nogil:
+    cdef PtPool* pool = m.pool
+    cdef void** grown
+    cdef bint ok = True
+    pt_lock(&pool.lock)
+    if pool.chunk_count == pool.chunk_cap:
+        grown = <void**>realloc(pool.chunks, (pool.chunk_cap * 2 + 16) * sizeof(void*))
+        if grown == NULL:
+            ok = False
+        else:
+            pool.chunks = grown
+            pool.chunk_cap = pool.chunk_cap * 2 + 16
+    if ok:
+        pool.chunks[pool.chunk_count] = chunk
+        pool.chunk_count += 1
+    pt_unlock(&pool.lock)
+    return ok
+
+
+cdef inline bint pt_reserve(CyMem* m, uint32_t pages) noexcept nogil:
+    """Make the next `pages` page allocations contiguous."""
+    if m.arena_left >= pages:
+        return True
+    if pages < PT_ARENA_PAGES:
+        pages = PT_ARENA_PAGES
+    cdef uint8_t* chunk = <uint8_t*>calloc(pages, PT_PAGE_SIZE)
+    if chunk == NULL or not pt_track(m, chunk):
+        return False
+    m.arena = chunk
+    m.arena_left = pages
+    return True
+
+
+cdef inline uint8_t* pt_fresh(CyMem* m, bint zero) noexcept nogil:
+    """Unused page buffer, recycled if possible. NULL if out of memory."""
+    cdef uint8_t* buf = m.free_pages
+    if buf != NULL:
+        m.free_pages = (<uint8_t**>buf)[0]
+        if zero:
+            memset(buf, 0, PT_PAGE_SIZE)
+        return buf
+    if not pt_reserve(m, 1):
+        return NULL
+    buf = m.arena
+    m.arena += PT_PAGE_SIZE
+    m.arena_left -= 1
+    return buf
+
+
+cdef inline void pt_recycle(CyMem* m, uint8_t* buf) noexcept nogil:
+    (<uint8_t**>buf)[0] = m.free_pages
+    m.free_pages = buf
+
+
+cdef inline bint pt_log(CyMem* m, uint32_t page, uint8_t* buf) noexcept nogil:
+    cdef PtUndo* grown
+    if m.undo_count == m.undo_cap:
+        grown = <PtUndo*>realloc(m.undo, (m.undo_cap * 2 + 64) * sizeof(PtUndo))
+        if grown == NULL:
+            return False
+        m.undo = grown
+        m.undo_cap = m.undo_cap * 2 + 64
+    m.undo[m.undo_count].page = page
+    m.undo[m.undo_count].buf = buf
+    m.undo_count += 1
+    return True
+
+
+cdef inline uint8_t* pt_page_alloc(CyMem* m, uint32_t page) noexcept nogil:
+    """
+    Writable buffer of page, allocated zeroed on first use and copied first
+    if shared. NULL if out of memory.
+    """
+    cdef uint32_t d = (page >> PT_LEAF_SHIFT) & (PT_DIR_SIZE - 1)
+    cdef uint8_t** leaf = m.dir[d]
+    if leaf == NULL:
+        leaf = <uint8_t**>calloc(PT_LEAF_SIZE, sizeof(uint8_t*))
+        if leaf == NULL or not pt_track(m, leaf):
+            return NULL
+        m.dir[d] = leaf
+    cdef uint8_t* buf = leaf[page & (PT_LEAF_SIZE - 1)]
+    cdef uint8_t* fresh
+    if m.cow != NULL and pt_bit(m.cow, page):
+        fresh = pt_fresh(m, buf == NULL)
+        if fresh == NULL:
+            return NULL
+        if m.tracking and not pt_log(m, page, buf):
+            pt_recycle(m, fresh)
+            return NULL
+        if buf != NULL:
+            memcpy(fresh, buf, PT_PAGE_SIZE)
+        else:
+            m.page_count += 1
+        m.cow[page >> 6] &= ~(<uint64_t>1 << (page & 63))
+        leaf[page & (PT_LEAF_SIZE - 1)] = fresh
+        return fresh
+    if buf == NULL:
+        buf = pt_fresh(m, True)
+        if buf == NULL:
+            return NULL
+        leaf[page & (PT_LEAF_SIZE - 1)] = buf
+        m.page_count += 1
+    return buf
+
+
+cdef inline bint pt_can_read(const CyMem* m, uint32_t page) noexcept nogil:
+    if page >= PT_MAX_PAGES:
+        return False
+    return ((m.r_bitset[page >> 6] | m.w_bitset[page >> 6]) >> (page & 63)) & 1
+
+
+cdef inline bint pt_can_write(const CyMem* m, uint32_t page) noexcept nogil:
+    if page >= PT_MAX_PAGES:
+        return False
+    return (m.w_bitset[page >> 6] >> (page & 63)) & 1
+
+
+cdef inline bint pt_accessible(const CyMem* m, uint32_t addr, uint32_t size, bint write) noexcept nogil:
+    # Accesses of at most one page touch at most two pages; wrapping past
+    # 2**32 always faults
+    cdef uint32_t first = addr >> PT_PAGE_SHIFT
+    cdef uint32_t last = (addr + size - 1) >> PT_PAGE_SHIFT
+    if addr + size - 1 < addr:
+        return False
+    if write:
+        return pt_can_write(m, first) and (last == first or pt_can_write(m, last))
+    return pt_can_read(m, first) and (last == first or pt_can_read(m, last))
+
+
+cdef inline uint32_t pt_load(CyMem* m, uint32_t addr, uint32_t size, uint64_t* out) noexcept nogil:
+    """Load a little-endian value of 1 to 8 bytes, or fault."""
+    if not pt_accessible(m, addr, size, False):
+        m.fault_addr = addr
+        return PVM_EXIT_PAGE_FAULT
+    cdef uint64_t value = 0
+    cdef uint32_t i, a
+    cdef uint8_t* buf = pt_page(m, addr >> PT_PAGE_SHIFT)
+    if (addr & (PT_PAGE_SIZE - 1)) + size <= PT_PAGE_SIZE:
+        if buf != NULL:
+            buf += addr & (PT_PAGE_SIZE - 1)
+            for i in range(size):
+                value |= (<uint64_t>buf[i]) << (8 * i)
+    else:
+        for i in range(size):
+            a = addr + i
+            buf = pt_page(m, a >> PT_PAGE_SHIFT)
+            if buf != NULL:
+                value |= (<uint64_t>buf[a & (PT_PAGE_SIZE - 1)]) << (8 * i)
+    out[0] = value
+    return PVM_NEXT_PC
+
+
+cdef inline uint32_t pt_store(CyMem* m, uint32_t addr, uint32_t size, uint64_t value) noexcept nogil:
+    """Store the low `size` bytes of value little-endian, or fault."""
+    if not pt_accessible(m, addr, size, True):
+        m.fault_addr = addr
+        return PVM_EXIT_PAGE_FAULT
+    cdef uint32_t i, a
+    cdef uint8_t* buf
+    if (addr & (PT_PAGE_SIZE - 1)) + size <= PT_PAGE_SIZE:
+        buf = pt_page_alloc(m, addr >> PT_PAGE_SHIFT)
+        if buf == NULL:
+            return PVM_EXIT_PANIC
+        buf += addr & (PT_PAGE_SIZE - 1)
+        for i in range(size):
+            buf[i] = <uint8_t>(value >> (8 * i))
+    else:
+        for i in range(size):
+            a = addr + i
+            buf = pt_page_alloc(m, a >> PT_PAGE_SHIFT)
+            if buf == NULL:
+                return PVM_EXIT_PANIC
+            buf[a & (PT_PAGE_SIZE - 1)] = <uint8_t>(value >> (8 * i))
+    return PVM_NEXT_PC
@@ -7,7 +7,9 @@ This file exposes the CyProgram class and its methods for efficient
 Cython-to-Cython calls and inheritance.
 """
 
-from libc.stdint cimport int32_t, uint32_t, uint8_t
+from libc.stdint cimport int32_t, int64_t, uint32_t, uint64_t, uint8_t
+from .cy_code cimport CyCode, code_branch, code_djump, PVM_NEXT_PC, PVM_EXIT_PANIC, PVM_EXIT_HALT
+
 
 cdef class CyProgram:
     """
@@ -27,9 +29,18 @@ cdef class CyProgram:
     cdef public int32_t            zeta_len
     cdef public set                _basic_blocks_set
     cdef public dict               _exec_blocks
+    cdef CyCode                    code
+    cdef void**                    _block_table   # pc -> CyBlock*, see cy_block
+    cdef int32_t                   _block_table_len
+    cdef void*                     _aot_blocks    # CyBlock[] by block id, see precompile
+    cdef void*                     _aot_instrs    # CyInstr[] backing _aot_blocks
+    cdef uint64_t*                 _block_hits    # entries by block start pc, see enable_profile
+    cdef bint                      _profiling     # count into _block_hits
     
     # Private/internal attributes
     cdef int32_t*                  _skip_cache
+    cdef uint8_t*                  _block_map
+    cdef int64_t*                  _jump_targets
     cdef public int32_t            _skip_cache_len
     
     # Internal methods
@@ -12,10 +12,10 @@
 # cython: optimize.unpack_method_calls=True
 
 cimport cython
-from libc.stdint cimport int32_t, uint32_t, uint8_t
-from libc.stdlib cimport malloc, free
+from libc.stdint cimport int32_t, int64_t, uint32_t, uint64_t, uint8_t
+from libc.stdlib cimport malloc, calloc, free
+from libc.string cimport memset
 from .cy_status cimport PvmExit, PVM_PANIC, PVM_HALT
-from ..common.constants import PVM_ADDR_ALIGNMENT
 from .mapper cimport inst_map
 from tsrkit_types.integers import Uint
 from tsrkit_types import Bits
@@ -28,6 +28,14 @@ cdef class CyProgram:
         self._skip_cache_len = 0
         self.zeta = NULL
         self.zeta_len = 0
+        self._block_map = NULL
+        self._jump_targets = NULL
+        self._block_table = NULL
+        self._block_table_len = 0
+        self._aot_blocks = NULL
+        self._aot_instrs = NULL
+        self._block_hits = NULL
+        self._profiling = False
 
     def __init__(
         self,
@@ -67,6 +75,12 @@ cdef class CyProgram:
 
         self._precompute_cache()
 
+        # Compiled blocks by start pc; entries are owned by _exec_blocks
+        self._block_table_len = self.instruction_set_len + 1
+        self._block_table = <void**>calloc(self._block_table_len, sizeof(void*))
+        if self._block_table == NULL:
+            raise MemoryError("failed to allocate block table")
+
     @cython.cfunc
     @cython.inline
     cdef _precompute_cache(self):
@@ -109,12 +123,93 @@ cdef class CyProgram:
         self.basic_blocks      = bb
         self._basic_blocks_set = set(bb)
 
+        # C copies of the control-flow tables for branches taken without the GIL
+        cdef int32_t map_len = max(max(bb) + 1, instruction_len + 1)
+        self._block_map = <uint8_t*>calloc(map_len, sizeof(uint8_t))
+        self._jump_targets = <int64_t*>malloc(max(self.jump_table_len, 1) * sizeof(int64_t))
+        if self._block_map == NULL or self._jump_targets == NULL:
+            raise MemoryError("failed to allocate control-flow tables")
+        for i in bb:
+            self._block_map[i] = 1
+        for i in range(self.jump_table_len):
+            self._jump_targets[i] = self.jump_table[i]
+
+        self.code.block_map      = self._block_map
+        self.code.block_map_len  = map_len
+        self.code.jump_table     = self._jump_targets
+        self.code.jump_table_len = self.jump_table_len
+
     # ---------------------------------------------------------------- dealloc
     def __dealloc__(self):
         if self._skip_cache != NULL:
             free(self._skip_cache)
         if self.zeta != NULL:
             free(self.zeta)
+        if self._block_map != NULL:
+            free(self._block_map)
+        if self._jump_targets != NULL:
+            free(self._jump_targets)
+        if self._block_table != NULL:
+            free(self._block_table)
+        if self._aot_blocks != NULL:
+            free(self._aot_blocks)
+        if self._aot_instrs != NULL:
+            free(self._aot_instrs)
+        if self._block_hits != NULL:
+            free(self._block_hits)
+
+    # ------------------------------------------------------------ compilation
+    def precompile(self):
+        """
+        Compile every basic block ahead of execution.
+
+        Blocks are otherwise compiled on first entry. Precompiled blocks sit in
+        one array by block id and link to the blocks at their fall-through and
+        static jump targets, so tight loops never leave the execution loops.
+        Calling this again is a no-op.
+        """
+        inst_map.precompile(self)
+        return self
+
+    @property
+    def precompiled(self):
+        """True once precompile has run."""
+        return self._aot_blocks != NULL
+
+    # -------------------------------------------------------------- profiling
+    def enable_profile(self):
+        """
+        Count entries into each block from now on, for tsrkit_pvm.profiler.
+
+        While profiling is off the execution loops pay one untaken branch per
+        block. Counts from threads running the program at once may race.
+        """
+        if self._block_hits == NULL:
+            self._block_hits = <uint64_t*>calloc(self._block_table_len, sizeof(uint64_t))
+            if self._block_hits == NULL:
+                raise MemoryError("failed to allocate block counters")
+        elif not self._profiling:
+            self.reset_profile()
+        self._profiling = True
+        return self
+
+    def disable_profile(self):
+        """
+        Stop counting and drop the counts. Runs already under way keep
+        counting into the buffer, so it is kept until the program is freed.
+        """
+        self._profiling = False
+
+    def reset_profile(self):
+        if self._block_hits != NULL:
+            memset(self._block_hits, 0, self._block_table_len * sizeof(uint64_t))
+
+    def block_hits(self):
+        """Entries by block start pc since profiling was enabled."""
+        cdef int32_t pc
+        if not self._profiling:
+            return {}
+        return {pc: self._block_hits[pc] for pc in range(self._block_table_len) if self._block_hits[pc]}
 
     # ------------------------------------------------------------ fast helpers
     @cython.cfunc
@@ -128,33 +223,21 @@ cdef class CyProgram:
     @cython.cfunc
     @cython.inline
     cdef uint32_t branch(self, int32_t counter, int32_t branch, bint cond):
-        """Optimized conditional branch with fast set lookup."""
-        if not cond:
-            return <uint32_t>0xFFFF_FFFF
-        if branch not in self._basic_blocks_set:
+        """Conditional branch, raising PvmExit on an invalid target."""
+        cdef uint32_t target = code_branch(&self.code, branch, cond)
+        if target == PVM_EXIT_PANIC:
             raise PvmExit(PVM_PANIC)
-        return branch
+        return target
 
     @cython.cfunc
     @cython.inline  
     cdef uint32_t djump(self, uint32_t counter, uint32_t a):
-        """Optimized dynamic jump with safer type handling."""
-        # halt sentinel - original comparison
-        if a == 0xFFFF_FFFF - 0xFFFF:
+        """Dynamic jump, raising PvmExit on halt or an invalid target."""
+        cdef uint32_t target = code_djump(&self.code, a)
+        if target == PVM_EXIT_HALT:
             raise PvmExit(PVM_HALT)
-
-        # address sanity - keep original modulo check for safety
-        if a == 0 or a % PVM_ADDR_ALIGNMENT:
+        if target == PVM_EXIT_PANIC:
             raise PvmExit(PVM_PANIC)
-
-        cdef int32_t idx = <int32_t>(a // PVM_ADDR_ALIGNMENT) - 1
-        if idx < 0 or idx >= self.jump_table_len:
-            raise PvmExit(PVM_PANIC)
-
-        cdef int32_t target = self.jump_table[idx]
-        if target not in self._basic_blocks_set:
-            raise PvmExit(PVM_PANIC)
-
         return target
 
     # Optimized encode/decode functions with C-level performance
@@ -18,6 +18,8 @@ from libc.stdint cimport uint8_t, int32_t
 from .cy_program cimport CyProgram
 from .cy_memory cimport CyMemory
 from .mapper cimport CyInstMapper, inst_map
+from .cy_block cimport CyBlock, lookup_block, run_blocks, run_blocks_gil, RUN_PANIC, RUN_HALT, RUN_OUT_OF_GAS, RUN_PAGE_FAULT
+from .cy_pages cimport CyMem
 from .cy_status cimport OUT_OF_GAS, PAGE_FAULT, PVM_HALT, PVM_PANIC, PVM_PAGE_FAULT, PVM_OUT_OF_GAS, PVM_HOST, CyStatus, CONTINUE, PVM_CONTINUE
 from .cy_status cimport PvmExit
 from ..common.status import ExecutionStatus, HALT, PANIC, OUT_OF_GAS as EXEC_OUT_OF_GAS, CONTINUE as EXEC_CONTINUE, HOST, PAGE_FAULT as EXEC_PAGE_FAULT
@@ -110,35 +112,63 @@ cdef tuple _execute_internal(
     """
     Internal Cython-only execution method for maximum performance.
     This bypasses Python object creation and uses C types throughout.
+
+    Compiled blocks chain into each other inside run_blocks, which releases
+    the GIL for runs of register, memory and control-flow instructions, and
+    run_blocks_gil for blocks that call the host or grow the heap. Control
+    returns here to switch between the two, or to compile a missing block.
+    Programs precompiled with CyProgram.precompile never miss.
     """
     cdef int64_t remaining_gas = gas
     cdef int32_t pc = program_counter
     cdef int32_t gas_cost
-    cdef bint should_break = False
-    cdef tuple result
-    cdef CyStatus status = CONTINUE
-    cdef int status_code = 0
+    cdef int exit_code
+    cdef CyBlock* block
+    cdef CyMem* mem = memory.mem
+    cdef CyStatus status = CyStatus()
     
-    while not should_break:
+    while True:
         try:
-            # Execute instruction using optimized mapper (this will handle nogil internally)
-            pc, gas_cost = inst_map.process_instruction(program, pc, registers, memory)
-            remaining_gas -= gas_cost
+            block = lookup_block(program, pc)
+            if block == NULL:
+                if 0 <= pc < program._block_table_len:
+                    inst_map.get_block(program, pc)
+                    continue
 
-            if remaining_gas < 0:
-                status = OUT_OF_GAS
-                should_break = True
+                # Outside the block table, e.g. a start pc past the code
+                pc, gas_cost = inst_map.process_instruction(program, pc, registers, memory)
+                remaining_gas -= gas_cost
+                if remaining_gas < 0:
+                    status.set_values(PVM_OUT_OF_GAS, 0)
+                    break
                 continue
 
+            if block.nogil:
+                with nogil:
+                    exit_code = run_blocks(program, &pc, &remaining_gas, registers, mem)
+            else:
+                exit_code = run_blocks_gil(program, &pc, &remaining_gas, registers, memory)
+
         except PvmExit as e:
             if e.code < 5:
-                should_break = True
-                status.code = e.code 
-                status.register = e.register
+                status.set_values(e.code, e.register)
                 remaining_gas -= e.gas_cost
                 pc = e.next_pc
+                break
             else:
                 raise e
 
-    return status, pc, remaining_gas
+        if exit_code == RUN_OUT_OF_GAS:
+            status.set_values(PVM_OUT_OF_GAS, 0)
+            break
+        if exit_code == RUN_PANIC:
+            status.set_values(PVM_PANIC, 0)
+            break
+        if exit_code == RUN_HALT:
+            status.set_values(PVM_HALT, 0)
+            break
+        if exit_code == RUN_PAGE_FAULT:
+            status.set_values(PVM_PAGE_FAULT, mem.fault_addr)
+            break
 
+    return status, pc, remaining_gas
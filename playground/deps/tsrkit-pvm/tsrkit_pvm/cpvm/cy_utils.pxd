@@ -8,21 +8,21 @@ from libc.string cimport memset, memcpy
 # ─────────────────────── C-level optimized functions ───────────────────────
 
 # Memory utilities - ultra-fast C implementations
-cdef uint32_t total_page_size(uint32_t blob_len) nogil except? 0
-cdef uint32_t total_zone_size(uint32_t blob_len) nogil except? 0
+cdef uint32_t total_page_size(uint32_t blob_len) noexcept nogil
+cdef uint32_t total_zone_size(uint32_t blob_len) noexcept nogil
 cdef list get_pages(uint32_t start_index, uint32_t length)
 
-cdef int64_t chi(uint64_t value, uint8_t n) nogil except? -1
-cdef int64_t z(uint64_t x, uint8_t n) nogil except? -1
-cdef uint64_t z_inv(int64_t x, uint8_t n) nogil except? 0
+cdef int64_t chi(uint64_t value, uint8_t n) noexcept nogil
+cdef int64_t z(uint64_t x, uint8_t n) noexcept nogil
+cdef uint64_t z_inv(int64_t x, uint8_t n) noexcept nogil
 
 # Bit operations - interface compatible with utils.py
 cdef list b(uint64_t value, uint8_t byte_size, bint is_reversed = ?)
 cdef uint64_t b_inv(list bits, bint is_reversed = ?)
 
 # Math utilities - optimized C implementations  
-cdef int64_t rtz(double x) nogil except? -1
-cdef int64_t smod(int64_t a, int64_t b) nogil except? -1
+cdef int64_t rtz(double x) noexcept nogil
+cdef int64_t smod(int64_t a, int64_t b) noexcept nogil
 
 # Fast byte conversion utilities - C-level performance for memory ops
 cdef bytes uint64_to_bytes_le(uint64_t value, uint8_t num_bytes) 
@@ -34,9 +34,9 @@ cdef uint32_t bytes_to_uint32_le(bytes data)
 cdef uint16_t bytes_to_uint16_le(bytes data)
 cdef uint8_t bytes_to_uint8_le(bytes data)
 
-cdef uint8_t clamp_12(uint8_t val) nogil except? 255
-cdef uint8_t clamp_4(uint8_t val) nogil except? 255
-cdef uint8_t clamp_4_max0(int8_t val) nogil except? 255
+cdef uint8_t clamp_12(uint8_t val) noexcept nogil
+cdef uint8_t clamp_4(uint8_t val) noexcept nogil
+cdef uint8_t clamp_4_max0(int8_t val) noexcept nogil
 
 # Comparison operation codes for C-level lookup
 cdef enum CmpOp:
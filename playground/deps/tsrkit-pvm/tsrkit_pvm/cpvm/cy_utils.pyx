@@ -40,11 +40,11 @@ cdef void _init_lookup_tables():
 _init_lookup_tables()
 
 # Memory utilities - ultra-fast C implementations
-cdef uint32_t total_page_size(uint32_t blob_len) nogil except? 0:
+cdef uint32_t total_page_size(uint32_t blob_len) noexcept nogil:
     """Calculate total page size needed for a blob - matches Python version exactly."""
     return ((blob_len + PVM_MEMORY_PAGE_MASK) >> PVM_MEMORY_PAGE_SHIFT) << PVM_MEMORY_PAGE_SHIFT
 
-cdef uint32_t total_zone_size(uint32_t blob_len) nogil except? 0:
+cdef uint32_t total_zone_size(uint32_t blob_len) noexcept nogil:
     """Calculate total zone size needed for a blob - matches Python version exactly."""
     cdef uint32_t zone_mask = PVM_INIT_ZONE_SIZE - 1
     return ((blob_len + zone_mask) >> PVM_INIT_ZONE_SHIFT) << PVM_INIT_ZONE_SHIFT
@@ -70,7 +70,7 @@ cdef list get_pages(uint32_t start_index, uint32_t length):
 # Bit manipulation utilities - C-level performance with inline optimization
 @cython.cfunc
 @cython.inline
-cdef int64_t chi(uint64_t value, uint8_t n) nogil except? -1:
+cdef int64_t chi(uint64_t value, uint8_t n) noexcept nogil:
     """Make value (of size n) an unbounded integer - ultra-fast inline version."""
     if n <= 0: return value
     if n >= 8: return <int64_t>value  # Already unbounded
@@ -80,7 +80,7 @@ cdef int64_t chi(uint64_t value, uint8_t n) nogil except? -1:
 
 @cython.cfunc
 @cython.inline
-cdef int64_t z(uint64_t x, uint8_t n) nogil except? -1:
+cdef int64_t z(uint64_t x, uint8_t n) noexcept nogil:
     """Z function - convert unsigned to signed - ultra-fast inline version."""
     if n <= 0 or n >= 8: return <int64_t>x  # Edge cases
     cdef uint8_t bits = n << 3  # 8 * n
@@ -90,7 +90,7 @@ cdef int64_t z(uint64_t x, uint8_t n) nogil except? -1:
 
 @cython.cfunc
 @cython.inline
-cdef uint64_t z_inv(int64_t x, uint8_t n) nogil except? 0:
+cdef uint64_t z_inv(int64_t x, uint8_t n) noexcept nogil:
     """Z_inv function - convert signed to unsigned - ultra-fast inline version."""
     if n <= 0 or n >= 8: return <uint64_t>x  # Edge cases
     return <uint64_t>x & ((1ULL << (n << 3)) - 1)  # Just mask to n bytes
@@ -221,11 +221,11 @@ cdef uint64_t b_inv(list bits, bint is_reversed = False):
     return result
 
 # Math utilities - optimized C implementations  
-cdef int64_t rtz(double x) nogil except? -1:
+cdef int64_t rtz(double x) noexcept nogil:
     """Round towards zero - matches Python version exactly."""
     return <int64_t>x  # C cast truncates towards zero like Python int()
 
-cdef int64_t smod(int64_t a, int64_t b) nogil except? -1:
+cdef int64_t smod(int64_t a, int64_t b) noexcept nogil:
     """Signed modulo operation - matches Python version exactly."""
     if b == 0:
         return a
@@ -238,19 +238,19 @@ cdef int64_t smod(int64_t a, int64_t b) nogil except? -1:
 # Clamp functions - branchless C implementations with inline optimization
 @cython.cfunc
 @cython.inline
-cdef uint8_t clamp_12(uint8_t val) nogil except? 255:
+cdef uint8_t clamp_12(uint8_t val) noexcept nogil:
     """Clamp to range [0, 12] - ultra-fast inline branchless version."""
     return val if val <= 12 else 12
 
 @cython.cfunc
 @cython.inline
-cdef uint8_t clamp_4(uint8_t val) nogil except? 255:
+cdef uint8_t clamp_4(uint8_t val) noexcept nogil:
     """Clamp to range [0, 4] - ultra-fast inline branchless version."""
     return val if val <= 4 else 4
 
 @cython.cfunc
 @cython.inline
-cdef uint8_t clamp_4_max0(int8_t val) nogil except? 255:
+cdef uint8_t clamp_4_max0(int8_t val) noexcept nogil:
     """Clamp to range [0, 4] with max(0, val) - ultra-fast inline version."""
     if val <= 0:
         return 0
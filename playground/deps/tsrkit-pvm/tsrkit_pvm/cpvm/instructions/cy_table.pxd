@@ -6,6 +6,8 @@ Unified Cython interface for all instruction tables.
 
 from libc.stdint cimport uint32_t, uint64_t, uint8_t, int32_t
 from ..cy_program cimport CyProgram
+from ..cy_code cimport CyCode
+from ..cy_pages cimport CyMem
 from ..cy_memory cimport CyMemory
 
 # C struct for instruction properties - eliminates Python tuple overhead
@@ -30,12 +32,41 @@ ctypedef uint32_t (*instr_fn_t)(
     uint8_t rd
 )
 
+# Handlers that only touch registers and control flow. They run without the
+# GIL and report exits through PVM_EXIT_* return values instead of PvmExit.
+ctypedef uint32_t (*instr_nogil_fn_t)(
+    const CyCode *code,
+    uint64_t *registers,
+    uint32_t counter,
+    uint64_t vx,
+    uint64_t vy,
+    uint8_t ra,
+    uint8_t rb,
+    uint8_t rd
+) noexcept nogil
+
+# Loads and stores. They run without the GIL on the page table and report a
+# page fault through PVM_EXIT_PAGE_FAULT, with the address in mem.fault_addr.
+ctypedef uint32_t (*instr_mem_fn_t)(
+    CyMem *mem,
+    uint64_t *registers,
+    uint64_t vx,
+    uint64_t vy,
+    uint8_t ra,
+    uint8_t rb,
+    uint8_t rd
+) noexcept nogil
+
 # Define the table entry as a Python-visible Cython class, so it
 # can be stored in Python dicts and carried around easily.
+# Exactly one of fn / nogil_fn / mem_fn is set.
 cdef class CyTableEntry:
     cdef instr_fn_t fn
+    cdef instr_nogil_fn_t nogil_fn
+    cdef instr_mem_fn_t mem_fn
     cdef public uint32_t gas_cost
     cdef public bint is_terminating
+    cdef public uint8_t target_arg      # operand holding a static jump target: 0 none, 1 vx, 2 vy
 
 cdef class CyTable:
     """
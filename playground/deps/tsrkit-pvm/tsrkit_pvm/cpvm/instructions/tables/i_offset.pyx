@@ -9,9 +9,10 @@ from ...cy_utils cimport clamp_4, z
 from ..cy_table cimport CyTable, CyTableEntry, InstructionProps
 from ...cy_memory cimport CyMemory
 from ...cy_program cimport CyProgram
+from ...cy_code cimport CyCode, code_branch
 
 # Unified dispatch function for jump instruction
-cdef inline uint32_t jump_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t jump_fn(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """
     OPC40: Unconditional jump to specified offset.
     
@@ -23,7 +24,7 @@ cdef inline uint32_t jump_fn(CyProgram program, uint64_t *registers, CyMemory me
         vx: Target jump address
         vy, ra, rb, rd: Unused for this instruction
     """
-    return program.branch(counter, vx, True)
+    return code_branch(code, vx, True)
 
 cdef class CyWArgsOneOffset(CyTable):
     """
@@ -63,5 +64,5 @@ cdef class CyWArgsOneOffset(CyTable):
 # Prebuilt table (opcode -> CyTableEntry)
 cdef dict TABLE = {}
 cdef CyTableEntry _e
-_e = CyTableEntry(); _e.fn = jump_fn; _e.gas_cost = 1; _e.is_terminating = True; TABLE[40] = _e
+_e = CyTableEntry(); _e.nogil_fn = jump_fn; _e.gas_cost = 1; _e.is_terminating = True; _e.target_arg = 1; TABLE[40] = _e
 
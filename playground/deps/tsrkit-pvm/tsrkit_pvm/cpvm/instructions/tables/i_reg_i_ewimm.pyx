@@ -9,9 +9,10 @@ from ...cy_utils cimport clamp_12
 from ..cy_table cimport CyTable, CyTableEntry, instr_fn_t, InstructionProps
 from ...cy_memory cimport CyMemory
 from ...cy_program cimport CyProgram
+from ...cy_code cimport CyCode
 
 # Unified dispatch function for load_imm_64 instruction
-cdef inline uint32_t load_imm_64_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t load_imm_64_fn(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """
     OPC20: Load 64-bit immediate value into register.
     
@@ -66,5 +67,5 @@ cdef class CyInstructionsWArgs1Reg1EwImm(CyTable):
 # Prebuilt table (opcode -> CyTableEntry)
 cdef dict TABLE = {}
 cdef CyTableEntry _e
-_e = CyTableEntry(); _e.fn = load_imm_64_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[20] = _e
+_e = CyTableEntry(); _e.nogil_fn = load_imm_64_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[20] = _e
 
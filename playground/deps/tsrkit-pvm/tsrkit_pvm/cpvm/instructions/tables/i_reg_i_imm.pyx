@@ -8,79 +8,91 @@ from ...cy_utils cimport chi, clamp_12, clamp_4
 from ..cy_table cimport CyTable, CyTableEntry, InstructionProps
 from ...cy_memory cimport CyMemory
 from ...cy_program cimport CyProgram
+from ...cy_pages cimport CyMem, pt_load, pt_store
+from ...cy_code cimport CyCode, code_djump, PVM_NEXT_PC
 
 
-cdef inline uint32_t jump_ind_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t jump_ind_fn(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC50: Indirect jump to address in register + offset."""
     cdef uint32_t addr_calc = registers[ra] + vx
-    return program.djump(counter, addr_calc)
+    return code_djump(code, addr_calc)
 
-cdef inline uint32_t load_imm_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t load_imm_fn(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC51: Load immediate value into register."""
     registers[ra] = vx
     return <uint32_t>0xFFFFFFFF
 
-cdef inline uint32_t load_u8_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t load_u8_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC52: Load unsigned 8-bit value from memory."""
-    cdef bytes data = memory.read(vx, 1)
-    registers[ra] = int.from_bytes(data, "little")
-    return <uint32_t>0xFFFFFFFF
+    cdef uint64_t value
+    cdef uint32_t exit = pt_load(mem, <uint32_t>vx, 1, &value)
+    if exit == PVM_NEXT_PC:
+        registers[ra] = value
+    return exit
 
-cdef inline uint32_t load_i8_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t load_i8_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC53: Load signed 8-bit value from memory."""
-    cdef bytes data = memory.read(vx, 1)
-    registers[ra] = <uint64_t>chi(<uint64_t>int.from_bytes(data, "little"), <uint8_t>1)
-    return <uint32_t>0xFFFFFFFF
+    cdef uint64_t value
+    cdef uint32_t exit = pt_load(mem, <uint32_t>vx, 1, &value)
+    if exit == PVM_NEXT_PC:
+        registers[ra] = <uint64_t>chi(value, 1)
+    return exit
 
-cdef inline uint32_t load_u16_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t load_u16_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC54: Load unsigned 16-bit value from memory."""
-    cdef bytes data = memory.read(vx, 2)
-    registers[ra] = int.from_bytes(data, "little")
-    return <uint32_t>0xFFFFFFFF
+    cdef uint64_t value
+    cdef uint32_t exit = pt_load(mem, <uint32_t>vx, 2, &value)
+    if exit == PVM_NEXT_PC:
+        registers[ra] = value
+    return exit
 
-cdef inline uint32_t load_i16_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t load_i16_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC55: Load signed 16-bit value from memory."""
-    cdef bytes data = memory.read(vx, 2)
-    registers[ra] = <uint64_t>chi(<uint64_t>int.from_bytes(data, "little"), <uint8_t>2)
-    return <uint32_t>0xFFFFFFFF
+    cdef uint64_t value
+    cdef uint32_t exit = pt_load(mem, <uint32_t>vx, 2, &value)
+    if exit == PVM_NEXT_PC:
+        registers[ra] = <uint64_t>chi(value, 2)
+    return exit
 
-cdef inline uint32_t load_u32_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t load_u32_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC56: Load unsigned 32-bit value from memory."""
-    cdef bytes data = memory.read(vx, 4)
-    registers[ra] = int.from_bytes(data, "little")
-    return <uint32_t>0xFFFFFFFF
+    cdef uint64_t value
+    cdef uint32_t exit = pt_load(mem, <uint32_t>vx, 4, &value)
+    if exit == PVM_NEXT_PC:
+        registers[ra] = value
+    return exit
 
-cdef inline uint32_t load_i32_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t load_i32_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC57: Load signed 32-bit value from memory."""
-    cdef bytes data = memory.read(vx, 4)
-    registers[ra] = <uint64_t>chi(<uint64_t>int.from_bytes(data, "little"), <uint8_t>4)
-    return <uint32_t>0xFFFFFFFF
+    cdef uint64_t value
+    cdef uint32_t exit = pt_load(mem, <uint32_t>vx, 4, &value)
+    if exit == PVM_NEXT_PC:
+        registers[ra] = <uint64_t>chi(value, 4)
+    return exit
 
-cdef inline uint32_t load_u64_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t load_u64_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC58: Load unsigned 64-bit value from memory."""
-    cdef bytes data = memory.read(vx, 8)
-    registers[ra] = int.from_bytes(data, "little")
-    return <uint32_t>0xFFFFFFFF
+    cdef uint64_t value
+    cdef uint32_t exit = pt_load(mem, <uint32_t>vx, 8, &value)
+    if exit == PVM_NEXT_PC:
+        registers[ra] = value
+    return exit
 
-cdef inline uint32_t store_u8_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_u8_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC59: Store 8-bit value to memory."""
-    memory.write(vx, int(registers[ra] % (2**8)).to_bytes(1, "little"))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>vx, 1, registers[ra])
 
-cdef inline uint32_t store_u16_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_u16_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC60: Store 16-bit value to memory."""
-    memory.write(vx, int(registers[ra] % (2**16)).to_bytes(2, "little"))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>vx, 2, registers[ra])
 
-cdef inline uint32_t store_u32_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_u32_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC61: Store 32-bit value to memory."""
-    memory.write(vx, int(registers[ra] % (2**32)).to_bytes(4, "little"))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>vx, 4, registers[ra])
 
-cdef inline uint32_t store_u64_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_u64_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC62: Store 64-bit value to memory."""
-    memory.write(vx, registers[ra].to_bytes(8, "little"))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>vx, 8, registers[ra])
 
 cdef class CyInstructionsWArgs1Reg1Imm(CyTable):
     """
@@ -121,16 +133,16 @@ cdef class CyInstructionsWArgs1Reg1Imm(CyTable):
 # Prebuilt table (opcode -> CyTableEntry)
 cdef dict TABLE = {}
 cdef CyTableEntry _e
-_e = CyTableEntry(); _e.fn = jump_ind_fn; _e.gas_cost = 1; _e.is_terminating = True; TABLE[50] = _e
-_e = CyTableEntry(); _e.fn = load_imm_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[51] = _e
-_e = CyTableEntry(); _e.fn = load_u8_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[52] = _e
-_e = CyTableEntry(); _e.fn = load_i8_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[53] = _e
-_e = CyTableEntry(); _e.fn = load_u16_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[54] = _e
-_e = CyTableEntry(); _e.fn = load_i16_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[55] = _e
-_e = CyTableEntry(); _e.fn = load_u32_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[56] = _e
-_e = CyTableEntry(); _e.fn = load_i32_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[57] = _e
-_e = CyTableEntry(); _e.fn = load_u64_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[58] = _e
-_e = CyTableEntry(); _e.fn = store_u8_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[59] = _e
-_e = CyTableEntry(); _e.fn = store_u16_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[60] = _e
-_e = CyTableEntry(); _e.fn = store_u32_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[61] = _e
-_e = CyTableEntry(); _e.fn = store_u64_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[62] = _e
\ No newline at end of file
+_e = CyTableEntry(); _e.nogil_fn = jump_ind_fn; _e.gas_cost = 1; _e.is_terminating = True; TABLE[50] = _e
+_e = CyTableEntry(); _e.nogil_fn = load_imm_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[51] = _e
+_e = CyTableEntry(); _e.mem_fn = load_u8_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[52] = _e
+_e = CyTableEntry(); _e.mem_fn = load_i8_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[53] = _e
+_e = CyTableEntry(); _e.mem_fn = load_u16_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[54] = _e
+_e = CyTableEntry(); _e.mem_fn = load_i16_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[55] = _e
+_e = CyTableEntry(); _e.mem_fn = load_u32_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[56] = _e
+_e = CyTableEntry(); _e.mem_fn = load_i32_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[57] = _e
+_e = CyTableEntry(); _e.mem_fn = load_u64_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[58] = _e
+_e = CyTableEntry(); _e.mem_fn = store_u8_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[59] = _e
+_e = CyTableEntry(); _e.mem_fn = store_u16_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[60] = _e
+_e = CyTableEntry(); _e.mem_fn = store_u32_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[61] = _e
+_e = CyTableEntry(); _e.mem_fn = store_u64_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[62] = _e
\ No newline at end of file
@@ -10,32 +10,25 @@ from ...cy_utils cimport chi, clamp_12, clamp_4, clamp_4_max0
 from ..cy_table cimport CyTable, CyTableEntry, instr_fn_t, InstructionProps
 from ...cy_memory cimport CyMemory
 from ...cy_program cimport CyProgram
+from ...cy_pages cimport CyMem, pt_load, pt_store
 
 
 # Store immediate indirect instructions
-cdef inline uint32_t store_imm_ind_u8_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_imm_ind_u8_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC70: Store immediate vy as u8 at address (ra + vx)."""
-    value = int(vy % (2**8))
-    memory.write((registers[ra] + vx), value.to_bytes(1, "little"))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>(registers[ra] + vx), 1, vy)
 
-cdef inline uint32_t store_imm_ind_u16_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_imm_ind_u16_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC71: Store immediate vy as u16 at address (ra + vx)."""
-    value = int(vy % (2**16))
-    memory.write((registers[ra] + vx), value.to_bytes(2, "little"))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>(registers[ra] + vx), 2, vy)
 
-cdef inline uint32_t store_imm_ind_u32_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_imm_ind_u32_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC72: Store immediate vy as u32 at address (ra + vx)."""
-    value = int(vy % (2**32))
-    memory.write((registers[ra] + vx), value.to_bytes(4, "little"))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>(registers[ra] + vx), 4, vy)
 
-cdef inline uint32_t store_imm_ind_u64_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_imm_ind_u64_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC73: Store immediate vy as u64 at address (ra + vx)."""
-    value = int(vy % (2**64))
-    memory.write((registers[ra] + vx), value.to_bytes(8, "little"))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>(registers[ra] + vx), 8, vy)
 
 cdef class CyInstructionsWArgs1Reg2Imm(CyTable):
     """
@@ -87,7 +80,7 @@ cdef class CyInstructionsWArgs1Reg2Imm(CyTable):
 # Prebuilt table (opcode -> CyTableEntry)
 cdef dict TABLE = {}
 cdef CyTableEntry _e
-_e = CyTableEntry(); _e.fn = store_imm_ind_u8_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[70] = _e
-_e = CyTableEntry(); _e.fn = store_imm_ind_u16_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[71] = _e
-_e = CyTableEntry(); _e.fn = store_imm_ind_u32_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[72] = _e
-_e = CyTableEntry(); _e.fn = store_imm_ind_u64_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[73] = _e
+_e = CyTableEntry(); _e.mem_fn = store_imm_ind_u8_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[70] = _e
+_e = CyTableEntry(); _e.mem_fn = store_imm_ind_u16_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[71] = _e
+_e = CyTableEntry(); _e.mem_fn = store_imm_ind_u32_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[72] = _e
+_e = CyTableEntry(); _e.mem_fn = store_imm_ind_u64_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[73] = _e
@@ -9,35 +9,24 @@ from ...cy_utils cimport chi, clamp_4, clamp_4_max0
 from ..cy_table cimport CyTable, CyTableEntry, instr_fn_t, InstructionProps
 from ...cy_memory cimport CyMemory
 from ...cy_program cimport CyProgram
+from ...cy_pages cimport CyMem, pt_load, pt_store
 
 
-cdef inline uint32_t store_imm_u8_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_imm_u8_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC30: Store immediate 8-bit value."""
-    cdef uint8_t value = <uint8_t>(vy % 2**8)
-    cdef uint64_t address = <uint64_t>vx
-    memory.write(address & 0xFFFFFFFF, value.to_bytes(1, 'little'))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>vx, 1, vy)
 
-cdef inline uint32_t store_imm_u16_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_imm_u16_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC31: Store immediate 16-bit value."""
-    cdef uint16_t value = <uint16_t>(vy % 2**16)
-    cdef uint64_t address = <uint64_t>vx
-    memory.write(address & 0xFFFFFFFF, value.to_bytes(2, 'little'))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>vx, 2, vy)
 
-cdef inline uint32_t store_imm_u32_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_imm_u32_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC32: Store immediate 32-bit value."""
-    cdef uint32_t value = <uint32_t>(vy % 2**32)
-    cdef uint64_t address = <uint64_t>vx
-    memory.write(address & 0xFFFFFFFF, value.to_bytes(4, 'little'))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>vx, 4, vy)
 
-cdef inline uint32_t store_imm_u64_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t store_imm_u64_fn(CyMem *mem, uint64_t *registers, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC33: Store immediate 64-bit value."""
-    cdef uint64_t value = <uint64_t>(vy % 2**64)
-    cdef uint64_t address = <uint64_t>vx
-    memory.write(address & 0xFFFFFFFF, value.to_bytes(8, 'little'))
-    return <uint32_t>0xFFFFFFFF
+    return pt_store(mem, <uint32_t>vx, 8, vy)
 
 cdef class CyInstructionsWArgs2Imm(CyTable):
     """
@@ -84,7 +73,7 @@ cdef class CyInstructionsWArgs2Imm(CyTable):
 # Prebuilt table (opcode -> CyTableEntry)
 cdef dict TABLE = {}
 cdef CyTableEntry _e
-_e = CyTableEntry(); _e.fn = store_imm_u8_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[30] = _e
-_e = CyTableEntry(); _e.fn = store_imm_u16_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[31] = _e
-_e = CyTableEntry(); _e.fn = store_imm_u32_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[32] = _e
-_e = CyTableEntry(); _e.fn = store_imm_u64_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[33] = _e
+_e = CyTableEntry(); _e.mem_fn = store_imm_u8_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[30] = _e
+_e = CyTableEntry(); _e.mem_fn = store_imm_u16_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[31] = _e
+_e = CyTableEntry(); _e.mem_fn = store_imm_u32_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[32] = _e
+_e = CyTableEntry(); _e.mem_fn = store_imm_u64_fn; _e.gas_cost = 1; _e.is_terminating = False; TABLE[33] = _e
@@ -9,11 +9,12 @@ from ...cy_utils cimport clamp_12, z, z_inv, b
 from ..cy_table cimport CyTable, CyTableEntry, instr_fn_t, InstructionProps
 from ...cy_memory cimport CyMemory, ACC_WRITE
 from ...cy_program cimport CyProgram
+from ...cy_code cimport CyCode
 
 # ----------------------------#
 # ---- C helper functions ----#
 # ----------------------------#
-cdef inline uint32_t _count_set_bits_c(uint64_t val):
+cdef inline uint32_t _count_set_bits_c(uint64_t val) noexcept nogil:
     """Fast bit counting using Brian Kernighan's algorithm."""
     cdef uint32_t count = 0
     while val:
@@ -21,7 +22,7 @@ cdef inline uint32_t _count_set_bits_c(uint64_t val):
         count += 1
     return count
 
-cdef inline uint32_t _leading_zeros_c(uint64_t val, uint32_t bitsize):
+cdef inline uint32_t _leading_zeros_c(uint64_t val, uint32_t bitsize) noexcept nogil:
     """Count leading zeros with C-level bit operations."""
     if val == 0:
         return bitsize
@@ -35,7 +36,7 @@ cdef inline uint32_t _leading_zeros_c(uint64_t val, uint32_t bitsize):
         
     return count
 
-cdef inline uint32_t _trailing_zeros_c(uint64_t val, uint32_t bitsize):
+cdef inline uint32_t _trailing_zeros_c(uint64_t val, uint32_t bitsize) noexcept nogil:
     """Count trailing zeros with C-level bit operations."""
     if val == 0:
         return bitsize
@@ -48,7 +49,7 @@ cdef inline uint32_t _trailing_zeros_c(uint64_t val, uint32_t bitsize):
     return count
 
 
-cdef inline uint32_t  move_reg(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t move_reg(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC100: Move value from register ra to register rd."""
     registers[rd] = registers[ra]
     return <uint32_t>0xFFFFFFFF
@@ -69,83 +70,83 @@ cdef inline uint32_t sbrk(CyProgram program, uint64_t *registers, CyMemory memor
     return <uint32_t>0xFFFFFFFF
 
 # Bit counting instructions with C-level optimizations
-cdef inline uint32_t  count_set_bits_64(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t count_set_bits_64(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC102: Count set bits in 64-bit value."""
-    registers[rd] = _count_set_bits_c(registers[ra] & 0xFFFFFFFFFFFFFFFF)
+    registers[rd] = _count_set_bits_c(registers[ra] & 0xFFFFFFFFFFFFFFFFULL)
     return <uint32_t>0xFFFFFFFF
 
-cdef inline uint32_t  count_set_bits_32(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t count_set_bits_32(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC103: Count set bits in 32-bit value."""
-    registers[rd] = _count_set_bits_c(registers[ra] & 0xFFFFFFFF)
+    registers[rd] = _count_set_bits_c(registers[ra] & 0xFFFFFFFFU)
     return <uint32_t>0xFFFFFFFF
 
 # Leading zero counting with C optimizations
-cdef inline uint32_t  leading_zero_bits_64(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t leading_zero_bits_64(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC104: Count leading zero bits in 64-bit value."""
-    registers[rd] = _leading_zeros_c(registers[ra] & 0xFFFFFFFFFFFFFFFF, 64)
+    registers[rd] = _leading_zeros_c(registers[ra] & 0xFFFFFFFFFFFFFFFFULL, 64)
     return <uint32_t>0xFFFFFFFF
 
-cdef inline uint32_t  leading_zero_bits_32(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t leading_zero_bits_32(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC105: Count leading zero bits in 32-bit value."""
-    registers[rd] = _leading_zeros_c(registers[ra] & 0xFFFFFFFF, 32)
+    registers[rd] = _leading_zeros_c(registers[ra] & 0xFFFFFFFFU, 32)
     return <uint32_t>0xFFFFFFFF
 
 # Trailing zero counting with C optimizations  
-cdef inline uint32_t  trailing_zero_bits_64(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t trailing_zero_bits_64(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC106: Count trailing zero bits in 64-bit value."""
-    registers[rd] = _trailing_zeros_c(registers[ra] & 0xFFFFFFFFFFFFFFFF, 64)
+    registers[rd] = _trailing_zeros_c(registers[ra] & 0xFFFFFFFFFFFFFFFFULL, 64)
     return <uint32_t>0xFFFFFFFF
 
-cdef inline uint32_t  trailing_zero_bits_32(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t trailing_zero_bits_32(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC107: Count trailing zero bits in 32-bit value."""
-    registers[rd] = _trailing_zeros_c(registers[ra] & 0xFFFFFFFF, 32)
+    registers[rd] = _trailing_zeros_c(registers[ra] & 0xFFFFFFFFU, 32)
     return <uint32_t>0xFFFFFFFF
 
 # Sign extension instructions
-cdef inline uint32_t  sign_extend_8(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t sign_extend_8(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC108: Sign extend 8-bit value to 64-bit."""
     cdef uint64_t val = registers[ra] & 0xFF  # Get low 8 bits
     # Check if sign bit (bit 7) is set
     if val & 0x80:
         # Sign extend by setting upper 56 bits to 1
-        registers[rd] = val | 0xFFFFFFFFFFFFFF00
+        registers[rd] = val | 0xFFFFFFFFFFFFFF00ULL
     else:
         # Zero extend
         registers[rd] = val
     return <uint32_t>0xFFFFFFFF
 
-cdef inline uint32_t  sign_extend_16(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t sign_extend_16(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC109: Sign extend 16-bit value to 64-bit."""
     cdef uint64_t val = registers[ra] & 0xFFFF  # Get low 16 bits
     # Check if sign bit (bit 15) is set
     if val & 0x8000:
         # Sign extend by setting upper 48 bits to 1
-        registers[rd] = val | 0xFFFFFFFFFFFF0000
+        registers[rd] = val | 0xFFFFFFFFFFFF0000ULL
     else:
         # Zero extend
         registers[rd] = val
     return <uint32_t>0xFFFFFFFF
 
-cdef inline uint32_t  zero_extend_16(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t zero_extend_16(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC110: Zero extend 16-bit value to 64-bit."""
     cdef uint64_t val = registers[ra] % (2**16)
     registers[rd] = val
     return <uint32_t>0xFFFFFFFF
 
-cdef inline uint32_t  reverse_bytes(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t reverse_bytes(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC111: Reverse byte order of 64-bit value."""
     cdef uint64_t val = registers[ra]
     cdef uint64_t result = 0
     
     # Fast byte reversal using C bit operations
-    result |= ((val & 0x00000000000000FF) << 56)
-    result |= ((val & 0x000000000000FF00) << 40)
-    result |= ((val & 0x0000000000FF0000) << 24)
-    result |= ((val & 0x00000000FF000000) << 8)
-    result |= ((val & 0x000000FF00000000) >> 8)
-    result |= ((val & 0x0000FF0000000000) >> 24)
-    result |= ((val & 0x00FF000000000000) >> 40)
-    result |= ((val & 0xFF00000000000000) >> 56)
+    result |= ((val & 0x00000000000000FFULL) << 56)
+    result |= ((val & 0x000000000000FF00ULL) << 40)
+    result |= ((val & 0x0000000000FF0000ULL) << 24)
+    result |= ((val & 0x00000000FF000000ULL) << 8)
+    result |= ((val & 0x000000FF00000000ULL) >> 8)
+    result |= ((val & 0x0000FF0000000000ULL) >> 24)
+    result |= ((val & 0x00FF000000000000ULL) >> 40)
+    result |= ((val & 0xFF00000000000000ULL) >> 56)
     
     registers[rd] = result
     return <uint32_t>0xFFFFFFFF
@@ -182,15 +183,15 @@ cdef class CyInstructionsWArgs2Reg(CyTable):
 # Prebuilt table (opcode -> CyTableEntry)
 cdef dict TABLE = {}
 cdef CyTableEntry _e
-_e = CyTableEntry(); _e.fn = move_reg; _e.gas_cost = 1; _e.is_terminating = False; TABLE[100] = _e
+_e = CyTableEntry(); _e.nogil_fn = move_reg; _e.gas_cost = 1; _e.is_terminating = False; TABLE[100] = _e
 _e = CyTableEntry(); _e.fn = sbrk; _e.gas_cost = 1; _e.is_terminating = False; TABLE[101] = _e
-_e = CyTableEntry(); _e.fn = count_set_bits_64; _e.gas_cost = 1; _e.is_terminating = False; TABLE[102] = _e
-_e = CyTableEntry(); _e.fn = count_set_bits_32; _e.gas_cost = 1; _e.is_terminating = False; TABLE[103] = _e
-_e = CyTableEntry(); _e.fn = leading_zero_bits_64; _e.gas_cost = 1; _e.is_terminating = False; TABLE[104] = _e
-_e = CyTableEntry(); _e.fn = leading_zero_bits_32; _e.gas_cost = 1; _e.is_terminating = False; TABLE[105] = _e
-_e = CyTableEntry(); _e.fn = trailing_zero_bits_64; _e.gas_cost = 1; _e.is_terminating = False; TABLE[106] = _e
-_e = CyTableEntry(); _e.fn = trailing_zero_bits_32; _e.gas_cost = 1; _e.is_terminating = False; TABLE[107] = _e
-_e = CyTableEntry(); _e.fn = sign_extend_8; _e.gas_cost = 1; _e.is_terminating = False; TABLE[108] = _e
-_e = CyTableEntry(); _e.fn = sign_extend_16; _e.gas_cost = 1; _e.is_terminating = False; TABLE[109] = _e
-_e = CyTableEntry(); _e.fn = zero_extend_16; _e.gas_cost = 1; _e.is_terminating = False; TABLE[110] = _e
-_e = CyTableEntry(); _e.fn = reverse_bytes; _e.gas_cost = 1; _e.is_terminating = False; TABLE[111] = _e
+_e = CyTableEntry(); _e.nogil_fn = count_set_bits_64; _e.gas_cost = 1; _e.is_terminating = False; TABLE[102] = _e
+_e = CyTableEntry(); _e.nogil_fn = count_set_bits_32; _e.gas_cost = 1; _e.is_terminating = False; TABLE[103] = _e
+_e = CyTableEntry(); _e.nogil_fn = leading_zero_bits_64; _e.gas_cost = 1; _e.is_terminating = False; TABLE[104] = _e
+_e = CyTableEntry(); _e.nogil_fn = leading_zero_bits_32; _e.gas_cost = 1; _e.is_terminating = False; TABLE[105] = _e
+_e = CyTableEntry(); _e.nogil_fn = trailing_zero_bits_64; _e.gas_cost = 1; _e.is_terminating = False; TABLE[106] = _e
+_e = CyTableEntry(); _e.nogil_fn = trailing_zero_bits_32; _e.gas_cost = 1; _e.is_terminating = False; TABLE[107] = _e
+_e = CyTableEntry(); _e.nogil_fn = sign_extend_8; _e.gas_cost = 1; _e.is_terminating = False; TABLE[108] = _e
+_e = CyTableEntry(); _e.nogil_fn = sign_extend_16; _e.gas_cost = 1; _e.is_terminating = False; TABLE[109] = _e
+_e = CyTableEntry(); _e.nogil_fn = zero_extend_16; _e.gas_cost = 1; _e.is_terminating = False; TABLE[110] = _e
+_e = CyTableEntry(); _e.nogil_fn = reverse_bytes; _e.gas_cost = 1; _e.is_terminating = False; TABLE[111] = _e
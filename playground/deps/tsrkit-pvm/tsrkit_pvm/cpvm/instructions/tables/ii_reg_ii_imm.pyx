@@ -8,12 +8,13 @@ from ...cy_utils cimport chi, clamp_12, clamp_4, clamp_4_max0
 from ..cy_table cimport CyTable, CyTableEntry, instr_fn_t, InstructionProps
 from ...cy_memory cimport CyMemory
 from ...cy_program cimport CyProgram
+from ...cy_code cimport CyCode, code_djump
 
-cdef inline uint32_t load_imm_jump_ind_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t load_imm_jump_ind_fn(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """OPC180: Load immediate value into register and jump indirect."""
     wb = registers[rb]
     registers[ra] = vx
-    return program.djump(counter, (wb + vy) % 2**32)
+    return code_djump(code, <uint32_t>(wb + vy))
 
 cdef class CyInstructionsWArgs2Reg2Imm(CyTable):
     """
@@ -74,6 +75,6 @@ cdef class CyInstructionsWArgs2Reg2Imm(CyTable):
 # Prebuilt table (opcode -> CyTableEntry)
 cdef dict TABLE = {}
 cdef CyTableEntry _e
-_e = CyTableEntry(); _e.fn = load_imm_jump_ind_fn; _e.gas_cost = 1; _e.is_terminating = True; TABLE[180] = _e
+_e = CyTableEntry(); _e.nogil_fn = load_imm_jump_ind_fn; _e.gas_cost = 1; _e.is_terminating = True; TABLE[180] = _e
 
 
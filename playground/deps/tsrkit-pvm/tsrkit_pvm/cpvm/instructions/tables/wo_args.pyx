@@ -5,21 +5,22 @@
 
 
 from libc.stdint cimport uint32_t, uint64_t, uint8_t
-from ...cy_status cimport PvmExit, PVM_PANIC, CONTINUE
+from ...cy_status cimport CONTINUE
 from ..cy_table cimport CyTable, CyTableEntry, instr_fn_t, InstructionProps
 from ...cy_memory cimport CyMemory
 from ...cy_program cimport CyProgram
+from ...cy_code cimport CyCode, PVM_EXIT_PANIC
 
 
-cdef inline uint32_t trap_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t trap_fn(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """
     OPC0: Trap - Raise panic error.
     All arguments unused for this instruction.
     """
     # Trap instruction causes panic and terminates execution
-    raise PvmExit(PVM_PANIC)
+    return PVM_EXIT_PANIC
 
-cdef inline uint32_t fallthrough_fn(CyProgram program, uint64_t *registers, CyMemory memory, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd):
+cdef inline uint32_t fallthrough_fn(const CyCode *code, uint64_t *registers, uint32_t counter, uint64_t vx, uint64_t vy, uint8_t ra, uint8_t rb, uint8_t rd) noexcept nogil:
     """
     OPC1: Fallthrough - Continue execution.
     All arguments unused for this instruction.
@@ -50,7 +51,7 @@ cdef class InstructionsWoArgs(CyTable):
 
 cdef dict TABLE = {}
 cdef CyTableEntry _e
-_e = CyTableEntry(); _e.fn = trap_fn; _e.gas_cost = 1; _e.is_terminating = True; TABLE[0] = _e
-_e = CyTableEntry(); _e.fn = fallthrough_fn; _e.gas_cost = 1; _e.is_terminating = True; TABLE[1] = _e
+_e = CyTableEntry(); _e.nogil_fn = trap_fn; _e.gas_cost = 1; _e.is_terminating = True; TABLE[0] = _e
+_e = CyTableEntry(); _e.nogil_fn = fallthrough_fn; _e.gas_cost = 1; _e.is_terminating = True; TABLE[1] = _e
 
 
@@ -25,5 +25,6 @@ cdef class CyInstMapper:
 
     cdef CyBlockInfo get_block(self, CyProgram program, int32_t start_pc)
     cdef CyBlockInfo _compile_block(self, CyProgram program, int32_t start_pc)
+    cdef precompile(self, CyProgram program)
 
 cdef CyInstMapper inst_map
\ No newline at end of file
@@ -1,10 +1,12 @@
 # cython: language_level=3
 # cython: boundscheck=False, wraparound=False, cdivision=True
-from libc.stdint cimport uint8_t, int32_t, uint64_t
+from libc.stdint cimport uint8_t, int32_t, uint32_t, uint64_t
+from libc.stdlib cimport calloc, malloc, free
+from libc.string cimport memcpy
 
 from .cy_memory  cimport CyMemory
 from .cy_program cimport CyProgram
-from .cy_block   cimport CyBlockInfo, CyCompiledInstruction
+from .cy_block   cimport CyBlock, CyBlockInfo, CyCompiledInstruction, CyInstr, lookup_block, pvm_publish_block
 from .instructions.cy_table cimport CyTable, CyTableEntry, InstructionProps
 from .cy_status cimport PVM_OUT_OF_GAS, PvmExit
 
@@ -76,11 +78,66 @@ cdef class CyInstMapper:
         if block:
             return block
 
-        # Compile block and cache it
-        block = self._compile_block(program, start_pc)
-        program._exec_blocks[start_pc] = block
+        # Compile block and cache it. Another thread may have compiled the same
+        # block meanwhile; keep the first one, as the nogil loop may be running it.
+        block = program._exec_blocks.setdefault(start_pc, self._compile_block(program, start_pc))
+        if 0 <= start_pc < program._block_table_len:
+            pvm_publish_block(&program._block_table[start_pc], <void*>&(<CyBlockInfo>block).block)
         return block
     
+    cdef precompile(self, CyProgram program):
+        """
+        Compile all basic blocks of a program into one contiguous arena.
+
+        Block ids follow the order of program.basic_blocks. Once every block is
+        published, each block's fall-through and static jump target are
+        resolved to block pointers. Dynamic jumps go through the jump table to
+        a pc and from there through the block table, which is now complete.
+        """
+        if program._aot_blocks != NULL:
+            return
+
+        cdef list starts = sorted(pc for pc in set(program.basic_blocks) if pc < program._block_table_len)
+        cdef list infos = [self.get_block(program, pc) for pc in starts]
+        cdef int32_t count = len(infos)
+        cdef uint32_t total = 0
+        cdef CyBlockInfo info
+        for info in infos:
+            total += info.block.count
+
+        cdef CyBlock* blocks = <CyBlock*>calloc(max(count, 1), sizeof(CyBlock))
+        cdef CyInstr* instrs = <CyInstr*>malloc(max(total, 1) * sizeof(CyInstr))
+        if blocks == NULL or instrs == NULL:
+            free(blocks)
+            free(instrs)
+            raise MemoryError("failed to allocate precompiled blocks")
+
+        cdef int32_t i
+        cdef uint32_t offset = 0
+        for i in range(count):
+            info = infos[i]
+            blocks[i] = info.block
+            blocks[i].instrs = instrs + offset
+            memcpy(blocks[i].instrs, info.block.instrs, info.block.count * sizeof(CyInstr))
+            offset += info.block.count
+
+        # Another thread may have precompiled while blocks were compiled here
+        if program._aot_blocks != NULL:
+            free(blocks)
+            free(instrs)
+            return
+
+        # Publish first so successors resolve to arena blocks
+        for i in range(count):
+            pvm_publish_block(&program._block_table[<int32_t>starts[i]], &blocks[i])
+        for i in range(count):
+            blocks[i].next = lookup_block(program, <int32_t>blocks[i].next_pc)
+            if blocks[i].target_pc != blocks[i].next_pc:
+                blocks[i].target = lookup_block(program, <int32_t>blocks[i].target_pc)
+
+        program._aot_blocks = blocks
+        program._aot_instrs = instrs
+
     cdef CyBlockInfo _compile_block(self, CyProgram program, int32_t start_pc):
         """Compile a basic block starting at the given PC with aggressive pre-caching."""
         cdef int32_t current_pc = start_pc
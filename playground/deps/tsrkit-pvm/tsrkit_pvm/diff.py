@@ -0,0 +1,341 @@
+"""
+Differential execution of one program on several PVM engines.
+
+Engines run in lockstep one basic block at a time: each gets exactly the
+block's gas, so it stops with OUT_OF_GAS at the start of the next block (see
+`_step` for engines that meter after a block). After every block the harness
+compares status, pc, gas used, registers and the pages any engine wrote, and
+reports the first divergence with a disassembly window.
+
+    python -m tsrkit_pvm.diff service.pvm --args 0a0b --gas 1000000
+    python -m tsrkit_pvm.diff loop.bin --raw --engines python,cython --json
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from .common.constants import PVM_MEMORY_PAGE_SIZE
+from .common.status import ExecutionStatus
+from .common.types import Accessibility
+from .core.code import Code, y_function
+from .engine import Engine, available_engines, get_engine
+from .interpreter.instructions.inst_map import inst_map
+from .interpreter.program import INT_Program
+
+# Engines that charge each instruction before running it
+_PREPAID = {"recompiler"}
+
+# (host call id, gas, registers, memory) -> (gas, registers)
+HostFn = Callable[[int, int, List[int], Any], Tuple[int, List[int]]]
+
+
+@dataclass
+class StepResult:
+    """What one engine did in one step, normalized across engines"""
+
+    status: str  # "block" when the block ran to completion
+    pc: int
+    gas_used: int
+    registers: List[int]
+    host_id: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "pc": self.pc,
+            "gas_used": self.gas_used,
+            "registers": self.registers,
+        }
+
+
+@dataclass
+class Divergence:
+    step: int
+    pc: int
+    field: str
+    results: Dict[str, Any]
+    window: List[str]
+
+    def __str__(self) -> str:
+        lines = [f"divergence in {self.field} at step {self.step}, block pc {self.pc}:"]
+        for name, value in self.results.items():
+            lines.append(f"  {name:<11} {value}")
+        lines.append("disassembly:")
+        lines.extend(f"  {line}" for line in self.window)
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "step": self.step,
+            "pc": self.pc,
+            "field": self.field,
+            "results": {k: _jsonable(v) for k, v in self.results.items()},
+            "window": self.window,
+        }
+
+
+@dataclass
+class DiffResult:
+    engines: List[str]
+    steps: int
+    status: str
+    gas_used: int
+    divergence: Optional[Divergence] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.divergence is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "engines": self.engines,
+            "steps": self.steps,
+            "status": self.status,
+            "gas_used": self.gas_used,
+            "divergence": self.divergence.to_dict() if self.divergence else None,
+        }
+
+
+@dataclass
+class _Machine:
+    engine: Engine
+    program: Any
+    memory: Any
+    registers: List[int]
+    pc: int
+    results: List[StepResult] = field(default_factory=list)
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return value.hex()
+    if isinstance(value, StepResult):
+        return value.to_dict()
+    return value
+
+
+def disassemble(program: INT_Program, pc: int, before: int = 4, after: int = 6) -> List[str]:
+    """Instructions around pc, with pc marked"""
+    starts = [i for i, is_op in enumerate(program.offset_bitmask) if is_op]
+    if not starts:
+        return []
+    at = min(range(len(starts)), key=lambda i: abs(starts[i] - pc))
+    lines = []
+    for counter in starts[max(at - before, 0) : at + after + 1]:
+        opcode = program.instruction_set[counter]
+        handler = inst_map._dispatch_table[opcode]
+        if handler is None:
+            text = f"invalid opcode {opcode}"
+        else:
+            try:
+                args = handler.table_class(
+                    counter=counter, program=program, skip_index=program.skip(counter)
+                ).get_props()
+                text = f"{handler.op_data.name} {', '.join(map(str, args))}".rstrip()
+            except Exception:
+                text = handler.op_data.name
+        marker = "=>" if counter == pc else "  "
+        lines.append(f"{marker} {counter:>6}  {text}")
+    return lines
+
+
+def _block(program: INT_Program, pc: int) -> Tuple[int, int]:
+    """Gas of the block at pc, and the pc just past its last instruction"""
+    try:
+        block = inst_map.get_block(program, pc)
+    except Exception:
+        # Invalid opcode or pc past the code; every engine should panic
+        return 1, pc + 1
+    last = block.instructions[-1].table.counter
+    return block.total_gas, last + 1 + program.skip(last)
+
+
+def _status_name(status: ExecutionStatus) -> str:
+    return status.name.lower()
+
+
+def _step(machine: _Machine, budget: int, end: int, completes_block: bool) -> StepResult:
+    """
+    Run one block (or, on the last step, whatever gas is left). Engines that
+    meter after a block overrun into the next one when given its exact cost,
+    so if that happens the block is rolled back and rerun with one gas less,
+    which stops them right after it.
+    """
+    pc, registers = machine.pc, list(machine.registers)
+    snapshot = machine.memory.snapshot()
+    status, next_pc, remaining, out, memory = machine.engine.execute(
+        machine.program, pc, budget, list(registers), machine.memory
+    )
+    gas = budget
+    # An exit reported at or past the block's end also means it ran past it;
+    # rerunning a genuine exit just reproduces it
+    overran = remaining < 0 or not pc <= next_pc < end
+    if overran and completes_block and machine.engine.name not in _PREPAID:
+        memory.restore(snapshot)
+        gas = budget - 1
+        status, next_pc, remaining, out, memory = machine.engine.execute(
+            machine.program, pc, gas, list(registers), memory
+        )
+    machine.memory = memory
+    machine.registers = [int(r) for r in out]
+    machine.pc = int(next_pc)
+    if status == ExecutionStatus.OUT_OF_GAS and completes_block:
+        return StepResult("block", machine.pc, budget, machine.registers)
+    host_id = int(status.value.register) if status == ExecutionStatus.HOST else None
+    return StepResult(
+        _status_name(status), machine.pc, gas - int(remaining), machine.registers, host_id
+    )
+
+
+def _page(memory: Any, page: int) -> Optional[bytes]:
+    address = page * PVM_MEMORY_PAGE_SIZE
+    if not memory.is_accessible(address, PVM_MEMORY_PAGE_SIZE, Accessibility.READ):
+        return None
+    return bytes(memory.read(address, PVM_MEMORY_PAGE_SIZE))
+
+
+def _compare_memory(machines: Sequence[_Machine]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    dirty = sorted({pg for m in machines for pg in m.memory.dirty_pages()})
+    for page in dirty:
+        contents = {m.engine.name: _page(m.memory, page) for m in machines}
+        if len(set(contents.values())) > 1:
+            pages = [data for data in contents.values() if data is not None]
+            offset = next(
+                (i for i in range(PVM_MEMORY_PAGE_SIZE) if len({p[i] for p in pages}) > 1), 0
+            )
+            address = page * PVM_MEMORY_PAGE_SIZE + offset
+            report = {
+                name: "inaccessible" if data is None else f"{address:#x}: {data[offset:offset + 16].hex()}"
+                for name, data in contents.items()
+            }
+            return f"memory page {page}", report
+    return None
+
+
+def _compare(machines: Sequence[_Machine], final: bool) -> Optional[Tuple[str, Dict[str, Any]]]:
+    results = {m.engine.name: m.results[-1] for m in machines}
+    fields = ("status",) if final else ("status", "pc", "gas_used", "registers")
+    for name in fields:
+        values = {engine: getattr(r, name) for engine, r in results.items()}
+        if len(set(map(str, values.values()))) > 1:
+            return name, values
+    if final:
+        return None
+    return _compare_memory(machines)
+
+
+def run_diff(
+    blob: bytes,
+    args: bytes = b"",
+    gas: int = 10_000_000,
+    engines: Optional[Sequence[Union[str, Engine]]] = None,
+    raw: bool = False,
+    host: Optional[HostFn] = None,
+    max_steps: Optional[int] = None,
+) -> DiffResult:
+    """
+    Run `blob` on every engine in lockstep and return the first divergence.
+
+    Args:
+        blob: Standard program blob (read/write data + code), or PVM code
+            alone with `raw`, which starts from empty memory and zero registers
+        engines: Engines to compare, default every available one
+        host: Services HOST exits on each engine; without it a host call ends
+            the run like any other exit
+        max_steps: Stop after this many blocks
+    """
+    if engines is None:
+        engines = [name for name, error in available_engines().items() if error is None]
+    resolved = [get_engine(e, strict=True) for e in engines]
+    if len(resolved) < 2:
+        raise ValueError("need at least two engines to compare")
+
+    code = blob if raw else Code.decode_from(blob).code
+    reference = INT_Program.decode_from(code)[0]
+
+    machines = []
+    for engine in resolved:
+        if raw:
+            program = engine.decode(code)
+            memory, registers = engine.new_memory(program), [0] * 13
+        else:
+            program, registers, memory = y_function(blob, args, engine)
+        machines.append(_Machine(engine, program, memory, list(registers), 0))
+
+    names = [e.name for e in resolved]
+    remaining, steps, status = gas, 0, "block"
+    while max_steps is None or steps < max_steps:
+        pc = machines[0].pc
+        block_gas, end = _block(reference, pc)
+        completes_block = remaining >= block_gas
+        budget = block_gas if completes_block else remaining
+        for m in machines:
+            m.results.append(_step(m, budget, end, completes_block))
+        steps += 1
+
+        mismatch = _compare(machines, final=not completes_block)
+        if mismatch is not None:
+            name, values = mismatch
+            divergence = Divergence(steps, pc, name, values, disassemble(reference, pc))
+            return DiffResult(names, steps, "diverged", gas - remaining, divergence)
+
+        result = machines[0].results[-1]
+        status = result.status
+        if not completes_block:
+            remaining = 0
+            break
+        remaining -= result.gas_used
+        if status == "host" and host is not None:
+            for m in machines:
+                host_gas, m.registers = host(
+                    result.host_id, remaining, list(m.registers), m.memory
+                )
+            remaining = host_gas
+            continue
+        if status != "block":
+            break
+
+    return DiffResult(names, steps, status, gas - remaining)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tsrkit_pvm.diff",
+        description="Run a PVM program on several engines in lockstep and report the first divergence",
+    )
+    parser.add_argument("program", help="program blob, or PVM code with --raw")
+    parser.add_argument("--args", default="", help="argument bytes as hex")
+    parser.add_argument("--gas", type=int, default=10_000_000)
+    parser.add_argument("--engines", help="comma separated, default every available engine")
+    parser.add_argument("--raw", action="store_true", help="program is bare PVM code")
+    parser.add_argument("--max-steps", type=int)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    opts = parser.parse_args(argv)
+
+    with open(opts.program, "rb") as f:
+        blob = f.read()
+    result = run_diff(
+        blob,
+        bytes.fromhex(opts.args),
+        opts.gas,
+        opts.engines.split(",") if opts.engines else None,
+        opts.raw,
+        max_steps=opts.max_steps,
+    )
+    if opts.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    elif result.ok:
+        print(
+            f"{', '.join(result.engines)} agree: {result.steps} blocks, "
+            f"{result.gas_used} gas, {result.status}"
+        )
+    else:
+        print(result.divergence)
+    return 0 if result.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
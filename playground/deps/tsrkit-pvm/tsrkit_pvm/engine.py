@@ -0,0 +1,215 @@
+"""
+Registry of PVM execution engines.
+
+An engine bundles a PVM with the Program and Memory classes it runs on, so
+callers can pick one per invocation instead of per process:
+
+    python      pure-Python interpreter (INT_*), always available
+    cython      compiled interpreter (CyInterpreter), needs the built extension
+    recompiler  x86-64 recompiler (REC_*), needs tsrkit_asm, libsegwrap and a
+                working seccomp filter for host calls
+    tiered      cython for short calls, recompiler for long ones (by gas)
+
+Engines are loaded and probed on first use. An unavailable engine falls back
+to the next one in its chain (recompiler -> cython -> python) unless the
+caller asks for it strictly.
+
+PVM_MODE selects the process default; its legacy values keep their meaning
+("interpreter" is Cython, "mypyc" is the pure-Python interpreter).
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Type, Union
+
+from .core.ipvm import PVM
+from .core.memory import Memory
+from .core.program_base import Program
+
+TIERED = "tiered"
+
+# Calls with at least this much gas go to the recompiler in tiered mode; below
+# it, assembling the program costs more than the interpreter spends running it
+TIER_GAS_THRESHOLD = int(os.environ.get("PVM_TIER_GAS", 5_000_000))
+
+_ALIASES = {"interpreter": "cython", "mypyc": "python"}
+
+
+class EngineUnavailable(ImportError):
+    """Raised when an engine (and its fallbacks, if allowed) cannot be loaded"""
+
+
+@dataclass(frozen=True)
+class Engine:
+    """A PVM together with the program and memory types it executes"""
+
+    name: str
+    pvm: Type[PVM]
+    program: Type[Program]
+    memory: Type[Memory]
+    # Extra constructor arguments the memory needs for a given program
+    memory_args: Callable[[Any], tuple] = lambda program: ()
+
+    def decode(self, code: bytes) -> Any:
+        return self.program.decode_from(code)[0]
+
+    def new_memory(self, program: Any) -> Any:
+        """Empty memory, as used for inner machines"""
+        return self.memory(*self.memory_args(program))
+
+    def memory_from_pc(
+        self, program: Any, read: bytes, write: bytes, args: bytes, z: int, s: int
+    ) -> Any:
+        return self.memory.from_pc(read, write, args, z, s, *self.memory_args(program))
+
+    def execute(self, program: Any, pc: int, gas: int, registers: list, memory: Any):
+        return self.pvm.execute(program, pc, gas, registers, memory)
+
+    def __repr__(self) -> str:
+        return f"Engine({self.name})"
+
+
+def _load_python() -> Engine:
+    from .interpreter.memory import INT_Memory
+    from .interpreter.program import INT_Program
+    from .interpreter.pvm import Interpreter
+
+    return Engine("python", Interpreter, INT_Program, INT_Memory)
+
+
+def _load_cython() -> Engine:
+    from .cpvm.cy_memory import CyMemory
+    from .cpvm.cy_program import CyProgram
+    from .cpvm.cy_pvm import CyInterpreter
+
+    return Engine("cython", CyInterpreter, CyProgram, CyMemory)
+
+
+def _load_recompiler() -> Engine:
+    from .recompiler.memory import REC_Memory
+    from .recompiler.program import REC_Program
+    from .recompiler.pvm import Recompiler
+    from .recompiler.segwrap import segwrap, _segwrap_available
+    from .recompiler.vm_context import VMContext
+
+    if not _segwrap_available or segwrap is None:
+        raise EngineUnavailable("libsegwrap is not available")
+    # Installs the process-wide handlers; -3 means seccomp is blocked, so
+    # host calls from recompiled code would never trap
+    result = segwrap.initialize()
+    if result == -3:
+        raise EngineUnavailable("seccomp filters are not supported here")
+    if result != 0:
+        raise EngineUnavailable(f"segwrap failed to initialize ({result})")
+
+    return Engine(
+        "recompiler",
+        Recompiler,
+        REC_Program,
+        REC_Memory,
+        lambda program: (VMContext.calculate_size(len(program.jump_table)),),
+    )
+
+
+_loaders: Dict[str, Callable[[], Engine]] = {}
+_fallbacks: Dict[str, Optional[str]] = {}
+_engines: Dict[str, Engine] = {}
+_errors: Dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def register_engine(
+    name: str, loader: Callable[[], Engine], fallback: Optional[str] = None
+) -> None:
+    """
+    Add an engine. `loader` imports and probes it on first use, raising
+    ImportError/OSError when unavailable; `fallback` is tried instead.
+    """
+    with _lock:
+        _loaders[name] = loader
+        _fallbacks[name] = fallback
+        _engines.pop(name, None)
+        _errors.pop(name, None)
+
+
+register_engine("python", _load_python)
+register_engine("cython", _load_cython, fallback="python")
+register_engine("recompiler", _load_recompiler, fallback="cython")
+
+
+def _canonical(name: str) -> str:
+    name = _ALIASES.get(name, name)
+    if name != TIERED and name not in _loaders:
+        raise ValueError(f"Unknown PVM engine {name!r}")
+    return name
+
+
+def _load(name: str) -> Optional[Engine]:
+    if name in _engines:
+        return _engines[name]
+    if name in _errors:
+        return None
+    with _lock:
+        if name not in _engines and name not in _errors:
+            try:
+                _engines[name] = _loaders[name]()
+            except (ImportError, OSError) as e:
+                _errors[name] = str(e) or type(e).__name__
+    return _engines.get(name)
+
+
+def available_engines() -> Dict[str, Optional[str]]:
+    """Probe every engine: name -> None if usable, else why not"""
+    for name in list(_loaders):
+        _load(name)
+    return {name: _errors.get(name) for name in _loaders}
+
+
+def default_engine_name() -> str:
+    return _canonical(os.environ.get("PVM_MODE", "interpreter"))
+
+
+def get_engine(
+    name: Union[str, Engine, None] = None, strict: bool = False
+) -> Engine:
+    """
+    Resolve an engine by name (default: PVM_MODE). Unavailable engines fall
+    back along their chain unless `strict`. "tiered" resolves to the
+    recompiler here; use `select_engine` to tier by gas.
+    """
+    if isinstance(name, Engine):
+        return name
+    requested = _canonical(name if name is not None else default_engine_name())
+    current: Optional[str] = "recompiler" if requested == TIERED else requested
+    while current is not None:
+        engine = _load(current)
+        if engine is not None:
+            return engine
+        if strict:
+            break
+        current = _fallbacks[current]
+    reasons = ", ".join(f"{n}: {e}" for n, e in _errors.items())
+    raise EngineUnavailable(f"PVM engine {requested!r} is not available ({reasons})")
+
+
+def select_engine(
+    name: Union[str, Engine, None] = None, gas: Optional[int] = None
+) -> Engine:
+    """Like `get_engine`, but "tiered" picks by the invocation's gas budget"""
+    if isinstance(name, Engine):
+        return name
+    requested = _canonical(name if name is not None else default_engine_name())
+    if requested == TIERED:
+        if gas is not None and gas < TIER_GAS_THRESHOLD:
+            return get_engine("cython")
+        return get_engine("recompiler")
+    return get_engine(requested)
+
+
+def engine_of(memory: Any) -> Engine:
+    """The loaded engine whose memory type `memory` is"""
+    for engine in list(_engines.values()):
+        if isinstance(memory, engine.memory):
+            return engine
+    raise ValueError(f"No loaded PVM engine uses {type(memory).__name__}")
@@ -10,6 +10,7 @@ from tsrkit_pvm.common.constants import (
     PVM_MEMORY_PAGE_SIZE,
 )
 from tsrkit_pvm.common.status import PAGE_FAULT, ExecutionStatus, PvmError
+from tsrkit_pvm.core.memory import MemorySnapshot
 
 ADDR_MOD = 2**32
 PAGE_SIZE = PVM_MEMORY_PAGE_SIZE
@@ -30,9 +31,14 @@ class INT_Memory:
     """
     Sparse, page-mapped memory model with read/write page protection.
     Optimized with hot page caching for sequential access patterns.
+
+    Snapshots and forks share page buffers: once either exists, a page is
+    copied before its first write, and the page it replaced is kept in an undo
+    log so restore() only touches pages written since the snapshot.
     """
     __slots__ = ('_pages', '_r_pages', '_w_pages', 'heap_break', 'logger',
-                 '_hot_page_num', '_hot_page_data', '_hot_page_writable')
+                 '_hot_page_num', '_hot_page_data', '_hot_page_writable',
+                 '_owned', '_undo', '_perm_undo', '_epoch')
 
     def __init__(
         self,
@@ -68,6 +74,13 @@ class INT_Memory:
         self._hot_page_num: int = -1
         self._hot_page_data: Optional[bytearray] = None
         self._hot_page_writable: bool = False
+
+        # Copy-on-write state: pages safe to write in place (None means all),
+        # page buffers and permissions replaced since the live snapshot
+        self._owned: Optional[set[int]] = None
+        self._undo: Optional[Dict[int, Optional[bytearray]]] = None
+        self._perm_undo: Optional[Dict[int, tuple[int, int]]] = None
+        self._epoch: int = 0
         
         if data:
             # Simple bulk loading
@@ -107,23 +120,47 @@ class INT_Memory:
     def _page_for(self, addr: int, *, create: bool = False) -> Union[bytearray, bytes]:
         """
         Get the underlying page buffer for an address.
-        Creates a fresh zero-filled page if `create` is True.
+        With `create`, the buffer is writable: created zero-filled when
+        absent, copied first when shared.
         """
         pg = addr >> _PAGE_SHIFT
+        if create:
+            return self._claim(pg)
         
         # Check main storage
         page_data = self._pages.get(pg)
         if page_data is not None:
             return page_data
         
-        if not create:
-            # Return read-only zero page (shared) to avoid dict hits
-            return _ZERO_PAGE
-            
-        # Create new page
-        ba = bytearray(PAGE_SIZE)
-        self._pages[pg] = ba
-        return ba
+        # Return read-only zero page (shared) to avoid dict hits
+        return _ZERO_PAGE
+
+    def _claim(self, pg: int) -> bytearray:
+        """
+        Page buffer that may be written in place, allocating it when absent.
+        A page shared with a snapshot or fork is copied first.
+        """
+        page_data = self._pages.get(pg)
+        owned = self._owned
+        if owned is None or pg in owned:
+            if page_data is None:
+                page_data = bytearray(PAGE_SIZE)
+                self._pages[pg] = page_data
+            return page_data
+
+        if self._undo is not None and pg not in self._undo:
+            self._undo[pg] = page_data
+        page_data = bytearray(page_data) if page_data is not None else bytearray(PAGE_SIZE)
+        self._pages[pg] = page_data
+        owned.add(pg)
+        if pg == self._hot_page_num:
+            self._drop_hot_page()
+        return page_data
+
+    def _drop_hot_page(self) -> None:
+        self._hot_page_num = -1
+        self._hot_page_data = None
+        self._hot_page_writable = False
 
     def _assert_access(self, addr: int, *, write: bool = False) -> None:
         """Optimized access check with bitarray."""
@@ -174,10 +211,12 @@ class INT_Memory:
                 # Zero data - avoid allocation
                 return b'\x00' * length
             
-            # Update hot cache
+            # Update hot cache; shared pages must go through _claim to be written
             self._hot_page_num = pg
             self._hot_page_data = page_data
-            self._hot_page_writable = bool(self._w_pages[pg])
+            self._hot_page_writable = bool(self._w_pages[pg]) and (
+                self._owned is None or pg in self._owned
+            )
             
             return bytes(page_data[page_off:page_off + length])
         
@@ -233,9 +272,8 @@ class INT_Memory:
             
             # Get or create page
             page_data = self._pages.get(pg)
-            if page_data is None:
-                page_data = bytearray(PAGE_SIZE)
-                self._pages[pg] = page_data
+            if page_data is None or (self._owned is not None and pg not in self._owned):
+                page_data = self._claim(pg)
             
             # Update hot cache
             self._hot_page_num = pg
@@ -267,11 +305,7 @@ class INT_Memory:
             page_off = address & _PAGE_MASK
             chunk = min(PAGE_SIZE - page_off, end - address)
             
-            page_data = self._pages.get(pg)
-            if page_data is None:
-                page_data = bytearray(PAGE_SIZE)
-                self._pages[pg] = page_data
-            
+            page_data = self._claim(pg)
             page_data[page_off:page_off + chunk] = data_mv[cursor:cursor + chunk]
             
             cursor += chunk
@@ -328,8 +362,6 @@ class INT_Memory:
         # print(f"READ \t\t | Start: {int(read_start).to_bytes(4).hex()} \t | End {int(read_pages[-1] * PVM_MEMORY_PAGE_SIZE).to_bytes(4).hex()}")
         for i, byt in enumerate(read):
             memory[read_start + i] = int(byt)
-            
-        print(read_pages)
 
         write_start = 2 * PVM_INIT_ZONE_SIZE + total_zone_size(len(read))
         write_pages = get_pages(
@@ -351,7 +383,6 @@ class INT_Memory:
                 total_page_size(s),
             )
         )
-        print(write_pages)
 
         arg_start = 2**32 - PVM_INIT_ZONE_SIZE - PVM_INIT_DATA_SIZE
         read_pages.extend(get_pages(arg_start, total_page_size(len(args))))
@@ -380,6 +411,7 @@ class INT_Memory:
     def alter_accessibility(self, start: int, len_: int, access: Accessibility) -> None:
         """Optimized accessibility alteration."""
         pages = get_pages(start, len_)
+        perm_undo = self._perm_undo
         
         for pg in pages:
             if pg >= MAX_PAGES:
@@ -394,6 +426,9 @@ class INT_Memory:
             # Skip if already correct
             if current_write == target_write and current_read == target_read:
                 continue
+
+            if perm_undo is not None and pg not in perm_undo:
+                perm_undo[pg] = (current_read, current_write)
             
             if target_write:
                 self._w_pages[pg] = 1
@@ -408,11 +443,68 @@ class INT_Memory:
         # Invalidate hot page cache for affected pages
         for pg in pages:
             if pg < MAX_PAGES and pg == self._hot_page_num:
-                self._hot_page_num = -1
-                self._hot_page_data = None
-                self._hot_page_writable = False
+                self._drop_hot_page()
                 break
 
+    # --------------------------------------------------------------------- #
+    # Snapshots
+    # --------------------------------------------------------------------- #
+
+    def snapshot(self) -> MemorySnapshot:
+        """Checkpoint memory; costs nothing until pages are written."""
+        self._epoch += 1
+        self._undo = {}
+        self._perm_undo = {}
+        self._owned = set()
+        self._drop_hot_page()
+        return MemorySnapshot(self, self._epoch, self.heap_break)
+
+    def restore(self, snapshot: MemorySnapshot) -> None:
+        """Roll back to the live snapshot, which stays valid afterwards."""
+        snapshot.check(self, self._epoch)
+        assert self._undo is not None and self._perm_undo is not None
+
+        pages = self._pages
+        for pg, page_data in self._undo.items():
+            if page_data is None:
+                pages.pop(pg, None)
+            else:
+                pages[pg] = page_data
+        for pg, (readable, writable) in self._perm_undo.items():
+            self._r_pages[pg] = readable
+            self._w_pages[pg] = writable
+
+        # Restored buffers belong to the snapshot again
+        self._undo.clear()
+        self._perm_undo.clear()
+        self._owned = set()
+        self.heap_break = snapshot.heap
+        self._drop_hot_page()
+
+    def dirty_pages(self) -> List[int]:
+        """Pages written since the live snapshot, ascending."""
+        if self._undo is None:
+            raise ValueError("no live snapshot")
+        return sorted(self._undo)
+
+    def fork(self) -> Self:
+        """Independent memory sharing every page with this one until written."""
+        child = self.__class__.__new__(self.__class__)
+        child._pages = dict(self._pages)
+        child._r_pages = self._r_pages.copy()
+        child._w_pages = self._w_pages.copy()
+        child.heap_break = self.heap_break
+        child.logger = self.logger
+        child._owned = set()
+        child._undo = None
+        child._perm_undo = None
+        child._epoch = 0
+        child._drop_hot_page()
+
+        self._owned = set()
+        self._drop_hot_page()
+        return child
+
 _ZERO_PAGE = bytes(PAGE_SIZE)
 
 # Export INT_Memory as Memory for backward compatibility
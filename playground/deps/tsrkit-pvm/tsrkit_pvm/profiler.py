@@ -0,0 +1,426 @@
+"""
+Where a program spends its gas.
+
+The Cython engine counts entries into every basic block of an attached
+program. Entries are exact; per-block gas and per-opcode counts are static
+estimates from them, as a block a run exits partway through (out of gas, a
+fault) is counted whole. The recompiler samples the instruction pointer on
+SIGPROF instead and maps samples back to PVM pcs, so its numbers are shares of
+CPU time. Host calls are counted and timed by whoever dispatches them, through
+`Profiler.record_host_call` (PsiH does this for the active profiler).
+
+    with Profiler(symbols) as profiler:
+        program = profiler.attach(engine.decode(code), "my-service")
+        ... run it ...
+    profile = profiler.collect()
+    profile.write_json("profile.json")
+    profile.write_folded("profile.folded")   # flamegraph.pl / speedscope
+
+Folded stacks are `name;symbol;block@pc weight`, weighted by gas, or by
+samples for the recompiler. Symbols map PVM pcs to function names; the
+service build strips them, so they are passed in (see `load_symbols`).
+
+    python -m tsrkit_pvm.profiler service.pvm --args 0a0b --json out.json --folded out.folded
+"""
+
+import argparse
+import bisect
+import contextvars
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .common.status import ExecutionStatus
+from .core.code import y_function
+from .engine import get_engine
+from .interpreter.instructions.inst_map import inst_map
+from .interpreter.program import INT_Program
+
+COUNTED = "counted"
+SAMPLED = "sampled"
+UNPROFILED = "unprofiled"
+
+_active: contextvars.ContextVar = contextvars.ContextVar("pvm_profiler", default=None)
+
+# Profilers each program is attached to, by id; the last one to close turns profiling off
+_attached: Dict[int, int] = {}
+_attached_lock = threading.Lock()
+
+
+def active_profiler() -> Optional["Profiler"]:
+    """The profiler entered in the current context, if any"""
+    return _active.get()
+
+
+def load_symbols(path: str) -> Dict[int, str]:
+    """Read `<pc> <name>` lines (pc in decimal or 0x hex); `#` starts a comment"""
+    symbols = {}
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                pc, name = line.split(None, 1)
+                symbols[int(pc, 0)] = name.strip()
+    return symbols
+
+
+@dataclass
+class BlockStats:
+    pc: int
+    symbol: Optional[str] = None
+    instructions: int = 0
+    entries: int = 0
+    gas: int = 0
+    samples: int = 0
+
+
+@dataclass
+class HostCallStats:
+    count: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+
+    @property
+    def mean_us(self) -> float:
+        return self.total_ns / self.count / 1000 if self.count else 0.0
+
+
+@dataclass
+class ProgramProfile:
+    name: str
+    mode: str
+    blocks: Dict[int, BlockStats] = field(default_factory=dict)
+    opcodes: Dict[str, int] = field(default_factory=dict)
+    # Recompiler only: samples outside guest code, and lost to a full buffer
+    outside: int = 0
+    dropped: int = 0
+
+    @property
+    def gas(self) -> int:
+        return sum(b.gas for b in self.blocks.values())
+
+    def weight(self, block: BlockStats) -> int:
+        return block.samples if self.mode == SAMPLED else block.gas
+
+
+@dataclass
+class Profile:
+    programs: List[ProgramProfile]
+    host_calls: Dict[int, HostCallStats]
+
+    def to_dict(self) -> Dict[str, Any]:
+        programs = []
+        for p in self.programs:
+            blocks = sorted(p.blocks.values(), key=p.weight, reverse=True)
+            programs.append({
+                "name": p.name,
+                "mode": p.mode,
+                "gas": p.gas,
+                # Blocks count whole, even where a run left them early
+                "gas_is_estimate": p.mode == COUNTED,
+                "outside": p.outside,
+                "dropped": p.dropped,
+                "blocks": [asdict(b) for b in blocks],
+                "opcodes": dict(Counter(p.opcodes).most_common()),
+            })
+        host_calls = {
+            str(index): {**asdict(stats), "mean_us": round(stats.mean_us, 3)}
+            for index, stats in sorted(self.host_calls.items())
+        }
+        return {"programs": programs, "host_calls": host_calls}
+
+    def folded(self) -> List[str]:
+        """Flamegraph folded stacks, one line per block"""
+        lines = []
+        for p in self.programs:
+            for block in sorted(p.blocks.values(), key=lambda b: b.pc):
+                weight = p.weight(block)
+                if weight:
+                    frames = [p.name, block.symbol, f"block@{block.pc:#x}"]
+                    lines.append(";".join(f for f in frames if f) + f" {weight}")
+        return lines
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_folded(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write("\n".join(self.folded()) + "\n")
+
+
+@dataclass
+class _Counts:
+    """A program's profiling counters at one moment"""
+    mode: str
+    pcs: Counter
+    outside: int = 0
+    dropped: int = 0
+
+
+# Marks a profiler still open: read the program's counters as they are now
+_LIVE = object()
+
+
+def _counts(program: Any) -> Optional[_Counts]:
+    if hasattr(program, "block_hits"):
+        return _Counts(COUNTED, Counter(program.block_hits()))
+    sampler = getattr(program, "sampler", None)
+    if sampler is not None:
+        return _Counts(SAMPLED, Counter(sampler.pcs), sampler.outside, sampler.dropped)
+    return None
+
+
+def _since(counts: Optional[_Counts], baseline: Optional[_Counts]) -> Optional[_Counts]:
+    """What was counted after `baseline`"""
+    if counts is None or baseline is None or baseline.mode != counts.mode:
+        return counts
+    pcs = Counter(counts.pcs)
+    pcs.subtract(baseline.pcs)
+    return _Counts(
+        counts.mode, +pcs, counts.outside - baseline.outside, counts.dropped - baseline.dropped
+    )
+
+
+class Profiler:
+    """
+    Collects block, opcode and host-call statistics of attached programs.
+
+    Counts are those of runs between `attach` and leaving the `with` block (or
+    `close`), whatever else has counted on the same program. Once no profiler
+    holds a program, its profiling is turned off again.
+
+    Args:
+        symbols: PVM pc -> function name, applied to every attached program
+        interval_us: Sampling interval for recompiled programs
+    """
+
+    def __init__(self, symbols: Optional[Dict[int, str]] = None, interval_us: int = 1000):
+        self.symbols = dict(symbols or {})
+        self.interval_us = interval_us
+        self.host_calls: Dict[int, HostCallStats] = {}
+        self._programs: List[Tuple[str, Any]] = []
+        # Program counters when attached, and when closed; by program id
+        self._baselines: Dict[int, Optional[_Counts]] = {}
+        self._final: Dict[int, Optional[_Counts]] = {}
+        self._lock = threading.Lock()
+        self._tokens: List[contextvars.Token] = []
+
+    def __enter__(self) -> "Profiler":
+        self._tokens.append(_active.set(self))
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _active.reset(self._tokens.pop())
+        if not self._tokens:
+            self.close()
+
+    def close(self) -> None:
+        """Keep the counts so far and stop profiling programs no other profiler holds"""
+        with self._lock:
+            for _, program in self._programs:
+                key = id(program)
+                if key in self._final:
+                    continue
+                self._final[key] = _counts(program)
+                with _attached_lock:
+                    _attached[key] -= 1
+                    if _attached[key]:
+                        continue
+                    del _attached[key]
+                if hasattr(program, "disable_profile"):
+                    program.disable_profile()
+                elif getattr(program, "is_recompiler", False):
+                    program.sampler = None
+
+    def attach(self, program: Any, name: Optional[str] = None) -> Any:
+        """
+        Start profiling `program`, a decoded Cython or recompiler program.
+        Programs of the pure-Python interpreter are listed without counters.
+        Default names are a short hash of the code.
+        """
+        if name is None:
+            name = hashlib.blake2b(bytes(program.instruction_set), digest_size=4).hexdigest()
+        with self._lock:
+            if any(p is program for _, p in self._programs):
+                return program
+            with _attached_lock:
+                if hasattr(program, "enable_profile"):
+                    program.enable_profile()
+                elif getattr(program, "is_recompiler", False):
+                    from .recompiler.sampler import Sampler
+
+                    if program.sampler is None:
+                        program.sampler = Sampler(program, self.interval_us)
+                _attached[id(program)] = _attached.get(id(program), 0) + 1
+            # Runs before this, or under other profilers, are not ours
+            self._baselines[id(program)] = _counts(program)
+            self._programs.append((name, program))
+        return program
+
+    def record_host_call(self, index: int, elapsed_ns: int) -> None:
+        with self._lock:
+            stats = self.host_calls.get(index)
+            if stats is None:
+                stats = self.host_calls[index] = HostCallStats()
+            stats.count += 1
+            stats.total_ns += elapsed_ns
+            stats.max_ns = max(stats.max_ns, elapsed_ns)
+
+    @contextmanager
+    def host_call(self, index: int) -> Iterator[None]:
+        started = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record_host_call(index, time.perf_counter_ns() - started)
+
+    def collect(self) -> Profile:
+        """Statistics so far; programs attached under one name are merged"""
+        with self._lock:
+            attached = [
+                (name, program, self._baselines[id(program)], self._final.get(id(program), _LIVE))
+                for name, program in self._programs
+            ]
+            host_calls = {i: HostCallStats(**asdict(s)) for i, s in self.host_calls.items()}
+        merged: Dict[str, ProgramProfile] = {}
+        for name, program, baseline, final in attached:
+            counts = _counts(program) if final is _LIVE else final
+            profile = _profile_program(name, program, self.symbols, _since(counts, baseline))
+            into = merged.setdefault(name, ProgramProfile(name, profile.mode))
+            _merge(into, profile)
+        return Profile(list(merged.values()), host_calls)
+
+
+def _reference(program: Any) -> INT_Program:
+    return INT_Program(
+        z=program.z,
+        jump_table=list(program.jump_table),
+        instruction_set=bytes(program.instruction_set),
+        offset_bitmask=list(program.offset_bitmask),
+    )
+
+
+def _symbol_at(starts: List[int], symbols: Dict[int, str], pc: int) -> Optional[str]:
+    i = bisect.bisect_right(starts, pc)
+    return symbols[starts[i - 1]] if i else None
+
+
+def _block_info(reference: INT_Program, pc: int) -> Any:
+    try:
+        return inst_map.get_block(reference, pc)
+    except Exception:
+        return None
+
+
+def _profile_program(name: str, program: Any, symbols: Dict[int, str], counts: Optional[_Counts]) -> ProgramProfile:
+    if counts is None:
+        return ProgramProfile(name, UNPROFILED)
+    mode = counts.mode
+
+    reference = _reference(program)
+    block_starts = sorted(set(reference.basic_blocks))
+    symbol_starts = sorted(symbols)
+    profile = ProgramProfile(name, mode)
+    opcodes: Counter = Counter()
+    for pc, count in counts.pcs.items():
+        # Samples land on instructions; attribute them to their block
+        start = block_starts[bisect.bisect_right(block_starts, pc) - 1] if mode == SAMPLED else pc
+        info = _block_info(reference, start)
+        block = profile.blocks.get(start)
+        if block is None:
+            block = profile.blocks[start] = BlockStats(
+                start,
+                _symbol_at(symbol_starts, symbols, start),
+                len(info.instructions) if info is not None else 0,
+            )
+        if mode == SAMPLED:
+            block.samples += count
+            handler = inst_map._dispatch_table[reference.instruction_set[pc]]
+            if handler is not None:
+                opcodes[handler.op_data.name] += count
+        elif info is not None:
+            block.entries += count
+            block.gas += count * info.total_gas
+            for compiled in info.instructions:
+                opcodes[compiled.handler.op_data.name] += count
+    profile.opcodes = dict(opcodes)
+    if mode == SAMPLED:
+        profile.outside = counts.outside
+        profile.dropped = counts.dropped
+    return profile
+
+
+def _merge(into: ProgramProfile, other: ProgramProfile) -> None:
+    for pc, block in other.blocks.items():
+        mine = into.blocks.setdefault(pc, BlockStats(pc, block.symbol, block.instructions))
+        mine.entries += block.entries
+        mine.gas += block.gas
+        mine.samples += block.samples
+    opcodes = Counter(into.opcodes)
+    opcodes.update(other.opcodes)
+    into.opcodes = dict(opcodes)
+    into.outside += other.outside
+    into.dropped += other.dropped
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m tsrkit_pvm.profiler",
+        description="Run a PVM program once and report where its gas goes",
+    )
+    parser.add_argument("program", help="program blob, or PVM code with --raw")
+    parser.add_argument("--args", default="", help="argument bytes as hex")
+    parser.add_argument("--pc", type=int, default=0, help="entry point")
+    parser.add_argument("--gas", type=int, default=10_000_000)
+    parser.add_argument("--engine", default="cython", help="cython or recompiler")
+    parser.add_argument("--raw", action="store_true", help="program is bare PVM code")
+    parser.add_argument("--symbols", help="file of '<pc> <name>' lines")
+    parser.add_argument("--interval-us", type=int, default=1000, help="recompiler sampling interval")
+    parser.add_argument("--json", help="write the profile as JSON here")
+    parser.add_argument("--folded", help="write folded stacks here")
+    parser.add_argument("--top", type=int, default=15, help="blocks to print")
+    opts = parser.parse_args(argv)
+
+    with open(opts.program, "rb") as f:
+        blob = f.read()
+    engine = get_engine(opts.engine, strict=True)
+    profiler = Profiler(load_symbols(opts.symbols) if opts.symbols else None, opts.interval_us)
+    if opts.raw:
+        program = engine.decode(blob)
+        registers, memory = [0] * 13, engine.new_memory(program)
+    else:
+        program, registers, memory = y_function(blob, bytes.fromhex(opts.args), engine)
+    profiler.attach(program, "program")
+
+    # Host calls are not serviced: the run ends at the first one
+    status, pc, gas, _, _ = engine.execute(program, opts.pc, opts.gas, registers, memory)
+    profile = profiler.collect()
+
+    print(f"{status.name.lower()} at pc {pc}, {opts.gas - max(int(gas), 0)} gas used")
+    if status == ExecutionStatus.HOST:
+        print(f"stopped at host call {int(status.value.register)}")
+    for p in profile.programs:
+        total = sum(p.weight(b) for b in p.blocks.values()) or 1
+        unit = "samples" if p.mode == SAMPLED else "gas"
+        for block in sorted(p.blocks.values(), key=p.weight, reverse=True)[: opts.top]:
+            label = f"{block.pc:#x}" + (f" {block.symbol}" if block.symbol else "")
+            share = 100 * p.weight(block) / total
+            print(f"  {label:<32} {p.weight(block):>12} {unit} {share:5.1f}%  {block.entries:>10} entries")
+        if p.mode == COUNTED:
+            print("  (gas is estimated from block entries: a block the run left early counts whole)")
+    if opts.json:
+        profile.write_json(opts.json)
+    if opts.folded:
+        profile.write_folded(opts.folded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
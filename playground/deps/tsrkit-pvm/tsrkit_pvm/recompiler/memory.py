@@ -1,6 +1,7 @@
 import ctypes
 import mmap
 import os
+from typing import Dict, Optional, Tuple
 from bitarray import bitarray
 from tsrkit_pvm.common.types import Accessibility
 from tsrkit_pvm.common.utils import get_pages, total_page_size, total_zone_size
@@ -10,6 +11,8 @@ from tsrkit_pvm.common.constants import (
     PVM_MEMORY_PAGE_SIZE,
     PVM_MEMORY_TOTAL_SIZE,
 )
+from tsrkit_pvm.core.memory import MemorySnapshot
+from tsrkit_pvm.recompiler.segwrap import segwrap
 
 # Load libc for mprotect
 if os.uname().sysname == "Darwin":
@@ -18,7 +21,40 @@ else:
     libc = ctypes.CDLL("libc.so.6")
 
 
+class _CowRegion(ctypes.Structure):
+    """Mirror of segwrap's struct cow_region"""
+
+    _fields_ = [
+        ("base", ctypes.c_void_p),
+        ("shadow", ctypes.c_void_p),
+        ("tracked", ctypes.POINTER(ctypes.c_uint64)),
+        ("dirty", ctypes.POINTER(ctypes.c_uint64)),
+        ("pages", ctypes.c_uint64),
+    ]
+
+
+def _runs(pages: bitarray):
+    """(first, count) of each run of set bits"""
+    first = prev = -2
+    for pg in pages.search(1):
+        if pg != prev + 1:
+            if first >= 0:
+                yield first, prev - first + 1
+            first = pg
+        prev = pg
+    if first >= 0:
+        yield first, prev - first + 1
+
+
 class REC_Memory:
+    """
+    Guest memory as one flat mapping, protected page by page with mprotect.
+
+    Snapshots track writes with the MMU: writable pages are mapped read-only,
+    and segwrap's fault handler saves a page to a shadow mapping on its first
+    write before unprotecting it, so restore() copies back only dirty pages.
+    """
+
     buf: mmap.mmap
     buf_start = 0
     offset = -1
@@ -26,6 +62,7 @@ class REC_Memory:
     _r_pages: bitarray  # Track readable pages as bits
     _w_pages: bitarray  # Track writable pages as bits
     _closed = False  # Track if memory has been closed
+    _cow: Optional[_CowRegion] = None  # Registered with segwrap while snapshots are taken
     MAX_PAGES = 1 << 20  # 1M pages for 4GB address space
 
     def __init__(self, vm_size: int, heap_start=0):
@@ -46,11 +83,17 @@ class REC_Memory:
         self._w_pages = bitarray(self.MAX_PAGES)
         self._w_pages.setall(0)
         self._closed = False
+        self._perm_undo: Optional[Dict[int, Tuple[int, int]]] = None
+        self._epoch = 0
 
     def close(self):
         """Close the memory mapping and clean up resources"""
         if not self._closed and hasattr(self, 'buf'):
             try:
+                if self._cow is not None and segwrap is not None:
+                    segwrap.cow_unregister(ctypes.byref(self._cow))
+                    self._cow = None
+                    self._cow_shadow.close()
                 self.buf.close()
                 self._closed = True
             except:
@@ -120,6 +163,9 @@ class REC_Memory:
             if pg >= self.MAX_PAGES:
                 continue  # Skip out-of-bounds pages
 
+            if self._perm_undo is not None and pg not in self._perm_undo:
+                self._perm_undo[pg] = (self._r_pages[pg], self._w_pages[pg])
+
             # Determine current protection
             current_prot = 0
             if self._w_pages[pg]:
@@ -154,11 +200,138 @@ class REC_Memory:
             start_addr = self.offset + pg * PAGE_SIZE
             aligned_addr = (start_addr // PAGE_SIZE) * PAGE_SIZE
 
-            res = libc.mprotect(ctypes.c_void_p(aligned_addr), PAGE_SIZE, target_prot)
+            res = libc.mprotect(
+                ctypes.c_void_p(aligned_addr), PAGE_SIZE, self._tracked_prot(pg, target_prot)
+            )
             if res != 0:
                 error = ctypes.get_errno()
                 print(f"Warning: mprotect failed for page {pg} to {access}: {error}")
 
+    # ------------------------------------------------------------------ #
+    # Snapshots
+    # ------------------------------------------------------------------ #
+
+    def _tracked_prot(self, pg: int, prot: int) -> int:
+        """Protection to map page pg with; clean writable pages stay read-only while tracked"""
+        cow = self._cow
+        if cow is None:
+            return prot
+        word, bit = pg >> 6, 1 << (pg & 63)
+        if prot & mmap.PROT_WRITE:
+            cow.tracked[word] |= bit
+            if not cow.dirty[word] & bit:
+                return mmap.PROT_READ
+        else:
+            cow.tracked[word] &= ~bit & 0xFFFF_FFFF_FFFF_FFFF
+        return prot
+
+    def _start_tracking(self) -> None:
+        if segwrap is None or not hasattr(segwrap, "cow_register"):
+            raise RuntimeError("REC_Memory snapshots need the segwrap library")
+
+        # Untouched shadow pages are never backed, so it costs O(dirty pages)
+        shadow = mmap.mmap(
+            -1,
+            length=PVM_MEMORY_TOTAL_SIZE,
+            flags=mmap.MAP_ANONYMOUS | mmap.MAP_PRIVATE | getattr(mmap, "MAP_NORESERVE", 0),
+        )
+        words = self.MAX_PAGES // 64
+        tracked = (ctypes.c_uint64 * words)()
+        dirty = (ctypes.c_uint64 * words)()
+        ctypes.memmove(tracked, bitarray(self._w_pages, endian="little").tobytes(), words * 8)
+
+        cow = _CowRegion(
+            self.offset & ~(PVM_MEMORY_PAGE_SIZE - 1),
+            ctypes.addressof(ctypes.c_char.from_buffer(shadow)),
+            ctypes.cast(tracked, ctypes.POINTER(ctypes.c_uint64)),
+            ctypes.cast(dirty, ctypes.POINTER(ctypes.c_uint64)),
+            self.MAX_PAGES,
+        )
+        if segwrap.cow_register(ctypes.byref(cow)) != 0:
+            shadow.close()
+            raise OSError("failed to register REC_Memory with segwrap")
+        self._cow, self._cow_shadow, self._cow_bits = cow, shadow, (tracked, dirty)
+
+        for first, count in _runs(self._w_pages):
+            aligned_addr = cow.base + first * PVM_MEMORY_PAGE_SIZE
+            libc.mprotect(ctypes.c_void_p(aligned_addr), count * PVM_MEMORY_PAGE_SIZE, mmap.PROT_READ)
+
+    def snapshot(self) -> MemorySnapshot:
+        """Checkpoint memory; later writes fault once per page to save it."""
+        if self._cow is None:
+            self._start_tracking()
+        elif segwrap.cow_reset(ctypes.byref(self._cow)) < 0:
+            raise OSError(ctypes.get_errno(), "mprotect failed while taking a snapshot")
+        self._perm_undo = {}
+        self._epoch += 1
+        return MemorySnapshot(self, self._epoch, self.heap_start)
+
+    def restore(self, snapshot: MemorySnapshot) -> None:
+        """Roll back to the live snapshot, which stays valid afterwards."""
+        snapshot.check(self, self._epoch)
+        assert self._cow is not None and self._perm_undo is not None
+        if segwrap.cow_restore(ctypes.byref(self._cow)) < 0:
+            raise OSError(ctypes.get_errno(), "mprotect failed while restoring a snapshot")
+
+        PAGE_SIZE = PVM_MEMORY_PAGE_SIZE
+        for pg, (readable, writable) in self._perm_undo.items():
+            self._r_pages[pg] = readable
+            self._w_pages[pg] = writable
+            if writable:
+                prot = mmap.PROT_READ | mmap.PROT_WRITE
+            elif readable:
+                prot = mmap.PROT_READ
+            else:
+                prot = 0
+            aligned_addr = ((self.offset + pg * PAGE_SIZE) // PAGE_SIZE) * PAGE_SIZE
+            libc.mprotect(ctypes.c_void_p(aligned_addr), PAGE_SIZE, self._tracked_prot(pg, prot))
+        self._perm_undo.clear()
+        self.heap_start = snapshot.heap
+
+    def dirty_pages(self) -> list[int]:
+        """Guest pages written since the live snapshot, ascending."""
+        if self._cow is None:
+            raise ValueError("no live snapshot")
+        dirty = bitarray(endian="little")
+        dirty.frombytes(ctypes.string_at(ctypes.addressof(self._cow_bits[1]), self.MAX_PAGES // 8))
+        # Tracking works on host pages from the aligned base; a misaligned
+        # guest page spans two of them
+        skew = self.offset - self._cow.base
+        pages = set()
+        for pg in dirty.search(1):
+            start = max(pg * PVM_MEMORY_PAGE_SIZE - skew, 0)
+            end = pg * PVM_MEMORY_PAGE_SIZE - skew + PVM_MEMORY_PAGE_SIZE - 1
+            pages.update(range(start // PVM_MEMORY_PAGE_SIZE, end // PVM_MEMORY_PAGE_SIZE + 1))
+        return sorted(pages)
+
+    def fork(self) -> "REC_Memory":
+        """
+        Independent copy of this memory. The guest lives in one flat mapping,
+        so accessible pages are copied up front; use snapshot() for
+        speculative runs.
+        """
+        vm_size = self.offset - self.buf_start
+        child = self.__class__(vm_size, self.heap_start)
+        child.buf[:vm_size] = self.buf[:vm_size]
+        child._r_pages = self._r_pages.copy()
+        child._w_pages = self._w_pages.copy()
+
+        PAGE_SIZE = PVM_MEMORY_PAGE_SIZE
+        zones = ((child._r_pages, mmap.PROT_READ), (child._w_pages, mmap.PROT_READ | mmap.PROT_WRITE))
+        # Copy the host pages that carry each page's protection, as mprotect
+        # sees them, and only then protect anything
+        host_start = vm_size & ~(PAGE_SIZE - 1)
+        for pages, _ in zones:
+            for first, count in _runs(pages):
+                start = host_start + first * PAGE_SIZE
+                end = start + count * PAGE_SIZE
+                child.buf[start:end] = self.buf[start:end]
+        for pages, prot in zones:
+            for first, count in _runs(pages):
+                aligned_addr = child.buf_start + host_start + first * PAGE_SIZE
+                libc.mprotect(ctypes.c_void_p(aligned_addr), count * PAGE_SIZE, prot)
+        return child
+
     @classmethod
     def from_pc(
         cls, read: bytes, write: bytes, args: bytes, z: int, s: int, vm_size: int
@@ -117,6 +117,8 @@ class REC_Program(Program):
         self.halt_offset = None
         self._msn_to_pvm_map = {}
         self._msn_breakpoints = []
+        # Set to a recompiler.sampler.Sampler to profile runs
+        self.sampler = None
 
     def assemble(self, gas_enabled: bool = True, logger: Optional[Any] = None) -> Tuple[bytes, dict, int, int]:
         """
@@ -20,7 +20,7 @@ from tsrkit_asm import (
 import ctypes
 import mmap
 import os
-import os
+import threading
 
 # Load libc for mprotect
 if os.uname().sysname == "Darwin":
@@ -33,30 +33,17 @@ from ..common.status import PANIC, HALT, PAGE_FAULT, HOST, OUT_OF_GAS, Execution
 # NOTE: Python's signal mod can only handle signals at high lvl
 # Its handlers run on main thread only
 # C's sigaction provides a better low level handler
-try:
-    from importlib.resources import files
-    segwrap_package = files('libs')
-    _segwrap_path = str(segwrap_package / 'libsegwrap.so')
-    
-    # Load the segwrap library with error handling
-    segwrap: Optional[ctypes.CDLL] = ctypes.CDLL(_segwrap_path)
-    
-    # Test library loading by checking if expected symbols exist
-    if hasattr(segwrap, 'initialize') and hasattr(segwrap, 'run_code'):
-        _segwrap_available = True
-    else:
-        _segwrap_available = False
-        print("Warning: segwrap library loaded but missing expected symbols")
-        
-except (ImportError, OSError, Exception) as e:
-    segwrap = None
-    _segwrap_available = False
+# segwrap keeps its run state in thread-local storage, and ctypes.CDLL drops
+# the GIL around foreign calls, so run_code executes guest code concurrently
+# when called from several threads
+from tsrkit_pvm.recompiler.segwrap import segwrap, _segwrap_available
 
 
 class Recompiler(PVM):
     """Recompiler mode of PVM"""
     
     _signal_handlers_initialized: ClassVar[bool] = False  # Class variable to track initialization
+    _signal_handlers_lock: ClassVar[threading.Lock] = threading.Lock()
 
     @classmethod
     def execute(
@@ -98,7 +85,12 @@ class Recompiler(PVM):
         # Install safe signal handler (only once per process)
         cls.init_sig_handlers()
 
-        # Activate syscall handler for PVM syscalls during execution
+        sampler = program.sampler
+        if sampler is not None:
+            sampler.start(code_pointer, len(program.msn_code))
+
+        # Handlers stay installed between runs; they are process-wide and shared
+        # by every thread executing recompiled code
         try:
             status, updated_regs, pg_data = cls.run_code(
                 addr, vm_ctx, vm_pointer, code_pointer + program.halt_offset, logger
@@ -140,7 +132,8 @@ class Recompiler(PVM):
         except Exception as e:
             raise ValueError(f"Page Fault {e}")
         finally:
-            cls.cleanup_sig_state()
+            if sampler is not None:
+                sampler.stop()
 
         final_pc = program.msn_to_pvm_index(pg_data.rip - code_pointer)
 
@@ -229,31 +222,33 @@ class Recompiler(PVM):
 
     @classmethod
     def init_sig_handlers(cls, logger = None):
-        """Install the C signal handlers (only once per process)"""
+        """Install the C signal handlers (only once per process, from any thread)"""
         if cls._signal_handlers_initialized:
             return  # Already initialized
-        
-        if not _segwrap_available or segwrap is None:
-            if logger: logger.warning("Warning: segwrap library not available, signal handlers disabled")
-            cls._signal_handlers_initialized = True
-            return
-            
-        result = segwrap.initialize()
-        if result != 0:
-            # If we get error -3, it's likely a seccomp restriction (containers, etc.)
-            # For now, we'll allow this to continue but log a warning
-            if result == -3:
-                if logger: 
-                    logger.warning(
-                        "Failed to install seccomp filter (error -3). PVM syscall handling may not work properly in restricted environments. This is expected in containers or sandboxed environments.",
-                    )
-                # Mark as initialized even if seccomp failed, to avoid repeated attempts
+
+        with cls._signal_handlers_lock:
+            if cls._signal_handlers_initialized:
+                return
+
+            if not _segwrap_available or segwrap is None:
+                if logger: logger.warning("Warning: segwrap library not available, signal handlers disabled")
                 cls._signal_handlers_initialized = True
-                return  # Continue without seccomp
-            else:
-                raise OSError(f"Failed to install signal handler: {result}")
-        
-        cls._signal_handlers_initialized = True
+                return
+
+            result = segwrap.initialize()
+            if result != 0:
+                # If we get error -3, it's likely a seccomp restriction (containers, etc.)
+                # For now, we'll allow this to continue but log a warning
+                if result == -3:
+                    if logger:
+                        logger.warning(
+                            "Failed to install seccomp filter (error -3). PVM syscall handling may not work properly in restricted environments. This is expected in containers or sandboxed environments.",
+                        )
+                else:
+                    raise OSError(f"Failed to install signal handler: {result}")
+
+            # Mark as initialized even if seccomp failed, to avoid repeated attempts
+            cls._signal_handlers_initialized = True
 
     @classmethod
     def run_code(
@@ -323,7 +318,10 @@ class Recompiler(PVM):
 
     @classmethod
     def cleanup_sig_state(cls):
-        """Clean up signal handlers and reset initialization state"""
+        """
+        Kept for compatibility. Handlers are installed once per process and
+        forward faults outside guest code, so there is nothing to tear down
+        between runs (and uninstalling them would break other threads).
+        """
         if _segwrap_available and segwrap is not None:
             segwrap.cleanup()
-        cls._signal_handlers_initialized = False  # Allow re-initialization
@@ -0,0 +1,68 @@
+"""
+Sampling profiler for recompiled programs.
+
+segwrap samples the instruction pointer on SIGPROF while a thread runs guest
+code; the samples are offsets into the program's machine code, mapped back to
+PVM pcs with REC_Program.msn_to_pvm_index.
+"""
+import ctypes
+from collections import Counter
+from typing import Any
+
+from tsrkit_pvm.recompiler.segwrap import segwrap, _segwrap_available
+
+
+class _ProfBuffer(ctypes.Structure):
+    """Mirror of segwrap's struct prof_buffer"""
+
+    _fields_ = [
+        ("code_start", ctypes.c_uint64),
+        ("code_end", ctypes.c_uint64),
+        ("samples", ctypes.POINTER(ctypes.c_uint32)),
+        ("capacity", ctypes.c_uint64),
+        ("count", ctypes.c_uint64),
+        ("outside", ctypes.c_uint64),
+        ("dropped", ctypes.c_uint64),
+    ]
+
+
+class Sampler:
+    """
+    Samples of one REC_Program, keyed by PVM pc. Recompiler.execute starts it
+    around each run when set as `program.sampler`; a sampler collects from one
+    thread at a time.
+    """
+
+    def __init__(self, program: Any, interval_us: int = 1000, capacity: int = 1 << 16):
+        if not _segwrap_available or not hasattr(segwrap, "prof_start"):
+            raise OSError("libsegwrap was built without the sampling profiler")
+        self.program = program
+        self.interval_us = interval_us
+        self.pcs: Counter = Counter()
+        self.outside = 0
+        self.dropped = 0
+        self._samples = (ctypes.c_uint32 * capacity)()
+        self._buf = _ProfBuffer(
+            samples=ctypes.cast(self._samples, ctypes.POINTER(ctypes.c_uint32)),
+            capacity=capacity,
+        )
+
+    def start(self, code_pointer: int, code_size: int) -> None:
+        buf = self._buf
+        buf.code_start, buf.code_end = code_pointer, code_pointer + code_size
+        buf.count = buf.outside = buf.dropped = 0
+        if segwrap.prof_start(ctypes.byref(buf), ctypes.c_uint64(self.interval_us)) != 0:
+            raise OSError("failed to start the SIGPROF timer")
+
+    def stop(self) -> None:
+        segwrap.prof_stop()
+        buf = self._buf
+        to_pvm = self.program.msn_to_pvm_index
+        for i in range(buf.count):
+            self.pcs[to_pvm(self._samples[i])] += 1
+        self.outside += buf.outside
+        self.dropped += buf.dropped
+
+    @property
+    def total(self) -> int:
+        return sum(self.pcs.values())
@@ -0,0 +1,28 @@
+"""
+Loader for libsegwrap, the C runtime that turns faults, traps and host calls
+of recompiled code into exits and tracks copy-on-write pages of REC_Memory.
+"""
+import ctypes
+from typing import Optional
+
+try:
+    from importlib.resources import files
+    segwrap_package = files('libs')
+    _segwrap_path = str(segwrap_package / 'libsegwrap.so')
+    
+    # Load the segwrap library with error handling
+    segwrap: Optional[ctypes.CDLL] = ctypes.CDLL(_segwrap_path)
+    
+    # Test library loading by checking if expected symbols exist
+    if hasattr(segwrap, 'initialize') and hasattr(segwrap, 'run_code'):
+        _segwrap_available = True
+        if hasattr(segwrap, 'cow_register'):
+            segwrap.cow_restore.restype = ctypes.c_int64
+            segwrap.cow_reset.restype = ctypes.c_int64
+    else:
+        _segwrap_available = False
+        print("Warning: segwrap library loaded but missing expected symbols")
+        
+except (ImportError, OSError, Exception) as e:
+    segwrap = None
+    _segwrap_available = False
@@ -11,9 +11,24 @@
 #include <linux/filter.h>
 #include <sys/prctl.h>
 #include <sys/syscall.h>
+#include <sys/time.h>
 #include <stdio.h>
+#include <unistd.h>
 
-static sigjmp_buf jmpbuf;
+#include <pthread.h>
+#include <errno.h>
+
+/*
+ * Faults are synchronous signals, delivered to the thread that raised them, so
+ * all run state lives in thread-local storage and any number of threads can
+ * execute guest code at once. Each run_code call pushes a frame; a handler
+ * jumps back to the innermost frame of the faulting thread, which also makes
+ * nested runs safe.
+ *
+ * TLS uses the initial-exec model so handlers never go through
+ * __tls_get_addr, which is not async-signal-safe.
+ */
+#define SEGWRAP_TLS __thread __attribute__((tls_model("initial-exec")))
 
 enum ExitStatus {
   HOST_CALL,
@@ -29,18 +44,69 @@ struct pg_data {
     enum ExitStatus status;
 };
 
-static struct pg_data program_status;
-static uint64_t host_call_offset = 1000;
-static int syscall_handler_initialized = 0;  // Track initialization state
+struct run_frame {
+    sigjmp_buf jmpbuf;
+    struct run_frame *prev;
+};
+
+static SEGWRAP_TLS struct run_frame *current_frame = NULL;
+static SEGWRAP_TLS struct pg_data program_status;
+
+static const uint64_t host_call_offset = 1000;
+
+static pthread_once_t handlers_once = PTHREAD_ONCE_INIT;
+static int handlers_result = 0;
+static pthread_once_t segv_once = PTHREAD_ONCE_INIT;
+static int segv_result = 0;
+static struct sigaction prev_segv, prev_ill, prev_sys;
+
+/*
+ * Copy-on-write tracking for memory snapshots. Tracked pages are mapped
+ * read-only; the first write to one faults, and the SIGSEGV handler saves the
+ * page to the region's shadow mapping, marks it dirty and unprotects it before
+ * the write is retried. This covers guest code and host-side writes through
+ * the mapping alike, so a restore only copies back dirty pages.
+ */
+#define COW_MAX_REGIONS 64
+#define COW_PAGE_SIZE 4096
+
+struct cow_region {
+    uint8_t *base;       // page-aligned start of the tracked range
+    uint8_t *shadow;     // same layout, holds the saved copy of dirty pages
+    uint64_t *tracked;   // bitset of pages mapped read-only for tracking
+    uint64_t *dirty;     // bitset of pages saved since the snapshot
+    uint64_t pages;
+};
+
+static struct cow_region *cow_regions[COW_MAX_REGIONS];
 
-static void syscall_handler(int sig, siginfo_t *si, void *ctx_) {
-  fflush(stdout);
-  ucontext_t *uc = (ucontext_t *)ctx_;
+static bool cow_handle(uint8_t *addr) {
+    for (int i = 0; i < COW_MAX_REGIONS; i++) {
+        struct cow_region *r = __atomic_load_n(&cow_regions[i], __ATOMIC_ACQUIRE);
+        if (r == NULL || addr < r->base || addr >= r->base + r->pages * COW_PAGE_SIZE) {
+            continue;
+        }
+        uint64_t pg = (uint64_t)(addr - r->base) / COW_PAGE_SIZE;
+        uint64_t bit = 1ULL << (pg & 63);
+        if (!(__atomic_load_n(&r->tracked[pg >> 6], __ATOMIC_ACQUIRE) & bit)) {
+            return false;
+        }
+        uint8_t *page = r->base + pg * COW_PAGE_SIZE;
+        // Whoever marks the page dirty saves it; a racing writer just retries
+        if (!(__atomic_fetch_or(&r->dirty[pg >> 6], bit, __ATOMIC_ACQ_REL) & bit)) {
+            memcpy(r->shadow + pg * COW_PAGE_SIZE, page, COW_PAGE_SIZE);
+            return mprotect(page, COW_PAGE_SIZE, PROT_READ | PROT_WRITE) == 0;
+        }
+        return true;
+    }
+    return false;
+}
+
+static void save_registers(ucontext_t *uc) {
 #if defined(__x86_64__)
     greg_t *g = uc->uc_mcontext.gregs;
-    // NOTE: RCX and R11 gets clobbered during syscall, so we cannot restore their value.
-    // For simplicity, we store all regs in memory before syscall and restore from there instead here
-    // Save all registers like other handlers to ensure consistency
+    // NOTE: RCX and R11 get clobbered by syscall, so host calls restore
+    // registers from the VM context rather than from here
     program_status.r8  = g[REG_R8];  program_status.r9  = g[REG_R9];
     program_status.r10 = g[REG_R10]; program_status.r11 = g[REG_R11];
     program_status.r12 = g[REG_R12]; program_status.r13 = g[REG_R13];
@@ -50,54 +116,74 @@ static void syscall_handler(int sig, siginfo_t *si, void *ctx_) {
     program_status.rdx = g[REG_RDX]; program_status.rax = g[REG_RAX];
     program_status.rcx = g[REG_RCX]; program_status.rsp = g[REG_RSP];
     program_status.rip = g[REG_RIP]; program_status.eflags = g[REG_EFL];
+#endif
+}
+
+// A fault outside guest code belongs to whoever handled the signal before us
+static void forward_signal(struct sigaction *prev, int sig, siginfo_t *si, void *ctx) {
+    if (prev->sa_flags & SA_SIGINFO) {
+        if (prev->sa_sigaction) {
+            prev->sa_sigaction(sig, si, ctx);
+            return;
+        }
+    } else if (prev->sa_handler == SIG_IGN) {
+        return;
+    } else if (prev->sa_handler != SIG_DFL) {
+        prev->sa_handler(sig);
+        return;
+    }
+    signal(sig, SIG_DFL);
+    raise(sig);
+}
+
+static void syscall_handler(int sig, siginfo_t *si, void *ctx) {
+    struct run_frame *frame = current_frame;
+    if (frame == NULL) {
+        forward_signal(&prev_sys, sig, si, ctx);
+        return;
+    }
+    save_registers((ucontext_t *)ctx);
     program_status.si_data = si->si_value.sival_int - host_call_offset;
     program_status.status = HOST_CALL;
-#endif
-    siglongjmp(jmpbuf, 1);
+    siglongjmp(frame->jmpbuf, 1);
 }
 
 static void sill_handler(int sig, siginfo_t *si, void *ctx) {
-    ucontext_t *uc = (ucontext_t *)ctx;
-#if defined(__x86_64__)
-    greg_t *g = uc->uc_mcontext.gregs;
-    program_status.r8  = g[REG_R8];  program_status.r9  = g[REG_R9];
-    program_status.r10 = g[REG_R10]; program_status.r11 = g[REG_R11];
-    program_status.r12 = g[REG_R12]; program_status.r13 = g[REG_R13];
-    program_status.r14 = g[REG_R14]; program_status.r15 = g[REG_R15];
-    program_status.rdi = g[REG_RDI]; program_status.rsi = g[REG_RSI];
-    program_status.rbp = g[REG_RBP]; program_status.rbx = g[REG_RBX];
-    program_status.rdx = g[REG_RDX]; program_status.rax = g[REG_RAX];
-    program_status.rcx = g[REG_RCX]; program_status.rsp = g[REG_RSP];
-    program_status.rip = g[REG_RIP]; program_status.eflags = g[REG_EFL];
+    struct run_frame *frame = current_frame;
+    if (frame == NULL) {
+        forward_signal(&prev_ill, sig, si, ctx);
+        return;
+    }
+    save_registers((ucontext_t *)ctx);
     program_status.si_data = (uint64_t)si->si_addr;
     program_status.status = ILL;
-#endif
-    siglongjmp(jmpbuf, 1);
+    siglongjmp(frame->jmpbuf, 1);
 }
 
 static void segv_handler(int sig, siginfo_t *si, void *ctx) {
-    ucontext_t *uc = (ucontext_t *)ctx;
-#if defined(__x86_64__)
-    greg_t *g = uc->uc_mcontext.gregs;
-    program_status.r8  = g[REG_R8];  program_status.r9  = g[REG_R9];
-    program_status.r10 = g[REG_R10]; program_status.r11 = g[REG_R11];
-    program_status.r12 = g[REG_R12]; program_status.r13 = g[REG_R13];
-    program_status.r14 = g[REG_R14]; program_status.r15 = g[REG_R15];
-    program_status.rdi = g[REG_RDI]; program_status.rsi = g[REG_RSI];
-    program_status.rbp = g[REG_RBP]; program_status.rbx = g[REG_RBX];
-    program_status.rdx = g[REG_RDX]; program_status.rax = g[REG_RAX];
-    program_status.rcx = g[REG_RCX]; program_status.rsp = g[REG_RSP];
-    program_status.rip = g[REG_RIP]; program_status.eflags = g[REG_EFL];
+    if (cow_handle((uint8_t *)si->si_addr)) {
+        return;
+    }
+    struct run_frame *frame = current_frame;
+    if (frame == NULL) {
+        forward_signal(&prev_segv, sig, si, ctx);
+        return;
+    }
+    save_registers((ucontext_t *)ctx);
     program_status.si_data = (uint64_t)si->si_addr;
     program_status.status = PAGE_FAULT;
-#endif
-    siglongjmp(jmpbuf, 1);
+    siglongjmp(frame->jmpbuf, 1);
 }
 
 int run_code(uint64_t addr, uint64_t *ret_val) {
-    if (sigsetjmp(jmpbuf, 1) == 0) {
+    // volatile: read back after siglongjmp
+    struct run_frame frame;
+    struct run_frame *volatile prev = current_frame;
+    frame.prev = prev;
+
+    if (sigsetjmp(frame.jmpbuf, 1) == 0) {
+        current_frame = &frame;
         uint64_t (*fn)(void) = (uint64_t (*)(void))addr;
-        uint64_t r = fn();
         uint64_t return_address;
 
         //  1) lea the label “1” into return_address  
@@ -112,35 +198,33 @@ int run_code(uint64_t addr, uint64_t *ret_val) {
             : "rax", "memory"             // clobberss
         );
 
+        current_frame = prev;
         if (ret_val) *ret_val = return_address;
         return 0;   // normal return
     } else {
+        current_frame = prev;
         return 1;  // segfault
     }
 }
 
+// Status of the last faulted run on the calling thread
 int get_program_status(struct pg_data *out) {
     *out = program_status;
     return 0;
 }
 
 // --- Handlers --- //
-int init_syscall_handler(void) {
-    // Check if already initialized
-    if (syscall_handler_initialized) {
-        return 0;  // Already set up, no need to do it again
-    }
-    
-    fflush(stdout);
-    
-    // Set up signal handler first
+static int install_handler(int sig, void (*fn)(int, siginfo_t *, void *), int flags, struct sigaction *prev) {
     struct sigaction sa;
     memset(&sa, 0, sizeof(sa));
-    sa.sa_sigaction = syscall_handler;
-    sa.sa_flags = SA_SIGINFO;
+    sa.sa_sigaction = fn;
+    sa.sa_flags = SA_SIGINFO | flags;
     sigemptyset(&sa.sa_mask);
-    
-    if (sigaction(SIGSYS, &sa, NULL) == -1) {
+    return sigaction(sig, &sa, prev);  // 0 on success
+}
+
+int init_syscall_handler(void) {
+    if (install_handler(SIGSYS, syscall_handler, 0, &prev_sys) == -1) {
         perror("sigaction");
         return -1;
     }
@@ -172,57 +256,204 @@ int init_syscall_handler(void) {
         .filter = filter,
     };
     
-    // Install the seccomp filter
+    // Install the filter on every thread of the process; threads started
+    // later inherit it. Fall back to the calling thread on old kernels.
+#if defined(SYS_seccomp) && defined(SECCOMP_FILTER_FLAG_TSYNC)
+    if (syscall(SYS_seccomp, SECCOMP_SET_MODE_FILTER, SECCOMP_FILTER_FLAG_TSYNC, &prog) == 0) {
+        return 0;
+    }
+    if (errno != ENOSYS && errno != EINVAL) {
+        perror("seccomp(SECCOMP_FILTER_FLAG_TSYNC)");
+        return -3;
+    }
+#endif
     if (prctl(PR_SET_SECCOMP, SECCOMP_MODE_FILTER, &prog) == -1) {
         perror("prctl(PR_SET_SECCOMP)");
         return -3;
     }
-    
-    syscall_handler_initialized = 1;  // Mark as initialized
     return 0;
 }
 
 
 int init_segv_handler(void) {
-    // --- For SEGV --- // 
-    struct sigaction sa;
-    memset(&sa, 0, sizeof(sa));
-    sa.sa_sigaction = segv_handler;
-    sa.sa_flags = SA_SIGINFO | SA_NODEFER;
-    sigemptyset(&sa.sa_mask);
-    int segv_status = sigaction(SIGSEGV, &sa, NULL);  // 0 on success
-    return segv_status;
+    return install_handler(SIGSEGV, segv_handler, SA_NODEFER, &prev_segv);
 }
 
 int init_segill_handler(void) {
-    // --- For SEGILL --- // 
-    struct sigaction sill;
-    memset(&sill, 0, sizeof(sill));
-    sill.sa_sigaction = sill_handler;
-    sill.sa_flags = SA_SIGINFO | SA_NODEFER;
-    sigemptyset(&sill.sa_mask);
-    int sill_status = sigaction(SIGILL, &sill, NULL);  // 0 on success 
-    return sill_status;
+    return install_handler(SIGILL, sill_handler, SA_NODEFER, &prev_ill);
 }
 
-// --- Main Initializer --- // 
-int initialize(void) {
-  int segv_result = init_segv_handler();
-  if (segv_result != 0) return segv_result;
+static void install_segv_once(void) {
+  segv_result = init_segv_handler();
+}
+
+static void initialize_once(void) {
+  pthread_once(&segv_once, install_segv_once);
+  if (segv_result != 0) { handlers_result = segv_result; return; }
   
   int sill_result = init_segill_handler();  
-  if (sill_result != 0) return sill_result;
+  if (sill_result != 0) { handlers_result = sill_result; return; }
   
-  int syscall_result = init_syscall_handler();
-  if (syscall_result != 0) return syscall_result;
-  
-  return 0;
+  handlers_result = init_syscall_handler();
+}
+
+// --- Main Initializer --- // 
+// Installs the handlers once per process; safe to call from any thread
+int initialize(void) {
+  pthread_once(&handlers_once, initialize_once);
+  return handlers_result;
+}
+
+// --- Copy-on-write regions --- //
+// Start tracking a region; installs the SIGSEGV handler if needed. Returns
+// -1 when the handler cannot be installed or all slots are taken.
+int cow_register(struct cow_region *region) {
+    pthread_once(&segv_once, install_segv_once);
+    if (segv_result != 0) {
+        return -1;
+    }
+    for (int i = 0; i < COW_MAX_REGIONS; i++) {
+        struct cow_region *expected = NULL;
+        if (__atomic_compare_exchange_n(&cow_regions[i], &expected, region, false,
+                                        __ATOMIC_ACQ_REL, __ATOMIC_ACQUIRE)) {
+            return 0;
+        }
+    }
+    return -1;
+}
+
+void cow_unregister(struct cow_region *region) {
+    for (int i = 0; i < COW_MAX_REGIONS; i++) {
+        struct cow_region *expected = region;
+        __atomic_compare_exchange_n(&cow_regions[i], &expected, NULL, false,
+                                    __ATOMIC_ACQ_REL, __ATOMIC_ACQUIRE);
+    }
+}
+
+// Copy dirty pages back from the shadow and track them again. Returns the
+// number of pages restored, or -1 if mprotect fails.
+int64_t cow_restore(struct cow_region *r) {
+    int64_t restored = 0;
+    for (uint64_t w = 0; w < (r->pages + 63) / 64; w++) {
+        uint64_t bits = r->dirty[w];
+        while (bits) {
+            uint64_t pg = w * 64 + __builtin_ctzll(bits);
+            uint8_t *page = r->base + pg * COW_PAGE_SIZE;
+            bits &= bits - 1;
+            if (mprotect(page, COW_PAGE_SIZE, PROT_READ | PROT_WRITE) != 0) {
+                return -1;
+            }
+            memcpy(page, r->shadow + pg * COW_PAGE_SIZE, COW_PAGE_SIZE);
+            if (mprotect(page, COW_PAGE_SIZE, PROT_READ) != 0) {
+                return -1;
+            }
+            restored++;
+        }
+        r->dirty[w] = 0;
+    }
+    return restored;
+}
+
+// Forget saved pages, making the current contents the snapshot
+int64_t cow_reset(struct cow_region *r) {
+    int64_t reset = 0;
+    for (uint64_t w = 0; w < (r->pages + 63) / 64; w++) {
+        uint64_t bits = r->dirty[w] & r->tracked[w];
+        while (bits) {
+            uint64_t pg = w * 64 + __builtin_ctzll(bits);
+            bits &= bits - 1;
+            if (mprotect(r->base + pg * COW_PAGE_SIZE, COW_PAGE_SIZE, PROT_READ) != 0) {
+                return -1;
+            }
+            reset++;
+        }
+        r->dirty[w] = 0;
+    }
+    return reset;
+}
+
+// --- Sampling profiler --- //
+// A process-wide CPU-time timer raises SIGPROF in whichever thread is running.
+// Threads profiling recompiled code register a buffer for the code they run;
+// the handler records rip as an offset into that code, and only counts samples
+// that land elsewhere (host calls, the interpreter). The timer runs while any
+// thread is profiling; the handler stays installed and ignores other threads.
+struct prof_buffer {
+    uint64_t code_start;
+    uint64_t code_end;
+    uint32_t *samples;
+    uint64_t capacity;
+    uint64_t count;
+    uint64_t outside;
+    uint64_t dropped;
+};
+
+static SEGWRAP_TLS struct prof_buffer *prof_current = NULL;
+static pthread_mutex_t prof_lock = PTHREAD_MUTEX_INITIALIZER;
+static int prof_installed = 0;
+static int prof_users = 0;
+
+static void prof_handler(int sig, siginfo_t *si, void *ctx) {
+    (void)sig; (void)si;
+    struct prof_buffer *buf = prof_current;
+    if (buf == NULL) {
+        return;
+    }
+#if defined(__x86_64__)
+    uint64_t rip = ((ucontext_t *)ctx)->uc_mcontext.gregs[REG_RIP];
+    if (rip < buf->code_start || rip >= buf->code_end) {
+        buf->outside++;
+    } else if (buf->count < buf->capacity) {
+        buf->samples[buf->count++] = (uint32_t)(rip - buf->code_start);
+    } else {
+        buf->dropped++;
+    }
+#endif
+}
+
+// Sample the calling thread into buf every interval_us of process CPU time.
+// Returns 0, or -1 if the handler or timer cannot be set up.
+int prof_start(struct prof_buffer *buf, uint64_t interval_us) {
+    int result = 0;
+    pthread_mutex_lock(&prof_lock);
+    if (!prof_installed) {
+        result = install_handler(SIGPROF, prof_handler, SA_RESTART, NULL);
+        prof_installed = result == 0;
+    }
+    if (result == 0 && prof_current == NULL && prof_users++ == 0) {
+        struct itimerval timer;
+        timer.it_interval.tv_sec = interval_us / 1000000;
+        timer.it_interval.tv_usec = interval_us % 1000000;
+        timer.it_value = timer.it_interval;
+        result = setitimer(ITIMER_PROF, &timer, NULL);
+        if (result != 0) {
+            prof_users--;
+        }
+    }
+    if (result == 0) {
+        prof_current = buf;
+    }
+    pthread_mutex_unlock(&prof_lock);
+    return result == 0 ? 0 : -1;
+}
+
+// Stop sampling the calling thread; the buffer keeps what was collected
+void prof_stop(void) {
+    pthread_mutex_lock(&prof_lock);
+    if (prof_current != NULL) {
+        prof_current = NULL;
+        if (--prof_users == 0) {
+            struct itimerval off;
+            memset(&off, 0, sizeof(off));
+            setitimer(ITIMER_PROF, &off, NULL);
+        }
+    }
+    pthread_mutex_unlock(&prof_lock);
 }
 
 // --- Cleanup Helper --- //
+// Handlers stay installed for the life of the process: they pass faults outside
+// guest code on to the previous handlers, and a seccomp filter cannot be
+// removed. Kept for ABI compatibility.
 void cleanup(void) {
-  signal(SIGSEGV, SIG_DFL);
-  signal(SIGILL, SIG_DFL);
-  signal(SIGSYS, SIG_DFL);
-  syscall_handler_initialized = 0;  // Reset initialization state
 }
@@ -0,0 +1,128 @@
+"""
+Gas used by built services, run through the playground.
+
+Compares builds of the same example, typically one per SDK revision, on a
+fixed sequence of refine calls. Each build runs against fresh state, so only
+the code differs:
+
+    ajanta build examples/c/token.c -o new/token.pvm
+    python -m playground.execution.gas_bench token old/token.pvm new/token.pvm
+
+Gas is deterministic, so one run per build is enough.
+"""
+import argparse
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from tsrkit_types import Bytes, Uint
+
+from playground.execution.invocations.refine import PsiR
+from playground.types.protocol.core import Balance, Gas, ServiceId
+from playground.types.protocol.crypto import OpaqueHash
+from playground.types.state.delta import AccountData, AccountMetadata, AccountPreimages, Delta
+from playground.types.state.state import state
+from playground.types.work.item import ExtrinsicSpecs, ImportSpecs, WorkItem
+from playground.types.work.package import Authorizer, WorkItems, WorkPackage
+from playground.types.work.report import RefineContext
+
+SERVICE = ServiceId(0)
+CODE_HASH = OpaqueHash(bytes(32))
+GAS_LIMIT = 10_000_000
+
+
+def _u64(value: int) -> bytes:
+    return value.to_bytes(8, "little")
+
+
+# Refine payloads of each example, in call order
+SCENARIOS: Dict[str, List[Tuple[str, bytes]]] = {
+    "hello": [
+        ("empty", b""),
+        ("payload", b"hello, jam"),
+    ],
+    "token": [
+        ("init", bytes([0x06])),
+        ("mint", bytes([0x01]) + _u64(1) + _u64(1000)),
+        ("mint", bytes([0x01]) + _u64(100) + _u64(500)),
+        ("transfer", bytes([0x02]) + _u64(2) + _u64(200)),
+        ("balance", bytes([0x03]) + _u64(1)),
+        ("balance", bytes([0x03]) + _u64(2)),
+        ("user", bytes([0x04]) + _u64(2)),
+    ],
+}
+
+
+def _accounts(code: bytes) -> Delta:
+    """Accounts holding just the service under test"""
+    meta = AccountMetadata.empty()
+    meta.balance = Balance(10**12)
+    return Delta({SERVICE: AccountData(service=meta, preimages=AccountPreimages({CODE_HASH: Bytes(code)}))})
+
+
+def _refine(payload: bytes) -> Tuple[str, int]:
+    item = WorkItem(
+        service=SERVICE,
+        code_hash=CODE_HASH,
+        refine_gas_limit=Gas(GAS_LIMIT),
+        accumulate_gas_limit=Gas(GAS_LIMIT),
+        export_count=Uint(0),
+        payload=Bytes(payload),
+        import_segments=ImportSpecs([]),
+        extrinsic=ExtrinsicSpecs([]),
+    )
+    package = WorkPackage(
+        auth_code_host=ServiceId(0),
+        authorization=Bytes(b""),
+        authorizer=Authorizer(code_hash=OpaqueHash(bytes(32)), params=Bytes(b"")),
+        context=RefineContext.empty(),
+        items=WorkItems([item]),
+    )
+    result, _, used = PsiR(item_index=0, p=package, auth_trace=b"", i_segments=[], e_offset=0).execute()
+    return result.get_key(), int(used)
+
+
+def measure(code: bytes, scenario: Sequence[Tuple[str, bytes]]) -> List[Tuple[str, str, int]]:
+    """(call, result, gas used) for each call of `scenario`, from fresh state"""
+    # Refine reads the global state; swap its accounts only for the run
+    saved = state.delta
+    state.delta = _accounts(code)
+    try:
+        rows = []
+        for name, payload in scenario:
+            status, used = _refine(payload)
+            rows.append((name, status, used))
+        return rows
+    finally:
+        state.delta = saved
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m playground.execution.gas_bench",
+        description="Compare the gas used by builds of an example service",
+    )
+    parser.add_argument("example", choices=sorted(SCENARIOS))
+    parser.add_argument("builds", nargs="+", help=".pvm files; the first is the baseline")
+    opts = parser.parse_args(argv)
+
+    results = []
+    for path in opts.builds:
+        with open(path, "rb") as f:
+            results.append(measure(f.read(), SCENARIOS[opts.example]))
+
+    print(f"{'call':<10} " + " ".join(f"{i:>12}" for i in range(len(opts.builds))))
+    for row in zip(*results):
+        cells = [f"{used:>12}" if status == "ok" else f"{status:>12}" for _, status, used in row]
+        print(f"{row[0][0]:<10} " + " ".join(cells))
+    totals = [sum(used for _, _, used in rows) for rows in results]
+    print(f"{'total':<10} " + " ".join(f"{t:>12}" for t in totals))
+    for i, (path, total) in enumerate(zip(opts.builds, totals)):
+        change = f"{(total / totals[0] - 1) * 100:+.1f}%" if totals[0] else "n/a"
+        print(f"[{i}] {path}: {change}")
+
+    # Results must agree, or the comparison is meaningless
+    return 0 if all([s for _, s, _ in rows] == [s for _, s, _ in results[0]] for rows in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
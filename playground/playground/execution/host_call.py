@@ -1,39 +1,31 @@
-from typing import Any, Tuple
-import os
+import time
+from typing import Any, Optional, Tuple
 from tsrkit_pvm import (
+        Engine,
         ExecutionStatus,
         CONTINUE,
         PvmError,
-        _HAS_RECOMPILER,
-        _HAS_CYTHON,
+        get_engine,
 )
+from tsrkit_pvm.profiler import active_profiler
 
-_PVM_MODE = os.environ.get("PVM_MODE", "interpreter")
-if _PVM_MODE == "interpreter":
-    from tsrkit_pvm.cpvm.cy_memory import CyMemory as Memory
-    from tsrkit_pvm.cpvm.cy_program import CyProgram as Program
-    from tsrkit_pvm.cpvm.cy_pvm import CyInterpreter as PVM
-elif _PVM_MODE == "mypyc":
-    from tsrkit_pvm import INT_Memory as Memory, INT_Program as Program
-    from tsrkit_pvm import INT_Memory as Memory, INT_Program as Program, Interpreter as PVM 
-elif _PVM_MODE == "recompiler" and _HAS_RECOMPILER:
-    from tsrkit_pvm import REC_Memory as Memory, REC_Program as Program, Recompiler as PVM
-else:
-    raise ImportError(f"PVM mode {_PVM_MODE} is not supported")
-
-HostCallReturn = Tuple[ExecutionStatus, int, int, list, Memory, Any]
+HostCallReturn = Tuple[ExecutionStatus, int, int, list, Any, Any]
 
 class PsiH:
     @staticmethod
     def execute(
-        program: Program,
+        program: Any,
         pc: int,
         gas: int,
         registers: list,
-        memory: Memory,
+        memory: Any,
         dispatch_fn: Any,
         context: Any,
+        engine: Optional[Engine] = None,
     ) -> HostCallReturn:
+        # program and memory must belong to `engine` (default: PVM_MODE)
+        PVM = get_engine(engine).pvm
+        profiler = active_profiler()
         current_gas = gas
         current_pc = pc
         
@@ -56,9 +48,12 @@ class PsiH:
                 try:
                     # Ultra-fast host call dispatch
                     host_register = int(status.value.register)
+                    started = time.perf_counter_ns() if profiler is not None else 0
                     status, remaining_gas, registers, memory, context = dispatch_fn(
                         host_register, remaining_gas, registers, memory, context
                     )
+                    if profiler is not None:
+                        profiler.record_host_call(host_register, time.perf_counter_ns() - started)
                     
                     # Inline gas check for maximum performance
                     if remaining_gas < 0:
@@ -10,7 +10,7 @@ from playground.types.state.accumulation.types import (
     PreimageDict,
 )
 from playground.execution.invocations.arg_invoke import PsiM
-from playground.execution.invocations.functions.general_fns import GeneralFunctions
+from playground.execution.invocations.functions.general_fns import GeneralFunctions, batch_storage_entries
 from playground.execution.invocations.protocol import InvocationInfo, InvocationProtocol
 from tsrkit_types.null import Null
 from tsrkit_types.integers import Uint
@@ -114,6 +114,7 @@ class PsiA(InvocationProtocol):
                 GeneralFunctions,
                 {"core_index": 0, "service_id": self.service_id},
             ),  
+            **batch_storage_entries(delta[xs], xs, delta),
         }
 
     def execute(self):
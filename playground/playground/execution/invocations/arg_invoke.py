@@ -1,11 +1,14 @@
 import time
-from typing import Any, Tuple
+from logging import INFO
+from typing import Any, Optional, Tuple
 from playground.execution.host_call import HostCallReturn, PsiH
 from playground.execution.invocations.protocol import Context, DispatchFunction
-from tsrkit_pvm import PANIC, ExecutionStatus, y_function
+from tsrkit_pvm import PANIC, Engine, ExecutionStatus, select_engine, y_function
+from tsrkit_pvm.profiler import active_profiler
 from tsrkit_types.bytes import Bytes
 from playground.types.protocol.core import Gas
-from playground.log_setup import pvm_logger as logger
+from playground.execution import trace
+from playground.execution.trace import pvm_trace
 
 ArgInvokeReturn = Tuple[Gas, ExecutionStatus | bytes, Context]
 
@@ -19,22 +22,28 @@ class PsiM:
         arguments: bytes,
         dispatch_fn: DispatchFunction,
         context: Any,
+        engine: Optional[Engine | str] = None,
     ) -> ArgInvokeReturn:
+        # None follows PVM_MODE; "tiered" routes by the gas budget
+        engine = select_engine(engine, int(gas))
         try:
-            program, registers, memory = y_function(blob, arguments)
+            program, registers, memory = y_function(blob, arguments, engine)
 
         except Exception as e:
-            logger.error(
-                "Failed to initialize the program",
-                extra={
-                    "error": str(e),
-                    "error_type": type(e).__name__,
-                }
-            )
+            pvm_trace.error("Failed to initialize the program: %s: %s", type(e).__name__, e)
             return Gas(0), PANIC, context
         
+        # Logger levels are read once per invocation rather than per host call
+        trace.refresh()
+
+        profiler = active_profiler()
+        if profiler is not None:
+            profiler.attach(program)
+
         # Direct execution without intermediate R call
-        host_result = PsiH.execute(program, int(pc), int(gas), registers, memory, dispatch_fn, context)
+        host_result = PsiH.execute(
+            program, int(pc), int(gas), registers, memory, dispatch_fn, context, engine
+        )
         return PsiM.R(gas, host_result)
 
 
@@ -48,7 +57,7 @@ class PsiM:
         # Optimized status handling
         if status == ExecutionStatus.OUT_OF_GAS:
             result = status
-            logger.warning("Invocation ran out of gas", extra={"initial_gas": int(g), "consumed_gas": int(consumed_gas)})
+            pvm_trace.warning("Invocation ran out of gas: initial_gas=%s consumed_gas=%s", int(g), int(consumed_gas))
         elif status == ExecutionStatus.HALT:
             # Fast path for memory access check
             reg7, reg8 = int(registers[7]), int(registers[8])
@@ -62,14 +71,14 @@ class PsiM:
         else:
             result = ExecutionStatus.PANIC
 
-        logger.info(
-            "Invocation completed",
-            extra={
-                "status": str(status._value_),
-                "initial_gas": int(g),
-                "consumed_gas": int(consumed_gas),
-                "result": result,
-            }
-        )
+        if pvm_trace.info:
+            pvm_trace.log(
+                INFO,
+                "Invocation completed: status=%s initial_gas=%s consumed_gas=%s result=%s",
+                status.name,
+                int(g),
+                int(consumed_gas),
+                f"{len(result)} bytes" if isinstance(result, bytes) else result.name,
+            )
 
         return consumed_gas, result, context
@@ -5,7 +5,7 @@ from playground.types.state.accumulation.types import (
 )
 from tsrkit_types import U32, U64, Bytes
 from playground.types.protocol.validators import ValidatorData
-from playground.log_setup import pvm_logger as logger, logger as jam_logger
+from playground.execution.trace import pvm_trace
 from playground.execution.invocations.functions.protocol import (
     InvocationFunctions as INVF,
 )
@@ -62,13 +62,13 @@ class AccumulateFunctions(INVF):
         [m, a, v, o, n] = registers[7:7 + 5]
 
         if not memory.is_accessible(a, 4 * CORE_COUNT):
-            logger.warning("Memory access violation in bless function: inaccessible chi_a memory region")
+            pvm_trace.warning("Memory access violation in bless function: inaccessible chi_a memory region")
             raise PvmError(PANIC)
 
         chi_a = U32.decode(memory.read(a, 4 * CORE_COUNT))
 
         if not memory.is_accessible(o, 12 * n):
-            logger.warning("Memory access violation in bless function: inaccessible chi_z memory region")
+            pvm_trace.warning("Memory access violation in bless function: inaccessible chi_z memory region")
             raise PvmError(PANIC)
 
         # Read all n records at once
@@ -83,11 +83,11 @@ class AccumulateFunctions(INVF):
             z_dict[s] = g
 
         if context.x.s_index != context.x.partial_state.privileges.chi_m:
-            logger.warning("Privilege mismatch in bless function: chi_m does not match s_index")
+            pvm_trace.warning("Privilege mismatch in bless function: chi_m does not match s_index")
             registers[7] = HostStatus.HUH.value
             return CONTINUE, gas, registers, memory, context
         if not all(0 <= x < 2**32 - 1 for x in (m, v)):
-            logger.warning(f"Invalid values for m or v in bless function: m={m}, v={v}")
+            pvm_trace.warning("Invalid values for m or v in bless function: m=%s, v=%s", m, v)
             registers[7] = HostStatus.WHO.value
             return CONTINUE, gas, registers, memory, context
 
@@ -101,16 +101,16 @@ class AccumulateFunctions(INVF):
         [c, o, a] = registers[7: 7 + 3]
 
         if not memory.is_accessible(o, 32 * MAX_AUTH_QUEUE_ITEMS):
-            logger.warning("Assign: Memory access violation in assign function: inaccessible authorizer_keys memory region")
+            pvm_trace.warning("Assign: Memory access violation in assign function: inaccessible authorizer_keys memory region")
             raise PvmError(PANIC)
 
         if c >= CORE_COUNT:
-            logger.warning(f"Assign: Invalid value for c={c} in assign function: exceeds CORE_COUNT={CORE_COUNT}")
+            pvm_trace.warning("Assign: Invalid value for c=%s in assign function: exceeds CORE_COUNT=%s", c, CORE_COUNT)
             registers[7] = HostStatus.CORE.value
             return CONTINUE, gas, registers, memory, context
 
         if context.x.partial_state.privileges.chi_a[c] != context.x.s_index:
-            logger.warning("Assign: Privilege mismatch in assign function: chi_a does not match s_index for given c")
+            pvm_trace.warning("Assign: Privilege mismatch in assign function: chi_a does not match s_index for given c")
             registers[7] = HostStatus.HUH.value
             return CONTINUE, gas, registers, memory, context
 
@@ -169,13 +169,13 @@ class AccumulateFunctions(INVF):
         [o, l, g, m, f] = registers[7 : 7 + 5]
 
         if not (memory.is_accessible(o, 32) and l < 2**32 - 1):
-            logger.warning("Memory access violation in new function: inaccessible code_hash memory region or invalid length type")
+            pvm_trace.warning("Memory access violation in new function: inaccessible code_hash memory region or invalid length type")
             raise PvmError(PANIC)
 
         accounts: DeltaView = context.x.partial_state.service_accounts
 
         if f != 0 and context.x.s_index != context.x.partial_state.privileges.chi_m:
-            logger.warning("Privilege mismatch in new function: chi_m does not match s_index when gratis_offset is non-zero")
+            pvm_trace.warning("Privilege mismatch in new function: chi_m does not match s_index when gratis_offset is non-zero")
             registers[7] = HostStatus.HUH.value
             return CONTINUE, gas, registers, memory, context
 
@@ -294,11 +294,11 @@ class AccumulateFunctions(INVF):
         l = BlobLength(max(81, account.service.num_o) - 81)
         lookup_key = LookupTable(hash=ServiceCodeHash(code_hash), length=BlobLength(l))
         if account == None or account.service.code_hash != ServiceCodeHash(list(context.x.s_index.encode()) + [0] * 28):
-            logger.warning("Eject function called with mismatched code hash for service account")
+            pvm_trace.warning("Eject function called with mismatched code hash for service account")
             registers[7] = HostStatus.WHO.value
             return CONTINUE, gas, registers, memory, context
         elif account.service.num_i != 2 or account.lookup[lookup_key] is None:
-            logger.warning("Eject function called with invalid number of items or missing lookup entry for service account")
+            pvm_trace.warning("Eject function called with invalid number of items or missing lookup entry for service account")
             registers[7] = HostStatus.HUH.value
             return CONTINUE, gas, registers, memory, context
         elif (
@@ -314,7 +314,7 @@ class AccumulateFunctions(INVF):
             delta[context.x.s_index].service.balance += balance
             return CONTINUE, gas, registers, memory, context
         else:
-            logger.warning("Eject function called with invalid lookup entry or timestamp conditions not met for service account")
+            pvm_trace.warning("Eject function called with invalid lookup entry or timestamp conditions not met for service account")
             registers[7] = HostStatus.HUH.value
             return CONTINUE, gas, registers, memory, context
 
@@ -347,12 +347,7 @@ class AccumulateFunctions(INVF):
             registers[7] = 3 + 2**32 * lookup_value[0]
             registers[8] = lookup_value[1] + 2**32 * lookup_value[2]
         else:
-            logger.critical(
-                "Unexpected metadata",
-                service=context.x.s_index,
-                lookup=lookup_value,
-                lookup_key=lookup_key,
-            )
+            pvm_trace.error("Unexpected metadata: service=%s lookup=%s lookup_key=%s", context.x.s_index, lookup_value, lookup_key)
             raise PvmError(PANIC)
 
         return ExecutionStatus.CONTINUE, gas, registers, memory, context
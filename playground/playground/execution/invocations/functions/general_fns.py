@@ -1,6 +1,10 @@
-from typing import Any, Optional, List
+import os
+import struct
+from typing import Any, Dict, Optional, List
 
-from playground.log_setup import pvm_logger as logger, logger as jam_logger
+from logging import DEBUG, ERROR, INFO, WARNING
+
+from playground.execution.trace import pvm_trace, service_trace, short_hex
 from playground.execution.invocations.functions.protocol import (
     InvocationFunctions as INVF,
 )
@@ -59,11 +63,54 @@ from playground.utils.constants import (
     Y,
 )
 
+# Experimental batched storage calls. They are not part of the protocol, so
+# they are only dispatched when JAM_BATCH_STORAGE=1; otherwise guests get WHAT
+# and fall back to read (3) / write (4).
+READ_MANY = 200
+WRITE_MANY = 201
+BATCH_MAX_ITEMS = 1024
+# Charged per item on top of the call itself, the same as one read or write
+BATCH_ITEM_GAS = 10
+# One operation: key_ptr, key_len, value_ptr, value_len, result (u64 each)
+BATCH_OP = struct.Struct("<5Q")
+
+
+def batch_storage_enabled() -> bool:
+    return os.environ.get("JAM_BATCH_STORAGE", "0") == "1"
+
+
+def batch_storage_entries(service_data: AccountData, service_index: ServiceId, accounts: Any) -> Dict[int, Any]:
+    """Dispatch table entries for the batched storage calls, if enabled"""
+    if not batch_storage_enabled():
+        return {}
+    return {
+        READ_MANY: (
+            GeneralFunctions,
+            {"service_data": service_data, "service_index": service_index, "accounts": accounts},
+        ),
+        WRITE_MANY: (GeneralFunctions, {"service_data": service_data, "service_index": service_index}),
+    }
+
+
+def _read_batch(memory: Memory, ops: int, count: int) -> List[list]:
+    size = BATCH_OP.size * count
+    if not memory.is_accessible(ops, size, Accessibility.WRITE):
+        pvm_trace.error("Host call batch: memory not accessible for operations: ops_offset=%s count=%s", ops, count)
+        raise PvmError(PANIC)
+    data = bytes(memory.read(ops, size))
+    return [list(BATCH_OP.unpack_from(data, i * BATCH_OP.size)) for i in range(count)]
+
+
+def _write_batch(memory: Memory, ops: int, batch: List[list]) -> None:
+    memory.write(ops, b"".join(BATCH_OP.pack(*op) for op in batch))
+
+
 class GeneralFunctions(INVF):
     @staticmethod
     @INVF.register(0, gas_cost=10)
     def gas(gas: Gas, registers: list, memory: Memory, context: Context) -> DispatchReturn:
-        logger.debug("Host call: gas", extra={"gas_remaining": gas, "gas_value_returned": gas})
+        if pvm_trace.debug:
+            pvm_trace.log(DEBUG, "Host call: gas: remaining=%s", gas)
         registers[7] = gas
         return ExecutionStatus.CONTINUE, gas, registers, memory, context
 
@@ -83,11 +130,10 @@ class GeneralFunctions(INVF):
         o: Optional[OperandTuples],
         t: Optional[DeferredTransfers],
     ):
-        fetch_type = registers[10]
-
-        logger.info("Host call: fetch", fetch_type=fetch_type, item_index=item_index)
-
         w10 = registers[10]
+        if pvm_trace.debug:
+            pvm_trace.log(DEBUG, "Host call: fetch: fetch_type=%s item_index=%s", w10, item_index)
+
         w11 = registers[11]
         w12 = registers[12]
         v = None
@@ -127,13 +173,16 @@ class GeneralFunctions(INVF):
                 + U32(W_X).encode()
                 + U32(Y).encode()
             )
-            logger.debug("Fetch: returning system constants")
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Fetch: returning system constants")
         elif w10 == 1 and entropy is not None:
             v = entropy
-            logger.debug("Fetch: returning entropy")
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Fetch: returning entropy")
         elif w10 == 2 and trace is not None:
             v = trace
-            logger.debug("Fetch: returning trace")
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Fetch: returning trace")
         elif (
             w10 == 3
             and item_index is not None
@@ -141,10 +190,12 @@ class GeneralFunctions(INVF):
             and w12 < len(extrinsics[int(w11)])
         ):
             v = extrinsics[w11][int(w12)]
-            logger.debug("Fetch: returning extrinsic data", w11=w11, w12=w12)
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Fetch: returning extrinsic data: w11=%s w12=%s", w11, w12)
         elif w10 == 4 and item_index is not None and w11 < len(extrinsics[item_index]):
             v = extrinsics[item_index][w11]
-            logger.debug("Fetch: returning item extrinsic", item_index=item_index, w11=w11)
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Fetch: returning item extrinsic: item_index=%s w11=%s", item_index, w11)
         elif (
             w10 == 5
             and item_index is not None
@@ -152,10 +203,12 @@ class GeneralFunctions(INVF):
             and w12 < len(import_segments[w11])
         ):
             v = import_segments[w11][w12]
-            logger.debug("Fetch: returning import segment", w11=w11, w12=w12)
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Fetch: returning import segment: w11=%s w12=%s", w11, w12)
         elif w10 == 6 and item_index is not None and w11 < len(import_segments[item_index]):
             v = import_segments[item_index][w11]
-            logger.debug("Fetch: returning item import segment", item_index=item_index, w11=w11)
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Fetch: returning item import segment: item_index=%s w11=%s", item_index, w11)
         elif package is not None:
 
             def s_cap(w: WorkItem):
@@ -172,45 +225,57 @@ class GeneralFunctions(INVF):
 
             if w10 == 7:
                 v = package.encode()
-                logger.debug("Fetch: returning package data")
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning package data")
             elif w10 == 8:
                 v = package.authorizer.code_hash + package.authorizer.params.encode()
-                logger.debug("Fetch: returning authorizer data")
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning authorizer data")
             elif w10 == 9:
                 v = package.authorization
-                logger.debug("Fetch: returning authorization")
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning authorization")
             elif w10 == 10:
                 v = package.context.encode()
-                logger.debug("Fetch: returning context")
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning context")
             elif w10 == 11:
                 v = Uint(len(package.items)).encode()
                 for item in package.items:
                     v += s_cap(item)
-                logger.debug("Fetch: returning all item summaries", item_count=len(package.items))
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning all item summaries: item_count=%s", len(package.items))
             elif w10 == 12 and w11 < len(package.items):
                 v = s_cap(package.items[w11])
-                logger.debug("Fetch: returning item summary", item_index=w11)
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning item summary: item_index=%s", w11)
             elif w10 == 13 and w11 < len(package.items):
                 v = package.items[w11].payload
-                logger.debug("Fetch: returning item payload", item_index=w11)
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning item payload: item_index=%s", w11)
         elif o is not None:
             if w10 == 14:
                 v = o.encode()
-                logger.debug("Fetch: returning o data")
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning o data")
             elif w10 == 15 and w11 < len(o):
                 v = o[w11].encode()
-                logger.debug("Fetch: returning o item", index=w11)
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning o item: index=%s", w11)
         elif t is not None:
             if w10 == 16:
                 v = t.encode()
-                logger.debug("Fetch: returning t data")
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning t data")
             elif w10 == 17 and w11 < len(t):
                 v = t[w11].encode()
-                logger.debug("Fetch: returning t item", index=w11)
+                if pvm_trace.debug:
+                    pvm_trace.log(DEBUG, "Fetch: returning t item: index=%s", w11)
 
         if v is None:
             registers[7] = HostStatus.NONE.value
-            logger.debug("Fetch: no data found for request", fetch_type=w10)
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Fetch: no data found for request: fetch_type=%s", w10)
             return CONTINUE, gas, registers, memory, context
 
         memory_start = int(registers[7])
@@ -218,22 +283,14 @@ class GeneralFunctions(INVF):
         l = min(int(registers[9]), len(v) - f)
 
         if not memory.is_accessible(memory_start, l, Accessibility.WRITE):
-            logger.error(
-                "Fetch: memory not accessible for write",
-                memory_start=memory_start,
-                required_size=l,
-            )
+            pvm_trace.error("Fetch: memory not accessible for write: memory_start=%s required_size=%s", memory_start, l)
             raise PvmError(PANIC)
 
         registers[7] = len(v)
         memory.write(memory_start, v[f : f + l])
 
-        logger.debug(
-            "Fetch: data written to memory",
-            memory_start=memory_start,
-            data_length=len(v),
-            written_length=l,
-        )
+        if pvm_trace.debug:
+            pvm_trace.log(DEBUG, "Fetch: data written to memory: memory_start=%s data_length=%s written_length=%s", memory_start, len(v), l)
 
         return CONTINUE, gas, registers, memory, context
 
@@ -253,13 +310,8 @@ class GeneralFunctions(INVF):
         hash_addr = registers[8]
         output_addr = registers[9]
 
-        logger.debug(
-            "Host call: lookup",
-            lookup_key=lookup_key,
-            hash_addr=hash_addr,
-            output_addr=output_addr,
-            service_index=int(service_index),
-        )
+        if pvm_trace.debug:
+            pvm_trace.log(DEBUG, "Host call: lookup: lookup_key=%s hash_addr=%s output_addr=%s service_index=%s", lookup_key, hash_addr, output_addr, int(service_index))
 
         a: None | AccountData = None
         if service_index == lookup_key or lookup_key == 2**64 - 1:
@@ -269,10 +321,7 @@ class GeneralFunctions(INVF):
         
         # Must be able to read the 32-byte hash_addr
         if not memory.is_accessible(hash_addr, 32):
-            logger.error(
-                "Host call lookup: memory not accessible to read preimage key",
-                hash_addr=hash_addr
-            )
+            pvm_trace.error("Host call lookup: memory not accessible to read preimage key: hash_addr=%s", hash_addr)
             raise PvmError(PANIC)
 
         hash_key = OpaqueHash(memory.read(int(hash_addr), 32))
@@ -280,35 +329,25 @@ class GeneralFunctions(INVF):
             # Directly get data
             v = a.preimages[hash_key]
             if not v:
-                logger.error("Failed key check")
+                pvm_trace.error("Failed key check")
                 raise PvmError(PANIC)
 
             f = min(registers[10], len(v))
             l = min(registers[11], len(v) - f)
 
             if not memory.is_accessible(output_addr, l, Accessibility.WRITE):
-                logger.error(
-                    "Host call lookup: memory not accessible for output",
-                    output_addr=output_addr,
-                    required_size=l,
-                )
+                pvm_trace.error("Host call lookup: memory not accessible for output: output_addr=%s required_size=%s", output_addr, l)
                 raise PvmError(PANIC)
 
             registers[7] = len(v)
             memory.write(output_addr, v[f:f+l])
-            logger.debug(
-                "Host call lookup: value found",
-                lookup_key=lookup_key,
-                value_length=len(v),
-                returned_length=l,
-            )
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Host call lookup: value found: lookup_key=%s value_length=%s returned_length=%s", lookup_key, len(v), l)
             return CONTINUE, gas, registers, memory, context
         else:
             registers[7] = HostStatus.NONE.value
-            logger.debug(
-                "Host call lookup: account or preimage",
-                lookup_key=lookup_key,
-            )
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Host call lookup: account or preimage: lookup_key=%s", lookup_key)
             return CONTINUE, gas, registers, memory, context
 
     @staticmethod
@@ -336,10 +375,7 @@ class GeneralFunctions(INVF):
         key_start, key_len, o = registers[8 : 8 + 3]
 
         if not memory.is_accessible(key_start, key_len):
-            logger.error(
-                "Host call read: memory not accessible for key",
-                extra={"key_offset": key_start, "key_size": key_len},
-            )
+            pvm_trace.error("Host call read: memory not accessible for key: key_offset=%s key_size=%s", key_start, key_len)
             raise PvmError(PANIC)
 
         value: None | Bytes = None
@@ -355,13 +391,8 @@ class GeneralFunctions(INVF):
             start = min(int(registers[11]), len(value))
             length = min(int(registers[12]), len(value) - start)
 
-            print("o", o, length, memory.is_accessible(o, length, Accessibility.READ))
-
             if not memory.is_accessible(o, length, Accessibility.WRITE):
-                logger.error(
-                    "Host call write: memory not accessible for output",
-                    extra={"output_offset": o, "required_size": length},
-                )
+                pvm_trace.error("Host call write: memory not accessible for output: output_offset=%s required_size=%s", o, length)
                 raise PvmError(PANIC)
             registers[7] = Register(len(value))
             memory.write(o, value[start : start + length])
@@ -381,48 +412,130 @@ class GeneralFunctions(INVF):
         [ko, kz, vo, vz] = registers[7 : 7 + 4]
 
         if not memory.is_accessible(ko, kz):
-            logger.error(
-                "Host call write: memory not accessible for key",
-                extra={"key_offset": ko, "key_size": kz},
-            )
+            pvm_trace.error("Host call write: memory not accessible for key: key_offset=%s key_size=%s", ko, kz)
             raise PvmError(PANIC)
 
-    
-        # TODO: Handle out of balance using temp caches
-        # from jam.state.state import state
-        # state.store.save_n_clear_cache()
-
-        k = Bytes(memory.read(ko, kz))
-        
-        a = service_data.storage
-
-        curr_value = a.get(k)
-        storage_len = len(curr_value) if curr_value else HostStatus.NONE.value
+        key = bytes(memory.read(ko, kz))
         if vz == 0:
-            a.__delitem__(k)
-            logger.debug("Host call write: storage key deleted", extra={"storage_key": k.hex()[:16] + "..."})
+            value = b""
         elif memory.is_accessible(vo, vz, Accessibility.READ):
-            pre_data = a.get(k)  # Use get() to avoid KeyError
-            a[k] = Bytes(memory.read(vo, vz))
-            if service_data.service.t > service_data.service.balance:
-                # state.store.clear()
-                registers[7] = HostStatus.FULL.value
-                if pre_data is None:
-                    del a[k]
-                else:
-                    a[k] = pre_data
-                logger.warning("Host call write: storage full", extra={"storage_key": k.hex()[:16] + "..."})
-                return CONTINUE, gas, registers, memory, context
+            value = bytes(memory.read(vo, vz))
         else:
-            logger.error(
-                "Host call write: memory not accessible for value",
-                extra={"value_offset": vo, "value_size": vz},
-            )
+            pvm_trace.error("Host call write: memory not accessible for value: value_offset=%s value_size=%s", vo, vz)
             raise PvmError(PANIC)
 
+        # Footprint and threshold balance are updated in O(1) from the replaced value
+        ok, previous = service_data.write_storage(key, value)
+        if not ok:
+            registers[7] = HostStatus.FULL.value
+            pvm_trace.warning("Host call write: storage full: storage_key=%s", short_hex(key))
+            return CONTINUE, gas, registers, memory, context
+        if pvm_trace.debug:
+            pvm_trace.log(DEBUG, "Host call write: storage_key=%s value_size=%s", short_hex(key), vz)
+
+        storage_len = len(previous) if previous is not None else HostStatus.NONE.value
         registers[7] = storage_len
         return CONTINUE, gas, registers, memory, context
 
+    @staticmethod
+    @INVF.register(READ_MANY, gas_cost=10)
+    def read_many(
+        gas: Gas,
+        registers: list,
+        memory: Memory,
+        context: Optional[Any],
+        service_data: AccountData,
+        service_index: ServiceId,
+        accounts: Delta,
+    ):
+        """`read` for each operation in a batch, writing each result into its operation"""
+        service_key, ops, count = registers[7 : 7 + 3]
+        if count > BATCH_MAX_ITEMS:
+            registers[7] = HostStatus.OOB.value
+            return CONTINUE, gas, registers, memory, context
+        gas -= BATCH_ITEM_GAS * count
+        if gas < 0:
+            return CONTINUE, gas, registers, memory, context
+
+        if service_key == 2**64 - 1:
+            service_key = service_index
+        a: None | AccountData = None
+        if service_key == service_index:
+            a = service_data
+        elif service_key in accounts:
+            a = accounts[service_key]
+
+        batch = _read_batch(memory, ops, count)
+        keys = []
+        for ko, kz, _, _, _ in batch:
+            if not memory.is_accessible(ko, kz):
+                pvm_trace.error("Host call read_many: memory not accessible for key: key_offset=%s key_size=%s", ko, kz)
+                raise PvmError(PANIC)
+            keys.append(memory.read(ko, kz))
+        values = a.storage.get_many(keys) if a is not None else [None] * count
+
+        for op, value in zip(batch, values):
+            if value is None or len(value) == 0:
+                op[4] = HostStatus.NONE.value
+                continue
+            length = min(op[3], len(value))
+            if not memory.is_accessible(op[2], length, Accessibility.WRITE):
+                pvm_trace.error("Host call read_many: memory not accessible for output: output_offset=%s required_size=%s", op[2], length)
+                raise PvmError(PANIC)
+            memory.write(op[2], value[:length])
+            op[4] = len(value)
+        _write_batch(memory, ops, batch)
+
+        if pvm_trace.debug:
+            pvm_trace.log(DEBUG, "Host call read_many: service=%s items=%s", service_key, count)
+        registers[7] = count
+        return CONTINUE, gas, registers, memory, context
+
+    @staticmethod
+    @INVF.register(WRITE_MANY, gas_cost=10)
+    def write_many(
+        gas: Gas,
+        registers: list,
+        memory: Memory,
+        context: Optional[Any],
+        service_data: AccountData,
+        service_index: ServiceId,
+    ):
+        """
+        `write` for each operation in a batch, in order. Every key and value is
+        read before anything is stored, so a panic leaves storage untouched.
+        """
+        ops, count = registers[7 : 7 + 2]
+        if count > BATCH_MAX_ITEMS:
+            registers[7] = HostStatus.OOB.value
+            return CONTINUE, gas, registers, memory, context
+        gas -= BATCH_ITEM_GAS * count
+        if gas < 0:
+            return CONTINUE, gas, registers, memory, context
+
+        batch = _read_batch(memory, ops, count)
+        items = []
+        for ko, kz, vo, vz, _ in batch:
+            if not memory.is_accessible(ko, kz):
+                pvm_trace.error("Host call write_many: memory not accessible for key: key_offset=%s key_size=%s", ko, kz)
+                raise PvmError(PANIC)
+            if vz and not memory.is_accessible(vo, vz, Accessibility.READ):
+                pvm_trace.error("Host call write_many: memory not accessible for value: value_offset=%s value_size=%s", vo, vz)
+                raise PvmError(PANIC)
+            items.append((bytes(memory.read(ko, kz)), bytes(memory.read(vo, vz)) if vz else b""))
+
+        for op, (ok, previous) in zip(batch, service_data.write_storage_many(items)):
+            if not ok:
+                op[4] = HostStatus.FULL.value
+            else:
+                op[4] = len(previous) if previous is not None else HostStatus.NONE.value
+        _write_batch(memory, ops, batch)
+
+        if pvm_trace.debug:
+            pvm_trace.log(DEBUG, "Host call write_many: items=%s", count)
+        registers[7] = count
+        return CONTINUE, gas, registers, memory, context
+
     @staticmethod
     @INVF.register(host_call=5, gas_cost=10)
     def info(
@@ -436,21 +549,16 @@ class GeneralFunctions(INVF):
         target_service = registers[7]
         output_offset = registers[8]
 
-        logger.debug(
-            "Host call: info",
-            extra={
-                "target_service": target_service,
-                "output_offset": output_offset,
-                "service_index": int(service_index),
-            }
-        )
+        if pvm_trace.debug:
+            pvm_trace.log(DEBUG, "Host call: info: target_service=%s output_offset=%s service_index=%s", target_service, output_offset, int(service_index))
 
         if target_service == 2**64 - 1:
             target_service = service_index
             
         if target_service not in accounts:
             registers[7] = HostStatus.NONE.value
-            logger.debug("Host call info: service not found", extra={"target_service": target_service})
+            if pvm_trace.debug:
+                pvm_trace.log(DEBUG, "Host call info: service not found: target_service=%s", target_service)
             return CONTINUE, gas, registers, memory, context
 
         acc: AccountData = accounts[target_service]
@@ -471,15 +579,13 @@ class GeneralFunctions(INVF):
         l = min(registers[10], len(v) - f)
 
         if not memory.is_accessible(output_offset, l, Accessibility.WRITE):
-            logger.error("Host call info: memory not accessible", extra={"output_offset": output_offset, "required_size": len(v)})
+            pvm_trace.error("Host call info: memory not accessible: output_offset=%s required_size=%s", output_offset, len(v))
             raise PvmError(PANIC)
         
         registers[7] = len(v)
         memory.write(output_offset, v[f:f+l])
-        logger.debug(
-            "Host call info: service info written",
-            extra={"target_service": target_service, "info_size": len(v)},
-        )
+        if pvm_trace.debug:
+            pvm_trace.log(DEBUG, "Host call info: service info written: target_service=%s info_size=%s", target_service, len(v))
 
         return CONTINUE, gas, registers, memory, context
 
@@ -507,51 +613,26 @@ class GeneralFunctions(INVF):
 
         # Validate memory accessibility for message
         if not memory.is_accessible(message_start, message_length):
-            # logger.error(
-            #     "Host call log: memory not accessible for message",
-            #     message_start=message_start,
-            #     message_length=message_length,
-            # )
             raise PvmError(PANIC)
 
         if target_length != 0 or target_start != 0:
             if not memory.is_accessible(target_start, target_length):
-                # logger.error(
-                #     "Host call log: memory not accessible for target",
-                #     target_start=target_start,
-                #     target_length=target_length,
-                # )
                 raise PvmError(PANIC)
+
+        # Service log levels: 0 error, 1 warning, 2 info, 3+ debug
+        log_level = (ERROR, WARNING, INFO)[level] if level < 3 else DEBUG
+        if not service_trace.enabled_for(log_level):
+            return CONTINUE, gas, registers, memory, context
+
+        if target_length != 0 or target_start != 0:
             target_bytes = memory.read(int(target_start), int(target_length))
-            try:
-                target_str = target_bytes.decode("utf-8", errors="replace")
-            except Exception:
-                target_str = target_bytes.hex()
+            target_str = target_bytes.decode("utf-8", errors="replace")
         else:
             target_str = None
 
         message_bytes = memory.read(message_start, message_length)
-        try:
-            message_str = message_bytes.decode("utf-8", errors="replace")
-        except Exception:
-            message_str = message_bytes.hex()
-
-        log_kwargs = {
-            "target": target_str,
-            "level": int(level),
-            "core_index": core_index,
-            "service_id": service_id,
-        }
-
-        # Load the default logger
-        # jam_logger = logger
-        if int(level) == 0:
-            jam_logger.error(message_str, extra=log_kwargs)
-        elif int(level) == 1:
-            jam_logger.warning(message_str, extra=log_kwargs)
-        elif int(level) == 2:
-            jam_logger.info(message_str, extra=log_kwargs)
-        else:
-            jam_logger.debug(message_str, extra=log_kwargs)
+        message_str = message_bytes.decode("utf-8", errors="replace")
+
+        service_trace.log(log_level, "%s%s", f"{target_str}: " if target_str else "", message_str)
 
         return CONTINUE, gas, registers, memory, context
@@ -5,17 +5,14 @@ from playground.execution.invocations.functions.protocol import (
     InvocationFunctions as INVF,
 )
 
-import os
-
-# Pre-compute PVM mode imports to avoid dynamic imports during execution
-_PVM_MODE = os.environ.get("PVM_MODE", "interpreter")
-if _PVM_MODE == "recompiler":
-    from tsrkit_pvm import REC_Memory as Memory, REC_Program as Program, Recompiler as PVM
-else:
-    from tsrkit_pvm import INT_Memory as Memory, INT_Program as Program, Interpreter as PVM
-
+from collections import OrderedDict
+import threading
 
 from tsrkit_pvm import (
+    Memory,
+    Program,
+    Engine,
+    engine_of,
     Accessibility,
     PANIC,
     CONTINUE,
@@ -34,6 +31,29 @@ class IntegratedPVM:
     program_code: bytes
     memory: Memory
     instruction_counter: ProgramCounter
+    program: Program = None
+
+
+# Decoded inner programs keyed by engine and blob, so services that spawn the
+# same sub-program repeatedly decode it once and keep the engine's block cache warm
+_PROGRAM_CACHE_SIZE = 32
+_programs: "OrderedDict[tuple, Program]" = OrderedDict()
+_programs_lock = threading.Lock()
+
+
+def _decode_program(engine: Engine, code: bytes) -> Program:
+    key = (engine.name, code)
+    with _programs_lock:
+        program = _programs.get(key)
+        if program is not None:
+            _programs.move_to_end(key)
+            return program
+    program = engine.decode(code)
+    with _programs_lock:
+        _programs[key] = program
+        if len(_programs) > _PROGRAM_CACHE_SIZE:
+            _programs.popitem(last=False)
+    return program
 
 
 class RefinementMap(Dictionary[Uint, IntegratedPVM]):
@@ -95,7 +115,7 @@ class RefineFunctions(INVF):
 
         # Two-phase contract: if o==0, it's a size probe — don't write, just return total length.
         if o != 0 and l > 0:
-            if not memory.is_accessible(o, l, True):
+            if not memory.is_accessible(o, l, Accessibility.WRITE):
                 raise PvmError(PANIC)
             memory.write(o, v[f:f + l])
 
@@ -114,7 +134,7 @@ class RefineFunctions(INVF):
     ):
         p = registers[7]
         z = min(registers[8], SEGMENT_SIZE)
-        if memory.is_accessible(address=p, length=z, for_write=True): #TODO: need to change to readable only
+        if memory.is_accessible(address=p, length=z, access=Accessibility.WRITE): #TODO: need to change to readable only
             # Mocking Utils.zero_padding
             val = ByteArray(memory.read(address=p, length=z))
             if len(val) < SEGMENT_SIZE:
@@ -145,24 +165,28 @@ class RefineFunctions(INVF):
         while n in context.m:
             n += 1
 
-        u = Memory()
+        # Inner machines run on the same engine as the calling program
+        engine = engine_of(memory)
         try:
-            Program.decode_from(p)
-            # TODO: Updating the commitment map, need to see how the dict is appended
-            context.m[n] = IntegratedPVM(
-                program_code=p, memory=u, instruction_counter=i
-            )
-            registers[7] = n
-            return CONTINUE, gas, registers, memory, context
-        except:
+            program = _decode_program(engine, bytes(p))
+        except Exception:
             registers[7] = HostStatus.HUH.value
-            return CONTINUE, gas, registers, context, context
+            return CONTINUE, gas, registers, memory, context
+
+        context.m[n] = IntegratedPVM(
+            program_code=p,
+            memory=engine.new_memory(program),
+            instruction_counter=i,
+            program=program,
+        )
+        registers[7] = n
+        return CONTINUE, gas, registers, memory, context
 
     @staticmethod
     @INVF.register(9, gas_cost=10)
     def peek(gas: Gas, registers: list, memory: Memory, context: RefineContext):
         [n, o, s, z] = registers[7:11]
-        if not memory.is_accessible(o, z, True):
+        if not memory.is_accessible(o, z, Accessibility.WRITE):
             raise PvmError(PANIC)
         elif n not in context.m:
             registers[7] = HostStatus.WHO.value
@@ -185,7 +209,7 @@ class RefineFunctions(INVF):
         elif n not in context.m:
             registers[7] = HostStatus.WHO.value
             return CONTINUE, gas, registers, memory,context
-        elif not context.m[n].memory.is_accessible(o, z, True):
+        elif not context.m[n].memory.is_accessible(o, z, Accessibility.WRITE):
             registers[7] = HostStatus.OOB.value
             return CONTINUE, gas, registers, memory,context
         else:
@@ -230,7 +254,7 @@ class RefineFunctions(INVF):
     @INVF.register(12, gas_cost=10)
     def invoke(gas: Gas, registers: list, memory: Memory, context: RefineContext):
         [n, o] = registers[7:9]
-        if not memory.is_accessible(o, 112, True):
+        if not memory.is_accessible(o, 112, Accessibility.WRITE):
             raise PvmError(PANIC)
         if n not in context.m:
             registers[7] = HostStatus.WHO.value
@@ -238,38 +262,30 @@ class RefineFunctions(INVF):
         m_bytes = memory.read(o, 112)
         # bytes->14size array of 8elements each 0->gas(g) 1-13->register_data(w)
         m_array = [m_bytes[i : i + 8] for i in range(0, len(m_bytes), 8)]
-        g, _ = U64.decode_from(bytes(m_array[0]))
+        g = int.from_bytes(m_array[0], "little")
         # TODO: Concat fix: https://github.com/gavofyork/graypaper/pull/438/files#diff-41f3b6a0435c4f16eceda600672b2e6a38411745d9f0277a9bffdf25911d5287
-        w = [U64.decode_from(bytes(m_array[i]))[0] for i in range(1, 14)]
-        [c, i_dash, g_dash, w_dash, u_dash] = PVM.execute(
-            context.m[n].program_code,
-            context.m[n].instruction_counter,
+        w = [int.from_bytes(m_array[i], "little") for i in range(1, 14)]
+        inner = context.m[n]
+        engine = engine_of(inner.memory)
+        if inner.program is None:
+            inner.program = _decode_program(engine, bytes(inner.program_code))
+        [c, i_dash, g_dash, w_dash, u_dash] = engine.execute(
+            inner.program,
+            inner.instruction_counter,
             g,
             w,
-            context.m[n].memory,
+            inner.memory,
+        )
+        memory.write(
+            o, U64(max(int(g_dash), 0)).encode() + b"".join(U64(r).encode() for r in w_dash)
         )
-        memory.write(o, g_dash.encode() + w_dash.encode())
-        context.m[n].memory = u_dash
-        if c == ExecutionStatus.HOST:
-            context.m[n].instruction_counter = i_dash + 1
-            registers[7] = U64(ExecutionStatus.HOST)  # NOTE: Saving the ExecValu on register[7]
+        inner.memory = u_dash
+        # Engines report the instruction after an ecall, the same pc PsiH resumes from
+        inner.instruction_counter = i_dash
+        registers[7] = c.value.code
+        if c in (ExecutionStatus.HOST, ExecutionStatus.PAGE_FAULT):
             registers[8] = c.value.register
-            return CONTINUE, gas, registers, memory, context
-        else:
-            context.m[n].instruction_counter = i_dash
-            if c == ExecutionStatus.PAGE_FAULT:
-                registers[7] = U64(ExecutionStatus.PAGE_FAULT)
-                registers[8] = c.value.register
-                return CONTINUE, gas, registers, memory, context
-            elif c == ExecutionStatus.OUT_OF_GAS:
-                registers[7] = U64(ExecutionStatus.OUT_OF_GAS)
-                return CONTINUE, gas, registers, memory, context
-            elif c == ExecutionStatus.PANIC:
-                registers[7] = U64(ExecutionStatus.PANIC)
-                return CONTINUE, gas, registers, memory, context
-            elif c == ExecutionStatus.HALT:
-                registers[7] = U64(ExecutionStatus.HALT)
-                return CONTINUE, gas, registers, memory, context
+        return CONTINUE, gas, registers, memory, context
 
     @staticmethod
     @INVF.register(13, gas_cost=10)
@@ -1,7 +1,7 @@
 from typing import Tuple
 from tsrkit_types import Uint
 from playground.execution.invocations.arg_invoke import PsiM
-from playground.execution.invocations.functions.general_fns import GeneralFunctions
+from playground.execution.invocations.functions.general_fns import GeneralFunctions, batch_storage_entries
 from playground.execution.invocations.protocol import InvocationProtocol
 from playground.execution.utils import decode_code_hash
 from jam.state.accounts import DeltaView
@@ -62,6 +62,7 @@ class PsiT(InvocationProtocol):
                 GeneralFunctions,
                 {"core_index": 0, "service_id": self.service_id},
             ),  # log
+            **batch_storage_entries(self.delta[self.service_id], self.service_id, self.delta),
         }
 
     def execute(self) -> Tuple[AccountData, Gas]:
@@ -1,6 +1,7 @@
+from logging import DEBUG
 from typing import Any, Callable, Dict, Protocol, Tuple
 
-# from jam.log_setup import pvm_logger as logger
+from playground.execution.trace import pvm_trace
 from playground.execution.invocations.functions.protocol import InvocationFunctions
 from tsrkit_pvm import (
     ExecutionStatus,
@@ -17,6 +18,9 @@ DispatchFunction = Callable[[Register, Gas, list, MemoryLike, Context], Dispatch
 
 InvocationInfo = Tuple[InvocationFunctions, Tuple]
 
+# Trace message for each host call, with the gas left when it was made
+HOST_CALL = "Host call %s, gas %s"
+
 
 class InvocationProtocol(Protocol):
     table: Dict[int, InvocationInfo]
@@ -28,7 +32,8 @@ class InvocationProtocol(Protocol):
     def dispatch(
         self, host_call: int, gas: int, registers: list, memory: MemoryLike, x: Context
     ) -> DispatchReturn:
-        print("HOST", host_call)
+        if pvm_trace.debug:
+            pvm_trace.log(DEBUG, HOST_CALL, host_call, gas)
         table_entry = self.table.get(host_call)
         if table_entry is None:
             registers[7] = HostStatus.WHAT.value
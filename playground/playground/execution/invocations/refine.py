@@ -2,7 +2,7 @@ from typing import Tuple
 
 from tsrkit_types import Bytes, Null
 import time 
-from playground.execution.invocations.functions.general_fns import GeneralFunctions
+from playground.execution.invocations.functions.general_fns import GeneralFunctions, batch_storage_entries
 from playground.execution.invocations.arg_invoke import PsiM
 from playground.execution.invocations.functions.refine_fns import (
     RefineFunctions,
@@ -99,6 +99,7 @@ class PsiR(InvocationProtocol):
                 GeneralFunctions,
                 {"core_index": 0, "service_id": self.wi.service},
             ),  # log
+            **batch_storage_entries(service_data, self.wi.service, state.delta),
         }
 
     def execute(self) -> Tuple[WorkExecResult, Segments, Gas]:
@@ -0,0 +1,171 @@
+"""
+Tracing for the execution hot path.
+
+Host functions run once per host call, so they must not pay for log records
+nobody reads. A Tracer wraps a stdlib logger and exposes its level checks as
+plain attributes, recomputed once per invocation instead of on every call:
+
+    if pvm_trace.debug:
+        pvm_trace.log(DEBUG, "Host call write: key %s", short_hex(k))
+
+Arguments are only formatted when a handler emits the record, or when a
+captured trace is read back. `capture()` attaches a ring buffer that keeps the
+last events of an invocation without going through logging handlers at all,
+and can hand each event to a listener as it happens, e.g. to stream it.
+
+Setting JAM_TRACE=0 compiles tracing out: every guard is constant False and
+warning/error calls return immediately.
+"""
+import logging
+import os
+from collections import deque
+from contextlib import contextmanager
+from logging import DEBUG, ERROR, INFO, WARNING
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from playground.log_setup import logger as jam_logger, pvm_logger
+
+"""False when tracing is compiled out with JAM_TRACE=0"""
+TRACING = os.environ.get("JAM_TRACE", "1") != "0"
+
+"""Number of events kept by a trace sink unless told otherwise"""
+DEFAULT_CAPACITY = 4096
+
+TraceEvent = Tuple[str, int, str, tuple]
+TraceListener = Callable[[TraceEvent], None]
+
+
+class short_hex:
+    """Lazily formatted hex prefix of a byte string"""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, data: bytes, size: int = 8):
+        self.data = data
+        self.size = size
+
+    def __str__(self) -> str:
+        data = bytes(self.data)
+        if len(data) <= self.size:
+            return data.hex()
+        return data[: self.size].hex() + "..."
+
+
+class TraceSink:
+    """Ring buffer of unformatted trace events for one invocation"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, level: int = DEBUG, listener: Optional[TraceListener] = None):
+        self.events: deque = deque(maxlen=capacity)
+        self.level = level
+        self.listener = listener
+        self.total = 0
+
+    def record(self, name: str, level: int, msg: str, args: tuple):
+        event = (name, level, msg, args)
+        self.events.append(event)
+        self.total += 1
+        if self.listener is not None:
+            self.listener(event)
+
+    @property
+    def dropped(self) -> int:
+        """Events pushed out of the buffer by newer ones"""
+        return self.total - len(self.events)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[TraceEvent]:
+        return iter(self.events)
+
+    def lines(self) -> List[str]:
+        """Formatted events, oldest first"""
+        out = []
+        if self.dropped:
+            out.append(f"... {self.dropped} earlier events dropped")
+        for name, level, msg, args in self.events:
+            text = msg % args if args else msg
+            out.append(f"{logging.getLevelName(level)}:{name}: {text}")
+        return out
+
+    def text(self) -> str:
+        return "\n".join(self.lines())
+
+
+class Tracer:
+    """Logger facade with level checks hoisted into attributes"""
+
+    __slots__ = ("logger", "sink", "debug", "info")
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+        self.sink: Optional[TraceSink] = None
+        self.debug = False
+        self.info = False
+        self.refresh()
+
+    def enabled_for(self, level: int) -> bool:
+        if not TRACING:
+            return False
+        if self.sink is not None and level >= self.sink.level:
+            return True
+        return self.logger.isEnabledFor(level)
+
+    def refresh(self):
+        """Re-read logger levels, call when an invocation starts"""
+        self.debug = self.enabled_for(DEBUG)
+        self.info = self.enabled_for(INFO)
+
+    def log(self, level: int, msg: str, *args):
+        """Record an event; callers on hot paths guard this with `debug`/`info`"""
+        sink = self.sink
+        if sink is not None and level >= sink.level:
+            sink.record(self.logger.name, level, msg, args)
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, msg, *args, stacklevel=2)
+
+    def warning(self, msg: str, *args):
+        if TRACING:
+            self.log(WARNING, msg, *args)
+
+    def error(self, msg: str, *args):
+        if TRACING:
+            self.log(ERROR, msg, *args)
+
+
+"""Tracer for PVM and host-call events"""
+pvm_trace = Tracer(pvm_logger)
+
+"""Tracer for messages logged by services through the log host call"""
+service_trace = Tracer(jam_logger)
+
+_TRACERS = (pvm_trace, service_trace)
+
+
+def refresh():
+    """Re-read logger levels for all tracers"""
+    for tracer in _TRACERS:
+        tracer.refresh()
+
+
+@contextmanager
+def capture(
+    capacity: int = DEFAULT_CAPACITY, level: int = DEBUG, listener: Optional[TraceListener] = None
+) -> Iterator[TraceSink]:
+    """
+    Keep the last `capacity` events at or above `level` in a ring buffer, and
+    pass each one to `listener` as it is recorded.
+
+    Nothing is captured when tracing is compiled out.
+    """
+    sink = TraceSink(capacity, level, listener)
+    previous = [tracer.sink for tracer in _TRACERS]
+    for tracer in _TRACERS:
+        tracer.sink = sink
+    refresh()
+    try:
+        yield sink
+    finally:
+        for tracer, prev in zip(_TRACERS, previous):
+            tracer.sink = prev
+        refresh()
@@ -13,16 +13,25 @@ Ed25519Signature = Bytes[64]
 BandersnatchVrfSignature = Bytes[96]
 BandersnatchRingVrfSignature = Bytes[784]
 
+from collections import OrderedDict
 from hashlib import blake2b, sha256, sha512, sha3_256
+from typing import Iterable, List
 import os
 
 # Hash functions
 class Hash:
     """Cryptographic hash functions that produce 32-byte outputs"""
 
-    # cache for hash results to avoid recomputation
-    _blake2b_cache = {}
-    _cache_max_size = 1000
+    # LRU cache of 32-byte blake2b results, keyed on the input bytes
+    _blake2b_cache: "OrderedDict[bytes, Bytes]" = OrderedDict()
+    # Budget for cached inputs + digests, in bytes
+    _cache_max_bytes = int(os.environ.get("JAM_HASH_CACHE_BYTES", 4 * 1024 * 1024))
+    # Inputs larger than this are hashed but never cached (program blobs, segments, ...)
+    _cache_max_input = int(os.environ.get("JAM_HASH_CACHE_MAX_INPUT", 1024))
+    _cache_bytes = 0
+    _cache_hits = 0
+    _cache_misses = 0
+    _cache_skipped = 0
 
     @staticmethod
     def blake2b(data: bytes, digest_size: int = 32) -> Bytes[32]:
@@ -31,29 +40,82 @@ class Hash:
         if not isinstance(data, bytes):
             data = bytes(data)
 
-        # Use cache for common case (32-byte digest)
-        if digest_size == 32:
-            if data in Hash._blake2b_cache:
-                return Hash._blake2b_cache[data]
-
-            result = Bytes[32](blake2b(data, digest_size=digest_size).digest())
+        if digest_size != 32:
+            return Bytes[32](blake2b(data, digest_size=digest_size).digest())
 
-            # Simple cache eviction when full
-            if len(Hash._blake2b_cache) >= Hash._cache_max_size:
-                # Remove oldest 20% of entries
-                items_to_remove = Hash._cache_max_size // 5
-                for _ in range(items_to_remove):
-                    Hash._blake2b_cache.pop(next(iter(Hash._blake2b_cache)))
+        if len(data) > Hash._cache_max_input:
+            Hash._cache_skipped += 1
+            return Bytes[32](blake2b(data, digest_size=32).digest())
 
-            Hash._blake2b_cache[data] = result
+        cache = Hash._blake2b_cache
+        result = cache.get(data)
+        if result is not None:
+            cache.move_to_end(data)
+            Hash._cache_hits += 1
             return result
-        else:
-            return Bytes[32](blake2b(data, digest_size=digest_size).digest())
+
+        Hash._cache_misses += 1
+        result = Bytes[32](blake2b(data, digest_size=32).digest())
+        cache[data] = result
+        Hash._cache_bytes += len(data) + 32
+        while Hash._cache_bytes > Hash._cache_max_bytes and cache:
+            evicted, _ = cache.popitem(last=False)
+            Hash._cache_bytes -= len(evicted) + 32
+        return result
+
+    @staticmethod
+    def blake2b_many(items: Iterable[bytes]) -> List[Bytes[32]]:
+        """32-byte blake2b of each item, e.g. a list of segments or work items"""
+        max_input = Hash._cache_max_input
+        out = []
+        for data in items:
+            if not isinstance(data, bytes):
+                data = bytes(data)
+            if len(data) > max_input:
+                Hash._cache_skipped += 1
+                out.append(Bytes[32](blake2b(data, digest_size=32).digest()))
+            else:
+                out.append(Hash.blake2b(data))
+        return out
+
+    @staticmethod
+    def configure_cache(max_bytes: int | None = None, max_input_size: int | None = None):
+        """Resize the blake2b cache, evicting least recently used entries if needed"""
+        if max_bytes is not None:
+            Hash._cache_max_bytes = max_bytes
+        if max_input_size is not None:
+            Hash._cache_max_input = max_input_size
+        cache = Hash._blake2b_cache
+        for data in [k for k in cache if len(k) > Hash._cache_max_input]:
+            del cache[data]
+            Hash._cache_bytes -= len(data) + 32
+        while Hash._cache_bytes > Hash._cache_max_bytes and cache:
+            evicted, _ = cache.popitem(last=False)
+            Hash._cache_bytes -= len(evicted) + 32
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """blake2b cache statistics"""
+        lookups = Hash._cache_hits + Hash._cache_misses
+        return {
+            "entries": len(Hash._blake2b_cache),
+            "bytes": Hash._cache_bytes,
+            "max_bytes": Hash._cache_max_bytes,
+            "max_input_size": Hash._cache_max_input,
+            "hits": Hash._cache_hits,
+            "misses": Hash._cache_misses,
+            "uncached": Hash._cache_skipped,
+            "hit_rate": (Hash._cache_hits / lookups * 100) if lookups > 0 else 0,
+        }
 
     @staticmethod
     def clear_cache():
-        """Clear the blake2b cache to prevent memory buildup"""
+        """Clear the blake2b cache and reset its statistics"""
         Hash._blake2b_cache.clear()
+        Hash._cache_bytes = 0
+        Hash._cache_hits = 0
+        Hash._cache_misses = 0
+        Hash._cache_skipped = 0
 
     @staticmethod
     def sha256(data: bytes) -> Bytes[32]:
@@ -1,12 +1,11 @@
 from dataclasses import field
-from typing import Self
+from typing import Iterable, List, Optional, Self, Tuple
 from tsrkit_types import Bytes
 from tsrkit_types.dictionary import Dictionary
 from tsrkit_types.integers import Uint, U32
 from tsrkit_types.sequences import TypedBoundedVector
 from tsrkit_types.struct import structure
 from playground.types.protocol.core import Balance, BlobLength, Gas, ServiceId, TimeSlot
-from playground.types.protocol.crypto import Hash
 from playground.utils.constants import (
     BASIC_MINIMUM_BALANCE,
     ADDITIONAL_BALANCE_PER_ITEM,
@@ -38,14 +37,20 @@ class AccountMetadata:
     accumulated_at: TimeSlot = field(metadata={"name": "last_accumulation_slot"}) # a
     parent_service: ServiceId # p
 
+    @staticmethod
+    def threshold(num_i: int, num_o: int, gratis_offset: int) -> int:
+        """a_t for the given footprint, as a plain int so callers can test a change before applying it"""
+        return max(
+            0,
+            BASIC_MINIMUM_BALANCE
+            + ADDITIONAL_BALANCE_PER_ITEM * num_i
+            + ADDITIONAL_BALANCE_PER_OCTET * num_o
+            - gratis_offset,
+        )
+
     @property
     def t(self):
-        return max(Balance(0), Balance(
-            BASIC_MINIMUM_BALANCE
-            + ADDITIONAL_BALANCE_PER_ITEM * self.num_i
-            + ADDITIONAL_BALANCE_PER_OCTET * self.num_o
-            - self.gratis_offset
-        ))
+        return Balance(AccountMetadata.threshold(self.num_i, self.num_o, self.gratis_offset))
 
     @staticmethod
     def empty() -> "AccountMetadata":
@@ -63,7 +68,54 @@ class AccountMetadata:
         )
 
 
-class AccountStorage(Dictionary[Bytes, Bytes, "key", "value"]): ...
+"""Octets counted in a_o for each storage item, on top of its key and value"""
+STORAGE_ITEM_OCTETS = 34
+
+
+class AccountStorage(Dictionary[Bytes, Bytes, "key", "value"]):
+    """
+    Storage dictionary.
+
+    Keys are interned: lookups take raw bytes, and overwriting an item keeps the
+    key object already in the map, so only new keys are wrapped in Bytes.
+    `put` and `delete` return the previous value, which is all a caller needs to
+    update the account footprint (a_i, a_o) without rescanning storage.
+
+    Source: https://graypaper.fluffylabs.dev/#/38c4e62/10510110a401?v=0.7.0
+    """
+
+    @staticmethod
+    def footprint(key: bytes, value: Optional[bytes]) -> Tuple[int, int]:
+        """(items, octets) contributed to (a_i, a_o) by one entry, zero if absent"""
+        if value is None:
+            return 0, 0
+        return 1, STORAGE_ITEM_OCTETS + len(key) + len(value)
+
+    def put(self, key: bytes, value: bytes) -> Optional[Bytes]:
+        """Set an item, returning the value it replaced"""
+        previous = self.get(key)
+        if previous is None and type(key) is not Bytes:
+            key = Bytes(key)
+        self[key] = value if type(value) is Bytes else Bytes(value)
+        return previous
+
+    def delete(self, key: bytes) -> Optional[Bytes]:
+        """Remove an item if present, returning its value"""
+        previous = self.get(key)
+        if previous is not None:
+            del self[key]
+        return previous
+
+    def get_many(self, keys: Iterable[bytes]) -> List[Optional[Bytes]]:
+        get = self.get
+        return [get(key) for key in keys]
+
+    def put_many(self, items: Iterable[Tuple[bytes, bytes]]) -> List[Optional[Bytes]]:
+        """Set several items; an empty value deletes. Returns the replaced values."""
+        out = []
+        for key, value in items:
+            out.append(self.put(key, value) if len(value) else self.delete(key))
+        return out
 
 
 """Preimage dictionary"""
@@ -80,7 +132,8 @@ class LookupTable:
     length: BlobLength
 
     def __hash__(self):
-        return int.from_bytes(Hash.blake2b(self.length.encode() + self.hash.encode()))
+        # Only used for dict/set membership; equality is on (hash, length)
+        return hash((bytes(self.hash), int(self.length)))
 
     def __lt__(self, other):
         if not isinstance(other, LookupTable):
@@ -117,5 +170,37 @@ class AccountData:
     def historical_lookup(self, timeslot, hash):
         return self.preimages[hash]
 
+    def write_storage(self, key: bytes, value: bytes) -> Tuple[bool, Optional[Bytes]]:
+        """
+        Set a storage item (or delete it, for an empty value) keeping a_i and a_o current.
+
+        The threshold balance of the resulting footprint is checked first; if it
+        exceeds a_b nothing is changed and (False, current value) is returned.
+        Otherwise returns (True, replaced value).
+        """
+        meta = self.service
+        current = self.storage.get(key)
+        items, octets = AccountStorage.footprint(key, value if len(value) else None)
+        old_items, old_octets = AccountStorage.footprint(key, current)
+        num_i = meta.num_i + items - old_items
+        num_o = meta.num_o + octets - old_octets
+
+        if AccountMetadata.threshold(num_i, num_o, meta.gratis_offset) > meta.balance:
+            return False, current
+
+        if len(value):
+            self.storage.put(key, value)
+        elif current is not None:
+            self.storage.delete(key)
+        if num_i != meta.num_i:
+            meta.num_i = Ai(num_i)
+        if num_o != meta.num_o:
+            meta.num_o = Ao(num_o)
+        return True, current
+
+    def write_storage_many(self, items: Iterable[Tuple[bytes, bytes]]) -> List[Tuple[bool, Optional[Bytes]]]:
+        """`write_storage` for each item in order; a rejected item does not stop the rest"""
+        return [self.write_storage(key, value) for key, value in items]
+
 
 class Delta(Dictionary[ServiceId, AccountData, "id", "data"]): ...
\ No newline at end of file
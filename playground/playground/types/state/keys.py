@@ -0,0 +1,75 @@
+"""
+State key construction (C) for the serialized JAM state.
+
+Source: https://graypaper.fluffylabs.dev/#/38c4e62/3b5d003b5d00?v=0.7.0
+"""
+from playground.types.protocol.crypto import Hash
+
+"""Size of a serialized state key in octets"""
+STATE_KEY_SIZE = 31
+
+"""Component index of service account metadata, C(255, s)"""
+SERVICE_ACCOUNT_INDEX = 255
+
+"""Discriminators prefixed to the account-owned key material"""
+STORAGE_DISCRIMINATOR = (2**32 - 1).to_bytes(4, "little")
+PREIMAGE_DISCRIMINATOR = (2**32 - 2).to_bytes(4, "little")
+
+
+def component_key(i: int) -> bytes:
+    """C(i) ↦ [i, 0, 0, ...]"""
+    return bytes([i]) + bytes(STATE_KEY_SIZE - 1)
+
+
+def service_key(i: int, s: int) -> bytes:
+    """C(i, s) ↦ [i, n0, 0, n1, 0, n2, 0, n3, 0, 0, ...] where n = E4(s)"""
+    n = int(s).to_bytes(4, "little")
+    return bytes([i, n[0], 0, n[1], 0, n[2], 0, n[3]]) + bytes(STATE_KEY_SIZE - 8)
+
+
+def account_key(s: int, h: bytes) -> bytes:
+    """C(s, h) ↦ [n0, a0, n1, a1, n2, a2, n3, a3, a4, a5, ..., a26] where n = E4(s), a = H(h)"""
+    n = int(s).to_bytes(4, "little")
+    a = bytes(Hash.blake2b(bytes(h)))
+    return bytes([n[0], a[0], n[1], a[1], n[2], a[2], n[3], a[3]]) + a[4:27]
+
+
+def storage_key(s: int, k: bytes) -> bytes:
+    """Key of storage item k of service s"""
+    return account_key(s, STORAGE_DISCRIMINATOR + bytes(k))
+
+
+def preimage_key(s: int, h: bytes) -> bytes:
+    """Key of the preimage with hash h of service s"""
+    return account_key(s, PREIMAGE_DISCRIMINATOR + bytes(h))
+
+
+def lookup_key(s: int, h: bytes, l: int) -> bytes:
+    """Key of the lookup timestamps of (h, l) of service s"""
+    return account_key(s, int(l).to_bytes(4, "little") + bytes(h))
+
+
+def is_component_key(key: bytes) -> bool:
+    """True if key is C(i) for some component i"""
+    return not any(key[1:])
+
+
+def is_service_key(key: bytes) -> bool:
+    """True if key is C(255, s) for some service s"""
+    return (
+        key[0] == SERVICE_ACCOUNT_INDEX
+        and key[2] == 0
+        and key[4] == 0
+        and key[6] == 0
+        and not any(key[8:])
+    )
+
+
+def service_id_of(key: bytes) -> int:
+    """Service id encoded in a C(255, s) key"""
+    return int.from_bytes(bytes(key[1:8:2]), "little")
+
+
+def account_id_of(key: bytes) -> int:
+    """Service id interleaved into a C(s, h) key"""
+    return int.from_bytes(bytes(key[0:8:2]), "little")
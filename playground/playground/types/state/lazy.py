@@ -0,0 +1,372 @@
+"""
+Delta and per-account mappings backed by a StateStore.
+
+Entries are decoded from the store on first access and cached in the mapping, so
+memory use is proportional to what is touched. Writes and deletions are tracked
+and returned by `changes()` as serialized state key/value updates for
+`StateStore.commit`.
+
+Storage, preimage and lookup keys are hashed into the state key, so these
+mappings cannot enumerate entries that were never accessed: iteration and len()
+only cover loaded entries. Use AccountMetadata.num_i / num_o for totals.
+"""
+from typing import Dict, Iterator, Optional
+
+from tsrkit_types import Bytes
+
+from playground.types.state.delta import (
+    AccountData,
+    AccountLookup,
+    AccountMetadata,
+    AccountPreimages,
+    AccountStorage,
+    Delta,
+    LookupTable,
+    Timestamps,
+)
+from playground.types.protocol.core import ServiceId
+from playground.types.state.keys import (
+    SERVICE_ACCOUNT_INDEX,
+    account_id_of,
+    is_component_key,
+    is_service_key,
+    lookup_key,
+    preimage_key,
+    service_id_of,
+    service_key,
+    storage_key,
+)
+from playground.types.storage.state_store import StateStore
+
+"""Version prefix of the serialized account metadata"""
+ACCOUNT_VERSION = 0
+
+Changes = Dict[bytes, Optional[bytes]]
+
+
+def encode_account(meta: AccountMetadata) -> bytes:
+    """E(0, a_c, E8(a_b, a_g, a_m, a_o, a_f), E4(a_i, a_r, a_a, a_p))"""
+    return bytes([ACCOUNT_VERSION]) + meta.encode()
+
+
+def decode_account(value: bytes) -> AccountMetadata:
+    meta, _ = AccountMetadata.decode_from(bytes(value), 1)
+    return meta
+
+
+class _LazyAccountMap:
+    """
+    Mixin for an account-owned Dictionary whose entries live in a StateStore.
+
+    Subclasses define how a mapping key maps to its state key and how values are
+    (de)serialized.
+    """
+
+    # Values that can be mutated in place (and so must be diffed on write-back)
+    _mutable_values = False
+
+    def __init__(self, store: StateStore, service_id: int, touched: Optional[set] = None):
+        super().__init__({})
+        self._store = store
+        self._service_id = int(service_id)
+        self._dirty = set()
+        self._deleted = set()
+        # The owning LazyDelta's changed accounts, which writes add this one to
+        self._touched = touched if touched is not None else set()
+
+    def _state_key(self, key) -> bytes:
+        raise NotImplementedError
+
+    def _decode(self, value: bytes):
+        raise NotImplementedError
+
+    def _encode(self, value) -> bytes:
+        raise NotImplementedError
+
+    def _load(self, key):
+        if key in self._deleted:
+            return None
+        raw = self._store.get(self._state_key(key))
+        if raw is None:
+            return None
+        value = self._decode(raw)
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __missing__(self, key):
+        value = self._load(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self, key) or self._load(key) is not None
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        value = self._load(key)
+        return default if value is None else value
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._dirty.add(key)
+        self._deleted.discard(key)
+        self._touched.add(self._service_id)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        dict.__delitem__(self, key)
+        self._dirty.discard(key)
+        self._deleted.add(key)
+        self._touched.add(self._service_id)
+
+    def pop(self, key, *default):
+        if key in self:
+            value = dict.__getitem__(self, key)
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    @property
+    def dirty(self) -> set:
+        """Keys written or deleted since the last write-back"""
+        return self._dirty | self._deleted
+
+    def changes(self) -> Changes:
+        """Serialized updates for every modified entry"""
+        out: Changes = {self._state_key(k): None for k in self._deleted}
+        for key in self._dirty:
+            out[self._state_key(key)] = self._encode(dict.__getitem__(self, key))
+        if self._mutable_values:
+            for key, value in dict.items(self):
+                if key in self._dirty:
+                    continue
+                state_key = self._state_key(key)
+                encoded = self._encode(value)
+                if self._store.get(state_key) != encoded:
+                    out[state_key] = encoded
+        return out
+
+    def mark_clean(self):
+        self._dirty.clear()
+        self._deleted.clear()
+
+
+class LazyAccountStorage(_LazyAccountMap, AccountStorage):
+    def _load(self, key):
+        # Intern raw keys read from guest memory once, on first load
+        return super()._load(key if type(key) is Bytes else Bytes(key))
+
+    def _state_key(self, key) -> bytes:
+        return storage_key(self._service_id, key)
+
+    def _decode(self, value: bytes):
+        return Bytes(value)
+
+    def _encode(self, value) -> bytes:
+        return bytes(value)
+
+
+class LazyAccountPreimages(_LazyAccountMap, AccountPreimages):
+    def _state_key(self, key) -> bytes:
+        return preimage_key(self._service_id, key)
+
+    def _decode(self, value: bytes):
+        return Bytes(value)
+
+    def _encode(self, value) -> bytes:
+        return bytes(value)
+
+
+class LazyAccountLookup(_LazyAccountMap, AccountLookup):
+    _mutable_values = True
+
+    def _state_key(self, key: LookupTable) -> bytes:
+        return lookup_key(self._service_id, key.hash, key.length)
+
+    def _decode(self, value: bytes):
+        timestamps, _ = Timestamps.decode_from(bytes(value))
+        return timestamps
+
+    def _encode(self, value) -> bytes:
+        return Timestamps(value).encode()
+
+
+class LazyDelta(Delta):
+    """
+    Service accounts backed by a StateStore.
+
+    The set of service ids is read from the store index on construction (one
+    prefix scan); an account's metadata is decoded on first access, and its
+    storage, preimages and lookup become lazy mappings over the same store.
+
+    An account counts as changed once it is fetched or set, or its storage,
+    preimages or lookup are written, until the next `mark_clean`; `changes()`
+    encodes only those. Fetch an account again after a commit before changing
+    its metadata or lookup timestamps in place.
+    """
+
+    def __init__(self, store: StateStore):
+        super().__init__({})
+        self._store = store
+        self._ids = {
+            service_id_of(key)
+            for key, _ in store.scan(bytes([SERVICE_ACCOUNT_INDEX]))
+            if is_service_key(key)
+        }
+        self._removed = set()
+        # Accounts handed out or set since the last write-back
+        self._touched = set()
+
+    def _load(self, service_id) -> Optional[AccountData]:
+        service_id = int(service_id)
+        if service_id not in self._ids:
+            return None
+        raw = self._store.get(service_key(SERVICE_ACCOUNT_INDEX, service_id))
+        account = AccountData(
+            service=decode_account(raw),
+            storage=LazyAccountStorage(self._store, service_id, self._touched),
+            preimages=LazyAccountPreimages(self._store, service_id, self._touched),
+            lookup=LazyAccountLookup(self._store, service_id, self._touched),
+        )
+        dict.__setitem__(self, ServiceId(service_id), account)
+        return account
+
+    def __missing__(self, key):
+        account = self._load(key)
+        if account is None:
+            raise KeyError(key)
+        return account
+
+    def __getitem__(self, key):
+        account = super().__getitem__(key)
+        self._touched.add(int(key))
+        return account
+
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self, key) or int(key) in self._ids
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key):
+            account = dict.__getitem__(self, key)
+        else:
+            account = self._load(key)
+            if account is None:
+                return default
+        self._touched.add(int(key))
+        return account
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._ids.add(int(key))
+        self._touched.add(int(key))
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        if dict.__contains__(self, key):
+            dict.__delitem__(self, key)
+        self._ids.discard(int(key))
+        self._removed.add(int(key))
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[ServiceId]:
+        return (ServiceId(s) for s in sorted(self._ids))
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[k] for k in self]
+
+    def items(self):
+        return [(k, self[k]) for k in self]
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    @property
+    def loaded(self) -> int:
+        """Number of accounts decoded so far"""
+        return dict.__len__(self)
+
+    def changes(self) -> Changes:
+        """Serialized updates for removed, new and modified accounts"""
+        out: Changes = {}
+
+        # Account-owned keys interleave the service id, which is not a key prefix,
+        # so removal scans the index. Ejections are rare.
+        if self._removed:
+            for key in self._store.keys():
+                if is_service_key(key):
+                    sid = service_id_of(key)
+                elif is_component_key(key):
+                    continue
+                else:
+                    sid = account_id_of(key)
+                if sid in self._removed:
+                    out[key] = None
+
+        for sid in self._touched:
+            account = dict.get(self, ServiceId(sid))
+            if account is None:
+                continue  # removed since
+            meta_key = service_key(SERVICE_ACCOUNT_INDEX, sid)
+            meta = encode_account(account.service)
+            if self._store.get(meta_key) != meta:
+                out[meta_key] = meta
+
+            for mapping, make_key, encode in (
+                (account.storage, storage_key, bytes),
+                (account.preimages, preimage_key, bytes),
+                (account.lookup, None, lambda v: Timestamps(v).encode()),
+            ):
+                if isinstance(mapping, _LazyAccountMap):
+                    out.update(mapping.changes())
+                    continue
+                # Account inserted with plain mappings; write all of its entries
+                for key, value in mapping.items():
+                    if make_key is None:
+                        out[lookup_key(sid, key.hash, key.length)] = encode(value)
+                    else:
+                        out[make_key(sid, key)] = encode(value)
+        return out
+
+    def mark_clean(self):
+        """Rebind changed accounts to lazy mappings after a write-back"""
+        self._removed.clear()
+        # Cleared in place: the lazy mappings share the set
+        touched = list(self._touched)
+        self._touched.clear()
+        for sid in touched:
+            account = dict.get(self, ServiceId(sid))
+            if account is None:
+                continue
+            for name, cls in (
+                ("storage", LazyAccountStorage),
+                ("preimages", LazyAccountPreimages),
+                ("lookup", LazyAccountLookup),
+            ):
+                mapping = getattr(account, name)
+                if isinstance(mapping, _LazyAccountMap):
+                    mapping.mark_clean()
+                else:
+                    lazy = cls(self._store, sid, self._touched)
+                    dict.update(lazy, mapping)
+                    setattr(account, name, lazy)
@@ -26,125 +26,201 @@ from playground.types.state.delta import (
     AccountStorage,
 )
 from playground.types.state.sigma import Sigma
+from playground.types.state.keys import (
+    SERVICE_ACCOUNT_INDEX,
+    component_key,
+    is_component_key,
+    lookup_key,
+    preimage_key,
+    service_key,
+    storage_key,
+)
+from playground.types.state.lazy import LazyDelta, encode_account
+from playground.types.state.trie import StateTrie
+from playground.types.storage.state_store import StateStore
 from playground.types.work import WorkDependencies
 from playground.utils.constants import CORE_COUNT, EPOCH_LENGTH
-from playground.types.protocol.crypto import OpaqueHash, Hash
+from playground.types.protocol.crypto import OpaqueHash, Hash, StateRoot
 from playground.types.protocol.core import Balance, Gas, ServiceId
 from tsrkit_types.bytes import Bytes
 from tsrkit_types.integers import U32
 from tsrkit_types.null import Null
 from playground.types.state.gamma import GammaS, GammaSFallback
 
+"""State components by key index C(i)"""
+COMPONENTS = {
+    1: ("alpha", Alpha),
+    2: ("phi", Phi),
+    3: ("beta", Beta),
+    4: ("gamma", Gamma),
+    5: ("psi", Psi),
+    6: ("eta", Eta),
+    7: ("iota", Iota),
+    8: ("kappa", Kappa),
+    9: ("lambda_", Lambda_),
+    10: ("rho", Rho),
+    11: ("tau", Tau),
+    12: ("chi", Chi),
+    13: ("pi", Pi),
+    14: ("omega", Omega),
+    15: ("xi", Xi),
+    16: ("theta", Theta),
+}
+
 
 class GhostState(Sigma):
-    
+    # Backing store when loaded through `from_store` / `save`
+    _store = None
+    # Merkle trie kept in sync by `state_root`
+    _trie = None
+    # Keys where the trie holds a change not yet in the backing store
+    _trie_changed = frozenset()
+
     @staticmethod
     def detransform(state: dict) -> "GhostState":
         """Inverse of transform"""
-        delta = {}
-        for key, value in sorted(state.items(), key=lambda x: x[0], reverse=True):
-            # Start with finding all core state components 1-15
-            # if (key[0] <= 15) and bytes(key[0:32]) == 0:
-            if int(key[0]) <= 15 and int(key[0]) > 0:
-                if int(key[0]) == 1:
-                    alpha, _ = Alpha.decode_from(bytes(value))
-                elif int(key[0]) == 2:
-                    phi, _ = Phi.decode_from(bytes(value))
-                elif int(key[0]) == 3:
-                    beta, _ = Beta.decode_from(bytes(value))
-                elif int(key[0]) == 4:
-                    gamma, _ = Gamma.decode_from(bytes(value))
-                elif int(key[0]) == 5:
-                    psi, _ = Psi.decode_from(bytes(value))
-                elif int(key[0]) == 6:
-                    eta, _ = Eta.decode_from(bytes(value))
-                elif int(key[0]) == 7:
-                    iota, _ = Iota.decode_from(bytes(value))
-                elif int(key[0]) == 8:
-                    kappa, _ = Kappa.decode_from(bytes(value))
-                elif int(key[0]) == 9:
-                    lambda_, _ = Lambda_.decode_from(bytes(value))
-                elif int(key[0]) == 10:
-                    rho, _ = Rho.decode_from(bytes(value))
-                elif int(key[0]) == 11:
-                    tau, _ = Tau.decode_from(bytes(value))
-                elif int(key[0]) == 12:
-                    chi, _ = Chi.decode_from(bytes(value))
-                elif int(key[0]) == 13:
-                    pi, _ = Pi.decode_from(bytes(value))
-                elif int(key[0]) == 14:
-                    omega, _ = Omega.decode_from(bytes(value))
-                elif int(key[0]) == 15:
-                    xi, _ = Xi.decode_from(bytes(value))
-                elif int(key[0]) == 16:
-                    theta, _ = Theta.decode_from(bytes(value))
-
-            # Then find all services (first byte is 255, rest is service id)
-            elif int(key[0]) == 255:
-                service_id = int.from_bytes(bytes(Bytes([key[1], key[3], key[5], key[7]])))
-                total_offset = 0
-                ac, offset = OpaqueHash.decode_from(bytes(value), total_offset)
-                total_offset += offset
-                ab, offset = Balance.decode_from(bytes(value), total_offset)
-                total_offset += offset
-                ag, offset = Gas.decode_from(bytes(value), total_offset)
-                total_offset += offset
-                am, offset = Gas.decode_from(bytes(value), total_offset)
-                total_offset += offset
-                ao, offset = Gas.decode_from(bytes(value), total_offset)
-                total_offset += offset
-                ai, offset = U32.decode_from(bytes(value), total_offset)
-                total_offset += offset
-                delta[service_id] = AccountData(
-                    storage=AccountStorage({}),
-                    preimages=AccountPreimages({}),
-                    lookup=AccountLookup({}),
-                    code_hash=Bytes[32](ac),
-                    balance=Balance(ab),
-                    gas_limit=Gas(ag),
-                    min_gas=Gas(am),
-                )
+        return GhostState.from_store(StateStore.from_items(state))
 
+    @staticmethod
+    def load(path) -> "GhostState":
+        """Open a state file written by `save`, decoding service accounts on access"""
+        return GhostState.from_store(StateStore.open(str(path)))
+
+    @staticmethod
+    def from_store(store: StateStore) -> "GhostState":
+        """
+        Build the state over a StateStore. Components are decoded eagerly, delta is
+        a LazyDelta over the store.
+        """
+        components = {}
+        for index, (name, component) in COMPONENTS.items():
+            value = store.get(component_key(index))
+            if value is None:
+                raise ValueError(f"State is missing component {name} (C({index}))")
+            components[name], _ = component.decode_from(value)
+        state = GhostState(**components, delta=LazyDelta(store))
+        state._store = store
+        return state
+
+    def save(self, path) -> StateStore:
+        """Write the full state to path and rebind it to the written file, closing the previous one"""
+        items = self.serialized()
+        if self._trie is not None:
+            self._trie.update({k: None for k in list(self._trie) if k not in items})
+            self._trie.update(items)
+        previous = self._store
+        store = StateStore.create(str(path), items)
+        self._rebind(store)
+        if previous is not None:
+            previous.close()
+        return store
+
+    def serialized(self) -> dict:
+        """All state key/value pairs, including entries not yet loaded from the store"""
+        if self._store is None or not issubclass(type(self.delta), LazyDelta):
+            return self.transform()
+        # Unloaded entries only exist in the current store
+        items = dict(self._store.items())
+        for key, value in self.changes().items():
+            if value is None:
+                items.pop(key, None)
             else:
-                if Bytes(key[7:0:-2]) == Bytes(2**32 - 1):
-                    # populating the storage
-                    service_id = int.from_bytes(bytes(Bytes(key[0:7:2])))
-                    delta[service_id].storage[
-                        Bytes[32](Bytes(key[8:32] + Bytes(bytearray(8))))
-                    ] = value
-                elif Bytes(key[7:0:-2]) == Bytes(2**32 - 2):
-                    # populating the lookup
-                    service_id = int.from_bytes(bytes(Bytes(key[0:7:2])))
-                    delta[service_id].lookup[Hash.blake2b(value)] = value
-
-                else:
-                    # populating the timestamps
-                    service_id = int.from_bytes(bytes(Bytes(key[0:7:2])))
-                    TimeStamps, _ = Timestamps.decode_from(bytes(value))
-                    timestamp_key = Bytes[32](
-                        Bytes(key[1:8:2]) + Bytes(key[8:32]) + Bytes(bytearray(4))
-                    )
-                    delta[service_id].timestamps[timestamp_key] = TimeStamps
+                items[key] = value
+        return items
 
-        return GhostState(
-            alpha=alpha,
-            phi=phi,
-            beta=beta,
-            theta=theta,
-            gamma=gamma,
-            psi=psi,
-            eta=eta,
-            iota=iota,
-            kappa=kappa,
-            lambda_=lambda_,
-            rho=rho,
-            tau=tau,
-            chi=chi,
-            pi=pi,
-            omega=omega,
-            xi=xi,
-            delta=delta,
-        )
+    def state_root(self) -> StateRoot:
+        """
+        Merklized state root.
+
+        The trie is built on the first call; later calls only apply `changes()`,
+        so the cost is proportional to what changed. A state without a store is
+        first backed by an in-memory one, keeping its account objects, to have
+        something to diff against. Keys changed at the last call but not now
+        (changed back since) are reset to the store's value.
+        """
+        if self._trie is None and self._store is None:
+            items = self.transform()
+            self._attach(StateStore.from_items(items))
+            self._trie = StateTrie(items)
+        elif self._trie is None:
+            self._trie = StateTrie(self.serialized())
+            self._trie_changed = frozenset(self.changes())
+        else:
+            self._update_trie(self.changes())
+        return self._trie.root()
+
+    def _update_trie(self, changes: dict):
+        """Make the trie hold the store plus `changes`"""
+        reverted = {k: self._store.get(k) for k in self._trie_changed if k not in changes}
+        self._trie.update({**reverted, **changes})
+        self._trie_changed = frozenset(changes)
+
+    def transform(self) -> dict:
+        """
+        Serialize the state into state key/value pairs.
+
+        Account mappings only yield loaded entries when lazy; use `save` or
+        `changes` for store-backed states.
+        """
+        out = {
+            component_key(index): getattr(self, name).encode()
+            for index, (name, _) in COMPONENTS.items()
+        }
+        for service_id, account in self.delta.items():
+            sid = int(service_id)
+            out[service_key(SERVICE_ACCOUNT_INDEX, sid)] = encode_account(account.service)
+            for key, value in account.storage.items():
+                out[storage_key(sid, key)] = bytes(value)
+            for key, value in account.preimages.items():
+                out[preimage_key(sid, key)] = bytes(value)
+            for key, value in account.lookup.items():
+                out[lookup_key(sid, key.hash, key.length)] = Timestamps(value).encode()
+        return out
+
+    def changes(self) -> dict:
+        """Serialized updates since the state was loaded or last committed"""
+        store: StateStore = self._store
+        out = {}
+        for index, (name, _) in COMPONENTS.items():
+            value = getattr(self, name).encode()
+            if store.get(component_key(index)) != value:
+                out[component_key(index)] = value
+        if issubclass(type(self.delta), LazyDelta):
+            out.update(self.delta.changes())
+        else:
+            # delta was replaced wholesale; rewrite every account
+            base = {k for k, _ in store.items() if not is_component_key(k)}
+            accounts = {k: v for k, v in self.transform().items() if not is_component_key(k)}
+            out.update({k: None for k in base - accounts.keys()})
+            out.update(accounts)
+        return out
+
+    def commit(self):
+        """Write dirty components and accounts back to the backing store"""
+        if self._store is None:
+            raise ValueError("State has no backing store, use save()")
+        changes = self.changes()
+        if self._trie is not None:
+            self._update_trie(changes)
+        self._store.commit(changes)
+        self._rebind(self._store)
+
+    def _attach(self, store: StateStore):
+        """Back an in-memory state with `store`, which must hold what it serializes to"""
+        delta = LazyDelta(store)
+        for service_id, account in self.delta.items():
+            delta[service_id] = account
+        self.delta = delta
+        self._rebind(store)
+
+    def _rebind(self, store: StateStore):
+        self._store = store
+        # The trie was brought up to date with the store by the caller
+        self._trie_changed = frozenset()
+        if issubclass(type(self.delta), LazyDelta) and self.delta._store is store:
+            self.delta.mark_clean()
+        else:
+            self.delta = LazyDelta(store)
 
     @staticmethod
     def genesis(genesis_path) -> "GhostState":
@@ -195,13 +271,13 @@ class GhostState(Sigma):
         Returns:
             GammaSFallback - Set of Bandersnatch keys
         """
-        # Loop through epoch size
+        # Hash entropy + encoded4(i) for every slot of the epoch in one batch
+        entropy = bytes(entropy)
+        hashes = Hash.blake2b_many(entropy + U32(i).encode() for i in range(EPOCH_LENGTH))
         fallback = []
-        for i in range(EPOCH_LENGTH):
-            # Add entropy to encoded4(i)
-            hashed = Hash.blake2b(bytes(entropy) + U32(i).encode())
-            index, _ = U32.decode_from(bytes(Bytes(hashed[:4])))
-            val_key = validators[int(index) % len(validators)].bandersnatch
+        for hashed in hashes:
+            index = int.from_bytes(hashed[:4], "little")
+            val_key = validators[index % len(validators)].bandersnatch
             fallback.append(val_key)
         return GammaS(GammaSFallback(fallback))
     
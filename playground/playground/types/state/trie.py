@@ -0,0 +1,202 @@
+"""
+State Merklization (M) over a binary Patricia trie.
+
+Source: https://graypaper.fluffylabs.dev/#/38c4e62/3b9d013b9d01?v=0.7.0
+
+Node hashes are cached in the trie and invalidated along the path of every
+changed key, so `root()` after k updates rehashes O(k * depth) nodes.
+"""
+from hashlib import blake2b
+from typing import Dict, Iterator, Mapping, Optional
+
+from playground.types.protocol.crypto import StateRoot
+from playground.types.state.keys import STATE_KEY_SIZE
+
+ZERO_HASH = bytes(32)
+
+
+def _hash(data: bytes) -> bytes:
+    # Node preimages are unique, so this bypasses the Hash.blake2b cache
+    return blake2b(data, digest_size=32).digest()
+
+
+def _bit(key: bytes, i: int) -> int:
+    return (key[i >> 3] >> (7 - (i & 7))) & 1
+
+
+def leaf_payload(value: bytes) -> bytes:
+    """Value embedded in a leaf: the value itself if it fits, else its hash"""
+    if len(value) <= 32:
+        return value
+    return _hash(value)
+
+
+def encode_leaf(key: bytes, value: bytes) -> bytes:
+    """L(k, v): embedded-value leaf for |v| <= 32, regular leaf otherwise"""
+    if len(value) <= 32:
+        return bytes([0b10000000 | len(value)]) + key[:31] + value + bytes(32 - len(value))
+    return bytes([0b11000000]) + key[:31] + _hash(value)
+
+
+def encode_branch(left: bytes, right: bytes) -> bytes:
+    """B(l, r): first bit cleared, followed by the remaining bits of l and all of r"""
+    return bytes([left[0] & 0b01111111]) + left[1:] + right
+
+
+class _Leaf:
+    __slots__ = ("key", "payload", "size", "hash")
+
+    def __init__(self, key: bytes, payload: bytes, size: int):
+        self.key = key
+        self.payload = payload
+        self.size = size
+        self.hash = None
+
+
+class _Branch:
+    __slots__ = ("left", "right", "hash")
+
+    def __init__(self):
+        self.left = None
+        self.right = None
+        self.hash = None
+
+
+class StateTrie:
+    """
+    Incremental Merklization of serialized state key/value pairs.
+
+    Leaves keep only the 32-byte payload of their value (the value or its hash),
+    so the trie's memory use does not grow with preimage sizes.
+    """
+
+    def __init__(self, items: Optional[Mapping[bytes, bytes]] = None):
+        self._root = None
+        self._leaves: Dict[bytes, _Leaf] = {}
+        self.hashed = 0
+        if items:
+            for key, value in items.items():
+                self[key] = value
+
+    def __len__(self) -> int:
+        return len(self._leaves)
+
+    def __contains__(self, key: bytes) -> bool:
+        return bytes(key) in self._leaves
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self._leaves)
+
+    # ---------------------------------------------------------------------------- #
+    #                                    Updates                                   #
+    # ---------------------------------------------------------------------------- #
+
+    def __setitem__(self, key: bytes, value: bytes):
+        key, value = bytes(key), bytes(value)
+        if len(key) != STATE_KEY_SIZE:
+            raise ValueError(f"State keys must be {STATE_KEY_SIZE} bytes, got {len(key)}")
+        payload = leaf_payload(value)
+        leaf = self._leaves.get(key)
+        if leaf is not None and leaf.payload == payload and leaf.size == len(value):
+            return
+        leaf = _Leaf(key, payload, len(value))
+        self._leaves[key] = leaf
+        self._root = self._insert(self._root, leaf, 0)
+
+    def __delitem__(self, key: bytes):
+        key = bytes(key)
+        if key not in self._leaves:
+            raise KeyError(key)
+        del self._leaves[key]
+        self._root = self._delete(self._root, key, 0)
+
+    def update(self, changes: Mapping[bytes, Optional[bytes]]):
+        """Apply state updates, a value of None deletes the key"""
+        for key, value in changes.items():
+            if value is None:
+                if key in self:
+                    del self[key]
+            else:
+                self[key] = value
+
+    def _insert(self, node, leaf: _Leaf, depth: int):
+        if node is None:
+            return leaf
+        if type(node) is _Leaf:
+            if node.key == leaf.key:
+                return leaf
+            return self._split(node, leaf, depth)
+        node.hash = None
+        if _bit(leaf.key, depth):
+            node.right = self._insert(node.right, leaf, depth + 1)
+        else:
+            node.left = self._insert(node.left, leaf, depth + 1)
+        return node
+
+    def _split(self, a: _Leaf, b: _Leaf, depth: int) -> _Branch:
+        # Keys sharing a prefix get one branch per shared bit, with an empty sibling
+        branch = _Branch()
+        bit_a, bit_b = _bit(a.key, depth), _bit(b.key, depth)
+        if bit_a == bit_b:
+            child = self._split(a, b, depth + 1)
+            if bit_a:
+                branch.right = child
+            else:
+                branch.left = child
+        elif bit_a:
+            branch.left, branch.right = b, a
+        else:
+            branch.left, branch.right = a, b
+        return branch
+
+    def _delete(self, node, key: bytes, depth: int):
+        if node is None:
+            return None
+        if type(node) is _Leaf:
+            return None if node.key == key else node
+        node.hash = None
+        if _bit(key, depth):
+            node.right = self._delete(node.right, key, depth + 1)
+        else:
+            node.left = self._delete(node.left, key, depth + 1)
+
+        # A subtree holding a single leaf is that leaf
+        left, right = node.left, node.right
+        if left is None and (right is None or type(right) is _Leaf):
+            return right
+        if right is None and type(left) is _Leaf:
+            return left
+        return node
+
+    # ---------------------------------------------------------------------------- #
+    #                                    Hashing                                   #
+    # ---------------------------------------------------------------------------- #
+
+    def _node_hash(self, node) -> bytes:
+        if node is None:
+            return ZERO_HASH
+        if node.hash is None:
+            if type(node) is _Leaf:
+                if node.size <= 32:
+                    encoded = (
+                        bytes([0b10000000 | node.size])
+                        + node.key
+                        + node.payload
+                        + bytes(32 - node.size)
+                    )
+                else:
+                    encoded = bytes([0b11000000]) + node.key + node.payload
+            else:
+                encoded = encode_branch(self._node_hash(node.left), self._node_hash(node.right))
+            node.hash = _hash(encoded)
+            self.hashed += 1
+        return node.hash
+
+    def root(self) -> StateRoot:
+        """M(σ), rehashing only nodes invalidated since the last call"""
+        return StateRoot(self._node_hash(self._root))
+
+
+def merkle_root(items: Mapping[bytes, bytes]) -> StateRoot:
+    """Root of a full set of serialized state key/value pairs"""
+    return StateTrie(items).root()
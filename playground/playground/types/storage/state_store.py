@@ -0,0 +1,361 @@
+import heapq
+import mmap
+import os
+import struct
+from typing import Iterator, List, Mapping, Optional, Tuple
+
+from playground.types.state.keys import STATE_KEY_SIZE
+
+"""
+Layout of a state file (all integers little endian):
+
+    header  | magic (4) | version (4) | count (8) | data_offset (8) |
+            | overlay_offset (8) | overlay_count (8) | live (8) | garbage (8) | journal (8) |
+    index   | count x ( key (31) | offset (8) | length (4) )         sorted by key
+    data    | values, concatenated; offsets are from data_offset
+    ...     | values, overlay indexes and journals appended by commits
+
+Lookups are a binary search over the fixed-size index records, so opening a file
+costs one mmap and reading a value touches only the pages holding its record and
+its bytes.
+
+A commit appends the values it writes and patches the records of keys already in
+the file; a deleted key keeps its record, with length _DELETED. Keys the index did
+not hold go to the overlay, a second sorted index after the data, which commits
+adding keys rewrite. Patches are written to a journal first, so a commit cut
+short by a crash is redone on the next open. Once over half of the file is dead
+space (replaced values, old overlays and journals) a commit rewrites it whole.
+"""
+_MAGIC = b"AJSS"
+_VERSION = 2
+_HEADER = struct.Struct("<4sIQQQQQQQ")
+_RECORD = struct.Struct(f"<{STATE_KEY_SIZE}sQI")
+# Offset and length of a record, as patched by commits
+_SLOT = struct.Struct("<QI")
+# Journal entry: file position and length of the bytes that follow
+_PATCH = struct.Struct("<QI")
+_COUNT = struct.Struct("<Q")
+# Length of a deleted key's record
+_DELETED = 0xFFFFFFFF
+# Position of the journal field in the header
+_JOURNAL_FIELD = _HEADER.size - _COUNT.size
+
+
+class StateStore:
+    """
+    Sorted key/value file holding the serialized state, with write-back
+    through `commit`.
+
+    A store is either backed by an mmap of a file (`open`, `create`) or by an
+    in-memory buffer of the same layout (`from_items`).
+    """
+
+    def __init__(self, buf, path: Optional[str] = None, file=None):
+        self._buf = buf
+        self._path = path
+        self._file = file
+        self._read_header()
+
+    def _read_header(self):
+        (
+            magic, version, self._count, self._data_offset, self._overlay_offset,
+            self._overlay_count, self._live, self._garbage, self._journal,
+        ) = _HEADER.unpack_from(self._buf, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a state store (magic={magic!r}, version={version})")
+
+    # ---------------------------------------------------------------------------- #
+    #                                 Construction                                 #
+    # ---------------------------------------------------------------------------- #
+
+    @staticmethod
+    def serialize(items: Mapping[bytes, bytes]) -> bytes:
+        """Encode key/value pairs into the store layout"""
+        keys = sorted(bytes(k) for k in items)
+        values = {bytes(k): bytes(v) for k, v in items.items()}
+        data_offset = _HEADER.size + _RECORD.size * len(keys)
+
+        out = bytearray(data_offset)
+        offset = 0
+        for i, key in enumerate(keys):
+            if len(key) != STATE_KEY_SIZE:
+                raise ValueError(f"State keys must be {STATE_KEY_SIZE} bytes, got {len(key)}")
+            value = values[key]
+            _RECORD.pack_into(out, _HEADER.size + i * _RECORD.size, key, offset, len(value))
+            out += value
+            offset += len(value)
+        _HEADER.pack_into(out, 0, _MAGIC, _VERSION, len(keys), data_offset, len(out), 0, len(keys), 0, 0)
+        return bytes(out)
+
+    @classmethod
+    def from_items(cls, items: Mapping[bytes, bytes]) -> "StateStore":
+        """In-memory store"""
+        return cls(bytearray(cls.serialize(items)))
+
+    @classmethod
+    def create(cls, path: str, items: Mapping[bytes, bytes]) -> "StateStore":
+        """Write items to path and open it"""
+        cls._write_file(path, cls.serialize(items))
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: str) -> "StateStore":
+        f = open(path, "rb")
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            f.close()
+            raise
+        store = cls(buf, path=path, file=f)
+        if store._journal:
+            # The last commit stopped before all its patches were written
+            store._redo()
+        return store
+
+    @staticmethod
+    def _write_file(path: str, data: bytes):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------------------------------------------------------------------- #
+    #                                    Lookup                                    #
+    # ---------------------------------------------------------------------------- #
+
+    def __len__(self) -> int:
+        return self._live
+
+    def _key_at(self, pos: int) -> bytes:
+        return bytes(self._buf[pos : pos + STATE_KEY_SIZE])
+
+    def _value_at(self, pos: int) -> Optional[bytes]:
+        """Value of the record at `pos`, None if deleted"""
+        _, offset, length = _RECORD.unpack_from(self._buf, pos)
+        if length == _DELETED:
+            return None
+        start = self._data_offset + offset
+        return bytes(self._buf[start : start + length])
+
+    def _indexes(self) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """(start, count) of the main index and the overlay"""
+        return (_HEADER.size, self._count), (self._overlay_offset, self._overlay_count)
+
+    def _lower_bound(self, start: int, count: int, key: bytes) -> int:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(start + mid * _RECORD.size) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, key: bytes) -> Optional[int]:
+        """Position of the record of `key`, deleted or not"""
+        # An index holds each key at most once, and never both
+        for start, count in self._indexes():
+            i = self._lower_bound(start, count, key)
+            pos = start + i * _RECORD.size
+            if i < count and self._key_at(pos) == key:
+                return pos
+        return None
+
+    def _records(self, prefix: bytes = b"") -> Iterator[Tuple[bytes, int]]:
+        """(key, position) of every record from `prefix` on, both indexes merged"""
+
+        def index(start: int, count: int) -> Iterator[Tuple[bytes, int]]:
+            for i in range(self._lower_bound(start, count, prefix), count):
+                pos = start + i * _RECORD.size
+                yield self._key_at(pos), pos
+
+        return heapq.merge(*(index(start, count) for start, count in self._indexes()))
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        pos = self._find(bytes(key))
+        return None if pos is None else self._value_at(pos)
+
+    def __contains__(self, key: bytes) -> bool:
+        return self.get(key) is not None
+
+    def keys(self) -> Iterator[bytes]:
+        for key, _ in self.items():
+            yield key
+
+    def items(self) -> Iterator[Tuple[bytes, bytes]]:
+        for key, pos in self._records():
+            value = self._value_at(pos)
+            if value is not None:
+                yield key, value
+
+    def scan(self, prefix: bytes) -> Iterator[Tuple[bytes, bytes]]:
+        """All entries whose key starts with prefix, in key order"""
+        prefix = bytes(prefix)
+        for key, pos in self._records(prefix):
+            if not key.startswith(prefix):
+                return
+            value = self._value_at(pos)
+            if value is not None:
+                yield key, value
+
+    # ---------------------------------------------------------------------------- #
+    #                                  Write-back                                  #
+    # ---------------------------------------------------------------------------- #
+
+    def commit(self, updates: Mapping[bytes, Optional[bytes]]):
+        """
+        Apply updates (a value of None deletes the key).
+
+        Only the updated values and records are written, see the layout above;
+        the store is rewritten whole once it is mostly dead space. File-backed
+        stores are re-mapped.
+        """
+        if not updates:
+            return
+        end = len(self._buf)
+        overlay_end = self._overlay_offset + self._overlay_count * _RECORD.size
+        values = bytearray()
+        patches: List[Tuple[int, bytes]] = []
+        overlay = {}
+        live, garbage = self._live, self._garbage
+
+        for key, value in updates.items():
+            key = bytes(key)
+            pos = self._find(key)
+            if pos is not None:
+                _, _, length = _RECORD.unpack_from(self._buf, pos)
+                if length != _DELETED:
+                    live -= 1
+                    garbage += length
+            if value is None:
+                if pos is None:
+                    continue
+                slot = (0, _DELETED)
+            else:
+                value = bytes(value)
+                slot = (end - self._data_offset + len(values), len(value))
+                values += value
+                live += 1
+            if pos is None or self._overlay_offset <= pos < overlay_end:
+                # The main index doesn't hold it, so a deleted key just leaves the overlay
+                overlay[key] = None if value is None else slot
+            else:
+                patches.append((pos + STATE_KEY_SIZE, _SLOT.pack(*slot)))
+
+        overlay_offset, overlay_count = self._overlay_offset, self._overlay_count
+        index = b""
+        if overlay:
+            # Rewrite the overlay with the new and changed keys
+            for pos in range(self._overlay_offset, overlay_end, _RECORD.size):
+                key = self._key_at(pos)
+                if key not in overlay:
+                    overlay[key] = _SLOT.unpack_from(self._buf, pos + STATE_KEY_SIZE)
+            keys = sorted(k for k, slot in overlay.items() if slot is not None)
+            index = b"".join(_RECORD.pack(k, *overlay[k]) for k in keys)
+            overlay_offset, overlay_count = end + len(values), len(keys)
+            garbage += self._overlay_count * _RECORD.size
+
+        journal_size = 0
+        if self._path is not None:
+            journal_size = _COUNT.size + sum(_PATCH.size + len(p) for _, p in patches) + _PATCH.size + _HEADER.size
+            garbage += journal_size
+        if garbage * 2 > end + len(values) + len(index) + journal_size:
+            self._rewrite(updates)
+            return
+
+        header = _HEADER.pack(
+            _MAGIC, _VERSION, self._count, self._data_offset, overlay_offset,
+            overlay_count, live, garbage, 0,
+        )
+        # The header goes last: it makes the new overlay and counts visible
+        patches.append((0, header))
+        self._apply(bytes(values) + index, patches)
+
+    def _apply(self, tail: bytes, patches: List[Tuple[int, bytes]]):
+        """Append `tail`, then write each (position, bytes) patch through the journal"""
+        if self._path is None:
+            if not isinstance(self._buf, bytearray):
+                self._buf = bytearray(self._buf)
+            self._buf += tail
+            for pos, data in patches:
+                self._buf[pos : pos + len(data)] = data
+            self._read_header()
+            return
+
+        journal = bytearray(_COUNT.pack(len(patches)))
+        for pos, data in patches:
+            journal += _PATCH.pack(pos, len(data)) + data
+        with open(self._path, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.write(tail)
+            position = f.tell()
+            f.write(journal)
+            f.flush()
+            os.fsync(f.fileno())
+            # From here on, a crash is redone on open
+            f.seek(_JOURNAL_FIELD)
+            f.write(_COUNT.pack(position))
+            f.flush()
+            os.fsync(f.fileno())
+            self._patch(f, patches)
+        self._remap()
+
+    def _patch(self, f, patches: List[Tuple[int, bytes]]):
+        for pos, data in patches:
+            f.seek(pos)
+            f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _redo(self):
+        """Write the patches of the journal the header points to"""
+        (count,) = _COUNT.unpack_from(self._buf, self._journal)
+        pos, patches = self._journal + _COUNT.size, []
+        for _ in range(count):
+            target, length = _PATCH.unpack_from(self._buf, pos)
+            pos += _PATCH.size
+            patches.append((target, bytes(self._buf[pos : pos + length])))
+            pos += length
+        with open(self._path, "r+b") as f:
+            self._patch(f, patches)
+        self._remap()
+
+    def _remap(self):
+        """Map the file again after it grew or changed"""
+        self._buf.close()
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._read_header()
+
+    def _rewrite(self, updates: Mapping[bytes, Optional[bytes]]):
+        """Write the store compactly; file-backed stores are replaced atomically"""
+        merged = dict(self.items())
+        for key, value in updates.items():
+            if value is None:
+                merged.pop(bytes(key), None)
+            else:
+                merged[bytes(key)] = bytes(value)
+        data = self.serialize(merged)
+
+        if self._path is None:
+            self._buf = bytearray(data)
+        else:
+            self.close()
+            self._write_file(self._path, data)
+            self._file = open(self._path, "rb")
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._read_header()
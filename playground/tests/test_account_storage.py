@@ -0,0 +1,60 @@
+"""Tests for storage footprint accounting"""
+from tsrkit_types import Bytes
+
+from playground.types.protocol.core import Balance
+from playground.types.state.delta import AccountData, AccountMetadata, AccountStorage
+from playground.utils.constants import (
+    ADDITIONAL_BALANCE_PER_ITEM,
+    ADDITIONAL_BALANCE_PER_OCTET,
+    BASIC_MINIMUM_BALANCE,
+)
+
+
+def make_account(balance: int) -> AccountData:
+    meta = AccountMetadata.empty()
+    meta.balance = Balance(balance)
+    return AccountData(service=meta, storage=AccountStorage({}))
+
+
+def test_footprint_tracks_writes():
+    acc = make_account(10**12)
+    assert acc.write_storage(b"key", b"value") == (True, None)
+    assert (acc.service.num_i, acc.service.num_o) == (1, 34 + 3 + 5)
+
+    ok, previous = acc.write_storage(b"key", b"longer value")
+    assert ok and previous == b"value"
+    assert (acc.service.num_i, acc.service.num_o) == (1, 34 + 3 + 12)
+
+    acc.write_storage(b"other", b"x")
+    assert acc.write_storage(b"key", b"") == (True, b"longer value")
+    assert (acc.service.num_i, acc.service.num_o) == (1, 34 + 5 + 1)
+    # Deleting a missing key changes nothing
+    assert acc.write_storage(b"missing", b"") == (True, None)
+    assert acc.service.num_i == 1
+
+
+def test_threshold_rejects_write():
+    # Exactly enough for one item of 34 + 1 + 1 octets
+    acc = make_account(BASIC_MINIMUM_BALANCE + ADDITIONAL_BALANCE_PER_ITEM + 36 * ADDITIONAL_BALANCE_PER_OCTET)
+    assert acc.write_storage(b"a", b"1")[0]
+    assert acc.service.t == acc.service.balance
+
+    ok, current = acc.write_storage(b"a", b"12")
+    assert not ok and current == b"1"
+    assert acc.storage[b"a"] == b"1"
+    assert acc.service.num_o == 36
+
+
+def test_interned_keys_and_bulk():
+    storage = AccountStorage({})
+    assert storage.put_many([(b"a", b"1"), (b"b", b"2")]) == [None, None]
+    key = next(iter(storage))
+    assert type(key) is Bytes
+
+    storage.put(b"a", b"3")
+    # Overwriting keeps the key object already in the map
+    assert next(iter(storage)) is key
+    assert storage.get_many([b"a", b"b", b"c"]) == [b"3", b"2", None]
+    assert storage.put_many([(b"b", b"")]) == [b"2"]
+    assert list(storage) == [b"a"]
+    assert isinstance(storage.encode(), bytes)
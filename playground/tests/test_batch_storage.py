@@ -0,0 +1,88 @@
+"""Tests for the experimental batched storage host calls"""
+import pytest
+from tsrkit_pvm import INT_Memory, PvmError, HostStatus, PANIC
+
+from playground.execution.invocations.functions.general_fns import (
+    BATCH_OP,
+    READ_MANY,
+    WRITE_MANY,
+    GeneralFunctions,
+    batch_storage_entries,
+)
+from playground.types.protocol.core import Balance
+from playground.types.state.delta import AccountData, AccountMetadata, AccountStorage
+
+OPS = 0x1000
+DATA = 0x2000
+
+
+def make_account(balance: int = 10**12) -> AccountData:
+    meta = AccountMetadata.empty()
+    meta.balance = Balance(balance)
+    return AccountData(service=meta, storage=AccountStorage({}))
+
+
+def make_memory() -> INT_Memory:
+    return INT_Memory({}, [0, 1, 2], [1, 2])
+
+
+def put_ops(memory, ops):
+    memory.write(OPS, b"".join(BATCH_OP.pack(*op, 0) for op in ops))
+
+
+def results(memory, count):
+    return [BATCH_OP.unpack_from(bytes(memory.read(OPS, BATCH_OP.size * count)), i * BATCH_OP.size)[4] for i in range(count)]
+
+
+def registers(*args):
+    r = [0] * 13
+    r[7 : 7 + len(args)] = args
+    return r
+
+
+def test_write_many_then_read_many():
+    acc, memory = make_account(), make_memory()
+    acc.write_storage(b"k1", b"old")
+    memory.write(DATA, b"k1k2v1v2")
+    put_ops(memory, [(DATA, 2, DATA + 4, 2), (DATA + 2, 2, DATA + 6, 2)])
+
+    r = registers(OPS, 2)
+    status, gas, r, memory, _ = GeneralFunctions.execute(WRITE_MANY, 100, r, memory, None, {"service_data": acc, "service_index": 1})
+    # 10 for the call, 10 per item
+    assert (gas, r[7]) == (70, 2)
+    assert results(memory, 2) == [3, HostStatus.NONE.value]
+    assert acc.storage.get_many([b"k1", b"k2"]) == [b"v1", b"v2"]
+
+    memory.write(DATA + 4, bytes(4))
+    put_ops(memory, [(DATA, 2, DATA + 4, 2), (DATA + 2, 2, DATA + 6, 2), (DATA + 4, 1, DATA + 8, 8)])
+    r = registers(2**64 - 1, OPS, 3)
+    args = {"service_data": acc, "service_index": 1, "accounts": {}}
+    status, gas, r, memory, _ = GeneralFunctions.execute(READ_MANY, 100, r, memory, None, args)
+    assert (gas, r[7]) == (60, 3)
+    assert memory.read(DATA + 4, 4) == b"v1v2"
+    assert results(memory, 3) == [2, 2, HostStatus.NONE.value]
+
+
+def test_write_many_panics_before_storing():
+    acc, memory = make_account(), make_memory()
+    memory.write(DATA, b"k1v1")
+    # The second value is in read-only memory that isn't readable either
+    put_ops(memory, [(DATA, 2, DATA + 2, 2), (DATA, 2, 0x10 * 4096, 2)])
+    with pytest.raises(PvmError) as e:
+        GeneralFunctions.execute(WRITE_MANY, 100, registers(OPS, 2), memory, None, {"service_data": acc, "service_index": 1})
+    assert e.value.code == PANIC
+    assert acc.storage.get_many([b"k1"]) == [None]
+
+
+def test_too_many_items():
+    r = registers(OPS, 10**6)
+    _, gas, r, _, _ = GeneralFunctions.execute(WRITE_MANY, 100, r, make_memory(), None, {"service_data": make_account(), "service_index": 1})
+    assert (gas, r[7]) == (90, HostStatus.OOB.value)
+
+
+def test_disabled_by_default(monkeypatch):
+    acc = make_account()
+    monkeypatch.delenv("JAM_BATCH_STORAGE", raising=False)
+    assert batch_storage_entries(acc, 1, {}) == {}
+    monkeypatch.setenv("JAM_BATCH_STORAGE", "1")
+    assert set(batch_storage_entries(acc, 1, {})) == {READ_MANY, WRITE_MANY}
@@ -0,0 +1,36 @@
+"""Tests for the build gas comparison"""
+from tsrkit_pvm.core.code import Code
+from tsrkit_types import Bytes
+
+from playground.execution.gas_bench import SCENARIOS, main, measure
+from playground.types.state.state import state
+
+# load_imm r7, 0; load_imm r8, 0; jump_ind r0 (the halt address)
+HALT = bytes([0, 0, 14, 51, 7, 0, 0, 0, 0, 51, 8, 0, 0, 0, 0, 50, 0, 65, 16])
+
+
+def halting_service() -> bytes:
+    """Returns an empty result straight away"""
+    return Bytes(b"").encode() + Code(read=b"", r_write=b"", code=HALT, z=1, s=1 << 16).encode()
+
+
+def test_measure_is_deterministic():
+    code = halting_service()
+    rows = measure(code, SCENARIOS["token"])
+    assert [name for name, _, _ in rows] == [name for name, _ in SCENARIOS["token"]]
+    assert all(status == "ok" and used > 0 for _, status, used in rows)
+    assert measure(code, SCENARIOS["token"]) == rows
+
+
+def test_measure_leaves_state_alone():
+    accounts = state.delta
+    before = dict(accounts)
+    measure(halting_service(), SCENARIOS["hello"])
+    assert state.delta is accounts and dict(state.delta) == before
+
+
+def test_main_compares_builds(tmp_path, capsys):
+    build = tmp_path / "hello.pvm"
+    build.write_bytes(halting_service())
+    assert main(["hello", str(build), str(build)]) == 0
+    assert f"[1] {build}: +0.0%" in capsys.readouterr().out
@@ -0,0 +1,54 @@
+"""Tests for the blake2b cache in Hash"""
+from hashlib import blake2b
+
+from playground.types.protocol.crypto import Hash
+
+
+def setup_function():
+    Hash.clear_cache()
+
+
+def teardown_function():
+    Hash.configure_cache(max_bytes=4 * 1024 * 1024, max_input_size=1024)
+    Hash.clear_cache()
+
+
+def test_cache_hits_and_results():
+    data = b"jam" * 10
+    expected = blake2b(data, digest_size=32).digest()
+    assert Hash.blake2b(data) == expected
+    assert Hash.blake2b(bytearray(data)) == expected
+
+    stats = Hash.cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 50
+
+
+def test_large_inputs_are_not_cached():
+    Hash.configure_cache(max_input_size=64)
+    blob = bytes(1000)
+    assert Hash.blake2b(blob) == blake2b(blob, digest_size=32).digest()
+    stats = Hash.cache_stats()
+    assert stats["entries"] == 0
+    assert stats["uncached"] == 1
+
+
+def test_byte_budget_evicts_least_recently_used():
+    Hash.configure_cache(max_bytes=3 * (32 + 32))
+    a, b, c, d = (bytes([i]) * 32 for i in range(4))
+    for item in (a, b, c):
+        Hash.blake2b(item)
+    Hash.blake2b(a)  # a becomes most recently used
+    Hash.blake2b(d)  # evicts b
+
+    stats = Hash.cache_stats()
+    assert stats["entries"] == 3
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert b not in Hash._blake2b_cache
+    assert a in Hash._blake2b_cache
+
+
+def test_blake2b_many():
+    items = [bytes([i]) * i for i in range(10)] + [bytes(5000)]
+    assert Hash.blake2b_many(items) == [blake2b(i, digest_size=32).digest() for i in items]
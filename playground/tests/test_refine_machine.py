@@ -0,0 +1,58 @@
+"""Tests for inner PVMs created by the refine `machine` / `invoke` host calls"""
+from tsrkit_types import U64
+from tsrkit_pvm import get_engine
+
+from playground.execution.invocations.functions.refine_fns import (
+    RefineContext,
+    RefinementMap,
+    RefineFunctions,
+)
+
+# Counts r0 up to r1 = 1_000_000 then traps
+LOOP = bytes([
+    0, 0, 26, 51, 0, 51, 1, 64, 66, 15, 40, 2, 149, 0, 1, 171, 16, 253,
+    20, 3, 239, 190, 173, 222, 0, 0, 0, 0, 0, 133, 146, 0, 2,
+])
+CODE_ADDR, ARGS_ADDR = 0x10000, 0x11000
+
+
+def _setup():
+    memory = get_engine().memory({}, [16, 17], [16, 17])
+    memory.write(CODE_ADDR, LOOP)
+    context = RefineContext(m=RefinementMap({}), e=[])
+    return memory, context
+
+
+def _machine(memory, context, code_len=len(LOOP)):
+    registers = [0] * 13
+    registers[7:10] = [CODE_ADDR, code_len, 0]
+    _, _, registers, memory, context = RefineFunctions.machine(10, registers, memory, context)
+    return registers[7]
+
+
+def test_machine_shares_decoded_program():
+    memory, context = _setup()
+    a, b = _machine(memory, context), _machine(memory, context)
+    assert (a, b) == (1, 2)
+    assert context.m[a].program is context.m[b].program
+    assert isinstance(context.m[a].memory, type(memory))
+
+    memory.write(CODE_ADDR, b"\xff" * 8)
+    assert _machine(memory, context, 8) == 2**64 - 9  # HUH
+
+
+def test_invoke_runs_inner_program():
+    memory, context = _setup()
+    n = _machine(memory, context)
+    gas = 100_000
+    memory.write(ARGS_ADDR, U64(gas).encode() + bytes(13 * 8))
+
+    registers = [0] * 13
+    registers[7:9] = [n, ARGS_ADDR]
+    _, _, registers, memory, context = RefineFunctions.invoke(10, registers, memory, context)
+
+    assert registers[7] == 4  # out of gas
+    remaining = U64.decode_from(memory.read(ARGS_ADDR, 8))[0]
+    assert remaining == 0
+    r0, r1 = (U64.decode_from(memory.read(ARGS_ADDR + 8 * i, 8))[0] for i in (1, 2))
+    assert 0 < r0 < r1 == 1_000_000
@@ -0,0 +1,196 @@
+"""Tests for the mmap-backed state store and lazy delta"""
+import os
+import random
+from pathlib import Path
+
+import pytest
+from tsrkit_types import Bytes, U32
+
+from playground.types.protocol.core import Balance, BlobLength, ServiceId
+from playground.types.state import lazy
+from playground.types.state.delta import AccountData, AccountMetadata, LookupTable, Timestamps
+from playground.types.state.state import GhostState
+from playground.types.state.keys import SERVICE_ACCOUNT_INDEX, service_key, storage_key
+from playground.types.state.tau import Tau
+from playground.types.storage.state_store import StateStore
+
+GENESIS = Path(__file__).parents[1] / "playground" / "genesis.json"
+
+
+def make_state(services: int = 3, items: int = 50) -> GhostState:
+    state = GhostState.genesis(genesis_path=GENESIS)
+    state.delta.clear()
+    for s in range(services):
+        acc = AccountData(service=AccountMetadata.empty())
+        acc.storage = acc.storage.__class__({})
+        acc.preimages = acc.preimages.__class__({})
+        acc.lookup = acc.lookup.__class__({})
+        for i in range(items):
+            acc.storage[Bytes(f"key-{i}".encode())] = Bytes(f"value-{s}-{i}".encode())
+        acc.preimages[Bytes[32](bytes([s]) * 32)] = Bytes(b"blob")
+        acc.lookup[LookupTable(hash=Bytes[32](bytes([s]) * 32), length=BlobLength(4))] = Timestamps([])
+        state.delta[ServiceId(s)] = acc
+    return state
+
+
+def test_store_roundtrip(tmp_path):
+    items = {bytes([i]) * 31: bytes([i]) * i for i in range(1, 40)}
+    store = StateStore.create(str(tmp_path / "state"), items)
+    assert len(store) == len(items)
+    for key, value in items.items():
+        assert store.get(key) == value
+    assert store.get(bytes(31)) is None
+    assert [k for k, _ in store.scan(bytes([5]))] == [bytes([5]) * 31]
+
+    store.commit({bytes([1]) * 31: None, bytes([2]) * 31: b"new"})
+    assert store.get(bytes([1]) * 31) is None
+    assert store.get(bytes([2]) * 31) == b"new"
+    assert len(StateStore.open(str(tmp_path / "state"))) == len(items) - 1
+
+
+def test_commit_patches_in_place(tmp_path):
+    path = tmp_path / "state"
+    items = {bytes([i]) * 31: bytes([i]) * 1000 for i in range(1, 100)}
+    store = StateStore.create(str(path), items)
+    inode, size = os.stat(path).st_ino, os.path.getsize(path)
+
+    store.commit({bytes([1]) * 31: b"changed", bytes([2]) * 31: None, bytes([200]) * 31: b"new"})
+    # Appended to, not rewritten
+    assert os.stat(path).st_ino == inode
+    assert os.path.getsize(path) - size < 400
+    assert store.get(bytes([1]) * 31) == b"changed"
+    assert store.get(bytes([2]) * 31) is None
+    assert store.get(bytes([200]) * 31) == b"new"
+    assert len(store) == len(items)
+    store.close()
+
+
+def test_commits_match_a_dict(tmp_path):
+    rng = random.Random(3)
+    path = str(tmp_path / "state")
+    keys = [bytes([rng.randrange(4)]) + rng.randbytes(30) for _ in range(60)]
+    model = {k: rng.randbytes(20) for k in keys[:30]}
+    store = StateStore.create(path, model)
+    for round in range(200):
+        updates = {}
+        for key in rng.sample(keys, 5):
+            updates[key] = None if rng.random() < 0.3 else rng.randbytes(rng.randrange(1, 40))
+            if updates[key] is None:
+                model.pop(key, None)
+            else:
+                model[key] = updates[key]
+        store.commit(updates)
+        if round % 50 == 0:
+            store.close()
+            store = StateStore.open(path)
+        assert len(store) == len(model)
+        assert dict(store.items()) == model
+        assert list(store.keys()) == sorted(model)
+        assert [k for k, _ in store.scan(bytes([2]))] == sorted(k for k in model if k[0] == 2)
+    # Dead space is reclaimed
+    assert os.path.getsize(path) < 3 * len(StateStore.serialize(model))
+    store.close()
+
+
+def test_interrupted_commit_is_redone(tmp_path, monkeypatch):
+    path = str(tmp_path / "state")
+    store = StateStore.create(path, {bytes([i]) * 31: bytes(100) for i in range(1, 20)})
+
+    def crash(self, f, patches):
+        raise OSError("power cut")
+
+    monkeypatch.setattr(StateStore, "_patch", crash)
+    with pytest.raises(OSError):
+        store.commit({bytes([1]) * 31: b"new", bytes([99]) * 31: b"added"})
+    monkeypatch.undo()
+    store.close()
+
+    reopened = StateStore.open(path)
+    assert reopened.get(bytes([1]) * 31) == b"new"
+    assert reopened.get(bytes([99]) * 31) == b"added"
+    assert len(reopened) == 20
+    reopened.close()
+
+
+def test_save_closes_the_previous_store(tmp_path):
+    make_state(services=1, items=2).save(tmp_path / "first")
+    state = GhostState.load(tmp_path / "first")
+    first = state._store
+    state.save(tmp_path / "second")
+    assert first._file is None
+    assert state.delta[0].storage[b"key-1"] == b"value-0-1"
+
+
+def test_lazy_load(tmp_path):
+    path = tmp_path / "state"
+    make_state().save(path)
+
+    state = GhostState.load(path)
+    assert len(state.delta) == 3
+    assert state.delta.loaded == 0
+
+    storage = state.delta[1].storage
+    assert state.delta.loaded == 1
+    assert len(storage) == 0
+    assert storage[b"key-7"] == b"value-1-7"
+    assert storage.get(b"missing") is None
+    assert b"key-8" in storage
+    assert len(storage) == 2
+    assert state.delta[2].preimages[Bytes[32](bytes([2]) * 32)] == b"blob"
+
+
+def test_write_back(tmp_path):
+    path = tmp_path / "state"
+    make_state().save(path)
+
+    state = GhostState.load(path)
+    acc = state.delta[0]
+    acc.storage[b"key-1"] = Bytes(b"changed")
+    del acc.storage[b"key-2"]
+    acc.service.balance = Balance(42)
+    acc.lookup[LookupTable(hash=Bytes[32](bytes(32)), length=BlobLength(4))].append(U32(7))
+    state.tau = Tau(9)
+    del state.delta[2]
+
+    changes = state.changes()
+    assert changes[storage_key(0, b"key-2")] is None
+    state.commit()
+    assert state.changes() == {}
+
+    reloaded = GhostState.load(path)
+    assert reloaded.tau == 9
+    assert len(reloaded.delta) == 2
+    assert reloaded.delta[0].storage[b"key-1"] == b"changed"
+    assert reloaded.delta[0].storage.get(b"key-2") is None
+    assert reloaded.delta[0].storage[b"key-3"] == b"value-0-3"
+    assert reloaded.delta[0].service.balance == 42
+    assert list(reloaded.delta[0].lookup[LookupTable(hash=Bytes[32](bytes(32)), length=BlobLength(4))]) == [7]
+    assert reloaded._store.get(storage_key(2, b"key-1")) is None
+
+
+def test_changes_encode_only_fetched_accounts(tmp_path, monkeypatch):
+    path = tmp_path / "state"
+    make_state().save(path)
+    state = GhostState.load(path)
+    for s in range(3):
+        state.delta[s].service
+    state.commit()
+
+    encoded = []
+    encode = lazy.encode_account
+    monkeypatch.setattr(lazy, "encode_account", lambda meta: encoded.append(meta) or encode(meta))
+    assert state.changes() == {}
+    assert encoded == []
+
+    state.delta[1].service.balance = Balance(7)
+    assert list(state.changes()) == [service_key(SERVICE_ACCOUNT_INDEX, 1)]
+    assert len(encoded) == 1
+
+
+def test_detransform_matches_transform():
+    state = make_state(services=2, items=5)
+    restored = GhostState.detransform(state.transform())
+    assert restored.tau == state.tau
+    assert restored.kappa == state.kappa
+    assert restored.delta[1].storage[b"key-4"] == b"value-1-4"
+    assert restored.delta[1].service == AccountMetadata.empty()
@@ -0,0 +1,139 @@
+"""Tests for state Merklization"""
+import random
+from hashlib import blake2b
+from pathlib import Path
+
+from tsrkit_types import Bytes
+
+from playground.types.protocol.core import ServiceId
+from playground.types.state.delta import AccountData, AccountMetadata
+from playground.types.state.state import GhostState
+from playground.types.state.tau import Tau
+from playground.types.state.trie import StateTrie, encode_branch, encode_leaf, merkle_root
+
+GENESIS = Path(__file__).parents[1] / "playground" / "genesis.json"
+
+
+def reference_root(items: dict) -> bytes:
+    """M(d) straight from the definition"""
+
+    def bit(key, i):
+        return (key[i >> 3] >> (7 - (i & 7))) & 1
+
+    def merkle(kvs, i):
+        if not kvs:
+            return bytes(32)
+        if len(kvs) == 1:
+            return blake2b(encode_leaf(*kvs[0]), digest_size=32).digest()
+        left = [(k, v) for k, v in kvs if not bit(k, i)]
+        right = [(k, v) for k, v in kvs if bit(k, i)]
+        return blake2b(encode_branch(merkle(left, i + 1), merkle(right, i + 1)), digest_size=32).digest()
+
+    return merkle(sorted(items.items()), 0)
+
+
+def random_items(rng, n):
+    return {rng.randbytes(31): rng.randbytes(rng.choice([0, 5, 32, 33, 200])) for _ in range(n)}
+
+
+def test_root_matches_definition():
+    rng = random.Random(7)
+    assert merkle_root({}) == bytes(32)
+    for n in (1, 2, 3, 17, 200):
+        items = random_items(rng, n)
+        assert merkle_root(items) == reference_root(items)
+
+    # Keys sharing a long prefix
+    items = {bytes(30) + bytes([i]): bytes([i]) for i in range(4)}
+    assert merkle_root(items) == reference_root(items)
+
+
+def test_incremental_updates():
+    rng = random.Random(11)
+    items = random_items(rng, 500)
+    trie = StateTrie(items)
+    trie.root()
+
+    for _ in range(20):
+        changes = {}
+        for key in rng.sample(sorted(items), 5):
+            changes[key] = None
+            del items[key]
+        for key, value in random_items(rng, 5).items():
+            changes[key] = value
+            items[key] = value
+        for key in rng.sample(sorted(items), 5):
+            changes[key] = items[key] = rng.randbytes(40)
+
+        trie.hashed = 0
+        trie.update(changes)
+        assert trie.root() == reference_root(items)
+        # Only paths of touched keys are rehashed
+        assert trie.hashed < 15 * 40
+
+    for key in list(items):
+        del trie[key]
+    assert trie.root() == bytes(32)
+
+
+def test_state_root(tmp_path):
+    state = GhostState.genesis(genesis_path=GENESIS)
+    state.delta.clear()
+    acc = AccountData(service=AccountMetadata.empty())
+    acc.storage = acc.storage.__class__({Bytes(b"k"): Bytes(b"v")})
+    state.delta[ServiceId(3)] = acc
+    assert state.state_root() == reference_root(state.transform())
+
+    state.save(tmp_path / "state")
+    loaded = GhostState.load(tmp_path / "state")
+    root = loaded.state_root()
+    assert root == state.state_root()
+
+    loaded.delta[3].storage[b"k2"] = Bytes(b"v2")
+    loaded.tau = Tau(5)
+    assert loaded.state_root() != root
+    loaded.commit()
+    assert loaded.state_root() == reference_root(loaded.serialized())
+
+
+def test_state_root_without_store(monkeypatch):
+    state = GhostState.genesis(genesis_path=GENESIS)
+    state.delta.clear()
+    acc = AccountData(service=AccountMetadata.empty())
+    acc.storage = acc.storage.__class__({Bytes(b"k"): Bytes(b"v")})
+    state.delta[ServiceId(3)] = acc
+    root = state.state_root()
+
+    transforms = []
+    transform = GhostState.transform
+    monkeypatch.setattr(GhostState, "transform", lambda self: transforms.append(1) or transform(self))
+    # Through the account put in, not fetched again
+    acc.storage[b"k2"] = Bytes(b"v2")
+    changed = state.state_root()
+    assert changed != root
+    state.tau = Tau(5)
+    assert state.state_root() not in (root, changed)
+    assert transforms == []
+    assert state.delta[3] is acc
+    assert state.state_root() == reference_root(transform(state))
+
+
+def test_state_root_after_revert(tmp_path):
+    state = GhostState.genesis(genesis_path=GENESIS)
+    state.delta.clear()
+    acc = AccountData(service=AccountMetadata.empty())
+    acc.storage = acc.storage.__class__({Bytes(b"k"): Bytes(b"v")})
+    state.delta[ServiceId(3)] = acc
+    state.save(tmp_path / "state")
+
+    loaded = GhostState.load(tmp_path / "state")
+    root = loaded.state_root()
+    tau = loaded.tau
+    loaded.tau = Tau(int(tau) + 1)
+    loaded.delta[3].storage[b"k2"] = Bytes(b"v2")
+    assert loaded.state_root() != root
+
+    # Changed back: no longer in changes(), but the trie still holds the change
+    loaded.tau = tau
+    del loaded.delta[3].storage[b"k2"]
+    assert loaded.state_root() == root == reference_root(loaded.serialized())
@@ -0,0 +1,85 @@
+"""Tests for the execution tracing facade"""
+import logging
+
+import pytest
+
+from playground.execution import trace
+from playground.execution.trace import DEBUG, INFO, pvm_trace, short_hex
+
+
+@pytest.fixture
+def pvm_level():
+    """Sets the pvm logger's level; the old level and hoisted flags are restored after the test"""
+    logger = logging.getLogger("pvm")
+    old = logger.level
+    yield logger.setLevel
+    logger.setLevel(old)
+    trace.refresh()
+
+
+class Counted:
+    formatted = 0
+
+    def __str__(self):
+        Counted.formatted += 1
+        return "counted"
+
+
+def test_disabled_levels_are_hoisted(pvm_level):
+    pvm_level(logging.WARNING)
+    trace.refresh()
+    assert not pvm_trace.debug
+    assert not pvm_trace.info
+
+    pvm_level(logging.DEBUG)
+    # Levels are only re-read on refresh
+    assert not pvm_trace.debug
+    trace.refresh()
+    assert pvm_trace.debug
+
+
+def test_capture_ring_buffer(pvm_level):
+    Counted.formatted = 0
+    # Other test modules configure DEBUG logging at import time
+    pvm_level(logging.WARNING)
+    with trace.capture(capacity=3, level=INFO) as sink:
+        assert pvm_trace.info and not pvm_trace.debug
+        pvm_trace.log(DEBUG, "below capture level %s", Counted())
+        for i in range(5):
+            pvm_trace.log(INFO, "event %s %s", i, Counted())
+        assert len(sink) == 3
+        assert sink.dropped == 2
+        # Arguments are formatted when the trace is read
+        assert Counted.formatted == 0
+
+    assert sink.lines() == [
+        "... 2 earlier events dropped",
+        "INFO:pvm: event 2 counted",
+        "INFO:pvm: event 3 counted",
+        "INFO:pvm: event 4 counted",
+    ]
+    assert pvm_trace.sink is None
+
+
+def test_compiled_out(monkeypatch):
+    monkeypatch.setattr(trace, "TRACING", False)
+    with trace.capture() as sink:
+        assert not pvm_trace.debug
+        pvm_trace.error("dropped")
+    assert len(sink) == 0
+
+
+def test_short_hex():
+    assert str(short_hex(b"\x01\x02")) == "0102"
+    assert str(short_hex(bytes(range(20)), 4)) == "00010203..."
+
+
+def test_capture_listener_sees_every_event(pvm_level):
+    seen = []
+    pvm_level(logging.WARNING)
+    with trace.capture(capacity=2, listener=seen.append) as sink:
+        for i in range(4):
+            pvm_trace.log(INFO, "event %s", i)
+    # The ring buffer keeps the last two, the listener got them all as they happened
+    assert len(sink) == 2
+    assert seen == [("pvm", INFO, "event %s", (i,)) for i in range(4)]
@@ -0,0 +1,188 @@
+/**
+ * @file jam_cache.c
+ * @brief JAM Storage Cache Implementation
+ */
+
+#include "jam_cache.h"
+#include "jam_pvm.h"
+#include "jam_str.h"
+
+#if (JAM_CACHE_SLOTS & (JAM_CACHE_SLOTS - 1)) != 0
+#error "JAM_CACHE_SLOTS must be a power of two"
+#endif
+
+// --- Slots ---
+
+#define SLOT_USED    0x01  // Holds a key (stays set so probe chains survive)
+#define SLOT_VALID   0x02  // Value below is what storage holds (or will)
+#define SLOT_PRESENT 0x04  // Key exists; VALID without PRESENT means deleted
+#define SLOT_DIRTY   0x08  // Not written to storage yet
+#define SLOT_LARGE   0x10  // Value is too long to cache; reads go to the host
+
+typedef struct {
+    uint8_t flags;
+    uint8_t key_len;
+    uint8_t value_len;
+    uint8_t key[JAM_CACHE_KEY_MAX];
+    uint8_t value[JAM_CACHE_VALUE_MAX];
+} cache_slot_t;
+
+static cache_slot_t _cache[JAM_CACHE_SLOTS];
+static uint64_t _cache_used;
+
+static int _key_eq(const cache_slot_t* s, const uint8_t* key, uint64_t key_len) {
+    if (s->key_len != key_len) return 0;
+    for (uint64_t i = 0; i < key_len; i++) {
+        if (s->key[i] != key[i]) return 0;
+    }
+    return 1;
+}
+
+// FNV-1a
+static uint64_t _key_hash(const uint8_t* key, uint64_t key_len) {
+    uint64_t h = 0xcbf29ce484222325ULL;
+    for (uint64_t i = 0; i < key_len; i++) {
+        h ^= key[i];
+        h *= 0x100000001b3ULL;
+    }
+    return h;
+}
+
+// Slot holding `key`, else a free slot claimed for it, else NULL (full or too long)
+static cache_slot_t* _slot_for(const void* key, uint64_t key_len) {
+    if (key_len > JAM_CACHE_KEY_MAX) return (cache_slot_t*)0;
+    const uint8_t* k = (const uint8_t*)key;
+    uint64_t i = _key_hash(k, key_len) & (JAM_CACHE_SLOTS - 1);
+    for (uint64_t probe = 0; probe < JAM_CACHE_SLOTS; probe++) {
+        cache_slot_t* s = &_cache[i];
+        if (!(s->flags & SLOT_USED)) {
+            s->flags = SLOT_USED;
+            s->key_len = (uint8_t)key_len;
+            mem_cpy(s->key, k, key_len);
+            _cache_used++;
+            return s;
+        }
+        if (_key_eq(s, k, key_len)) return s;
+        i = (i + 1) & (JAM_CACHE_SLOTS - 1);
+    }
+    return (cache_slot_t*)0;
+}
+
+static uint64_t _copy_out(const cache_slot_t* s, void* out, uint64_t out_offset, uint64_t out_len) {
+    if (!(s->flags & SLOT_PRESENT)) return HOST_NONE;
+    if (out_offset < s->value_len) {
+        uint64_t n = s->value_len - out_offset;
+        mem_cpy(out, s->value + out_offset, n < out_len ? n : out_len);
+    }
+    return s->value_len;
+}
+
+// --- API ---
+
+uint64_t cached_get_storage(uint64_t service_id, const void* key, uint64_t key_len,
+                            void* out, uint64_t out_offset, uint64_t out_len) {
+#ifndef JAM_NO_STORAGE_CACHE
+    cache_slot_t* s = service_id == 0 ? _slot_for(key, key_len) : (cache_slot_t*)0;
+    if (s && !(s->flags & SLOT_LARGE)) {
+        if (s->flags & SLOT_VALID) return _copy_out(s, out, out_offset, out_len);
+
+        uint64_t r = get_storage(0, key, key_len, s->value, 0, JAM_CACHE_VALUE_MAX);
+        if (r == HOST_NONE) {
+            s->flags = SLOT_USED | SLOT_VALID;
+            return HOST_NONE;
+        }
+        if (!host_is_error(r) && r <= JAM_CACHE_VALUE_MAX) {
+            s->flags = SLOT_USED | SLOT_VALID | SLOT_PRESENT;
+            s->value_len = (uint8_t)r;
+            return _copy_out(s, out, out_offset, out_len);
+        }
+        if (!host_is_error(r)) {
+            // Too long to cache: the slot keeps the key, the host keeps the value
+            s->flags = SLOT_USED | SLOT_LARGE;
+            // The probe already holds the head of the value
+            if (out_offset <= JAM_CACHE_VALUE_MAX && out_len <= JAM_CACHE_VALUE_MAX - out_offset) {
+                mem_cpy(out, s->value + out_offset, out_len);
+                return r;
+            }
+        }
+    }
+#endif
+    return get_storage(service_id, key, key_len, out, out_offset, out_len);
+}
+
+uint64_t cached_set_storage(const void* key, uint64_t key_len, const void* value, uint64_t value_len) {
+#ifndef JAM_NO_STORAGE_CACHE
+    cache_slot_t* s = _slot_for(key, key_len);
+    if (s && value_len <= JAM_CACHE_VALUE_MAX) {
+        uint8_t present = value_len ? SLOT_PRESENT : 0;
+        // Writing back what storage already holds is not a change
+        int same = (s->flags & SLOT_VALID) && (s->flags & SLOT_PRESENT) == present &&
+                   s->value_len == value_len;
+        for (uint64_t i = 0; same && i < value_len; i++) {
+            same = s->value[i] == ((const uint8_t*)value)[i];
+        }
+        if (!same) {
+            mem_cpy(s->value, value, value_len);
+            s->value_len = (uint8_t)value_len;
+            s->flags = SLOT_USED | SLOT_VALID | SLOT_DIRTY | present;
+        }
+        return HOST_OK;
+    }
+    if (s) {
+        // Superseded by a direct write of a value too long to cache
+        s->flags = SLOT_USED | SLOT_LARGE;
+    }
+#endif
+    return set_storage(key, key_len, value, value_len);
+}
+
+#ifdef JAM_BATCH_STORAGE
+static jam_storage_op_t _flush_ops[JAM_CACHE_SLOTS];
+
+// All dirty slots in one set_storage_many; 0 if the host doesn't support it or
+// the call failed, leaving the slots dirty for the per-key writes
+static uint64_t _flush_batched(void) {
+    uint64_t n = 0;
+    for (uint64_t i = 0; i < JAM_CACHE_SLOTS; i++) {
+        cache_slot_t* s = &_cache[i];
+        if (!(s->flags & SLOT_DIRTY)) continue;
+        _flush_ops[n].key_ptr = (uint64_t)s->key;
+        _flush_ops[n].key_len = s->key_len;
+        _flush_ops[n].value_ptr = (uint64_t)s->value;
+        _flush_ops[n].value_len = s->value_len;
+        n++;
+    }
+    if (n == 0 || host_is_error(set_storage_many(_flush_ops, n))) return 0;
+    for (uint64_t i = 0; i < JAM_CACHE_SLOTS; i++) {
+        _cache[i].flags &= ~SLOT_DIRTY;
+    }
+    return 1;
+}
+#endif
+
+uint64_t storage_cache_flush(void) {
+    uint64_t failed = 0;
+    if (_cache_used == 0) return 0;
+#ifdef JAM_BATCH_STORAGE
+    if (_flush_batched()) return 0;
+#endif
+    for (uint64_t i = 0; i < JAM_CACHE_SLOTS; i++) {
+        cache_slot_t* s = &_cache[i];
+        if (!(s->flags & SLOT_DIRTY)) continue;
+        if (host_is_error(set_storage(s->key, s->key_len, s->value, s->value_len))) {
+            // Still not in storage; a later flush tries again
+            failed++;
+            continue;
+        }
+        s->flags &= ~SLOT_DIRTY;
+    }
+    return failed;
+}
+
+void storage_cache_reset(void) {
+    if (_cache_used == 0) return;
+    for (uint64_t i = 0; i < JAM_CACHE_SLOTS; i++) {
+        _cache[i].flags = 0;
+    }
+    _cache_used = 0;
+}
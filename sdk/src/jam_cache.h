@@ -0,0 +1,87 @@
+/**
+ * @file jam_cache.h
+ * @brief JAM Storage Cache - Write-back cache for the state layer
+ *
+ * Every storage read and write is a host call, the most expensive thing a
+ * service does. The state macros (jam_state.h, jam_state_vars.h) go through
+ * this cache instead: the first read of a key fetches it, later reads and
+ * writes of that key stay in guest memory, and dirty keys are written once
+ * when the entry point returns (the runtime calls storage_cache_flush()).
+ *
+ * The cache is a fixed open-addressed table in a static arena. Keys or values
+ * that do not fit, and writes once the table is full, go straight to the
+ * host, so the cache never changes what a service stores, only how often it
+ * asks. Deleting (writing an empty value) is buffered like any write.
+ *
+ * Direct calls to get_storage/set_storage and the jam_storage.h functions
+ * bypass the cache; don't mix them with cached state for the same key within
+ * one entry point without calling storage_cache_flush() first. The same goes
+ * for host calls that observe this service's storage as a whole, such as
+ * info (the storage footprint: item and byte counts): until a flush they see
+ * storage without the buffered writes.
+ *
+ * Configuration (define before including the SDK):
+ *   JAM_CACHE_SLOTS      table size, a power of two (default 64)
+ *   JAM_CACHE_KEY_MAX    longest cached key in bytes (default 64)
+ *   JAM_CACHE_VALUE_MAX  longest cached value in bytes (default 64)
+ *   JAM_NO_STORAGE_CACHE disable the cache; every access is a host call
+ *   JAM_BATCH_STORAGE    flush with one set_storage_many call (experimental,
+ *                        falls back to set_storage if the host lacks it or
+ *                        the call fails)
+ */
+
+#ifndef JAM_CACHE_H
+#define JAM_CACHE_H
+
+#include <stdint.h>
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+#ifndef JAM_CACHE_SLOTS
+#define JAM_CACHE_SLOTS 64
+#endif
+
+#ifndef JAM_CACHE_KEY_MAX
+#define JAM_CACHE_KEY_MAX 64
+#endif
+
+#ifndef JAM_CACHE_VALUE_MAX
+#define JAM_CACHE_VALUE_MAX 64
+#endif
+
+/**
+ * @brief Cached get_storage
+ *
+ * Same arguments and result as get_storage: the value's full length, or
+ * HOST_NONE if the key doesn't exist. Reads of other services
+ * (service_id != 0) are not cached.
+ */
+uint64_t cached_get_storage(uint64_t service_id, const void* key, uint64_t key_len,
+                            void* out, uint64_t out_offset, uint64_t out_len);
+
+/**
+ * @brief Cached set_storage
+ *
+ * Buffers the write until the next flush.
+ * @return HOST_OK if buffered, otherwise set_storage's own result
+ */
+uint64_t cached_set_storage(const void* key, uint64_t key_len, const void* value, uint64_t value_len);
+
+/**
+ * @brief Write every dirty key to storage
+ * @return Number of writes that failed; their keys stay dirty
+ */
+uint64_t storage_cache_flush(void);
+
+/**
+ * @brief Forget everything cached, dropping unflushed writes
+ */
+void storage_cache_reset(void);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif // JAM_CACHE_H
@@ -4,6 +4,7 @@
  */
 
 #include "jam_codec.h"
+#include "jam_str.h"
 
 // --- Error Messages ---
 
@@ -21,11 +22,24 @@ const char* codec_result_name(codec_result_t result) {
 
 // --- General Integer Decoding ---
 
+// Leading one bits of each nibble
+static const uint8_t _nibble_ones[16] = {0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 3, 4};
+
+// Little-endian value of n (<= 8) bytes
+static inline uint64_t _load_le(const uint8_t* p, uint64_t n) {
+    uint64_t v = 0;
+    for (uint64_t i = 0; i < n; i++) {
+        v |= (uint64_t)p[i] << (8 * i);
+    }
+    return v;
+}
+
 codec_result_t codec_decode_uint(codec_decoder_t* dec, uint64_t* out) {
     if (!dec || !out) return CODEC_ERR_NULL;
     if (!codec_decoder_has(dec, 1)) return CODEC_ERR_BUFFER;
     
-    uint8_t tag = dec->buffer[dec->offset];
+    const uint8_t* p = dec->buffer + dec->offset;
+    uint8_t tag = p[0];
     
     // Single byte: 0-127
     if (tag < 128) {
@@ -34,63 +48,18 @@ codec_result_t codec_decode_uint(codec_decoder_t* dec, uint64_t* out) {
         return CODEC_OK;
     }
     
-    // Full 64-bit encoding (tag == 0xFF)
-    if (tag == 0xFF) {
-        if (!codec_decoder_has(dec, 9)) return CODEC_ERR_BUFFER;
-        
-        *out = (uint64_t)dec->buffer[dec->offset + 1]
-             | ((uint64_t)dec->buffer[dec->offset + 2] << 8)
-             | ((uint64_t)dec->buffer[dec->offset + 3] << 16)
-             | ((uint64_t)dec->buffer[dec->offset + 4] << 24)
-             | ((uint64_t)dec->buffer[dec->offset + 5] << 32)
-             | ((uint64_t)dec->buffer[dec->offset + 6] << 40)
-             | ((uint64_t)dec->buffer[dec->offset + 7] << 48)
-             | ((uint64_t)dec->buffer[dec->offset + 8] << 56);
-        dec->offset += 9;
-        return CODEC_OK;
-    }
-    
-    // Variable length encoding
-    // Calculate l from tag: l = floor(8 - log2(256 - tag))
-    // For tag in [128, 191]: l = 1 (2 bytes total)
-    // For tag in [192, 223]: l = 2 (3 bytes total)
-    // For tag in [224, 239]: l = 3 (4 bytes total)
-    // For tag in [240, 247]: l = 4 (5 bytes total)
-    // For tag in [248, 251]: l = 5 (6 bytes total)
-    // For tag in [252, 253]: l = 6 (7 bytes total)
-    // For tag == 254:        l = 7 (8 bytes total)
-    
-    uint8_t l;
-    if (tag < 192) {
-        l = 1;
-    } else if (tag < 224) {
-        l = 2;
-    } else if (tag < 240) {
-        l = 3;
-    } else if (tag < 248) {
-        l = 4;
-    } else if (tag < 252) {
-        l = 5;
-    } else if (tag < 254) {
-        l = 6;
-    } else {
-        l = 7; // tag == 254
-    }
+    // The tag's leading ones count the bytes that follow (l = 1..8); rv64imac
+    // has no clz, so count them a nibble at a time.
+    uint64_t l = _nibble_ones[tag >> 4];
+    if (l == 4) l += _nibble_ones[tag & 0x0F];
     
     if (!codec_decoder_has(dec, 1 + l)) return CODEC_ERR_BUFFER;
     
-    // alpha = tag + 2^(8-l) - 256
-    uint8_t shift = 8 - l;
-    uint64_t alpha = tag + (1 << shift) - 256;
-    
-    // beta = little-endian decode of next l bytes
-    uint64_t beta = 0;
-    for (uint8_t i = 0; i < l; i++) {
-        beta |= ((uint64_t)dec->buffer[dec->offset + 1 + i]) << (8 * i);
-    }
-    
-    // value = alpha * 2^(l*8) + beta
-    *out = (alpha << (l * 8)) + beta;
+    // value = alpha * 2^(8l) + beta, where alpha is what the tag holds after
+    // its prefix and beta is the next l bytes little-endian. The shift is
+    // split in two because l == 8 (alpha == 0) would shift by 64.
+    uint64_t alpha = tag & (0xFF >> l);
+    *out = ((alpha << (4 * l)) << (4 * l)) + _load_le(p + 1, l);
     dec->offset += 1 + l;
     return CODEC_OK;
 }
@@ -179,10 +148,7 @@ codec_result_t codec_decode_fixed_binary(codec_decoder_t* dec, uint8_t* out_data
     if (!dec || !out_data) return CODEC_ERR_NULL;
     if (!codec_decoder_has(dec, expected_len)) return CODEC_ERR_BUFFER;
     
-    // Copy data to output buffer
-    for (uint64_t i = 0; i < expected_len; i++) {
-        out_data[i] = dec->buffer[dec->offset + i];
-    }
+    mem_cpy(out_data, dec->buffer + dec->offset, expected_len);
     dec->offset += expected_len;
     
     return CODEC_OK;
@@ -202,6 +168,42 @@ codec_result_t codec_decode_bool(codec_decoder_t* dec, uint8_t* out) {
     return CODEC_OK;
 }
 
+// --- Array Decoding ---
+
+codec_result_t codec_decode_u16_array(codec_decoder_t* dec, uint16_t* out, uint64_t count) {
+    if (!dec || (!out && count)) return CODEC_ERR_NULL;
+    if (count > codec_decoder_remaining(dec) / 2) return CODEC_ERR_BUFFER;
+    
+    const uint8_t* p = dec->buffer + dec->offset;
+    for (uint64_t i = 0; i < count; i++, p += 2) {
+        out[i] = (uint16_t)(p[0] | (p[1] << 8));
+    }
+    dec->offset += count * 2;
+    return CODEC_OK;
+}
+
+codec_result_t codec_decode_u32_array(codec_decoder_t* dec, uint32_t* out, uint64_t count) {
+    if (!dec || (!out && count)) return CODEC_ERR_NULL;
+    if (count > codec_decoder_remaining(dec) / 4) return CODEC_ERR_BUFFER;
+    
+    const uint8_t* p = dec->buffer + dec->offset;
+    for (uint64_t i = 0; i < count; i++, p += 4) {
+        out[i] = (uint32_t)_load_le(p, 4);
+    }
+    dec->offset += count * 4;
+    return CODEC_OK;
+}
+
+codec_result_t codec_decode_u64_array(codec_decoder_t* dec, uint64_t* out, uint64_t count) {
+    if (!dec || (!out && count)) return CODEC_ERR_NULL;
+    if (count > codec_decoder_remaining(dec) / 8) return CODEC_ERR_BUFFER;
+    
+    // PVM is little-endian, so the wire format is already the memory layout
+    mem_cpy(out, dec->buffer + dec->offset, count * 8);
+    dec->offset += count * 8;
+    return CODEC_OK;
+}
+
 // --- General Integer Encoding ---
 
 uint64_t codec_encode_uint_size(uint64_t value) {
@@ -222,34 +224,27 @@ codec_result_t codec_encode_uint(codec_encoder_t* enc, uint64_t value) {
     uint64_t size = codec_encode_uint_size(value);
     if (codec_encoder_remaining(enc) < size) return CODEC_ERR_BUFFER;
     
-    if (value < 128) {
-        enc->buffer[enc->offset++] = (uint8_t)value;
-        return CODEC_OK;
-    }
+    // Write through a local pointer: stores to the buffer could alias
+    // enc->offset, so bumping it per byte reloads and stores it every time
+    uint8_t* p = enc->buffer + enc->offset;
+    enc->offset += size;
     
-    if (size == 9) {
-        // Full 64-bit encoding
-        enc->buffer[enc->offset++] = 0xFF;
-        for (int i = 0; i < 8; i++) {
-            enc->buffer[enc->offset++] = (uint8_t)(value >> (i * 8));
-        }
+    if (size == 1) {
+        p[0] = (uint8_t)value;
         return CODEC_OK;
     }
     
-    // Variable length encoding
-    uint8_t l = (uint8_t)(size - 1);
-    uint8_t shift = 8 - l;
-    
-    // alpha = value >> (l * 8)
-    uint64_t alpha = value >> (l * 8);
+    // l bytes follow the tag; with l == 8 the tag is 0xFF and carries no value
+    // bits (split shift: 8l would be 64)
+    uint64_t l = size - 1;
+    uint64_t alpha = (value >> (4 * l)) >> (4 * l);
     
-    // tag = 256 - 2^shift + alpha
-    uint8_t tag = (uint8_t)(256 - (1 << shift) + alpha);
-    enc->buffer[enc->offset++] = tag;
+    // tag = 256 - 2^(8-l) + alpha
+    p[0] = (uint8_t)(256 - (1 << (8 - l)) + alpha);
     
     // beta = value % 2^(l*8) - little endian
-    for (uint8_t i = 0; i < l; i++) {
-        enc->buffer[enc->offset++] = (uint8_t)(value >> (i * 8));
+    for (uint64_t i = 0; i < l; i++) {
+        p[1 + i] = (uint8_t)(value >> (i * 8));
     }
     
     return CODEC_OK;
@@ -269,8 +264,10 @@ codec_result_t codec_encode_u16(codec_encoder_t* enc, uint16_t value) {
     if (!enc) return CODEC_ERR_NULL;
     if (codec_encoder_remaining(enc) < 2) return CODEC_ERR_BUFFER;
     
-    enc->buffer[enc->offset++] = (uint8_t)(value);
-    enc->buffer[enc->offset++] = (uint8_t)(value >> 8);
+    uint8_t* p = enc->buffer + enc->offset;
+    p[0] = (uint8_t)(value);
+    p[1] = (uint8_t)(value >> 8);
+    enc->offset += 2;
     return CODEC_OK;
 }
 
@@ -278,10 +275,12 @@ codec_result_t codec_encode_u32(codec_encoder_t* enc, uint32_t value) {
     if (!enc) return CODEC_ERR_NULL;
     if (codec_encoder_remaining(enc) < 4) return CODEC_ERR_BUFFER;
     
-    enc->buffer[enc->offset++] = (uint8_t)(value);
-    enc->buffer[enc->offset++] = (uint8_t)(value >> 8);
-    enc->buffer[enc->offset++] = (uint8_t)(value >> 16);
-    enc->buffer[enc->offset++] = (uint8_t)(value >> 24);
+    uint8_t* p = enc->buffer + enc->offset;
+    p[0] = (uint8_t)(value);
+    p[1] = (uint8_t)(value >> 8);
+    p[2] = (uint8_t)(value >> 16);
+    p[3] = (uint8_t)(value >> 24);
+    enc->offset += 4;
     return CODEC_OK;
 }
 
@@ -289,9 +288,11 @@ codec_result_t codec_encode_u64(codec_encoder_t* enc, uint64_t value) {
     if (!enc) return CODEC_ERR_NULL;
     if (codec_encoder_remaining(enc) < 8) return CODEC_ERR_BUFFER;
     
+    uint8_t* p = enc->buffer + enc->offset;
     for (int i = 0; i < 8; i++) {
-        enc->buffer[enc->offset++] = (uint8_t)(value >> (i * 8));
+        p[i] = (uint8_t)(value >> (i * 8));
     }
+    enc->offset += 8;
     return CODEC_OK;
 }
 
@@ -307,9 +308,8 @@ codec_result_t codec_encode_binary(codec_encoder_t* enc, const uint8_t* data, ui
     // Encode data
     if (codec_encoder_remaining(enc) < len) return CODEC_ERR_BUFFER;
     
-    for (uint64_t i = 0; i < len; i++) {
-        enc->buffer[enc->offset++] = data[i];
-    }
+    mem_cpy(enc->buffer + enc->offset, data, len);
+    enc->offset += len;
     
     return CODEC_OK;
 }
@@ -318,9 +318,8 @@ codec_result_t codec_encode_fixed_binary(codec_encoder_t* enc, const uint8_t* da
     if (!enc) return CODEC_ERR_NULL;
     if (codec_encoder_remaining(enc) < len) return CODEC_ERR_BUFFER;
     
-    for (uint64_t i = 0; i < len; i++) {
-        enc->buffer[enc->offset++] = data[i];
-    }
+    mem_cpy(enc->buffer + enc->offset, data, len);
+    enc->offset += len;
     
     return CODEC_OK;
 }
@@ -155,6 +155,18 @@ codec_result_t codec_decode_fixed_binary(codec_decoder_t* dec, uint8_t* out_data
 
 codec_result_t codec_decode_bool(codec_decoder_t* dec, uint8_t* out);
 
+// --- Array Decoding ---
+
+/**
+ * @brief Decode `count` consecutive fixed-width integers
+ *
+ * One bounds check for the whole run instead of one per element. Nothing is
+ * consumed on error.
+ */
+codec_result_t codec_decode_u16_array(codec_decoder_t* dec, uint16_t* out, uint64_t count);
+codec_result_t codec_decode_u32_array(codec_decoder_t* dec, uint32_t* out, uint64_t count);
+codec_result_t codec_decode_u64_array(codec_decoder_t* dec, uint64_t* out, uint64_t count);
+
 // --- General Integer Encoding ---
 
 /**
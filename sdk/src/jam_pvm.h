@@ -73,6 +73,27 @@ uint64_t get_storage(uint64_t service_id, const void* key, uint64_t key_len, voi
 // Index 4: Write
 uint64_t set_storage(const void* key, uint64_t key_len, const void* value, uint64_t value_len);
 
+// --- Batched storage (experimental) ---------------------------------------
+// Not part of the protocol: hosts that don't enable them answer HOST_WHAT and
+// callers fall back to get_storage/set_storage. Each operation's `result`
+// gets what the single-key call would have returned.
+
+typedef struct {
+    uint64_t key_ptr;
+    uint64_t key_len;
+    uint64_t value_ptr;     // read: output buffer, write: value
+    uint64_t value_len;     // read: output capacity, write: value length (0 deletes)
+    uint64_t result;
+} jam_storage_op_t;
+
+#define JAM_BATCH_MAX_ITEMS 1024
+
+// Index 200: Read many. Returns count, or HOST_WHAT if unsupported
+uint64_t get_storage_many(uint64_t service_id, jam_storage_op_t* ops, uint64_t count);
+
+// Index 201: Write many, in order. Returns count, or HOST_WHAT if unsupported
+uint64_t set_storage_many(jam_storage_op_t* ops, uint64_t count);
+
 // Index 100: Log (raw)
 void log_raw(uint64_t level, const void* target, uint64_t target_len, const void* message, uint64_t message_len);
 
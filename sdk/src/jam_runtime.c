@@ -10,6 +10,7 @@
 #include "jam_service.h"
 #include "jam_codec.h"
 #include "jam_pvm.h"
+#include "jam_cache.h"
 
 // --- Refine Entry Point ---
 
@@ -44,13 +45,17 @@ jam_refine_result_t _jam_entry_refine(uint8_t* arg_ptr, uint64_t arg_len) {
     #endif
     
     // Call user's refine hook with individual arguments
-    return jam_hook_refine(
+    storage_cache_reset();
+    jam_refine_result_t result = jam_hook_refine(
         args.item_index,
         args.service_id,
         args.payload,
         args.payload_len,
         args.work_package_hash
     );
+    // Write back what the hook buffered in the storage cache
+    storage_cache_flush();
+    return result;
 }
 
 // --- Accumulate Entry Point ---
@@ -73,11 +78,13 @@ void _jam_entry_accumulate(uint8_t* arg_ptr, uint64_t arg_len) {
     #endif
     
     // Call user's accumulate hook with individual arguments
+    storage_cache_reset();
     jam_hook_accumulate(
         args.timeslot,
         args.service_id,
         args.num_inputs
     );
+    storage_cache_flush();
 }
 
 // --- On-Transfer Entry Point ---
@@ -85,7 +92,9 @@ void _jam_entry_accumulate(uint8_t* arg_ptr, uint64_t arg_len) {
 void _jam_entry_on_transfer(uint8_t* arg_ptr, uint64_t arg_len) {
     // TODO: Implement on_transfer argument decoding
     // For now, call with empty args
+    storage_cache_reset();
     jam_hook_on_transfer(0, 0, 0, (uint8_t*)0, 0);
+    storage_cache_flush();
 }
 
 // --- Entry Point Wrappers ---
@@ -21,6 +21,9 @@
 // Include the storage module
 #include "jam_storage.c"
 
+// Include the storage cache (depends on jam_str)
+#include "jam_cache.c"
+
 // Include the service types implementation
 #include "jam_service.c"
 
@@ -7,6 +7,7 @@
  * - String utilities (jam_str.h) 
  * - Logging utilities (jam_log.h)
  * - Codec for encoding/decoding (jam_codec.h)
+ * - Storage cache behind the state macros (jam_cache.h)
  * - Service types and argument structures (jam_service.h)
  * - Runtime entry points (jam_runtime.h)
  * 
@@ -42,6 +43,7 @@
 #include "jam_log.h"
 #include "jam_codec.h"
 #include "jam_storage.h"
+#include "jam_cache.h"
 #include "jam_state.h"
 #include "jam_service.h"
 #include "jam_runtime.h"
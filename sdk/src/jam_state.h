@@ -20,6 +20,11 @@
  *   // Convenience
  *   INC(counter);              // counter++
  *   DEC(counter);              // counter--
+ *
+ * Accesses go through the write-back cache in jam_cache.h, so INC(counter)
+ * costs at most one read per entry point and the write lands once, when the
+ * entry point returns. Declare a variable with the _DIRECT variant
+ * (STATE_U64_DIRECT, MAP_U64_DIRECT, ...) to make every access a host call.
  */
 
 #ifndef JAM_STATE_H
@@ -28,6 +33,7 @@
 #include <stdint.h>
 #include "jam_str.h"
 #include "jam_pvm.h"
+#include "jam_cache.h"
 
 #ifdef __cplusplus
 extern "C" {
@@ -61,47 +67,56 @@ static inline uint32_t _decode_u32_le(const uint8_t* buf) {
 // State Variable Declaration Macros
 // =============================================================================
 
-#define STATE_U64(name) \
+#define _STATE_U64(name, _rd, _wr) \
     static const char _k_##name[] = #name; \
     static inline uint64_t _get_##name(void) { \
         uint8_t _b[8]; \
-        uint64_t _r = get_storage(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 8); \
+        uint64_t _r = _rd(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 8); \
         return (_r == HOST_NONE || host_is_error(_r) || _r != 8) ? 0 : _decode_u64_le(_b); \
     } \
     static inline void _set_##name(uint64_t _v) { \
         uint8_t _b[8]; \
         _encode_u64_le(_v, _b); \
-        set_storage(_k_##name, sizeof(_k_##name)-1, _b, 8); \
+        _wr(_k_##name, sizeof(_k_##name)-1, _b, 8); \
     } \
     typedef int _dummy_##name
 
-#define STATE_U32(name) \
+#define STATE_U64(name)        _STATE_U64(name, cached_get_storage, cached_set_storage)
+#define STATE_U64_DIRECT(name) _STATE_U64(name, get_storage, set_storage)
+
+#define _STATE_U32(name, _rd, _wr) \
     static const char _k_##name[] = #name; \
     static inline uint32_t _get_##name(void) { \
         uint8_t _b[4]; \
-        uint64_t _r = get_storage(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 4); \
+        uint64_t _r = _rd(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 4); \
         return (_r == HOST_NONE || host_is_error(_r) || _r != 4) ? 0 : _decode_u32_le(_b); \
     } \
     static inline void _set_##name(uint32_t _v) { \
         uint8_t _b[4]; \
         _encode_u32_le(_v, _b); \
-        set_storage(_k_##name, sizeof(_k_##name)-1, _b, 4); \
+        _wr(_k_##name, sizeof(_k_##name)-1, _b, 4); \
     } \
     typedef int _dummy_##name
 
-#define STATE_BOOL(name) \
+#define STATE_U32(name)        _STATE_U32(name, cached_get_storage, cached_set_storage)
+#define STATE_U32_DIRECT(name) _STATE_U32(name, get_storage, set_storage)
+
+#define _STATE_BOOL(name, _rd, _wr) \
     static const char _k_##name[] = #name; \
     static inline int _get_##name(void) { \
         uint8_t _b[1]; \
-        uint64_t _r = get_storage(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 1); \
+        uint64_t _r = _rd(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 1); \
         return (_r == HOST_NONE || host_is_error(_r) || _r != 1) ? 0 : (_b[0] != 0); \
     } \
     static inline void _set_##name(int _v) { \
         uint8_t _b[1] = { _v ? 1 : 0 }; \
-        set_storage(_k_##name, sizeof(_k_##name)-1, _b, 1); \
+        _wr(_k_##name, sizeof(_k_##name)-1, _b, 1); \
     } \
     typedef int _dummy_##name
 
+#define STATE_BOOL(name)        _STATE_BOOL(name, cached_get_storage, cached_set_storage)
+#define STATE_BOOL_DIRECT(name) _STATE_BOOL(name, get_storage, set_storage)
+
 // =============================================================================
 // Access Macros
 // =============================================================================
@@ -123,7 +138,7 @@ static inline uint32_t _decode_u32_le(const uint8_t* buf) {
 // Mapping support: mapping(bytes => uint64)
 // =============================================================================
 
-#define MAP_U64(name) \
+#define _MAP_U64(name, _rd, _wr) \
     static const char _mp_##name[] = #name ":"; \
     static inline uint64_t _mget_##name(const void* _key, uint64_t _klen) { \
         char _fk[64]; \
@@ -132,7 +147,7 @@ static inline uint32_t _decode_u32_le(const uint8_t* buf) {
         uint64_t _clen = _klen > (64 - _plen) ? (64 - _plen) : _klen; \
         mem_cpy(_fk + _plen, _key, _clen); \
         uint8_t _b[8]; \
-        uint64_t _r = get_storage(0, _fk, _plen + _clen, _b, 0, 8); \
+        uint64_t _r = _rd(0, _fk, _plen + _clen, _b, 0, 8); \
         return (_r == HOST_NONE || host_is_error(_r) || _r != 8) ? 0 : _decode_u64_le(_b); \
     } \
     static inline void _mset_##name(const void* _key, uint64_t _klen, uint64_t _v) { \
@@ -143,10 +158,13 @@ static inline uint32_t _decode_u32_le(const uint8_t* buf) {
         mem_cpy(_fk + _plen, _key, _clen); \
         uint8_t _b[8]; \
         _encode_u64_le(_v, _b); \
-        set_storage(_fk, _plen + _clen, _b, 8); \
+        _wr(_fk, _plen + _clen, _b, 8); \
     } \
     typedef int _dummy_##name
 
+#define MAP_U64(name)        _MAP_U64(name, cached_get_storage, cached_set_storage)
+#define MAP_U64_DIRECT(name) _MAP_U64(name, get_storage, set_storage)
+
 #define MAP_GET(name, key, klen)        _mget_##name(key, klen)
 #define MAP_SET(name, key, klen, val)   _mset_##name(key, klen, val)
 #define MAP_ADD(name, key, klen, n)     do { _mset_##name(key, klen, _mget_##name(key, klen) + (n)); } while(0)
@@ -18,6 +18,11 @@
  *       counter = 42;
  *       state_save();
  *   }
+ *
+ * Storage goes through the write-back cache (jam_cache.h): state_save() and
+ * map setters only buffer writes, which the runtime flushes once the entry
+ * point returns. Append _DIRECT to a type (U64_DIRECT, MAP_DIRECT, ...) to
+ * read and write that variable with a host call every time.
  */
 
 #ifndef JAM_STATE_VARS_H
@@ -54,62 +59,57 @@ static inline jam_refine_result_t ok_void(void) {
 }
 
 static inline int _mem_cmp(const void* a, const void* b, uint64_t n) {
-    const uint8_t* p1 = (const uint8_t*)a;
-    const uint8_t* p2 = (const uint8_t*)b;
-    for (uint64_t i = 0; i < n; i++) {
-        if (p1[i] != p2[i]) return p1[i] - p2[i];
-    }
-    return 0;
+    return mem_cmp(a, b, n);
 }
 
 // =============================================================================
 // Accessor Generators (Internal)
 // =============================================================================
 
-#define _GEN_ACCESSOR_U64(name) \
+#define _GEN_ACCESSOR_U64_WITH(name, _rd, _wr) \
     static const char _k_##name[] = #name; \
     static inline uint64_t _read_##name(void) { \
         uint8_t _b[8]; \
-        uint64_t _r = get_storage(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 8); \
+        uint64_t _r = _rd(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 8); \
         return (_r == HOST_NONE || host_is_error(_r) || _r != 8) ? 0 : _decode_u64_le(_b); \
     } \
     static inline void _write_##name(uint64_t _v) { \
         uint8_t _b[8]; \
         _encode_u64_le(_v, _b); \
-        set_storage(_k_##name, sizeof(_k_##name)-1, _b, 8); \
+        _wr(_k_##name, sizeof(_k_##name)-1, _b, 8); \
     }
 
-#define _GEN_ACCESSOR_U32(name) \
+#define _GEN_ACCESSOR_U32_WITH(name, _rd, _wr) \
     static const char _k_##name[] = #name; \
     static inline uint32_t _read_##name(void) { \
         uint8_t _b[4]; \
-        uint64_t _r = get_storage(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 4); \
+        uint64_t _r = _rd(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 4); \
         return (_r == HOST_NONE || host_is_error(_r) || _r != 4) ? 0 : _decode_u32_le(_b); \
     } \
     static inline void _write_##name(uint32_t _v) { \
         uint8_t _b[4]; \
         _encode_u32_le(_v, _b); \
-        set_storage(_k_##name, sizeof(_k_##name)-1, _b, 4); \
+        _wr(_k_##name, sizeof(_k_##name)-1, _b, 4); \
     }
 
-#define _GEN_ACCESSOR_BOOL(name) \
+#define _GEN_ACCESSOR_BOOL_WITH(name, _rd, _wr) \
     static const char _k_##name[] = #name; \
     static inline int _read_##name(void) { \
         uint8_t _b[1]; \
-        uint64_t _r = get_storage(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 1); \
+        uint64_t _r = _rd(0, _k_##name, sizeof(_k_##name)-1, _b, 0, 1); \
         return (_r == HOST_NONE || host_is_error(_r) || _r != 1) ? 0 : (_b[0] != 0); \
     } \
     static inline void _write_##name(int _v) { \
         uint8_t _b[1] = { _v ? 1 : 0 }; \
-        set_storage(_k_##name, sizeof(_k_##name)-1, _b, 1); \
+        _wr(_k_##name, sizeof(_k_##name)-1, _b, 1); \
     }
 
-#define _GEN_ACCESSOR_STRUCT(name, type) \
+#define _GEN_ACCESSOR_STRUCT_WITH(name, type, _rd, _wr) \
     static const char _k_##name[] = #name; \
     static inline type _read_##name(void) { \
         type _v; \
         uint8_t _b[sizeof(type)]; \
-        uint64_t _r = get_storage(0, _k_##name, sizeof(_k_##name)-1, _b, 0, sizeof(type)); \
+        uint64_t _r = _rd(0, _k_##name, sizeof(_k_##name)-1, _b, 0, sizeof(type)); \
         if (_r == HOST_NONE || host_is_error(_r) || _r != sizeof(type)) { \
             mem_set(&_v, 0, sizeof(type)); \
         } else { \
@@ -118,10 +118,10 @@ static inline int _mem_cmp(const void* a, const void* b, uint64_t n) {
         return _v; \
     } \
     static inline void _write_##name(type _v) { \
-        set_storage(_k_##name, sizeof(_k_##name)-1, &_v, sizeof(type)); \
+        _wr(_k_##name, sizeof(_k_##name)-1, &_v, sizeof(type)); \
     }
 
-#define _GEN_ACCESSOR_MAP(name, key_type, val_type) \
+#define _GEN_ACCESSOR_MAP_WITH(name, key_type, val_type, _rd, _wr) \
     static const char _k_##name[] = #name; \
     static inline val_type name##_get(key_type key) { \
         val_type _v; \
@@ -129,7 +129,7 @@ static inline int _mem_cmp(const void* a, const void* b, uint64_t n) {
         mem_cpy(_k, _k_##name, sizeof(_k_##name) - 1); \
         _encode_u64_le((uint64_t)key, _k + sizeof(_k_##name) - 1); \
         uint8_t _b[sizeof(val_type)]; \
-        uint64_t _r = get_storage(0, _k, sizeof(_k), _b, 0, sizeof(val_type)); \
+        uint64_t _r = _rd(0, _k, sizeof(_k), _b, 0, sizeof(val_type)); \
         if (_r == HOST_NONE || host_is_error(_r) || _r != sizeof(val_type)) { \
             mem_set(&_v, 0, sizeof(val_type)); \
         } else { \
@@ -141,9 +141,20 @@ static inline int _mem_cmp(const void* a, const void* b, uint64_t n) {
         uint8_t _k[sizeof(_k_##name) - 1 + 8]; \
         mem_cpy(_k, _k_##name, sizeof(_k_##name) - 1); \
         _encode_u64_le((uint64_t)key, _k + sizeof(_k_##name) - 1); \
-        set_storage(_k, sizeof(_k), &_v, sizeof(val_type)); \
+        _wr(_k, sizeof(_k), &_v, sizeof(val_type)); \
     }
 
+#define _GEN_ACCESSOR_U64(name)                          _GEN_ACCESSOR_U64_WITH(name, cached_get_storage, cached_set_storage)
+#define _GEN_ACCESSOR_U32(name)                          _GEN_ACCESSOR_U32_WITH(name, cached_get_storage, cached_set_storage)
+#define _GEN_ACCESSOR_BOOL(name)                         _GEN_ACCESSOR_BOOL_WITH(name, cached_get_storage, cached_set_storage)
+#define _GEN_ACCESSOR_STRUCT(name, type)                 _GEN_ACCESSOR_STRUCT_WITH(name, type, cached_get_storage, cached_set_storage)
+#define _GEN_ACCESSOR_MAP(name, key_type, val_type)      _GEN_ACCESSOR_MAP_WITH(name, key_type, val_type, cached_get_storage, cached_set_storage)
+#define _GEN_ACCESSOR_U64_DIRECT(name)                   _GEN_ACCESSOR_U64_WITH(name, get_storage, set_storage)
+#define _GEN_ACCESSOR_U32_DIRECT(name)                   _GEN_ACCESSOR_U32_WITH(name, get_storage, set_storage)
+#define _GEN_ACCESSOR_BOOL_DIRECT(name)                  _GEN_ACCESSOR_BOOL_WITH(name, get_storage, set_storage)
+#define _GEN_ACCESSOR_STRUCT_DIRECT(name, type)          _GEN_ACCESSOR_STRUCT_WITH(name, type, get_storage, set_storage)
+#define _GEN_ACCESSOR_MAP_DIRECT(name, key_type, val_type) _GEN_ACCESSOR_MAP_WITH(name, key_type, val_type, get_storage, set_storage)
+
 // Dispatcher
 #define _GEN_ACCESSOR(type, name, ...) _GEN_ACCESSOR_##type(name, ##__VA_ARGS__)
 
@@ -157,6 +168,12 @@ static inline int _mem_cmp(const void* a, const void* b, uint64_t n) {
 #define _GEN_GLOBAL_STRUCT(name, type) type name; type _orig_##name;
 #define _GEN_GLOBAL_MAP(name, key_type, val_type)
 
+#define _GEN_GLOBAL_U64_DIRECT(name) _GEN_GLOBAL_U64(name)
+#define _GEN_GLOBAL_U32_DIRECT(name) _GEN_GLOBAL_U32(name)
+#define _GEN_GLOBAL_BOOL_DIRECT(name) _GEN_GLOBAL_BOOL(name)
+#define _GEN_GLOBAL_STRUCT_DIRECT(name, type) _GEN_GLOBAL_STRUCT(name, type)
+#define _GEN_GLOBAL_MAP_DIRECT(name, key_type, val_type)
+
 #define _GEN_GLOBAL(type, name, ...) _GEN_GLOBAL_##type(name, ##__VA_ARGS__)
 
 // =============================================================================
@@ -169,6 +186,12 @@ static inline int _mem_cmp(const void* a, const void* b, uint64_t n) {
 #define _GEN_LOAD_STRUCT(name, type) name = _read_##name(); _orig_##name = name;
 #define _GEN_LOAD_MAP(name, key_type, val_type)
 
+#define _GEN_LOAD_U64_DIRECT(name) _GEN_LOAD_U64(name)
+#define _GEN_LOAD_U32_DIRECT(name) _GEN_LOAD_U32(name)
+#define _GEN_LOAD_BOOL_DIRECT(name) _GEN_LOAD_BOOL(name)
+#define _GEN_LOAD_STRUCT_DIRECT(name, type) _GEN_LOAD_STRUCT(name, type)
+#define _GEN_LOAD_MAP_DIRECT(name, key_type, val_type)
+
 #define _GEN_LOAD(type, name, ...) _GEN_LOAD_##type(name, ##__VA_ARGS__)
 
 #define _GEN_SAVE_U64(name) if (name != _orig_##name) _write_##name(name);
@@ -177,6 +200,12 @@ static inline int _mem_cmp(const void* a, const void* b, uint64_t n) {
 #define _GEN_SAVE_STRUCT(name, type) if (_mem_cmp(&name, &_orig_##name, sizeof(type)) != 0) _write_##name(name);
 #define _GEN_SAVE_MAP(name, key_type, val_type)
 
+#define _GEN_SAVE_U64_DIRECT(name) _GEN_SAVE_U64(name)
+#define _GEN_SAVE_U32_DIRECT(name) _GEN_SAVE_U32(name)
+#define _GEN_SAVE_BOOL_DIRECT(name) _GEN_SAVE_BOOL(name)
+#define _GEN_SAVE_STRUCT_DIRECT(name, type) _GEN_SAVE_STRUCT(name, type)
+#define _GEN_SAVE_MAP_DIRECT(name, key_type, val_type)
+
 #define _GEN_SAVE(type, name, ...) _GEN_SAVE_##type(name, ##__VA_ARGS__)
 
 // =============================================================================
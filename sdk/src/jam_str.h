@@ -31,6 +31,9 @@ void* mem_cpy(void* dest, const void* src, uint64_t n);
 /** @brief Set n bytes to value */
 void* mem_set(void* dest, int val, uint64_t n);
 
+/** @brief Compare n bytes: <0, 0 or >0 like memcmp */
+int mem_cmp(const void* a, const void* b, uint64_t n);
+
 // --- Conversion ---
 
 /** @brief Convert uint64 to decimal string, returns chars written */
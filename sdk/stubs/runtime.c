@@ -2,6 +2,7 @@
 #include <stdint.h>
 #include <stddef.h>
 #include "../src/polkavm_guest.h"
+#include "../src/jam_pvm.h"
 
 POLKAVM_IMPORT_WITH_INDEX(0, uint64_t, _gas);
 uint64_t gas(void) { return _gas(); }
@@ -16,6 +17,16 @@ uint64_t set_storage(const void* key, uint64_t key_len, const void* value, uint6
     return _set_storage((uint64_t)key, key_len, (uint64_t)value, value_len);
 }
 
+POLKAVM_IMPORT_WITH_INDEX(200, uint64_t, _get_storage_many, uint64_t, uint64_t, uint64_t);
+uint64_t get_storage_many(uint64_t service_id, jam_storage_op_t* ops, uint64_t count) {
+    return _get_storage_many(service_id, (uint64_t)ops, count);
+}
+
+POLKAVM_IMPORT_WITH_INDEX(201, uint64_t, _set_storage_many, uint64_t, uint64_t);
+uint64_t set_storage_many(jam_storage_op_t* ops, uint64_t count) {
+    return _set_storage_many((uint64_t)ops, count);
+}
+
 POLKAVM_IMPORT_WITH_INDEX(100, void, _log, uint64_t, uint64_t, uint64_t, uint64_t, uint64_t);
 void log_raw(uint64_t level, const void* target, uint64_t target_len, const void* message, uint64_t message_len) {
     _log(level, (uint64_t)target, target_len, (uint64_t)message, message_len);
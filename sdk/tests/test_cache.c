@@ -0,0 +1,271 @@
+/**
+ * @file test_cache.c
+ * @brief Host-side tests for the storage cache (jam_cache.c)
+ *
+ * Built with the host compiler against a fake storage that counts host
+ * calls, once as is and once with -DJAM_BATCH_STORAGE:
+ *
+ *   cc -Isrc tests/test_cache.c -o test_cache && ./test_cache
+ *
+ * tests/test_sdk_cache.py at the repository root does this under pytest.
+ */
+
+#include <stdio.h>
+#include <string.h>
+
+// Small enough to fill
+#define JAM_CACHE_SLOTS 4
+#define JAM_CACHE_VALUE_MAX 16
+
+#include "../src/jam_str.c"
+#include "../src/jam_cache.c"
+
+// --- Fake host ---
+
+#define STORE_MAX 16
+#define VALUE_MAX 128
+
+typedef struct {
+    uint8_t key[32];
+    uint64_t key_len;
+    uint8_t value[VALUE_MAX];
+    uint64_t value_len;
+    int used;
+} item_t;
+
+static item_t _store[STORE_MAX];
+static int _gets, _sets, _batches;
+static uint64_t _set_result = HOST_OK;      // forced result of set_storage, if not HOST_OK
+static uint64_t _batch_result = HOST_WHAT;  // forced result of set_storage_many, if not HOST_OK
+
+static item_t* _find(const void* key, uint64_t key_len) {
+    for (int i = 0; i < STORE_MAX; i++) {
+        if (_store[i].used && _store[i].key_len == key_len && memcmp(_store[i].key, key, key_len) == 0) {
+            return &_store[i];
+        }
+    }
+    return NULL;
+}
+
+static void _put(const void* key, uint64_t key_len, const void* value, uint64_t value_len) {
+    item_t* it = _find(key, key_len);
+    if (value_len == 0) {
+        if (it) it->used = 0;
+        return;
+    }
+    for (int i = 0; !it && i < STORE_MAX; i++) {
+        if (!_store[i].used) it = &_store[i];
+    }
+    it->used = 1;
+    it->key_len = key_len;
+    memcpy(it->key, key, key_len);
+    it->value_len = value_len;
+    memcpy(it->value, value, value_len);
+}
+
+uint64_t get_storage(uint64_t service_id, const void* key, uint64_t key_len, void* out, uint64_t out_offset,
+                     uint64_t out_len) {
+    (void)service_id;
+    _gets++;
+    item_t* it = _find(key, key_len);
+    if (!it) return HOST_NONE;
+    if (out_offset < it->value_len) {
+        uint64_t n = it->value_len - out_offset;
+        memcpy(out, it->value + out_offset, n < out_len ? n : out_len);
+    }
+    return it->value_len;
+}
+
+uint64_t set_storage(const void* key, uint64_t key_len, const void* value, uint64_t value_len) {
+    _sets++;
+    if (_set_result != HOST_OK) return _set_result;
+    _put(key, key_len, value, value_len);
+    return HOST_OK;
+}
+
+uint64_t set_storage_many(jam_storage_op_t* ops, uint64_t count) {
+    _batches++;
+    if (_batch_result != HOST_OK) return _batch_result;
+    for (uint64_t i = 0; i < count; i++) {
+        _put((const void*)ops[i].key_ptr, ops[i].key_len, (const void*)ops[i].value_ptr, ops[i].value_len);
+    }
+    return count;
+}
+
+// --- Harness ---
+
+static int _failures;
+
+#define CHECK(cond)                                                     \
+    do {                                                                \
+        if (!(cond)) {                                                  \
+            printf("%s:%d: %s: %s\n", __FILE__, __LINE__, __func__, #cond); \
+            _failures++;                                                \
+        }                                                               \
+    } while (0)
+
+static void _setup(void) {
+    memset(_store, 0, sizeof(_store));
+    storage_cache_reset();
+    _gets = _sets = _batches = 0;
+    _set_result = HOST_OK;
+    _batch_result = HOST_WHAT;
+}
+
+static uint64_t _get(const char* key, char* out, uint64_t offset, uint64_t len) {
+    return cached_get_storage(0, key, strlen(key), out, offset, len);
+}
+
+static uint64_t _set(const char* key, const char* value) {
+    return cached_set_storage(key, strlen(key), value, strlen(value));
+}
+
+static const char* _stored(const char* key) {
+    static char buf[VALUE_MAX + 1];
+    item_t* it = _find(key, strlen(key));
+    if (!it) return "";
+    memcpy(buf, it->value, it->value_len);
+    buf[it->value_len] = 0;
+    return buf;
+}
+
+// --- Tests ---
+
+static void test_hit_and_miss(void) {
+    char out[8] = {0};
+    _setup();
+    _put("a", 1, "one", 3);
+
+    CHECK(_get("a", out, 0, sizeof(out)) == 3 && memcmp(out, "one", 3) == 0);
+    CHECK(_get("a", out, 1, 2) == 3 && memcmp(out, "ne", 2) == 0);
+    CHECK(_gets == 1);
+
+    // A missing key is remembered as missing
+    CHECK(_get("b", out, 0, sizeof(out)) == HOST_NONE);
+    CHECK(_get("b", out, 0, sizeof(out)) == HOST_NONE);
+    CHECK(_gets == 2);
+
+    // Other services' storage is not cached
+    cached_get_storage(7, "a", 1, out, 0, sizeof(out));
+    cached_get_storage(7, "a", 1, out, 0, sizeof(out));
+    CHECK(_gets == 4);
+}
+
+static void test_writes_wait_for_flush(void) {
+    char out[8] = {0};
+    _setup();
+    _put("a", 1, "one", 3);
+    _get("a", out, 0, sizeof(out));
+
+    CHECK(_set("b", "two") == HOST_OK);
+    CHECK(_set("b", "2") == HOST_OK);
+    CHECK(_get("b", out, 0, sizeof(out)) == 1 && out[0] == '2');
+    // Writing back what storage holds is not a change
+    CHECK(_set("a", "one") == HOST_OK);
+    CHECK(_sets == 0 && _gets == 1);
+
+    CHECK(storage_cache_flush() == 0);
+    CHECK(_sets + _batches >= 1 && strcmp(_stored("b"), "2") == 0);
+    int calls = _sets + _batches;
+    CHECK(storage_cache_flush() == 0);
+    CHECK(_sets + _batches == calls);
+
+    // Deleting is buffered like a write
+    CHECK(_set("b", "") == HOST_OK);
+    CHECK(_get("b", out, 0, sizeof(out)) == HOST_NONE);
+    storage_cache_flush();
+    CHECK(_find("b", 1) == NULL);
+}
+
+static void test_full_table_goes_to_host(void) {
+    const char* keys[] = {"k0", "k1", "k2", "k3", "k4"};
+    _setup();
+    for (int i = 0; i < 5; i++) _set(keys[i], "v");
+    // Four slots: the fifth key is written straight through
+    CHECK(_sets == 1 && strcmp(_stored("k4"), "v") == 0);
+    storage_cache_flush();
+    for (int i = 0; i < 5; i++) CHECK(strcmp(_stored(keys[i]), "v") == 0);
+}
+
+static void test_long_values_go_to_host(void) {
+    char value[40], out[40];
+    for (int i = 0; i < 40; i++) value[i] = (char)('a' + i % 26);
+    _setup();
+    _put("big", 3, value, sizeof(value));
+
+    // The probe holds the first JAM_CACHE_VALUE_MAX bytes and serves this read
+    CHECK(_get("big", out, 2, 8) == sizeof(value) && memcmp(out, value + 2, 8) == 0);
+    CHECK(_gets == 1);
+    // Later reads go straight to the host, once each
+    CHECK(_get("big", out, 0, sizeof(out)) == sizeof(value) && memcmp(out, value, sizeof(value)) == 0);
+    CHECK(_get("big", out, 10, 4) == sizeof(value) && memcmp(out, value + 10, 4) == 0);
+    CHECK(_gets == 3);
+
+    // A long write goes through; a short one is cached again
+    value[0] = 'Z';
+    CHECK(cached_set_storage("big", 3, value, sizeof(value)) == HOST_OK && _sets == 1);
+    CHECK(_get("big", out, 0, 1) == sizeof(value) && out[0] == 'Z' && _gets == 4);
+    _set("big", "small");
+    CHECK(_get("big", out, 0, sizeof(out)) == 5 && _gets == 4);
+}
+
+static void test_reset_drops_unflushed_writes(void) {
+    char out[8] = {0};
+    _setup();
+    _put("a", 1, "one", 3);
+    _set("a", "new");
+    storage_cache_reset();
+    CHECK(storage_cache_flush() == 0 && _sets == 0 && _batches == 0);
+    CHECK(_get("a", out, 0, sizeof(out)) == 3 && memcmp(out, "one", 3) == 0 && _gets == 1);
+}
+
+static void test_failed_flush_keeps_writes(void) {
+    _setup();
+    _set("a", "1");
+    _set("b", "2");
+    _set_result = HOST_FULL;
+    _batch_result = HOST_OOB;
+    CHECK(storage_cache_flush() == 2);
+    CHECK(_find("a", 1) == NULL && _find("b", 1) == NULL);
+
+    // Still dirty: the next flush writes them
+    _set_result = HOST_OK;
+    CHECK(storage_cache_flush() == 0);
+    CHECK(strcmp(_stored("a"), "1") == 0 && strcmp(_stored("b"), "2") == 0);
+}
+
+#ifdef JAM_BATCH_STORAGE
+static void test_batched_flush(void) {
+    _setup();
+    _set("a", "1");
+    _set("b", "2");
+    _batch_result = HOST_OK;
+    CHECK(storage_cache_flush() == 0);
+    CHECK(_batches == 1 && _sets == 0);
+    CHECK(strcmp(_stored("a"), "1") == 0 && strcmp(_stored("b"), "2") == 0);
+
+    // A host without the call: one write per key instead
+    _set("a", "3");
+    _batch_result = HOST_WHAT;
+    CHECK(storage_cache_flush() == 0);
+    CHECK(_batches == 2 && _sets == 1 && strcmp(_stored("a"), "3") == 0);
+}
+#endif
+
+int main(void) {
+    test_hit_and_miss();
+    test_writes_wait_for_flush();
+    test_full_table_goes_to_host();
+    test_long_values_go_to_host();
+    test_reset_drops_unflushed_writes();
+    test_failed_flush_keeps_writes();
+#ifdef JAM_BATCH_STORAGE
+    test_batched_flush();
+#endif
+    if (_failures) {
+        printf("%d check(s) failed\n", _failures);
+        return 1;
+    }
+    printf("ok\n");
+    return 0;
+}
@@ -0,0 +1,142 @@
+"""
+Content-hashed build cache.
+
+`ajanta build` spends its time in two steps whose output depends only on
+their inputs: transpiling (service source and aj-lang) and compiling (C text,
+cflags, the SDK and the build tool). Each step's output is stored under a
+hash of its inputs, so an unchanged service skips both, and an edit that
+transpiles to the same C (a comment, say) still skips the compile.
+
+Entries are plain files in .ajanta-cache/ or $AJANTA_CACHE_DIR: <hash>.json
+holds the C of each service in a source file, <hash>.pvm a compiled service.
+They are written atomically, so concurrent builds can share a cache, and
+deleting the directory is always safe.
+
+Only the service file itself is hashed: edits to modules it imports are not
+seen, use --no-cache for those.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CACHE_DIR = ".ajanta-cache"
+
+# Bumped when the layout or key derivation changes
+CACHE_VERSION = b"1"
+
+# sdk/ next to src/, as ajanta-build-tool finds it
+SDK_DIR = Path(__file__).parent.parent.parent.parent / "sdk"
+
+
+def default_cache_dir() -> Path:
+    return Path(os.environ.get("AJANTA_CACHE_DIR", DEFAULT_CACHE_DIR))
+
+
+# (root, suffixes) -> (file stats, digest) of the last _digest_tree
+_tree_digests: Dict[tuple, Tuple[tuple, bytes]] = {}
+
+
+def _digest_tree(root: Path, suffixes: tuple) -> bytes:
+    """
+    Hash of every file under `root` with one of `suffixes`, names included.
+
+    Files are only reread when one was added, removed or modified since the
+    last call, so watch mode sees SDK and aj-lang edits without rehashing them
+    on every rebuild.
+    """
+    paths = sorted(p for p in root.rglob("*") if p.suffix in suffixes and p.is_file()) if root.is_dir() else []
+    stats = []
+    for path in paths:
+        st = path.stat()
+        stats.append((str(path), st.st_size, st.st_mtime_ns))
+    stats = tuple(stats)
+    cached = _tree_digests.get((root, suffixes))
+    if cached is not None and cached[0] == stats:
+        return cached[1]
+
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(str(path.relative_to(root)).encode() + b"\0")
+        h.update(path.read_bytes())
+    _tree_digests[(root, suffixes)] = (stats, h.digest())
+    return h.digest()
+
+
+def _aj_lang_digest() -> bytes:
+    """aj-lang's version and sources; an editable install changes without a version bump"""
+    import aj_lang
+
+    root = Path(aj_lang.__file__).parent
+    return aj_lang.__version__.encode() + _digest_tree(root, (".py",))
+
+
+def _tool_digest(tool: Optional[str]) -> bytes:
+    if not tool:
+        return b""
+    try:
+        st = os.stat(tool)
+    except OSError:
+        return tool.encode()
+    return f"{tool}:{st.st_size}:{st.st_mtime_ns}".encode()
+
+
+def _key(parts: Iterable[bytes]) -> str:
+    h = hashlib.sha256(CACHE_VERSION)
+    for part in parts:
+        # Length-prefixed so no two part lists hash alike
+        h.update(len(part).to_bytes(8, "little") + part)
+    return h.hexdigest()
+
+
+class BuildCache:
+    """Transpiled C and compiled PVM blobs, keyed by what produced them"""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root is not None else default_cache_dir()
+
+    def transpile_key(self, source: bytes) -> str:
+        return _key([b"transpile", source, _aj_lang_digest()])
+
+    def compile_key(self, c_code: str, cflags: List[str], tool: Optional[str]) -> str:
+        return _key([
+            b"compile",
+            c_code.encode(),
+            "\0".join(cflags).encode(),
+            _digest_tree(SDK_DIR, (".c", ".h", ".S")),
+            _tool_digest(tool),
+        ])
+
+    def get_transpiled(self, key: str) -> Optional[Dict[str, str]]:
+        """C code of each service in a source file, by class name"""
+        data = self._read(f"{key}.json")
+        return json.loads(data) if data is not None else None
+
+    def put_transpiled(self, key: str, c_codes: Dict[str, str]) -> None:
+        self._write(f"{key}.json", json.dumps(c_codes).encode())
+
+    def get_pvm(self, key: str) -> Optional[bytes]:
+        return self._read(f"{key}.pvm")
+
+    def put_pvm(self, key: str, blob: bytes) -> None:
+        self._write(f"{key}.pvm", blob)
+
+    def _read(self, name: str) -> Optional[bytes]:
+        try:
+            return (self.root / name).read_bytes()
+        except OSError:
+            return None
+
+    def _write(self, name: str, data: bytes) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.root / name)
+        except BaseException:
+            os.unlink(tmp)
+            raise
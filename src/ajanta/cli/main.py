@@ -9,13 +9,19 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import hashlib
 import sys
 import os
 import subprocess
 import shutil
 import tempfile
+import time
 from pathlib import Path
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, List
+
+from ajanta.cli.cache import DEFAULT_CACHE_DIR, BuildCache
 
 
 # Default CFLAGS for PVM compilation
@@ -60,8 +66,8 @@ def find_build_tool() -> Optional[str]:
     return None
 
 
-def transpile_python_to_c(input_path: Path, verbose: bool = False) -> str:
-    """Transpile a Python service file to C code."""
+def transpile_services(input_path: Path, verbose: bool = False, optimize: bool = True) -> Dict[str, str]:
+    """Transpile every @service class in a Python file, by class name, in definition order."""
     import importlib.util
     
     # Ensure aj_lang is available
@@ -72,31 +78,44 @@ def transpile_python_to_c(input_path: Path, verbose: bool = False) -> str:
         print("Error: aj-lang is not installed. Run 'make install' first.", file=sys.stderr)
         sys.exit(1)
     
-    # Load the Python module
+    # Load the Python module, under a name of its own so several files can be loaded
     abs_path = input_path.resolve()
-    spec = importlib.util.spec_from_file_location("service_module", abs_path)
+    module_name = "service_module_" + hashlib.sha1(str(abs_path).encode()).hexdigest()[:12]
+    spec = importlib.util.spec_from_file_location(module_name, abs_path)
     if spec is None or spec.loader is None:
         raise ValueError(f"Cannot load module from {abs_path}")
     
     module = importlib.util.module_from_spec(spec)
-    sys.modules["service_module"] = module
+    # Registered while transpiling, which finds structs through the module;
+    # the file's directory is importable only while it runs
+    sys.modules[module_name] = module
     sys.path.insert(0, str(abs_path.parent))
-    spec.loader.exec_module(module)
-    
-    # Find the service class
-    services = get_all_services()
-    if not services:
-        raise ValueError("No @service decorated class found in the module")
-    
-    meta = list(services.values())[0]
-    
-    # Transpile to C
-    c_code = transpile_service(meta.cls)
-    
-    if verbose:
-        print(f"Transpiled {input_path} to C ({len(c_code)} bytes)")
-    
-    return c_code
+    try:
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            sys.path.remove(str(abs_path.parent))
+
+        # Find the service classes this file defined
+        services = [meta for meta in get_all_services().values() if meta.cls.__module__ == module_name]
+        if not services:
+            raise ValueError("No @service decorated class found in the module")
+
+        # Transpile to C
+        c_codes = {}
+        for meta in services:
+            c_codes[meta.cls.__name__] = transpile_service(meta.cls, optimize)
+            if verbose:
+                print(f"Transpiled {meta.cls.__name__} from {input_path} to C ({len(c_codes[meta.cls.__name__])} bytes)")
+    finally:
+        sys.modules.pop(module_name, None)
+
+    return c_codes
+
+
+def transpile_python_to_c(input_path: Path, verbose: bool = False, optimize: bool = True) -> str:
+    """Transpile the first service in a Python file to C code."""
+    return next(iter(transpile_services(input_path, verbose, optimize).values()))
 
 
 def compile_c_to_pvm(c_path: Path, output_path: Path, cflags: List[str], verbose: bool = False) -> bool:
@@ -127,66 +146,252 @@ def compile_c_to_pvm(c_path: Path, output_path: Path, cflags: List[str], verbose
     return True
 
 
-def cmd_build(args):
-    """Build a Python service to PVM (full pipeline)."""
-    input_path = Path(args.input)
-    
-    if not input_path.exists():
-        print(f"Error: Input file '{input_path}' not found", file=sys.stderr)
-        sys.exit(1)
-    
-    # Determine output path
-    if args.output:
-        output_path = Path(args.output)
-    else:
-        output_path = Path("build") / input_path.with_suffix(".pvm").name
-    
-    # Ensure output directory exists
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    print(f"Building {input_path} → {output_path}")
-    
-    # Step 1: Transpile Python to C
-    if args.verbose:
-        print("Step 1: Transpiling Python → C...")
-    
-    try:
-        c_code = transpile_python_to_c(input_path, args.verbose)
-    except Exception as e:
-        print(f"Error during transpilation: {e}", file=sys.stderr)
-        sys.exit(1)
-    
-    # Write C file (either to temp or alongside output)
-    if args.keep_c:
-        c_path = output_path.with_suffix(".c")
+@dataclass
+class ServiceBuild:
+    """One service on its way from Python to PVM."""
+    name: str
+    source: Path
+    output: Path
+    c_code: str = ""
+    transpile_time: float = 0.0
+    compile_time: float = 0.0
+    # The .pvm came from the build cache
+    cached: bool = False
+    size: int = 0
+    ok: bool = False
+
+
+def find_sources(inputs: List[str]) -> List[Path]:
+    """
+    Expand build inputs into service files: .py files as given, every .py
+    file in a directory, and manifests (any other file) listing one input per
+    line, relative to the manifest; blank lines and # comments are skipped.
+    """
+    sources: List[Path] = []
+    for item in inputs:
+        path = Path(item)
+        if not path.exists():
+            raise FileNotFoundError(f"Input '{path}' not found")
+        if path.is_dir():
+            found = sorted(p for p in path.glob("*.py") if not p.name.startswith("_"))
+        elif path.suffix == ".py":
+            found = [path]
+        else:
+            lines = [line.split("#", 1)[0].strip() for line in path.read_text().splitlines()]
+            found = find_sources([str(path.parent / line) for line in lines if line])
+        sources.extend(p for p in found if p not in sources)
+    return sources
+
+
+def transpile_source(
+    source: Path, output: Path, verbose: bool = False, cache: Optional[BuildCache] = None
+) -> List[ServiceBuild]:
+    """
+    Transpile every service in `source`. A file with one service builds to
+    `output`; with several, service X builds to <output stem>.X.pvm beside it.
+    Raises on transpile errors.
+    """
+    started = time.perf_counter()
+    c_codes = None
+    if cache:
+        c_key = cache.transpile_key(source.read_bytes())
+        c_codes = cache.get_transpiled(c_key)
+        if c_codes is not None and verbose:
+            print(f"  Transpile of {source} cached")
+    if c_codes is None:
+        c_codes = transpile_services(source, verbose)
+        if cache:
+            cache.put_transpiled(c_key, c_codes)
+    elapsed = (time.perf_counter() - started) / len(c_codes)
+    
+    builds = []
+    for name, c_code in c_codes.items():
+        path = output if len(c_codes) == 1 else output.with_name(f"{output.stem}.{name}.pvm")
+        builds.append(ServiceBuild(name, source, path, c_code, transpile_time=elapsed))
+    return builds
+
+
+def compile_service(
+    build: ServiceBuild, cflags: List[str], keep_c: bool = False, verbose: bool = False, cache: Optional[BuildCache] = None
+) -> ServiceBuild:
+    """Compile a transpiled service, from the cache if possible. Sets build.ok."""
+    started = time.perf_counter()
+    build.output.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Write C file alongside output if asked
+    if keep_c:
+        c_path = build.output.with_suffix(".c")
         with open(c_path, "w") as f:
-            f.write(c_code)
-        if args.verbose:
+            f.write(build.c_code)
+        if verbose:
             print(f"  Saved C code to {c_path}")
+    
+    if cache:
+        pvm_key = cache.compile_key(build.c_code, cflags, find_build_tool())
+        blob = cache.get_pvm(pvm_key)
+        if blob is not None:
+            build.output.write_bytes(blob)
+            build.cached, build.size, build.ok = True, len(blob), True
+            build.compile_time = time.perf_counter() - started
+            return build
+    
+    if keep_c:
+        success = compile_c_to_pvm(c_path, build.output, cflags, verbose)
     else:
         # Use a temp file
         c_file = tempfile.NamedTemporaryFile(mode="w", suffix=".c", delete=False)
-        c_file.write(c_code)
+        c_file.write(build.c_code)
         c_file.close()
         c_path = Path(c_file.name)
+        try:
+            success = compile_c_to_pvm(c_path, build.output, cflags, verbose)
+        finally:
+            c_path.unlink()
     
-    # Step 2: Compile C to PVM
-    if args.verbose:
-        print("Step 2: Compiling C → PVM...")
+    build.compile_time = time.perf_counter() - started
+    if success:
+        blob = build.output.read_bytes()
+        if cache:
+            cache.put_pvm(pvm_key, blob)
+        build.size, build.ok = len(blob), True
+    return build
+
+
+def build_services(
+    sources: List[Path],
+    output_for,
+    cflags: List[str],
+    keep_c: bool = False,
+    verbose: bool = False,
+    cache: Optional[BuildCache] = None,
+    jobs: int = 1,
+) -> List[ServiceBuild]:
+    """
+    Transpile every service in `sources` (one at a time: it imports them),
+    then compile up to `jobs` services at once. `output_for(source)` is where
+    a source's service builds to.
+    """
+    builds: List[ServiceBuild] = []
+    for source in sources:
+        if verbose:
+            print(f"Transpiling {source} → C...")
+        try:
+            builds.extend(transpile_source(source, output_for(source), verbose, cache))
+        except Exception as e:
+            print(f"Error during transpilation of {source}: {e}", file=sys.stderr)
+            builds.append(ServiceBuild(source.stem, source, output_for(source)))
+    
+    # Compiling is ajanta-build-tool's work in a subprocess, so threads are enough to overlap it
+    todo = [b for b in builds if b.c_code]
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for build in pool.map(lambda b: compile_service(b, cflags, keep_c, verbose, cache), todo):
+            if build.ok:
+                cached = ", cached" if build.cached else ""
+                print(f"✓ Built {build.output} ({build.size} bytes{cached})")
+            else:
+                print(f"✗ Failed {build.name} ({build.source})", file=sys.stderr)
+    return builds
+
+
+def report_builds(builds: List[ServiceBuild], elapsed: float) -> None:
+    """Per-service timings and sizes, for multi-service builds."""
+    print()
+    print(f"{'service':<24} {'transpile':>10} {'compile':>10} {'size':>10}  output")
+    for b in builds:
+        size = f"{b.size}" if b.ok else "failed"
+        compile_time = f"{b.compile_time:.2f}s" + ("*" if b.cached else " ")
+        print(f"{b.name:<24} {b.transpile_time:>9.2f}s {compile_time:>10} {size:>10}  {b.output}")
+    failed = sum(not b.ok for b in builds)
+    print(f"{len(builds)} services, {failed} failed, {elapsed:.2f}s  (* cached)")
+
+
+def build_service(
+    input_path: Path,
+    output_path: Path,
+    cflags: List[str],
+    keep_c: bool = False,
+    verbose: bool = False,
+    cache: Optional[BuildCache] = None,
+) -> bool:
+    """Transpile and compile the services in one file, reusing cached steps. Returns success."""
+    print(f"Building {input_path} → {output_path}")
+    builds = build_services([input_path], lambda _: output_path, cflags, keep_c, verbose, cache)
+    return all(b.ok for b in builds)
+
+
+def watch(paths: List[Path], rebuild, interval: float = 0.5) -> None:
+    """Call `rebuild` with the files that changed whenever any of `paths` changes, until interrupted."""
+    print(f"Watching {len(paths)} file(s) (Ctrl-C to stop)")
+    
+    def stamp(path):
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    last = {path: stamp(path) for path in paths}
+    try:
+        while True:
+            time.sleep(interval)
+            current = {path: stamp(path) for path in paths}
+            changed = [p for p in paths if current[p] is not None and current[p] != last[p]]
+            last = current
+            if changed:
+                rebuild(changed)
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_build(args):
+    """Build Python services to PVM (full pipeline)."""
+    try:
+        sources = find_sources(args.inputs)
+    except (FileNotFoundError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not sources:
+        print("Error: No service files found", file=sys.stderr)
+        sys.exit(1)
     
-    cflags = args.cflags if args.cflags else DEFAULT_CFLAGS
+    # One file builds to -o; several build into -o as a directory
+    single = len(sources) == 1 and len(args.inputs) == 1 and sources[0] == Path(args.inputs[0])
+    if single and args.output:
+        output_path = Path(args.output)
+        output_for = lambda _: output_path
+    else:
+        out_dir = Path(args.output) if args.output else Path("build")
+        output_for = lambda source: out_dir / source.with_suffix(".pvm").name
     
-    try:
-        success = compile_c_to_pvm(c_path, output_path, cflags, args.verbose)
-    finally:
-        # Clean up temp file if we created one
-        if not args.keep_c and c_path.exists():
-            c_path.unlink()
+    # Same-named files from different directories would overwrite each other
+    built_from = {}
+    for source in sources:
+        other = built_from.setdefault(output_for(source), source)
+        if other != source:
+            print(f"Error: {other} and {source} both build to {output_for(source)}", file=sys.stderr)
+            sys.exit(1)
     
-    if not success:
+    cflags = args.cflags if args.cflags else DEFAULT_CFLAGS
+    if args.batch_storage:
+        cflags = cflags + ["-DJAM_BATCH_STORAGE"]
+    
+    cache = None if args.no_cache else BuildCache(args.cache_dir)
+    jobs = args.jobs or os.cpu_count() or 1
+    
+    def rebuild(changed):
+        started = time.perf_counter()
+        if single:
+            print(f"Building {changed[0]} → {output_for(changed[0])}")
+        builds = build_services(changed, output_for, cflags, args.keep_c, args.verbose, cache, jobs)
+        if len(builds) > 1:
+            report_builds(builds, time.perf_counter() - started)
+        return all(b.ok for b in builds)
+    
+    success = rebuild(sources)
+    if args.watch:
+        watch(sources, rebuild)
+    elif not success:
         sys.exit(1)
-    
-    print(f"✓ Built {output_path} ({output_path.stat().st_size} bytes)")
 
 
 def cmd_transpile(args):
@@ -209,7 +414,7 @@ def cmd_transpile(args):
     print(f"Transpiling {input_path} → {output_path}")
     
     try:
-        c_code = transpile_python_to_c(input_path, args.verbose)
+        c_code = transpile_python_to_c(input_path, args.verbose, not args.no_optimize)
     except Exception as e:
         print(f"Error during transpilation: {e}", file=sys.stderr)
         sys.exit(1)
@@ -240,6 +445,8 @@ def cmd_compile(args):
     print(f"Compiling {input_path} → {output_path}")
     
     cflags = args.cflags if args.cflags else DEFAULT_CFLAGS
+    if args.batch_storage:
+        cflags = cflags + ["-DJAM_BATCH_STORAGE"]
     success = compile_c_to_pvm(input_path, output_path, cflags, args.verbose)
     
     if not success:
@@ -258,6 +465,8 @@ Examples:
   ajanta build examples/python/hello.py                    # Build to build/hello.pvm
   ajanta build examples/python/hello.py -o service.pvm     # Build to service.pvm
   ajanta build examples/python/hello.py --keep-c           # Keep intermediate C file
+  ajanta build examples/python/hello.py --watch            # Rebuild on every change
+  ajanta build examples/python/ -o build/ -j 8             # Build every service in a directory
   ajanta transpile examples/python/hello.py                # Just generate C code
   ajanta compile build/service.c -o build/service.pvm      # Compile C to PVM
 """,
@@ -269,11 +478,19 @@ Examples:
     # Build command (full pipeline: py → c → pvm)
     build_parser = subparsers.add_parser(
         "build",
-        help="Build a Python service to PVM (full pipeline)",
+        help="Build Python services to PVM (full pipeline)",
         description="Transpiles Python to C, then compiles to PVM"
     )
-    build_parser.add_argument("input", help="Input Python file (.py)")
-    build_parser.add_argument("-o", "--output", help="Output PVM file (default: build/<name>.pvm)")
+    build_parser.add_argument(
+        "inputs",
+        nargs="+",
+        metavar="input",
+        help="Python service files, directories of them, or manifests listing them"
+    )
+    build_parser.add_argument(
+        "-o", "--output",
+        help="Output PVM file for one input, else output directory (default: build/)"
+    )
     build_parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
     build_parser.add_argument("--keep-c", action="store_true", help="Keep intermediate C file")
     build_parser.add_argument(
@@ -281,6 +498,30 @@ Examples:
         nargs="*",
         help="Custom CFLAGS for compilation (overrides defaults)"
     )
+    build_parser.add_argument(
+        "--batch-storage",
+        action="store_true",
+        help="Flush state with one batched storage call (experimental, needs host support)"
+    )
+    build_parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        help="Services to compile at once (default: CPU count)"
+    )
+    build_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Rebuild whenever the input file changes"
+    )
+    build_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always transpile and compile, ignoring the build cache"
+    )
+    build_parser.add_argument(
+        "--cache-dir",
+        help=f"Build cache directory (default: $AJANTA_CACHE_DIR or {DEFAULT_CACHE_DIR})"
+    )
     build_parser.set_defaults(func=cmd_build)
     
     # Transpile command (py → c only)
@@ -292,6 +533,11 @@ Examples:
     transpile_parser.add_argument("input", help="Input Python file (.py)")
     transpile_parser.add_argument("-o", "--output", help="Output C file (default: build/<name>.c)")
     transpile_parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
+    transpile_parser.add_argument(
+        "--no-optimize",
+        action="store_true",
+        help="Skip the transpiler's optimisation passes (to compare gas against an optimised build)",
+    )
     transpile_parser.set_defaults(func=cmd_transpile)
     
     # Compile command (c → pvm only)
@@ -308,6 +554,11 @@ Examples:
         nargs="*",
         help="Custom CFLAGS for compilation (overrides defaults)"
     )
+    compile_parser.add_argument(
+        "--batch-storage",
+        action="store_true",
+        help="Flush state with one batched storage call (experimental, needs host support)"
+    )
     compile_parser.set_defaults(func=cmd_compile)
     
     args = parser.parse_args()
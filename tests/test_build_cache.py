@@ -0,0 +1,156 @@
+"""
+Tests for ajanta build: the build cache and multi-service builds.
+"""
+
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from ajanta.cli import main as cli
+from ajanta.cli.cache import BuildCache, _digest_tree
+
+EXAMPLES = Path(__file__).parent.parent / "examples" / "python"
+HELLO = EXAMPLES / "hello.py"
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Count transpiles and compiles; the 'compiler' just copies the C"""
+    calls = {"transpile": 0, "compile": 0}
+    transpile = cli.transpile_services
+
+    def fake_transpile(path, verbose=False):
+        calls["transpile"] += 1
+        return transpile(path, verbose)
+
+    def fake_compile(c_path, output_path, cflags, verbose=False):
+        calls["compile"] += 1
+        time.sleep(calls.get("delay", 0))
+        shutil.copy(c_path, output_path)
+        return True
+
+    monkeypatch.setattr(cli, "transpile_services", fake_transpile)
+    monkeypatch.setattr(cli, "compile_c_to_pvm", fake_compile)
+    return calls
+
+
+def test_unchanged_service_skips_both_steps(tmp_path, builds):
+    src = tmp_path / "hello.py"
+    shutil.copy(HELLO, src)
+    out = tmp_path / "hello.pvm"
+    cache = BuildCache(tmp_path / "cache")
+
+    assert cli.build_service(src, out, ["-O2"], cache=cache)
+    first = out.read_bytes()
+    out.unlink()
+    assert cli.build_service(src, out, ["-O2"], cache=cache)
+    assert out.read_bytes() == first
+    assert builds == {"transpile": 1, "compile": 1}
+
+    # New cflags recompile the cached C
+    assert cli.build_service(src, out, ["-O2", "-DX"], cache=cache)
+    assert builds == {"transpile": 1, "compile": 2}
+
+    # A comment changes the source but not the C
+    src.write_text(src.read_text() + "\n# comment\n")
+    assert cli.build_service(src, out, ["-O2"], cache=cache)
+    assert builds == {"transpile": 2, "compile": 2}
+
+
+def test_without_cache_always_builds(tmp_path, builds):
+    out = tmp_path / "hello.pvm"
+    for _ in range(2):
+        assert cli.build_service(HELLO, out, [], cache=None)
+    assert builds == {"transpile": 2, "compile": 2}
+
+
+def test_keys_cover_inputs(tmp_path):
+    cache = BuildCache(tmp_path)
+    assert cache.transpile_key(b"a") != cache.transpile_key(b"b")
+    assert cache.compile_key("int x;", ["-a", "-b"], None) != cache.compile_key("int x;", ["-a -b"], None)
+    assert cache.compile_key("int x;", [], "/bin/tool") != cache.compile_key("int x;", [], None)
+    assert cache.get_pvm("missing") is None
+
+
+def test_tree_digest_sees_edits(tmp_path):
+    sdk = tmp_path / "sdk"
+    sdk.mkdir()
+    (sdk / "a.c").write_text("int a;")
+    first = _digest_tree(sdk, (".c",))
+    assert _digest_tree(sdk, (".c",)) == first
+    # As a --watch rebuild after an SDK edit would
+    (sdk / "a.c").write_text("int bb;")
+    second = _digest_tree(sdk, (".c",))
+    assert second != first
+    (sdk / "b.c").write_text("")
+    assert _digest_tree(sdk, (".c",)) not in (first, second)
+
+
+def two_services(path):
+    """hello.py with a second, renamed copy of its service"""
+    source = HELLO.read_text()
+    body = source[source.index("@service"):]
+    path.write_text(source + "\n\n" + body.replace("class HelloService", "class GoodbyeService"))
+
+
+def test_directory_with_several_services(tmp_path, builds):
+    services = tmp_path / "services"
+    services.mkdir()
+    shutil.copy(HELLO, services / "hello.py")
+    shutil.copy(EXAMPLES / "token.py", services / "token.py")
+    two_services(services / "greet.py")
+
+    out = tmp_path / "out"
+    sources = cli.find_sources([str(services)])
+    built = cli.build_services(sources, lambda s: out / s.with_suffix(".pvm").name, [], jobs=4)
+    assert all(b.ok for b in built)
+    assert sorted(p.name for p in out.iterdir()) == [
+        "greet.GoodbyeService.pvm", "greet.HelloService.pvm", "hello.pvm", "token.pvm"
+    ]
+    assert builds == {"transpile": 3, "compile": 4}
+
+
+def test_same_named_services_are_refused(tmp_path, builds, monkeypatch, capsys):
+    for name in "ab":
+        (tmp_path / name).mkdir()
+        shutil.copy(EXAMPLES / "token.py", tmp_path / name / "token.py")
+    out = tmp_path / "out"
+    monkeypatch.setattr("sys.argv", ["ajanta", "build", str(tmp_path / "a"), str(tmp_path / "b"), "-o", str(out)])
+    with pytest.raises(SystemExit) as exc:
+        cli.main()
+    assert exc.value.code == 1
+    assert "both build to" in capsys.readouterr().err
+    assert builds == {"transpile": 0, "compile": 0}
+    assert not out.exists()
+
+
+def test_transpiling_leaves_import_state_alone():
+    path, modules = list(sys.path), set(sys.modules)
+    assert "HelloService" in cli.transpile_services(HELLO)
+    assert sys.path == path
+    assert {name for name in set(sys.modules) - modules if name.startswith("service_module_")} == set()
+
+
+def test_manifest(tmp_path):
+    shutil.copy(HELLO, tmp_path / "hello.py")
+    (tmp_path / "sub").mkdir()
+    shutil.copy(EXAMPLES / "token.py", tmp_path / "sub" / "token.py")
+    manifest = tmp_path / "services.txt"
+    manifest.write_text("# catalogue\nhello.py\n\nsub  # every service in sub/\nhello.py\n")
+    assert cli.find_sources([str(manifest)]) == [tmp_path / "hello.py", tmp_path / "sub" / "token.py"]
+    with pytest.raises(FileNotFoundError):
+        cli.find_sources([str(tmp_path / "missing.py")])
+
+
+def test_compiles_run_concurrently(tmp_path, builds):
+    builds["delay"] = 0.3
+    for name in "abcd":
+        shutil.copy(HELLO, tmp_path / f"{name}.py")
+    sources = cli.find_sources([str(tmp_path)])
+    started = time.perf_counter()
+    built = cli.build_services(sources, lambda s: tmp_path / "out" / s.with_suffix(".pvm").name, [], jobs=4)
+    assert len(built) == 4 and all(b.ok for b in built)
+    assert time.perf_counter() - started < 4 * 0.3
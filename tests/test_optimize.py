@@ -0,0 +1,290 @@
+"""
+Tests for the transpiler's optimisation passes.
+"""
+
+import ast
+import textwrap
+from pathlib import Path
+
+from aj_lang.transpiler.code_gen import CCodeGenerator
+from aj_lang.transpiler.optimize import optimize_function
+
+EXAMPLES = Path(__file__).parent.parent / "examples" / "python"
+
+MAP = {'type': 'U64', 'is_map': True, 'is_struct': False, 'key_type': 'U64', 'val_type': 'U64'}
+STATE_VARS = {
+    'supply': {'type': 'U64', 'is_map': False, 'is_struct': False, 'key_type': None, 'val_type': None},
+    'balances': MAP,
+    'allowed': MAP,
+}
+
+
+def optimized(code: str):
+    func = ast.parse(textwrap.dedent(code)).body[0]
+    gen = CCodeGenerator("Test", state_vars=STATE_VARS)
+    return optimize_function(func, gen), gen
+
+
+def c_body(code: str, optimize: bool = True) -> str:
+    func = ast.parse(textwrap.dedent(code)).body[0]
+    gen = CCodeGenerator("Test", state_vars=STATE_VARS)
+    if optimize:
+        optimize_function(func, gen)
+    gen.visit(func)
+    return "\n".join(gen.output)
+
+
+class CountingMap(dict):
+    """Storage map: missing keys read as 0, reads are counted"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def __getitem__(self, key):
+        self.reads += 1
+        return self.get(key, 0)
+
+
+class Service:
+    def __init__(self):
+        self.supply = 0
+        self.balances = CountingMap()
+        self.allowed = CountingMap()
+
+
+def run(func: ast.FunctionDef, *args):
+    """Call `func` as Python; returns its result, the maps and the map reads"""
+    namespace = {}
+    exec(compile(ast.fix_missing_locations(ast.Module([func], [])), "<test>", "exec"), namespace)
+    svc = Service()
+    svc.balances.update({1: 10, 2: 20, 3: 30})
+    result = namespace[func.name](svc, *args)
+    return result, dict(svc.balances), dict(svc.allowed), svc.balances.reads + svc.allowed.reads
+
+
+def assert_same_behaviour(code: str, calls):
+    """Optimised code returns and stores the same, with no more map reads"""
+    saved = 0
+    for args in calls:
+        before = run(ast.parse(textwrap.dedent(code)).body[0], *args)
+        after = run(optimized(code)[0], *args)
+        assert after[:3] == before[:3], args
+        assert after[3] <= before[3], args
+        saved += before[3] - after[3]
+    return saved
+
+
+TRANSFER = '''
+def transfer(self, a, b, amount):
+    if self.balances[a] < amount:
+        return 0
+    self.balances[a] -= amount
+    self.balances[b] += amount
+    return self.balances[a] + self.balances[b]
+'''
+
+LOOP = '''
+def spread(self, a, n):
+    total = 0
+    for i in range(n):
+        total += self.balances[a] * i
+        self.allowed[i] = self.balances[a]
+    return total
+'''
+
+
+class TestMapReads:
+    """Repeated and loop-invariant map reads."""
+
+    def test_repeated_reads_are_reused(self):
+        saved = assert_same_behaviour(TRANSFER, [(1, 2, 5), (1, 1, 5), (2, 1, 50), (4, 3, 0)])
+        assert saved > 0
+        assert c_body(TRANSFER).count("balances_get(") < c_body(TRANSFER, optimize=False).count("balances_get(")
+
+    def test_write_to_any_key_forgets_the_map(self):
+        # a and b may be equal, so reading balances[a] after writing balances[b] must read again
+        code = '''
+def f(self, a, b):
+    x = self.balances[a]
+    self.balances[b] = 7
+    return x + self.balances[a]
+'''
+        assert_same_behaviour(code, [(1, 1), (1, 2)])
+        assert c_body(code).count("balances_get(a)") == 2
+
+    def test_reassigned_key_is_read_again(self):
+        code = '''
+def f(self, a, b):
+    x = self.balances[a]
+    a = b
+    return x + self.balances[a]
+'''
+        assert_same_behaviour(code, [(1, 2), (2, 2)])
+        assert c_body(code).count("balances_get(a)") == 2
+
+    def test_branches_keep_only_common_reads(self):
+        code = '''
+def f(self, a, b):
+    if b > 1:
+        x = self.balances[a]
+    else:
+        self.balances[a] = 5
+    return self.balances[a]
+'''
+        assert_same_behaviour(code, [(1, 1), (1, 2), (3, 5)])
+
+    def test_short_circuit_reads_stay_conditional(self):
+        code = '''
+def f(self, a, b):
+    if b > 0 and self.balances[a] > 0:
+        return self.balances[a]
+    return 0
+'''
+        func, _ = optimized(code)
+        assert_same_behaviour(code, [(1, 0), (1, 1), (9, 1)])
+        assert isinstance(func.body[0], ast.If)
+
+    def test_invariant_read_leaves_loop(self):
+        func, gen = optimized(LOOP)
+        assert isinstance(func.body[1], ast.Assign) and func.body[1].targets[0].id == "_hoist1"
+        assert gen.declared_types["_hoist1"] == "uint64_t"
+        assert assert_same_behaviour(LOOP, [(1, 3), (3, 5)]) > 0
+        # A loop that never runs still reads once, but behaves the same
+        assert run(optimized(LOOP)[0], 1, 0)[:3] == run(ast.parse(LOOP).body[0], 1, 0)[:3]
+
+        c_code = c_body(LOOP)
+        assert c_code.index("_hoist1 = balances_get(a);") < c_code.index("for (;")
+        assert c_code.count("balances_get(") == 1
+
+    def test_read_keyed_on_loop_variable_stays_in_loop(self):
+        code = '''
+def f(self, a, n):
+    total = 0
+    for i in range(n):
+        total += self.balances[i]
+    return total
+'''
+        assert_same_behaviour(code, [(1, 0), (1, 4)])
+        c_code = c_body(code)
+        assert "_hoist" not in c_code
+        assert c_code.index("i = _tmp1;") < c_code.index("balances_get(i)")
+
+    def test_loop_variable_follows_python(self):
+        code = '''
+def f(self, a, n):
+    i = a
+    for i in range(n):
+        i = i * 2
+    return i
+'''
+        c_code = c_body(code)
+        # The body's write to i doesn't steer the loop; i keeps its value past the end
+        assert "for (; _tmp1 < _tmp2; _tmp1 += _tmp3) {" in c_code
+        assert c_code.index("i = _tmp1;") < c_code.index("i = (i * 2);")
+        assert "i +=" not in c_code and "i <" not in c_code
+
+    def test_read_of_written_map_stays_in_loop(self):
+        code = '''
+def f(self, a, n):
+    while self.balances[a] < n:
+        self.balances[a] += 1
+    return self.balances[a]
+'''
+        assert_same_behaviour(code, [(1, 12), (4, 3)])
+        assert "_hoist" not in c_body(code)
+
+    def test_unknown_call_forgets_everything(self):
+        code = '''
+def f(self, a):
+    x = self.balances[a]
+    set_storage(a, x)
+    return self.balances[a]
+'''
+        assert c_body(code).count("balances_get(a)") == 2
+
+
+class TestConstantsAndDeadStores:
+    """Constant folding and dead-store elimination."""
+
+    def test_folds_constants_and_dead_branches(self):
+        code = '''
+def f(self, a):
+    x = 2 * 8 + 1
+    if 3 > 4:
+        return 99
+    return x + a
+'''
+        func, _ = optimized(code)
+        assert ast.unparse(func.body[0]) == "x = 17"
+        assert len(func.body) == 2
+        assert "99" not in c_body(code)
+
+    def test_overwritten_read_is_dropped(self):
+        code = '''
+def f(self, a, b):
+    y = self.balances[a]
+    y = self.balances[b]
+    return y
+'''
+        c_code = c_body(code)
+        assert "balances_get(a)" not in c_code
+        assert assert_same_behaviour(code, [(1, 2)]) == 1
+
+    def test_folding_keeps_declared_types(self):
+        code = '''
+def f(self, a):
+    x = 2 + 3
+    return x
+'''
+        assert "uint64_t x = 0;" in c_body(code) and "uint64_t x = 0;" in c_body(code, optimize=False)
+
+    def test_store_before_nested_break_stays(self):
+        code = '''
+def f(self, n):
+    x = 0
+    for i in range(n):
+        x = 7
+        if i == 3:
+            break
+        x = 1
+    return x
+'''
+        assert "x = 7;" in c_body(code)
+        assert_same_behaviour(code, [(2,), (5,)])
+
+    def test_store_before_nested_continue_stays(self):
+        code = '''
+def f(self, a):
+    x = 0
+    n = 0
+    while x < 100 and n < 5:
+        n += 1
+        x = 200
+        if a == 1:
+            continue
+        x = a
+    return x
+'''
+        assert "x = 200;" in c_body(code)
+        assert_same_behaviour(code, [(1,), (2,)])
+
+    def test_stores_with_side_effects_stay(self):
+        code = '''
+def f(self, a):
+    x = gas()
+    return a
+'''
+        assert "x = gas();" in c_body(code)
+
+
+class TestServices:
+    """Transpiling the examples."""
+
+    def test_token_reads_less(self):
+        from ajanta.cli.main import transpile_services
+
+        plain = next(iter(transpile_services(EXAMPLES / "token.py", optimize=False).values()))
+        fast = next(iter(transpile_services(EXAMPLES / "token.py").values()))
+        assert fast.count("_get(") < plain.count("_get(")
+        assert "balances_set(sender, (bal_from - amount));" in fast
@@ -0,0 +1,24 @@
+"""
+Runs the SDK storage cache's C tests (sdk/tests/test_cache.c) with the host compiler.
+"""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+SDK = Path(__file__).parent.parent / "sdk"
+CC = shutil.which("cc") or shutil.which("gcc") or shutil.which("clang")
+
+
+@pytest.mark.skipif(CC is None, reason="no host C compiler")
+@pytest.mark.parametrize("flags", [[], ["-DJAM_BATCH_STORAGE"]], ids=["per-key", "batched"])
+def test_storage_cache(tmp_path, flags):
+    binary = tmp_path / "test_cache"
+    subprocess.run(
+        [CC, "-Wall", *flags, "-I", str(SDK / "src"), str(SDK / "tests" / "test_cache.c"), "-o", str(binary)],
+        check=True,
+    )
+    result = subprocess.run([str(binary)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout
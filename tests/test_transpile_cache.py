@@ -0,0 +1,129 @@
+"""
+Tests for the transpiler's source and method caches.
+"""
+
+import importlib.util
+import itertools
+import os
+import sys
+import time
+
+import pytest
+
+from aj_lang.transpiler import bench, source_cache, transpile
+
+SERVICE = '''
+from aj_lang.decorators import service, refine, structure
+from aj_lang.types import U32, U64, Mapping
+
+@structure
+class Point:
+    x: U64
+    y: U64
+
+@structure
+class Line:
+    a: U64
+    b: U64
+
+@service
+class Shapes:
+    points: Mapping[U64, Point]
+
+    @refine
+    def refine(self, payload: bytes) -> bytes:
+        p = self.points[1]
+        return p.x + {delta}
+'''
+
+
+_loads = itertools.count(1)
+
+
+def load(path, source: str):
+    """Write and import a service module, as ajanta build does on each rebuild"""
+    n = next(_loads)
+    path.write_text(source)
+    # Edits within a second may keep the size too; make sure they are seen
+    stamp = time.time() + n
+    os.utime(path, (stamp, stamp))
+    name = f"shapes_{n}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module.Shapes
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count parses of whole modules, and method bodies generated"""
+    calls = {"module": 0, "method": 0}
+    init = source_cache.ModuleSource.__init__
+    optimize = transpile.optimize_function
+
+    def counting_init(self, *args):
+        calls["module"] += 1
+        init(self, *args)
+
+    def counting_optimize(func, gen):
+        calls["method"] += 1
+        return optimize(func, gen)
+
+    monkeypatch.setattr(source_cache.ModuleSource, "__init__", counting_init)
+    monkeypatch.setattr(transpile, "optimize_function", counting_optimize)
+    return calls
+
+
+class TestTranspileCache:
+    """Parsing modules once and regenerating only changed methods."""
+
+    def test_module_parsed_once_for_all_structs(self, tmp_path, parses):
+        cls = load(tmp_path / "shapes.py", SERVICE.format(delta=0))
+        c_code = transpile.transpile_service(cls)
+        assert "} Point;" in c_code and "} Line;" in c_code
+        assert parses["module"] == 1
+
+    def test_unchanged_method_is_not_regenerated(self, tmp_path, parses):
+        path = tmp_path / "shapes.py"
+        first = transpile.transpile_service(load(path, SERVICE.format(delta=100)))
+        again = transpile.transpile_service(load(path, SERVICE.format(delta=100)))
+        assert again == first
+        assert parses == {"module": 1, "method": 1}
+
+    def test_edited_method_is_regenerated(self, tmp_path, parses):
+        path = tmp_path / "shapes.py"
+        first = transpile.transpile_service(load(path, SERVICE.format(delta=200)))
+        edited = transpile.transpile_service(load(path, SERVICE.format(delta=201)))
+        assert "+ 200" in first and "+ 201" in edited
+        assert parses == {"module": 2, "method": 2}
+
+    def test_struct_change_regenerates_methods(self, tmp_path, parses):
+        path = tmp_path / "shapes.py"
+        source = SERVICE.format(delta=400)
+        transpile.transpile_service(load(path, source))
+        # Same struct names, different fields
+        transpile.transpile_service(load(path, source.replace("    x: U64", "    x: U32")))
+        assert parses["method"] == 2
+
+    def test_invalidate_forces_a_reparse(self, tmp_path, parses):
+        cls = load(tmp_path / "shapes.py", SERVICE.format(delta=500))
+        transpile.transpile_service(cls)
+        source_cache.invalidate(str(tmp_path / "shapes.py"))
+        transpile.transpile_service(cls)
+        assert parses["module"] == 2
+
+    def test_cached_and_uncached_output_agree(self, tmp_path):
+        cls = load(tmp_path / "shapes.py", SERVICE.format(delta=300))
+        cached = transpile.transpile_service(cls)
+        transpile._method_cache.clear()
+        source_cache._modules.clear()
+        assert transpile.transpile_service(cls) == cached
+
+    def test_bench_runs(self, capsys):
+        assert bench.main(["--structs", "3", "--services", "4"]) == 0
+        out = capsys.readouterr().out
+        # Every service's refine is generated cold, none unchanged, one after an edit
+        assert "    4 methods generated" in out.splitlines()[1]
+        assert "    0 methods generated" in out.splitlines()[2]
+        assert "    1 methods generated" in out.splitlines()[3]
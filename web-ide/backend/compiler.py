@@ -0,0 +1,195 @@
+"""
+Compile results cache and warm transpiler workers for the IDE backend.
+
+The frontend resubmits the same sources often (run after compile, page
+reloads), and every Python compile used to start a fresh interpreter just to
+import aj-lang and transpile. Successful compiles are kept here by a hash of
+what produced them: language, source and the toolchain (aj-lang's sources
+for Python, the SDK sources and the ajanta-build-tool binary). Identical
+compiles that arrive together share one build.
+
+Python services are transpiled in a pool of worker processes that import
+aj-lang once when they start. Workers also keep aj-lang's own caches, so a
+resubmitted service with one edited method only regenerates that method.
+"""
+import asyncio
+import contextlib
+import hashlib
+import importlib.util
+import io
+import itertools
+import linecache
+import os
+import shutil
+import sys
+import tempfile
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+AJ_LANG_PATH = os.path.join(project_root, "aj-lang")
+SDK_DIR = Path(project_root) / "sdk"
+
+# Successful compiles kept in memory
+CACHE_SIZE = int(os.environ.get("IDE_COMPILE_CACHE_SIZE", "256"))
+# Transpiler worker processes; defaults to one per CPU
+TRANSPILE_WORKERS = int(os.environ.get("IDE_TRANSPILE_WORKERS", "0")) or os.cpu_count() or 1
+# Services a worker transpiles before it is replaced, as each one runs user code in it
+TRANSPILES_PER_WORKER = int(os.environ.get("IDE_TRANSPILES_PER_WORKER", "200"))
+
+
+@lru_cache(maxsize=None)
+def _digest_tree(root: Path, suffixes: tuple) -> bytes:
+    """Hash of every file under `root` with one of `suffixes`, names included"""
+    h = hashlib.sha256()
+    if root.is_dir():
+        for path in sorted(p for p in root.rglob("*") if p.suffix in suffixes and p.is_file()):
+            h.update(str(path.relative_to(root)).encode() + b"\0")
+            h.update(path.read_bytes())
+    return h.digest()
+
+
+def _aj_lang_digest() -> bytes:
+    """Sources of the aj-lang the workers import; hashed once, a restart picks up changes"""
+    if AJ_LANG_PATH not in sys.path:
+        sys.path.append(AJ_LANG_PATH)
+    spec = importlib.util.find_spec("aj_lang")
+    if spec is None or not spec.submodule_search_locations:
+        return b""
+    return _digest_tree(Path(list(spec.submodule_search_locations)[0]), (".py",))
+
+
+def _tool_digest(path: str) -> bytes:
+    tool = shutil.which("ajanta-build-tool", path=path)
+    if not tool:
+        return b""
+    try:
+        st = os.stat(tool)
+    except OSError:
+        return tool.encode()
+    # Rebuilding the tool changes its size or mtime, and so the key
+    return f"{tool}:{st.st_size}:{st.st_mtime_ns}".encode()
+
+
+def toolchain_digest(language: str, path: str) -> bytes:
+    """What besides the source decides a compile's output; `path` is the PATH builds run with"""
+    parts = [_digest_tree(SDK_DIR, (".c", ".h", ".S")), _tool_digest(path)]
+    if language == "python":
+        parts.append(_aj_lang_digest())
+    return b"".join(parts)
+
+
+class CompileCache:
+    """Successful compile responses by content hash, least recently used evicted first"""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def key(language: str, source: str, toolchain: bytes) -> str:
+        h = hashlib.sha256()
+        for part in (language.encode(), source.encode(), toolchain):
+            # Length-prefixed so no two part lists hash alike
+            h.update(len(part).to_bytes(8, "little") + part)
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+        return result
+
+    def put(self, key: str, result: dict) -> None:
+        if self.size <= 0:
+            return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    async def get_or_compile(self, key: str, compile: Callable[[], Awaitable[dict]]) -> dict:
+        """The cached response for `key`, or the result of `compile()`, kept if it succeeded"""
+        result = self.get(key)
+        if result is not None:
+            return {**result, "cached": True}
+
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.ensure_future(compile())
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # Shielded: a client that goes away doesn't cancel the build for the others waiting on it
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        del self._pending[key]
+        if not task.cancelled() and task.exception() is None and task.result().get("success"):
+            self.put(key, task.result())
+
+
+def init_transpiler():
+    """Import aj-lang up front, so the first transpile doesn't pay for it"""
+    if AJ_LANG_PATH not in sys.path:
+        sys.path.append(AJ_LANG_PATH)
+    if project_root not in sys.path:
+        sys.path.append(project_root)
+    import aj_lang.decorators  # noqa: F401
+    import aj_lang.transpiler.transpile  # noqa: F401
+
+
+def create_transpile_pool() -> ProcessPoolExecutor:
+    # Spawned rather than forked: the server process runs threads
+    return ProcessPoolExecutor(
+        max_workers=TRANSPILE_WORKERS,
+        mp_context=get_context("spawn"),
+        initializer=init_transpiler,
+        max_tasks_per_child=TRANSPILES_PER_WORKER,
+    )
+
+
+_loads = itertools.count()
+
+
+def transpile_python(source: str) -> dict:
+    """
+    Transpile the first service in `source` to C. Returns success, the C
+    code and the logs, which hold whatever the module printed.
+    """
+    from aj_lang.decorators import get_all_services
+    from aj_lang.transpiler import source_cache
+    from aj_lang.transpiler.transpile import transpile_service
+
+    output = io.StringIO()
+    module_name = f"ide_service_{os.getpid()}_{next(_loads)}"
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "service.py")
+        with open(path, "w") as f:
+            f.write(source)
+        try:
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                spec = importlib.util.spec_from_file_location(module_name, path)
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = module
+                spec.loader.exec_module(module)
+
+                # Only this module's services: earlier jobs registered theirs too
+                services = [meta for meta in get_all_services().values() if meta.cls.__module__ == module_name]
+                if not services:
+                    raise ValueError("No @service decorated class found in the module")
+                meta = services[0]
+                c_code = transpile_service(meta.cls)
+            print(f"Transpiled {meta.cls.__name__} to C ({len(c_code)} bytes)", file=output)
+            return {"success": True, "c_code": c_code, "logs": output.getvalue()}
+        except Exception:
+            return {"success": False, "logs": output.getvalue() + traceback.format_exc()}
+        finally:
+            # The file is gone after this job; don't keep its module or source around
+            sys.modules.pop(module_name, None)
+            source_cache.invalidate(path)
+            linecache.cache.pop(path, None)
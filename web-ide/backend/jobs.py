@@ -0,0 +1,328 @@
+"""
+PVM executions for the IDE backend, run in worker processes.
+
+An execution writes the playground's process-wide state (state.delta) and
+points the global tracers at its own trace capture, so executions must not
+share a process at the same time. Each worker process runs one job at a
+time, starting from the genesis service accounts, and returns its result
+and logs as plain data.
+
+A job can also stream its trace as it runs: given a queue, it sends
+structured events (host calls with the gas left, service log output, other
+trace events) in batches. The queue is bounded, so a slow reader slows the
+job down rather than piling events up in memory, and a job streams at most
+STREAM_MAX_EVENTS events.
+"""
+import copy
+import logging
+import os
+import queue as queues
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Optional
+
+# Setup paths for playground imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+sys.path.append(project_root)
+sys.path.append(os.path.join(project_root, "playground"))
+sys.path.append(os.path.join(project_root, "playground/deps/tsrkit-types"))
+sys.path.append(os.path.join(project_root, "playground/deps/tsrkit-asm/python"))
+sys.path.append(os.path.join(project_root, "playground/deps/tsrkit-pvm"))
+
+from playground.execution import trace
+from playground.execution.invocations.protocol import HOST_CALL
+from playground.execution.invocations.refine import PsiR
+from playground.types.work.package import WorkPackage, Authorizer, WorkItems
+from playground.types.work.item import WorkItem, ImportSpecs, ExtrinsicSpecs
+from playground.types.protocol.core import ServiceId, Gas, Balance, TimeSlot
+from playground.types.protocol.crypto import OpaqueHash
+from playground.types.state.state import state
+from playground.types.state.delta import AccountData, AccountMetadata
+from playground.types.work.report import RefineContext
+from playground.execution.invocations.accumulate import PsiA
+from playground.types.state.accumulation.types import OperandTuples, OperandTuple
+from playground.types.state.partial import GhostPartial
+from playground.types.protocol.core import WorkPackageHash, ExportsRoot
+from playground.types.protocol.crypto import Hash
+from playground.types.state.phi import AuthorizerHash
+from playground.types.work import WorkExecResult
+from tsrkit_types import Bytes, Uint
+
+# Worker processes for PVM runs; defaults to one per CPU
+RUN_WORKERS = int(os.environ.get("IDE_RUN_WORKERS", "0")) or os.cpu_count() or 1
+
+# Batches of events waiting for the reader before a streaming job blocks
+STREAM_QUEUE_SIZE = int(os.environ.get("IDE_STREAM_QUEUE_SIZE", "32"))
+# Events a job streams; later ones are counted and dropped
+STREAM_MAX_EVENTS = int(os.environ.get("IDE_STREAM_MAX_EVENTS", "20000"))
+# Characters of an event's text that are streamed
+STREAM_MAX_TEXT = int(os.environ.get("IDE_STREAM_MAX_TEXT", "2000"))
+# Seconds a job waits on a full queue before it stops streaming
+STREAM_STALL_TIMEOUT = float(os.environ.get("IDE_STREAM_STALL_TIMEOUT", "30"))
+
+# Service accounts every job starts from, taken when the worker starts
+_genesis_delta: Optional[dict] = None
+
+
+def init_worker():
+    global _genesis_delta
+    _genesis_delta = copy.deepcopy(dict(state.delta))
+
+
+def _reset_state():
+    """Undo whatever the previous job in this process did to the accounts"""
+    if _genesis_delta is None:
+        init_worker()
+    state.delta.clear()
+    for service_id, account in copy.deepcopy(_genesis_delta).items():
+        state.delta[service_id] = account
+
+
+def create_pool() -> ProcessPoolExecutor:
+    # Spawned rather than forked: the server process runs threads
+    return ProcessPoolExecutor(max_workers=RUN_WORKERS, mp_context=get_context("spawn"), initializer=init_worker)
+
+
+class EventStream:
+    """Trace listener sending a job's events to `queue` in batches, until `stop` is set"""
+
+    def __init__(self, queue, stop, batch_size: int = 64, interval: float = 0.05):
+        self.queue = queue
+        self.stop = stop
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pending: List[dict] = []
+        self.flushed_at = time.monotonic()
+        self.sent = 0
+        self.dropped = 0
+        self.detached = False
+
+    def __call__(self, event: trace.TraceEvent):
+        if self.detached:
+            return
+        if self.sent >= STREAM_MAX_EVENTS:
+            self.dropped += 1
+            return
+        self.pending.append(_structured(event))
+        self.sent += 1
+        if len(self.pending) >= self.batch_size or time.monotonic() - self.flushed_at >= self.interval:
+            self.flush()
+
+    def _put(self, message) -> None:
+        if self.detached or self.stop.is_set():
+            self.detached = True
+            return
+        try:
+            self.queue.put(message, timeout=STREAM_STALL_TIMEOUT)
+        except queues.Full:
+            # Nobody is reading; finish the job without streaming
+            self.detached = True
+
+    def flush(self) -> None:
+        if self.pending:
+            self._put({"type": "events", "events": self.pending})
+            self.pending = []
+        self.flushed_at = time.monotonic()
+
+    def close(self) -> None:
+        """Send what is left; None tells the reader the job is done"""
+        self.flush()
+        if self.dropped:
+            self._put({"type": "truncated", "dropped": self.dropped})
+        self._put(None)
+
+
+def _structured(event: trace.TraceEvent) -> dict:
+    name, level, msg, args = event
+    if msg == HOST_CALL:
+        return {"type": "host_call", "call": int(args[0]), "gas": int(args[1])}
+    text = msg % args if args else msg
+    if len(text) > STREAM_MAX_TEXT:
+        text = text[:STREAM_MAX_TEXT] + "..."
+    kind = "log" if name == trace.service_trace.logger.name else "trace"
+    return {"type": kind, "level": logging.getLevelName(level), "text": text}
+
+
+def _failure(sink: trace.TraceSink) -> dict:
+    error = traceback.format_exc()
+    return {"success": False, "logs": sink.text() + "\n" + error, "error": error}
+
+
+def run_refine(pvm_bytes: bytes, payload: str, queue=None, stop=None) -> dict:
+    """Refine `payload` (hex) with the service in `pvm_bytes`, streaming to `queue` if given"""
+    _reset_state()
+    stream = EventStream(queue, stop) if queue is not None else None
+    try:
+        return _run_refine(pvm_bytes, payload, stream)
+    finally:
+        if stream:
+            stream.close()
+
+
+def _run_refine(pvm_bytes: bytes, payload: str, stream: Optional[EventStream]) -> dict:
+    # Capture this invocation's trace in a ring buffer instead of raising the
+    # root logger to DEBUG for every request
+    with trace.capture(listener=stream) as sink:
+        try:
+            # Prepare arguments
+            payload_bytes = bytes.fromhex(payload)
+            service_id = ServiceId(0)
+
+            # Create WorkItem
+            work_item = WorkItem(
+                service=service_id,
+                code_hash=OpaqueHash(bytes([0]*32)),
+                refine_gas_limit=Gas(10000000),
+                accumulate_gas_limit=Gas(10000000),
+                export_count=Uint(0),
+                payload=Bytes(payload_bytes),
+                import_segments=ImportSpecs([]),
+                extrinsic=ExtrinsicSpecs([])
+            )
+
+            # Create WorkPackage
+            work_package = WorkPackage(
+                auth_code_host=ServiceId(0),
+                authorization=Bytes(b""),
+                authorizer=Authorizer(code_hash=OpaqueHash(bytes([0]*32)), params=Bytes(b"")),
+                context=RefineContext.empty(),
+                items=WorkItems([work_item])
+            )
+
+            # Setup State
+            account_metadata = AccountMetadata(
+                code_hash=Bytes[32](32),
+                balance=Balance(10**12),
+                gratis_offset=Balance(100),
+                gas_limit=Gas(0),
+                min_gas=Gas(0),
+                created_at=TimeSlot(0),
+                accumulated_at=TimeSlot(0),
+                parent_service=ServiceId(1),
+                num_i=Uint[32](0),
+                num_o=Uint[64](0),
+            )
+            account_data = AccountData(service=account_metadata)
+
+            # Mock historical_lookup to return our PVM code
+            account_data.historical_lookup = lambda x, y: Bytes(pvm_bytes)
+
+            state.delta[service_id] = account_data
+
+            # Execute
+            psir = PsiR(
+                item_index=0,
+                p=work_package,
+                auth_trace=b"",
+                i_segments=[],
+                e_offset=0
+            )
+
+            result, _, _ = psir.execute()
+
+            return {
+                "success": True,
+                "result": str(result),
+                "logs": sink.text()
+            }
+
+        except Exception:
+            return _failure(sink)
+
+
+def run_accumulate(pvm_bytes: bytes, queue=None, stop=None) -> dict:
+    """Accumulate one dummy operand with the service in `pvm_bytes`, streaming to `queue` if given"""
+    _reset_state()
+    stream = EventStream(queue, stop) if queue is not None else None
+    try:
+        return _run_accumulate(pvm_bytes, stream)
+    finally:
+        if stream:
+            stream.close()
+
+
+def _run_accumulate(pvm_bytes: bytes, stream: Optional[EventStream]) -> dict:
+    with trace.capture(listener=stream) as sink:
+        try:
+            # PVM Code
+            code = pvm_bytes
+            service_id = ServiceId(0)
+
+            # Setup Account Data (Reset state for simulation)
+            account_metadata = AccountMetadata(
+                code_hash=Bytes[32](bytes([0]*32)), # Dummy hash
+                balance=Balance(10**12),
+                gratis_offset=Balance(100),
+                gas_limit=Gas(10000000),
+                min_gas=Gas(0),
+                created_at=TimeSlot(0),
+                accumulated_at=TimeSlot(0),
+                parent_service=ServiceId(1),
+                num_i=Uint[32](0),
+                num_o=Uint[64](0),
+            )
+            account_data = AccountData(service=account_metadata)
+            state.delta[service_id] = account_data
+
+            # Calculate code hash and store preimage
+            code_hash = Hash.blake2b(code)
+            state.delta[service_id].service.code_hash = code_hash
+            state.delta[service_id].preimages[code_hash] = Bytes(code)
+
+            # Prepare OperandTuples (Dummy data for simulation)
+            operand_tuple = OperandTuple(
+                p=WorkPackageHash(bytes([0]*32)),
+                e=ExportsRoot(bytes([0]*32)),
+                a=AuthorizerHash(bytes([0]*32)),
+                y=OpaqueHash(bytes([0]*32)),
+                g=Uint(1000),
+                l=WorkExecResult(bytes([0]*32)),
+                t=Bytes(b"")
+            )
+
+            operand_tuples = OperandTuples([operand_tuple])
+
+            # GhostPartial wrapper
+            partial_state = GhostPartial(
+                service_accounts=state.delta,
+                validator_keys=state.iota,
+                authorizer_keys=state.phi,
+                privileges=state.chi
+            )
+
+            timeslot = TimeSlot(1)
+            gas_limit = Gas(10000000)
+            entropy = OpaqueHash(bytes([0]*32))
+
+            psia = PsiA(
+                u=partial_state,
+                t=timeslot,
+                s=service_id,
+                g=gas_limit,
+                o=operand_tuples,
+                entropy=entropy
+            )
+
+            # Execute
+            result, deferred_transfers, commitment, gas_used, preimages = psia.execute()
+
+            # Summarise in the trace; this went to the server's stdout before
+            for line in (
+                f"Deferred Transfers: {deferred_transfers}",
+                f"Commitment: {commitment}",
+                f"Preimages added: {preimages}",
+                f"Gas Used: {gas_used}",
+            ):
+                sink.record("accumulate", logging.INFO, line, ())
+
+            return {
+                "success": True,
+                "logs": sink.text(),
+                "result": f"Gas Used: {gas_used}\nCommitment: {commitment}"
+            }
+
+        except Exception:
+            return _failure(sink)
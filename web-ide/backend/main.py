@@ -1,7 +1,71 @@
-from fastapi import FastAPI
+import asyncio
+import queue
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from multiprocessing import get_context
+
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="Ajanta Web IDE")
+import compiler
+import jobs
+
+# PVM runs and Python transpiles go to worker processes, created on first use
+_run_pool = None
+_transpile_pool = None
+# Serves the queues streamed runs send their events through
+_stream_manager = None
+
+
+def _get_run_pool():
+    global _run_pool
+    if _run_pool is None:
+        _run_pool = jobs.create_pool()
+    return _run_pool
+
+
+async def _run_job(job, *args) -> dict:
+    """Run `job` in the run pool; a worker that dies fails its jobs, not the ones after them"""
+    pool = _get_run_pool()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, job, *args)
+    except BrokenProcessPool as e:
+        # A broken pool takes no more jobs; the next run starts a new one
+        global _run_pool
+        if _run_pool is pool:
+            _run_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+        error = f"Execution worker crashed: {e}"
+        return {"success": False, "logs": error, "error": error}
+
+
+def _get_transpile_pool():
+    global _transpile_pool
+    if _transpile_pool is None:
+        _transpile_pool = compiler.create_transpile_pool()
+    return _transpile_pool
+
+
+def _get_stream_manager():
+    global _stream_manager
+    if _stream_manager is None:
+        _stream_manager = get_context("spawn").Manager()
+    return _stream_manager
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the transpilers now, so the first Python compile finds them warm
+    _get_transpile_pool()
+    yield
+    for pool in (_run_pool, _transpile_pool):
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    if _stream_manager is not None:
+        _stream_manager.shutdown()
+
+
+app = FastAPI(title="Ajanta Web IDE", lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -56,12 +120,69 @@ import subprocess
 import tempfile
 import shutil
 
+# Compiles allowed to run at once; the rest wait their turn
+COMPILE_JOBS = int(os.environ.get("IDE_COMPILE_JOBS", "0")) or os.cpu_count() or 1
+_compile_slots = asyncio.Semaphore(COMPILE_JOBS)
+_compile_cache = compiler.CompileCache()
+
+
+async def _run_command(cmd, cwd=None, env=None, timeout=None) -> subprocess.CompletedProcess:
+    """subprocess.run(..., capture_output=True, text=True) without blocking the event loop"""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        env=env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    except asyncio.CancelledError:
+        # Client went away; don't leave the build running
+        proc.kill()
+        await proc.wait()
+        raise
+    return subprocess.CompletedProcess(
+        cmd, proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    )
+
+
 class CompileRequest(BaseModel):
     source: str
     language: str # python, c, cpp
 
+
+def _build_env():
+    env = os.environ.copy()
+    
+    # Add project root to PYTHONPATH for aj-lang
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+    env["PYTHONPATH"] = f"{env.get('PYTHONPATH', '')}:{project_root}/aj-lang:{project_root}"
+    
+    # Ensure cargo bin is in PATH for ajanta-build-tool
+    cargo_bin = os.path.expanduser("~/.cargo/bin")
+    env["PATH"] = f"{cargo_bin}:{env.get('PATH', '')}"
+    return env
+
+
 @app.post("/compile")
 async def compile_service(request: CompileRequest):
+    env = _build_env()
+    toolchain = compiler.toolchain_digest(request.language, env["PATH"])
+    key = compiler.CompileCache.key(request.language, request.source, toolchain)
+    
+    async def compile():
+        async with _compile_slots:
+            return await _compile_service(request, env)
+    
+    return await _compile_cache.get_or_compile(key, compile)
+
+
+async def _compile_service(request: CompileRequest, env: dict):
     # Create temp dir
     with tempfile.TemporaryDirectory() as temp_dir:
         # Write source file
@@ -74,52 +195,24 @@ async def compile_service(request: CompileRequest):
         
         # Build command
         cmd = []
-        env = os.environ.copy()
-        
-        # Add project root to PYTHONPATH for aj-lang
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
-        env["PYTHONPATH"] = f"{env.get('PYTHONPATH', '')}:{project_root}/aj-lang:{project_root}"
-        
-        # Ensure cargo bin is in PATH for ajanta-build-tool
-        cargo_bin = os.path.expanduser("~/.cargo/bin")
-        env["PATH"] = f"{cargo_bin}:{env.get('PATH', '')}"
         
         if request.language == "python":
             # Python workflow: transpile to C first, then compile to PVM
             c_output_path = source_path.replace(".py", ".c")
-            cmd = ["ajanta", "build", source_path, "-o", c_output_path]
             
-            # Step 1: Transpile Python to C
+            # Step 1: Transpile Python to C, in a worker that already has aj-lang imported
             try:
-                result = subprocess.run(
-                    cmd, 
-                    cwd=project_root,
-                    env=env,
-                    capture_output=True, 
-                    text=True,
-                    check=False
-                )
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(_get_transpile_pool(), compiler.transpile_python, request.source)
                 
-                if result.returncode != 0:
-                    return {"success": False, "logs": result.stdout + "\n" + result.stderr}
+                if not result["success"]:
+                    return {"success": False, "logs": result["logs"]}
                 
-                # Find the generated C file - ajanta puts it in build/ or same dir
-                if not os.path.exists(c_output_path):
-                    # Check for C file with same name
-                    possible_c_file = os.path.join(os.path.dirname(source_path), "service.c")
-                    if os.path.exists(possible_c_file):
-                        c_output_path = possible_c_file
-                    else:
-                        # Parse output for actual C file path
-                        for line in (result.stdout + result.stderr).split('\n'):
-                            if 'Generated C code:' in line:
-                                c_output_path = line.split('Generated C code:')[1].strip()
-                                break
+                with open(c_output_path, "w") as f:
+                    f.write(result["c_code"])
                 
-                if not os.path.exists(c_output_path):
-                    return {"success": False, "logs": f"Transpilation succeeded but C file not found.\n{result.stdout}"}
-                
-                transpile_logs = result.stdout
+                transpile_logs = result["logs"]
                 
             except Exception as e:
                 return {"success": False, "logs": f"Transpilation error: {str(e)}"}
@@ -134,14 +227,7 @@ async def compile_service(request: CompileRequest):
             
         # Run build
         try:
-            result = subprocess.run(
-                cmd, 
-                cwd=project_root, # Run from project root
-                env=env,
-                capture_output=True, 
-                text=True,
-                check=False
-            )
+            result = await _run_command(cmd, cwd=project_root, env=env) # Run from project root
             
             all_logs = (transpile_logs + "\n" if request.language == "python" else "") + result.stdout + "\n" + result.stderr
             
@@ -164,34 +250,6 @@ async def compile_service(request: CompileRequest):
         except Exception as e:
             return {"success": False, "logs": str(e)}
 
-# Setup paths for playground imports
-import sys
-import logging
-import io
-
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
-sys.path.append(project_root)
-sys.path.append(os.path.join(project_root, "playground"))
-sys.path.append(os.path.join(project_root, "playground/deps/tsrkit-types"))
-sys.path.append(os.path.join(project_root, "playground/deps/tsrkit-asm/python"))
-sys.path.append(os.path.join(project_root, "playground/deps/tsrkit-pvm"))
-
-from playground.execution.invocations.refine import PsiR
-from playground.types.work.package import WorkPackage, WorkPackageSpec, Authorizer, WorkItems
-from playground.types.work.item import WorkItem, ImportSpecs, ExtrinsicSpecs
-from playground.types.protocol.core import ServiceId, Gas, Balance, TimeSlot
-from playground.types.protocol.crypto import OpaqueHash
-from playground.types.state.state import state
-from playground.types.state.delta import AccountData, AccountMetadata
-from playground.types.work.report import RefineContext
-from playground.execution.invocations.accumulate import PsiA
-from playground.types.state.accumulation.types import OperandTuples, OperandTuple
-from playground.types.state.partial import GhostPartial
-from playground.types.protocol.core import WorkPackageHash, ExportsRoot
-from playground.types.protocol.crypto import Hash
-from playground.types.state.phi import AuthorizerHash
-from playground.types.work import WorkExecResult
-from tsrkit_types import Bytes, Uint
 
 class RunRequest(BaseModel):
     pvm_hex: str
@@ -205,83 +263,8 @@ async def run_service(request: RunRequest):
     except ValueError:
         return {"success": False, "logs": "Invalid hex string"}
     
-    # Setup logging capture
-    log_capture_string = io.StringIO()
-    ch = logging.StreamHandler(log_capture_string)
-    ch.setLevel(logging.DEBUG)
-    logger = logging.getLogger()
-    logger.addHandler(ch)
-    logger.setLevel(logging.DEBUG)
-    
-    try:
-        # Prepare arguments
-        payload_bytes = bytes.fromhex(request.payload)
-        service_id = ServiceId(0)
-        
-        # Create WorkItem
-        work_item = WorkItem(
-            service=service_id,
-            code_hash=OpaqueHash(bytes([0]*32)), 
-            refine_gas_limit=Gas(10000000),
-            accumulate_gas_limit=Gas(10000000),
-            export_count=Uint(0),
-            payload=Bytes(payload_bytes),
-            import_segments=ImportSpecs([]),
-            extrinsic=ExtrinsicSpecs([])
-        )
-
-        # Create WorkPackage
-        work_package = WorkPackage(
-            auth_code_host=ServiceId(0),
-            authorization=Bytes(b""),
-            authorizer=Authorizer(code_hash=OpaqueHash(bytes([0]*32)), params=Bytes(b"")),
-            context=RefineContext.empty(),
-            items=WorkItems([work_item])
-        )
-        
-        # Setup State
-        account_metadata = AccountMetadata(
-            code_hash=Bytes[32](32),
-            balance=Balance(10**12),
-            gratis_offset=Balance(100),
-            gas_limit=Gas(0),
-            min_gas=Gas(0),
-            created_at=TimeSlot(0),
-            accumulated_at=TimeSlot(0),
-            parent_service=ServiceId(1),
-            num_i=Uint[32](0),
-            num_o=Uint[64](0),
-        )
-        account_data = AccountData(service=account_metadata)
-        
-        # Mock historical_lookup to return our PVM code
-        account_data.historical_lookup = lambda x, y: Bytes(pvm_bytes)
-        
-        state.delta[service_id] = account_data
-        
-        # Execute
-        psir = PsiR(
-            item_index=0,
-            p=work_package,
-            auth_trace=b"",
-            i_segments=[],
-            e_offset=0
-        )
-        
-        result, _, _ = psir.execute()
-        
-        logs = log_capture_string.getvalue()
-        return {
-            "success": True,
-            "result": str(result),
-            "logs": logs
-        }
-        
-    except Exception as e:
-        import traceback
-        return {"success": False, "logs": log_capture_string.getvalue() + "\n" + traceback.format_exc()}
-    finally:
-        logger.removeHandler(ch)
+    # Runs in a worker process, with its own state and trace capture
+    return await _run_job(jobs.run_refine, pvm_bytes, request.payload)
 
 
 class AccumulateRequest(BaseModel):
@@ -295,96 +278,94 @@ async def accumulate_service(request: AccumulateRequest):
     except ValueError:
         return {"success": False, "logs": "Invalid hex string"}
     
-    # Setup logging
-    log_capture_string = io.StringIO()
-    ch = logging.StreamHandler(log_capture_string)
-    ch.setLevel(logging.DEBUG)
-    logger = logging.getLogger()
-    logger.addHandler(ch)
-    logger.setLevel(logging.DEBUG)
-    
+    return await _run_job(jobs.run_accumulate, pvm_bytes)
+
+
+# =============================================
+# Streamed runs (WebSocket)
+# =============================================
+#
+# The client sends one request, the same JSON as /run or /accumulate, and
+# receives messages as the job runs:
+#   {"type": "events", "events": [...]}   host_call (call, gas), log and trace events
+#   {"type": "truncated", "dropped": n}   events past IDE_STREAM_MAX_EVENTS
+#   {"type": "result", ...}               as /run or /accumulate, without the logs
+# then the server closes the socket.
+
+async def _stream_job(websocket: WebSocket, job, *args):
+    manager = _get_stream_manager()
+    events, stop = manager.Queue(jobs.STREAM_QUEUE_SIZE), manager.Event()
+    future = asyncio.ensure_future(_run_job(job, *args, events, stop))
     try:
-        # PVM Code
-        code = pvm_bytes
-        service_id = ServiceId(0)
-        
-        # Setup Account Data (Reset state for simulation)
-        account_metadata = AccountMetadata(
-            code_hash=Bytes[32](bytes([0]*32)), # Dummy hash
-            balance=Balance(10**12),
-            gratis_offset=Balance(100),
-            gas_limit=Gas(10000000),
-            min_gas=Gas(0),
-            created_at=TimeSlot(0),
-            accumulated_at=TimeSlot(0),
-            parent_service=ServiceId(1),
-            num_i=Uint[32](0),
-            num_o=Uint[64](0),
-        )
-        account_data = AccountData(service=account_metadata)
-        state.delta[service_id] = account_data
-        
-        # Calculate code hash and store preimage
-        code_hash = Hash.blake2b(code)
-        state.delta[service_id].service.code_hash = code_hash
-        state.delta[service_id].preimages[code_hash] = Bytes(code)
-        
-        # Prepare OperandTuples (Dummy data for simulation)
-        operand_tuple = OperandTuple(
-            p=WorkPackageHash(bytes([0]*32)),
-            e=ExportsRoot(bytes([0]*32)),
-            a=AuthorizerHash(bytes([0]*32)),
-            y=OpaqueHash(bytes([0]*32)),
-            g=Uint(1000),
-            l=WorkExecResult(bytes([0]*32)),
-            t=Bytes(b"")
-        )
-        
-        operand_tuples = OperandTuples([operand_tuple])
-        
-        # GhostPartial wrapper
-        partial_state = GhostPartial(
-            service_accounts=state.delta,
-            validator_keys=state.iota,
-            authorizer_keys=state.phi,
-            privileges=state.chi
-        )
-        
-        timeslot = TimeSlot(1)
-        gas_limit = Gas(10000000)
-        entropy = OpaqueHash(bytes([0]*32))
-        
-        psia = PsiA(
-            u=partial_state,
-            t=timeslot,
-            s=service_id,
-            g=gas_limit,
-            o=operand_tuples,
-            entropy=entropy
-        )
-        
-        # Execute
-        result, deferred_transfers, commitment, gas_used, preimages = psia.execute()
-        
-        # Format logs
-        print(f"Deferred Transfers: {deferred_transfers}")
-        print(f"Commitment: {commitment}")
-        print(f"Preimages added: {preimages}")
-        print(f"Gas Used: {gas_used}")
-        
-        logs = log_capture_string.getvalue()
-        
-        return {
-            "success": True,
-            "logs": logs,
-            "result": f"Gas Used: {gas_used}\nCommitment: {commitment}"
-        }
+        while True:
+            try:
+                message = await asyncio.to_thread(events.get, True, 0.5)
+            except queue.Empty:
+                # A job whose worker died never sends its end
+                if future.done():
+                    break
+                continue
+            if message is None:
+                break
+            # Waits for the client; the bounded queue makes the job wait in turn
+            await websocket.send_json(message)
         
-    except Exception as e:
-        import traceback
-        return {"success": False, "logs": log_capture_string.getvalue() + "\n" + traceback.format_exc()}
-    finally:
-        logger.removeHandler(ch)
+        try:
+            result = await future
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        result = {key: value for key, value in result.items() if key != "logs"}
+        await websocket.send_json({"type": "result", **result})
+        await websocket.close()
+    except WebSocketDisconnect:
+        # Let the job finish without streaming the rest; emptying the queue
+        # wakes it if it is waiting for room, and it sees `stop` on its next send
+        stop.set()
+        await asyncio.to_thread(_drain, events)
+
+
+def _drain(events):
+    try:
+        while True:
+            events.get_nowait()
+    except queue.Empty:
+        pass
+
+
+async def _receive_pvm(websocket: WebSocket, model):
+    """The request a streamed run starts with and its PVM bytes, or None after reporting it invalid"""
+    await websocket.accept()
+    try:
+        request = model(**await websocket.receive_json())
+    except WebSocketDisconnect:
+        return None
+    except (ValueError, TypeError) as e:
+        # Not JSON, or not the request's fields
+        error = str(e)
+    else:
+        try:
+            return request, bytes.fromhex(request.pvm_hex)
+        except ValueError:
+            error = "Invalid hex string"
+    await websocket.send_json({"type": "result", "success": False, "error": error})
+    await websocket.close()
+    return None
+
+
+@app.websocket("/run/stream")
+async def run_service_stream(websocket: WebSocket):
+    received = await _receive_pvm(websocket, RunRequest)
+    if received:
+        request, pvm_bytes = received
+        await _stream_job(websocket, jobs.run_refine, pvm_bytes, request.payload)
+
+
+@app.websocket("/accumulate/stream")
+async def accumulate_service_stream(websocket: WebSocket):
+    received = await _receive_pvm(websocket, AccumulateRequest)
+    if received:
+        _, pvm_bytes = received
+        await _stream_job(websocket, jobs.run_accumulate, pvm_bytes)
 
 
 # =============================================
@@ -415,12 +396,7 @@ class NetworkStatusRequest(BaseModel):
 async def network_status(request: NetworkStatusRequest):
     """Check if the network is reachable via jamt."""
     try:
-        result = subprocess.run(
-            [JAMT_PATH, "--rpc", request.rpc_url, "queue"],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        result = await _run_command([JAMT_PATH, "--rpc", request.rpc_url, "queue"], timeout=10)
         
         if result.returncode == 0:
             return {"success": True, "status": "connected", "logs": result.stdout}
@@ -457,12 +433,7 @@ async def deploy_service(request: DeployRequest):
         ]
         
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=120  # Deployment can take a while
-            )
+            result = await _run_command(cmd, timeout=120)  # Deployment can take a while
             
             output = result.stdout + "\n" + result.stderr
             
@@ -510,12 +481,7 @@ async def invoke_service(request: InvokeRequest):
     ]
     
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
+        result = await _run_command(cmd, timeout=120)
         
         output = result.stdout + "\n" + result.stderr
         